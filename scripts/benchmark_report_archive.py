@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Report archive benchmark for ClaimVision.
+
+Builds the archive of a synthetic photo claim (2 GiB of 4 MiB JPEG photos
+by default, one item per photo) into a byte-counting sink standing in for
+the S3 multipart upload, and reports for the previous archiver, which
+deflated every entry, and for report_archive.write_archive:
+
+    - seconds to build the archive
+    - throughput in MiB of photos per second
+    - size of the resulting archive
+
+The photos are random data behind a JPEG header, so like real photos they do
+not shrink when deflated. No database or AWS access is needed.
+
+    python scripts/benchmark_report_archive.py
+    python scripts/benchmark_report_archive.py --size-mb 2048 --photo-mb 4 --level 6
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import time
+import zipfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+from reports import report_archive
+from reports.report_archive import ArchiveEntry
+
+
+class CountingSink:
+    """A non-seekable destination that only counts the bytes written to it."""
+
+    def __init__(self):
+        self.position = 0
+
+    def write(self, data):
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+
+def build_claim(size_mb, photo_mb):
+    """Plan a claim of `size_mb` MiB of photos, returning (entries, items, open_entry)."""
+    photo_size = photo_mb * 1024 * 1024
+    count = max(size_mb // photo_mb, 1)
+    # A few distinct photos are reused; each entry is compressed on its own, so this does not help deflate
+    photos = [b"\xff\xd8\xff\xe0" + os.urandom(photo_size - 4) for _ in range(min(count, 8))]
+    entries = [ArchiveEntry(f"submission/Room {n % 10}/{n + 1} - Item {n} (1).jpg", str(n), "image/jpeg")
+               for n in range(count)]
+    items = [{"number": n + 1, "room": f"Room {n % 10}", "description": f"Item {n}", "quantity": 1,
+              "unit_cost": 10.0, "total_cost": 10.0} for n in range(count)]
+
+    def open_entry(entry):
+        photo = photos[int(entry.source) % len(photos)]
+        return io.BytesIO(photo), len(photo)
+
+    return entries, items, open_entry
+
+
+def legacy_write_archive(fileobj, entries, items, open_entry):
+    """The previous approach: deflate every entry, photos included."""
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        with archive.open(f"{report_archive.SUBMISSION_DIR}/{report_archive.ITEMS_CSV_NAME}", 'w') as target:
+            report_archive.write_items_csv(target, items)
+        for entry in entries:
+            source, size = open_entry(entry)
+            info = zipfile.ZipInfo(entry.arcname)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = size
+            with archive.open(info, 'w') as target:
+                shutil.copyfileobj(source, target, report_archive.COPY_CHUNK_SIZE)
+
+
+def measure(write, entries, items, open_entry):
+    """Build one archive, returning (seconds, archive bytes)."""
+    sink = CountingSink()
+    started = time.perf_counter()
+    write(sink, entries, items, open_entry)
+    return time.perf_counter() - started, sink.tell()
+
+
+def main():
+    """Main function to run the report archive benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--photo-mb", type=int, default=4)
+    parser.add_argument("--level", type=int, default=report_archive.COMPRESS_LEVEL)
+    args = parser.parse_args()
+
+    report_archive.COMPRESS_LEVEL = args.level
+    entries, items, open_entry = build_claim(args.size_mb, args.photo_mb)
+    photo_mib = len(entries) * args.photo_mb
+
+    print(f"{'archiver':>9} {'photos':>7} {'seconds':>9} {'MiB/s':>8} {'archive MiB':>12}")
+    for name, write in (("legacy", legacy_write_archive), ("current", report_archive.write_archive)):
+        seconds, size = measure(write, entries, items, open_entry)
+        print(f"{name:>9} {len(entries):>7} {seconds:9.2f} {photo_mib / seconds:8.1f} {size / 2**20:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
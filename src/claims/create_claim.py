@@ -5,6 +5,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from utils import response
 from utils.lambda_utils import standard_lambda_handler
 from models import Claim, Household
+from utils.claim_summary import initialize_claim_summary
+from utils.change_log import record_changes, CLAIM
 from utils.logging_utils import get_logger
 
 
@@ -85,6 +87,9 @@ def lambda_handler(event: dict, context: dict = None, db_session=None, user=None
             )
             
             db_session.add(new_claim)
+            db_session.flush()
+            initialize_claim_summary(db_session, new_claim.id)
+            record_changes(db_session, CLAIM, [new_claim.id])
             db_session.commit()
             db_session.refresh(new_claim)
         except Exception as e:
@@ -2,19 +2,72 @@
 Lambda handler for deleting a claim and its associated items and files.
 
 This module handles the soft deletion of claims from the ClaimVision system,
-ensuring proper authorization and data integrity.
+ensuring proper authorization and data integrity. The claim's items, files
+and rooms are soft deleted with it, in the same transaction.
 """
 from utils.logging_utils import get_logger
+from sqlalchemy import delete, select, update
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.search_index import reindex_items, reindex_files
+from utils.change_log import record_changes, CLAIM, ITEM, FILE, ROOM
 from models import Claim
+from models.item import Item
+from models.file import File
+from models.room import Room
+from models.item_files import ItemFile
+from models.file_labels import FileLabel
 from database.database import get_db_session
 from datetime import datetime, timezone
 
 
 logger = get_logger(__name__)
 
+
+def cascade_soft_delete(db_session, claim_id, now):
+    """
+    Soft delete the live items, files and rooms of a claim with one UPDATE per table.
+
+    Deleted files stay unique per hash, so earlier deleted files sharing a hash
+    with the claim's files are hard deleted first, as `delete_file` does for a
+    single file. Runs inside the caller's transaction.
+    """
+    live_hashes = select(File.file_hash).where(File.claim_id == claim_id, File.deleted.is_(False))
+    stale_file_ids = select(File.id).where(File.deleted.is_(True), File.file_hash.in_(live_hashes))
+    db_session.execute(delete(ItemFile).where(ItemFile.file_id.in_(stale_file_ids)),
+                       execution_options={"synchronize_session": False})
+    db_session.execute(delete(FileLabel).where(FileLabel.file_id.in_(stale_file_ids)),
+                       execution_options={"synchronize_session": False})
+    db_session.execute(delete(File).where(File.id.in_(stale_file_ids)),
+                       execution_options={"synchronize_session": False})
+
+    item_ids = db_session.execute(
+        update(Item).where(Item.claim_id == claim_id, Item.deleted.is_(False))
+        .values(deleted=True, updated_at=now).returning(Item.id),
+        execution_options={"synchronize_session": False}
+    ).scalars().all()
+    file_ids = db_session.execute(
+        update(File).where(File.claim_id == claim_id, File.deleted.is_(False))
+        .values(deleted=True, deleted_at=now, updated_at=now).returning(File.id),
+        execution_options={"synchronize_session": False}
+    ).scalars().all()
+    room_ids = db_session.execute(
+        update(Room).where(Room.claim_id == claim_id, Room.deleted.is_(False))
+        .values(deleted=True, updated_at=now).returning(Room.id),
+        execution_options={"synchronize_session": False}
+    ).scalars().all()
+
+    # Drop the search documents and tell syncing clients
+    reindex_items(db_session, item_ids)
+    reindex_files(db_session, file_ids)
+    record_changes(db_session, ITEM, item_ids)
+    record_changes(db_session, FILE, file_ids)
+    record_changes(db_session, ROOM, room_ids)
+    logger.info("Cascaded delete of claim %s to %s items, %s files and %s rooms",
+                claim_id, len(item_ids), len(file_ids), len(room_ids))
+
+
 @standard_lambda_handler(requires_auth=True)
 def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
     """
@@ -69,9 +122,12 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             
             # Soft delete the current claim - only set these values if it's not already deleted
             if not claim.deleted:
+                now = datetime.now(timezone.utc)
                 claim.deleted = True
-                claim.deleted_at = datetime.now(timezone.utc)
-                claim.updated_at = datetime.now(timezone.utc)
+                claim.deleted_at = now
+                claim.updated_at = now
+                record_changes(db_session, CLAIM, [claim.id])
+                cascade_soft_delete(db_session, claim.id, now)
             db_session.commit()
             
             logger.info(f"Claim {claim_id} soft deleted successfully")
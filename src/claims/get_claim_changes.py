@@ -0,0 +1,187 @@
+"""
+Lambda handler for syncing the changes of a claim.
+
+This module lets clients poll for what changed in a claim instead of
+re-downloading its item, room and file lists. It returns the current state of
+every claim, item, room and file (and the label set of every item and file
+whose labels changed) touched since a sync token, the IDs of those deleted
+since, and a new token to pass on the next poll.
+
+Usage:
+    GET /claims/{claim_id}/changes           -> starting token only
+    GET /claims/{claim_id}/changes?since=123 -> changes since the token
+
+Clients should fetch the starting token before loading the full lists so no
+change falls in between. When more entities changed than fit in one response,
+or the token is older than the retained changes (see
+CLAIM_CHANGES_RETENTION_SECONDS), `resync_required` is set and the client
+should reload the lists and continue from `next_token`.
+"""
+from collections import defaultdict
+from utils.logging_utils import get_logger
+from sqlalchemy.exc import SQLAlchemyError
+from utils import response
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils import change_log
+from models import Claim, File, Item, ItemFile, Label, Room
+from models.file_labels import FileLabel
+from models.item_labels import ItemLabel
+
+
+logger = get_logger(__name__)
+
+MAX_CHANGES = 1000
+
+
+def _load_labels(db_session, association, owner_column, owner_ids):
+    """Load the active labels of each owner (item or file) with one joined query."""
+    labels = defaultdict(list)
+    if not owner_ids:
+        return labels
+    rows = db_session.query(owner_column, Label.id, Label.label_text).join(
+        Label, Label.id == association.label_id
+    ).filter(
+        owner_column.in_(owner_ids),
+        association.deleted.is_(False),
+        Label.deleted.is_(False)
+    ).all()
+    for owner_id, label_id, label_text in rows:
+        labels[owner_id].append({"id": str(label_id), "label_text": label_text})
+    return labels
+
+
+def _serialize_file(file):
+    data = file.to_dict()
+    data.pop("s3_key", None)
+    return data
+
+
+def _collect_changes(db_session, claim_id, changed):
+    """Load the current state of changed entities and split them into changes and deletions."""
+    ids = defaultdict(set)
+    for entity_type, entity_id in changed:
+        ids[entity_type].add(entity_id)
+
+    changes = {"claims": [], "items": [], "rooms": [], "files": [], "item_labels": [], "file_labels": []}
+    deleted = {"claims": [], "items": [], "rooms": [], "files": []}
+
+    if ids[change_log.CLAIM]:
+        claim = db_session.query(Claim).filter(Claim.id == claim_id).first()
+        if claim and not claim.deleted:
+            changes["claims"].append(claim.to_dict())
+        else:
+            deleted["claims"].append(str(claim_id))
+
+    if ids[change_log.ITEM]:
+        items = db_session.query(Item).filter(
+            Item.id.in_(ids[change_log.ITEM]), Item.claim_id == claim_id, Item.deleted.is_(False)
+        ).all()
+        file_ids = defaultdict(list)
+        for item_id, file_id in db_session.query(ItemFile.item_id, ItemFile.file_id).filter(
+            ItemFile.item_id.in_([item.id for item in items])
+        ):
+            file_ids[item_id].append(str(file_id))
+        for item in items:
+            changes["items"].append({**item.to_dict(), "file_ids": file_ids[item.id]})
+        live = {item.id for item in items}
+        deleted["items"] = [str(item_id) for item_id in ids[change_log.ITEM] - live]
+
+    if ids[change_log.ROOM]:
+        rooms = db_session.query(Room).filter(
+            Room.id.in_(ids[change_log.ROOM]), Room.claim_id == claim_id, Room.deleted.is_(False)
+        ).all()
+        changes["rooms"] = [room.to_dict() for room in rooms]
+        live = {room.id for room in rooms}
+        deleted["rooms"] = [str(room_id) for room_id in ids[change_log.ROOM] - live]
+
+    if ids[change_log.FILE]:
+        files = db_session.query(File).filter(
+            File.id.in_(ids[change_log.FILE]), File.claim_id == claim_id, File.deleted.is_(False)
+        ).all()
+        changes["files"] = [_serialize_file(file) for file in files]
+        live = {file.id for file in files}
+        deleted["files"] = [str(file_id) for file_id in ids[change_log.FILE] - live]
+
+    # Label associations are reported as the full current label set of each owner
+    item_labels = _load_labels(db_session, ItemLabel, ItemLabel.item_id, ids[change_log.ITEM_LABELS])
+    changes["item_labels"] = [
+        {"item_id": str(item_id), "labels": item_labels[item_id]} for item_id in ids[change_log.ITEM_LABELS]
+    ]
+    file_labels = _load_labels(db_session, FileLabel, FileLabel.file_id, ids[change_log.FILE_LABELS])
+    changes["file_labels"] = [
+        {"file_id": str(file_id), "labels": file_labels[file_id]} for file_id in ids[change_log.FILE_LABELS]
+    ]
+
+    return changes, deleted
+
+
+@standard_lambda_handler(requires_auth=True)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
+    """
+    Handles syncing the changes of a claim for the authenticated user's household.
+
+    Query parameters:
+        since (str): Token returned by a previous call (omit to get a starting token)
+
+    Args:
+        event (dict): API Gateway event containing authentication details and claim ID.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+
+    Returns:
+        dict: API response containing the changes and the next token, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result  # Return error response
+
+    claim_id = result
+
+    query_params = event.get("queryStringParameters") or {}
+    since = query_params.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+            if since < 0:
+                raise ValueError(since)
+        except ValueError:
+            return response.api_response(400, error_details="Invalid since token")
+
+    try:
+        # Deleted claims stay visible here so clients can learn about the deletion
+        claim = db_session.query(Claim.id).filter(
+            Claim.id == claim_id,
+            Claim.household_id == user.household_id
+        ).first()
+        if not claim:
+            return response.api_response(404, error_details="Claim not found")
+
+        # The token is taken before reading so nothing committed in between is missed
+        next_token = change_log.current_sync_token(db_session)
+
+        response_data = {
+            "claim_id": str(claim_id),
+            "changes": {},
+            "deleted": {},
+            "resync_required": False,
+            "next_token": str(next_token),
+        }
+
+        if since is not None:
+            changed = change_log.changed_entities(db_session, claim_id, since, MAX_CHANGES + 1)
+            # Too many changes, or some were pruned since the token
+            if len(changed) > MAX_CHANGES or any(entity_type == change_log.PRUNED for entity_type, _ in changed):
+                response_data["resync_required"] = True
+            else:
+                response_data["changes"], response_data["deleted"] = _collect_changes(db_session, claim_id, changed)
+            logger.info("Claim %s has %s changed entities since %s", claim_id, len(changed), since)
+
+        return response.api_response(200, data=response_data)
+
+    except SQLAlchemyError as e:
+        logger.error("Database error syncing claim changes %s: %s", claim_id, str(e))
+        return response.api_response(500, error_details="Database error when syncing claim changes")
+    except Exception as e:
+        logger.exception("Unexpected error syncing claim changes: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
@@ -0,0 +1,130 @@
+"""
+Lambda handler for retrieving a claim overview.
+
+This module returns a claim together with its per-room item/file counts,
+total replacement value and file status histogram in a single response.
+The figures are read from the `claim_summaries` counters maintained by the
+item, file and room write handlers rather than aggregated on every read.
+"""
+from utils.logging_utils import get_logger
+from sqlalchemy import and_
+from sqlalchemy.exc import SQLAlchemyError
+from utils import response
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from database.database import WRITE
+from utils import claim_summary
+from models import Claim, ClaimSummary, Room
+
+
+logger = get_logger(__name__)
+
+
+def _load_claim_with_counters(db_session, claim_id, household_id):
+    """Load the claim and its summary counters with one outer-joined query."""
+    return db_session.query(Claim, ClaimSummary).outerjoin(
+        ClaimSummary, ClaimSummary.claim_id == Claim.id
+    ).filter(
+        Claim.id == claim_id,
+        Claim.household_id == household_id,
+        Claim.deleted.is_(False)
+    ).all()
+
+
+# Claims without counters are summarized (and committed) on first read
+@standard_lambda_handler(requires_auth=True, db_intent=WRITE)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
+    """
+    Handles retrieving the overview of a claim for the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing authentication details and claim ID.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+
+    Returns:
+        dict: API response containing the claim overview or an error message.
+    """
+    # Extract claim ID from path parameters
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result  # Return error response
+
+    claim_id = result
+
+    try:
+        rows = _load_claim_with_counters(db_session, claim_id, user.household_id)
+        if not rows:
+            return response.api_response(404, error_details="Claim not found")
+
+        counters = {(row.ClaimSummary.metric, row.ClaimSummary.key): row.ClaimSummary.value
+                    for row in rows if row.ClaimSummary is not None}
+
+        # Claims created before the summary table existed are initialized on first read
+        if (claim_summary.MARKER_METRIC, "") not in counters:
+            claim_summary.rebuild_claim_summary(db_session, claim_id)
+            db_session.commit()
+            rows = _load_claim_with_counters(db_session, claim_id, user.household_id)
+            counters = {(row.ClaimSummary.metric, row.ClaimSummary.key): row.ClaimSummary.value
+                        for row in rows if row.ClaimSummary is not None}
+
+        claim = rows[0].Claim
+
+        rooms = db_session.query(Room.id, Room.name).filter(
+            and_(Room.claim_id == claim_id, Room.deleted.is_(False))
+        ).order_by(Room.name).all()
+
+        item_count = int(counters.get((claim_summary.ITEMS, ""), 0))
+        file_count = int(counters.get((claim_summary.FILES, ""), 0))
+
+        room_data = []
+        assigned_items = 0
+        assigned_files = 0
+        for room in rooms:
+            room_items = int(counters.get((claim_summary.ROOM_ITEMS, str(room.id)), 0))
+            room_files = int(counters.get((claim_summary.ROOM_FILES, str(room.id)), 0))
+            assigned_items += room_items
+            assigned_files += room_files
+            room_data.append({
+                "id": str(room.id),
+                "name": room.name,
+                "item_count": room_items,
+                "file_count": room_files,
+            })
+
+        file_status_counts = {
+            key: int(value)
+            for (metric, key), value in counters.items()
+            if metric == claim_summary.FILE_STATUS and value
+        }
+
+        overview = {
+            "claim": {
+                "id": str(claim.id),
+                "household_id": str(claim.household_id),
+                "title": claim.title,
+                "description": claim.description or "",
+                "date_of_loss": claim.date_of_loss.strftime("%Y-%m-%d") if claim.date_of_loss else None,
+                "created_at": claim.created_at.isoformat() if claim.created_at else None,
+                "updated_at": claim.updated_at.isoformat() if claim.updated_at else None,
+            },
+            "item_count": item_count,
+            "file_count": file_count,
+            "total_replacement_value": round(counters.get((claim_summary.TOTAL_VALUE, ""), 0.0), 2),
+            "rooms": room_data,
+            "unassigned": {
+                "item_count": item_count - assigned_items,
+                "file_count": file_count - assigned_files,
+            },
+            "file_status_counts": file_status_counts,
+        }
+
+        return response.api_response(200, data=overview)
+
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error when retrieving overview for claim %s: %s", str(claim_id), str(e))
+        return response.api_response(500, error_details="Database error when retrieving claim overview")
+    except Exception as e:
+        logger.exception("Unexpected error retrieving claim overview: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
@@ -9,6 +9,7 @@ from datetime import datetime, date
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.change_log import record_changes, CLAIM
 from models import Claim
 
 
@@ -97,6 +98,8 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=
         # Update the updated_at timestamp
         if hasattr(claim, 'updated_at'):
             claim.updated_at = datetime.now()
+
+        record_changes(db_session, CLAIM, [claim.id])
         
         # Commit the changes
         db_session.commit()
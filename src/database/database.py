@@ -1,8 +1,26 @@
-"""Database connection management for PostgreSQL."""
-from sqlalchemy import create_engine
+"""
+Database connection management for PostgreSQL.
+
+Sessions are opened with an intent. Write sessions always use the primary.
+Read sessions use the read replica when one is configured (`DB_READ_HOST` or
+`READ_REPLICA_DATABASE_URL`) and healthy, and fall back to the primary
+otherwise. Replica health (reachable and not lagging more than
+`REPLICA_MAX_LAG_SECONDS`) is checked at most once per
+`REPLICA_HEALTH_CHECK_TTL` seconds per warm container.
+"""
+from typing import Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, Session, registry
+from utils.logging_utils import get_logger
+from utils.ttl_cache import TTLCache
 import os
 
+logger = get_logger(__name__)
+
+READ = "read"
+WRITE = "write"
+
 def get_database_url() -> str:
     """
     Construct the database URL from environment variables.
@@ -33,14 +51,96 @@ mapper_registry = registry()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db_session() -> Session:
+
+def get_read_replica_url() -> Optional[str]:
+    """
+    Construct the read replica URL from environment variables.
+
+    Returns
+    -------
+    Optional[str]
+        The replica URL, or None when no replica is configured.
+    """
+    username = os.getenv("DB_USERNAME")
+    password = os.getenv("DB_PASSWORD")
+    host = os.getenv("DB_READ_HOST")
+    name = os.getenv("DB_NAME", "claimvision")
+
+    if username and password and host:
+        return f"postgresql://{username}:{password}@{host}:5432/{name}"
+
+    return os.getenv("READ_REPLICA_DATABASE_URL") or None
+
+
+READ_REPLICA_URL: Optional[str] = get_read_replica_url()
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+
+_read_engine = None
+_ReadSessionLocal = None
+_replica_health = TTLCache(ttl_seconds=float(os.getenv("REPLICA_HEALTH_CHECK_TTL", "30")), max_entries=1)
+
+
+def _get_read_sessionmaker():
+    """Create the replica engine on first use."""
+    global _read_engine, _ReadSessionLocal
+    if _ReadSessionLocal is None:
+        _read_engine = create_engine(
+            READ_REPLICA_URL,
+            pool_pre_ping=True,
+            connect_args={"connect_timeout": int(os.getenv("REPLICA_CONNECT_TIMEOUT", "2"))},
+        )
+        _ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_read_engine)
+    return _ReadSessionLocal
+
+
+def replica_available() -> bool:
+    """
+    Check whether read sessions can use the replica.
+
+    Returns
+    -------
+    bool
+        True when a replica is configured, reachable and within the lag limit.
+    """
+    if not READ_REPLICA_URL:
+        return False
+
+    healthy = _replica_health.get(READ)
+    if healthy is not None:
+        return healthy
+
+    try:
+        with _get_read_sessionmaker()() as session:
+            # NULL on a primary or a replica that has replayed nothing yet, treated as no lag
+            lag = session.execute(text(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            )).scalar()
+        healthy = float(lag) <= REPLICA_MAX_LAG_SECONDS
+        if not healthy:
+            logger.warning("Read replica lagging by %.1fs, using primary", float(lag))
+    except SQLAlchemyError as e:
+        logger.warning("Read replica unavailable, using primary: %s", str(e))
+        healthy = False
+
+    _replica_health.set(READ, healthy)
+    return healthy
+
+
+def get_db_session(intent: str = WRITE) -> Session:
     """
     Creates and returns a new database session.
 
+    Parameters
+    ----------
+    intent : str
+        READ to allow routing to the read replica, WRITE (default) for the primary.
+
     Returns
     -------
     Session
         A SQLAlchemy database session.
     """
     mapper_registry.configure()  # Ensure mappers are configured
+    if intent == READ and replica_available():
+        return _get_read_sessionmaker()()
     return SessionLocal()
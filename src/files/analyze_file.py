@@ -16,6 +16,10 @@ from models.file import FileStatus, File
 from models.label import Label
 from models.file_labels import FileLabel
 from database.database import get_db_session
+from utils.claim_summary import apply_deltas, file_deltas, merge_deltas
+from utils.search_index import reindex_files, reindex_labels
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, FILE, FILE_LABELS
 
 logger = get_logger(__name__)
 
@@ -96,8 +100,11 @@ def lambda_handler(event, context):
                     logger.info(f"File {file_id} is not an image, skipping analysis")
                     
                     # Update file status to ANALYZED (even though we're skipping analysis)
+                    summary_deltas = file_deltas(file, -1)
                     file.status = FileStatus.ANALYZED
                     file.updated_at = datetime.now(timezone.utc)
+                    apply_deltas(db_session, merge_deltas(summary_deltas, file_deltas(file)))
+                    record_changes(db_session, FILE, [file_id])
                     db_session.commit()
                     
                     continue
@@ -107,6 +114,7 @@ def lambda_handler(event, context):
                     labels = detect_labels(s3_key)
                     logger.info(f"File {file_id} analyzed with {len(labels)} labels detected")
                     seen_labels = set()
+                    attached_label_ids = []
                     # Store labels in database
                     for label_data in labels:
                         label_name = label_data['Name'].strip().lower()
@@ -151,10 +159,18 @@ def lambda_handler(event, context):
                             label_id=existing_label.id
                         )
                         db_session.add(file_label)
+                        attached_label_ids.append(existing_label.id)
                     
                     # Update file status
+                    summary_deltas = file_deltas(file, -1)
                     file.status = FileStatus.ANALYZED
                     file.updated_at = datetime.now(timezone.utc)
+                    apply_deltas(db_session, merge_deltas(summary_deltas, file_deltas(file)))
+                    record_changes(db_session, FILE, [file_id])
+                    reindex_labels(db_session, attached_label_ids)
+                    reindex_files(db_session, [file_id])
+                    bump_label_version(db_session, file.household_id)
+                    record_changes(db_session, FILE_LABELS, [file_id])
                     
                     db_session.commit()
                     logger.info(f"File {file_id} analysis results stored in database")
@@ -164,8 +180,11 @@ def lambda_handler(event, context):
                     
                     # Update file status to ERROR
                     try:
+                        summary_deltas = file_deltas(file, -1)
                         file.status = FileStatus.ERROR
                         file.updated_at = datetime.now(timezone.utc)
+                        apply_deltas(db_session, merge_deltas(summary_deltas, file_deltas(file)))
+                        record_changes(db_session, FILE, [file_id])
                         db_session.commit()
                     except Exception as db_error:
                         logger.error(f"Failed to update file {file_id} status: {str(db_error)}")
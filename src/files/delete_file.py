@@ -2,8 +2,13 @@ from utils.logging_utils import get_logger
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timezone
 from models import File
+from models.file_labels import FileLabel
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.claim_summary import apply_deltas, file_deltas
+from utils.search_index import reindex_files
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, FILE
 from utils.logging_utils import get_logger
 
 
@@ -67,9 +72,17 @@ def lambda_handler(event: dict, context=None, _context=None, db_session=None, us
             
         # Soft delete the current file - only set these values if it's not already deleted
         if not file_data.deleted:
+            apply_deltas(db_session, file_deltas(file_data, -1))
             file_data.deleted = True
             file_data.deleted_at = datetime.now(timezone.utc)
             file_data.updated_at = datetime.now(timezone.utc)
+            # The file's labels are no longer counted
+            if db_session.query(FileLabel.file_id).filter(
+                FileLabel.file_id == file_data.id, FileLabel.deleted.is_(False)
+            ).first():
+                bump_label_version(db_session, file_data.household_id)
+        reindex_files(db_session, [file_data.id])
+        record_changes(db_session, FILE, [file_data.id])
         db_session.commit()
         
         # Return a 204 No Content response for successful deletion
@@ -3,14 +3,29 @@ Lambda handler for retrieving files for a user's household.
 
 This module handles the retrieval of file metadata and generates
 presigned URLs for file access when needed.
+
+Clients can narrow the payload with `fields=` (columns to return) and
+`expand=` (related data: `labels`, `url`, `room`). Only the requested
+columns are loaded, labels and rooms are only joined when expanded and
+URLs are only signed when `url` is expanded. Without either parameter the
+response matches the historical shape (all fields, labels and url).
+
+Files can be filtered by label with `label_ids=` (comma separated) and
+`label_match=any|all` (default `any`): `any` returns files carrying at least
+one of the labels, `all` only files carrying every one of them.
 """
 import os
 from utils.logging_utils import get_logger
+from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only, selectinload, joinedload
 from utils.lambda_utils import standard_lambda_handler, get_s3_client, extract_uuid_param, generate_presigned_url
-from utils import response
+from utils.fieldsets import resolve_fieldset, parse_list_param
+from utils.label_filters import files_with_labels, LABEL_MATCH_MODES
+from utils import response, auth_utils
 from models.file import File
-from models.claim import Claim
+from models.label import Label
+from models.room import Room
 import uuid
 
 logger = get_logger(__name__)
@@ -22,18 +37,62 @@ if S3_BUCKET_NAME and S3_BUCKET_NAME.startswith('/'):
     logger.warning("S3_BUCKET_NAME appears to be an SSM parameter path: %s. Using default bucket for local testing.", S3_BUCKET_NAME)
     S3_BUCKET_NAME = "claimvision-dev-bucket"
 
+# Selectable fields mapped to the columns that back them
+FILE_FIELD_COLUMNS = {
+    "id": File.id,
+    "file_name": File.file_name,
+    "status": File.status,
+    "created_at": File.created_at,
+    "updated_at": File.updated_at,
+    "claim_id": File.claim_id,
+    "room_id": File.room_id,
+    "content_type": File.content_type,
+    "file_size": File.file_size,
+    "metadata": File.file_metadata,
+}
+DEFAULT_FILE_FIELDS = ["id", "file_name", "status", "created_at", "updated_at", "claim_id", "metadata"]
+FILE_EXPANSIONS = ["labels", "url", "room"]
+DEFAULT_FILE_EXPANSIONS = ["labels", "url"]
+
+
+def serialize_file_fields(file: File, fields: list) -> dict:
+    """
+    Serialize the requested scalar fields of a file.
+
+    Args:
+        file (File): File loaded with at least the requested columns
+        fields (list): Field names to include
+
+    Returns:
+        dict: Serialized fields
+    """
+    serializers = {
+        "id": lambda f: str(f.id),
+        "file_name": lambda f: f.file_name,
+        "status": lambda f: f.status.value,
+        "created_at": lambda f: f.created_at.isoformat() if f.created_at else None,
+        "updated_at": lambda f: f.updated_at.isoformat() if f.updated_at else None,
+        "claim_id": lambda f: str(f.claim_id) if f.claim_id else None,
+        "room_id": lambda f: str(f.room_id) if f.room_id else None,
+        "content_type": lambda f: f.content_type,
+        "file_size": lambda f: f.file_size,
+        "metadata": lambda f: f.file_metadata or {},
+    }
+    return {field: serializers[field](file) for field in fields}
+
+
 @standard_lambda_handler(requires_auth=True)
 def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
     """
     Lambda handler to retrieve files for the authenticated user's household.
     Can optionally filter by claim_id if provided in path parameters.
-    
+
     Args:
         event (dict): API Gateway event
         _context (dict): Lambda execution context (unused)
         db_session (Session, optional): Database session for testing
         user (User): Authenticated user object (provided by decorator)
-        
+
     Returns:
         dict: API response with files or error
     """
@@ -42,10 +101,10 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
         query_params = event.get("queryStringParameters") or {}
         limit = query_params.get("limit", "10")
         offset = query_params.get("offset", "0")
-        
+
         # Check if specific file IDs were requested
         file_ids = query_params.get("ids")
-        
+
         try:
             limit = int(limit)
             offset = int(offset)
@@ -53,7 +112,30 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
                 return response.api_response(400, error_details="Invalid pagination parameters")
         except ValueError:
             return response.api_response(400, error_details="Invalid pagination parameters")
-        
+
+        success, result = resolve_fieldset(
+            event,
+            allowed_fields=FILE_FIELD_COLUMNS.keys(),
+            default_fields=DEFAULT_FILE_FIELDS,
+            allowed_expansions=FILE_EXPANSIONS,
+            default_expansions=DEFAULT_FILE_EXPANSIONS,
+        )
+        if not success:
+            return result  # Return error response
+        fields, expansions = result
+
+        label_ids = None
+        label_id_values = parse_list_param(query_params, "label_ids")
+        if label_id_values:
+            try:
+                label_ids = list({uuid.UUID(value) for value in label_id_values})
+            except ValueError:
+                return response.api_response(400, error_details="Invalid label ID format")
+
+        label_match = query_params.get("label_match", "any")
+        if label_match not in LABEL_MATCH_MODES:
+            return response.api_response(400, error_details="Invalid label_match: must be 'any' or 'all'")
+
         # Check if claim_id is provided in path parameters
         claim_id = None
         if event.get("pathParameters") and "claim_id" in event.get("pathParameters", {}):
@@ -61,26 +143,25 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             success, result = extract_uuid_param(event, "claim_id")
             if not success:
                 return result  # Return error response
-                
+
             claim_id = result
-            
-            # Verify claim exists and belongs to user's household
-            claim = db_session.query(Claim).filter(
-                Claim.id == claim_id,
-                Claim.household_id == user.household_id
-            ).first()
-            
-            if not claim:
+
+            # Verify claim exists and belongs to user's household (cached per container)
+            if not auth_utils.claim_in_household(db_session, claim_id, user.household_id):
                 logger.info("Claim not found or access denied: %s", claim_id)
                 return response.api_response(404, error_details="Claim not found or access denied")
-        
-        # Query files for the user's household
+
+        # Load only the columns needed for the requested fields (plus the S3 key when signing)
+        columns = [FILE_FIELD_COLUMNS[field] for field in fields]
+        if "url" in expansions:
+            columns.append(File.s3_key)
+
         files_query = db_session.query(File).filter(File.household_id == user.household_id)
-        
+
         # Apply claim_id filter if provided
         if claim_id:
             files_query = files_query.filter(File.claim_id == claim_id)
-            
+
         # Filter by specific file IDs if provided
         if file_ids:
             try:
@@ -90,47 +171,61 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
                 logger.warning("Invalid file ID format in query: %s", file_ids)
                 return response.api_response(400, error_details="Invalid file ID format")
 
-        # Get total count for pagination
-        total_count = files_query.count()
+        # Filter by labels if provided
+        if label_ids:
+            files_query = files_query.filter(File.id.in_(files_with_labels(label_ids, label_match)))
+
+        # The total is computed by a window function so the page and its count share one query
+        page_query = files_query.add_columns(func.count().over().label("total_count")).options(load_only(*columns))
+        if "labels" in expansions:
+            page_query = page_query.options(selectinload(File.labels).load_only(Label.label_text))
+        if "room" in expansions:
+            page_query = page_query.options(joinedload(File.room).load_only(Room.name))
 
         # Apply pagination
-        files = files_query.order_by(File.created_at.desc()).offset(offset).limit(limit).all()
+        rows = page_query.order_by(File.created_at.desc()).offset(offset).limit(limit).all()
+
+        if rows:
+            total_count = rows[0].total_count
+        elif offset:
+            # Paged past the end: the window count has no row to ride on
+            total_count = files_query.count()
+        else:
+            total_count = 0
 
-        # Get S3 client
-        s3_client = get_s3_client()
+        # Only build an S3 client when URLs were requested
+        s3_client = get_s3_client() if "url" in expansions else None
 
         # Format response with pre-signed URLs
         file_data = []
         s3_failure = False
 
-        for file in files:
-            file_info = {
-                "id": str(file.id),
-                "file_name": file.file_name,
-                "status": file.status.value,
-                "created_at": file.created_at.isoformat() if file.created_at else None,
-                "updated_at": file.updated_at.isoformat() if file.updated_at else None,
-                "claim_id": str(file.claim_id) if file.claim_id else None,
-                "metadata": file.file_metadata or {},
-                "labels": [label.label_text for label in file.labels] if file.labels else [],
-            }
-            
+        for file, _total in rows:
+            file_info = serialize_file_fields(file, fields)
+
+            if "labels" in expansions:
+                file_info["labels"] = [label.label_text for label in file.labels] if file.labels else []
+
+            if "room" in expansions:
+                file_info["room"] = {"id": str(file.room.id), "name": file.room.name} if file.room else None
+
             # Generate pre-signed URL
-            if file.s3_key:
-                if S3_BUCKET_NAME:
-                    signed_url = generate_presigned_url(s3_client, S3_BUCKET_NAME, file.s3_key)
-                    if signed_url is None:
+            if "url" in expansions:
+                if file.s3_key:
+                    if S3_BUCKET_NAME:
+                        signed_url = generate_presigned_url(s3_client, S3_BUCKET_NAME, file.s3_key)
+                        if signed_url is None:
+                            s3_failure = True
+                        file_info["url"] = signed_url
+                    else:
+                        logger.warning("S3_BUCKET_NAME is not set, cannot generate presigned URL")
                         s3_failure = True
-                    file_info["url"] = signed_url
+                        file_info["url"] = None
                 else:
-                    logger.warning("S3_BUCKET_NAME is not set, cannot generate presigned URL")
-                    s3_failure = True
                     file_info["url"] = None
-            else:
-                file_info["url"] = None
-                
+
             file_data.append(file_info)
-            
+
         # Return response with pagination metadata
         response_data = {
             "files": file_data,
@@ -140,14 +235,14 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
                 "offset": offset,
             }
         }
-        
+
         # Add warning if S3 failed
         if s3_failure:
             response_data["warning"] = "Some file URLs could not be generated"
-            
+
         logger.info("Retrieved %s files for household %s", len(file_data), user.household_id)
         return response.api_response(200, data=response_data)
-        
+
     except SQLAlchemyError as e:
         logger.error("Database error when retrieving files: %s", str(e))
         return response.api_response(500, error_details="Database error when retrieving files")
@@ -4,7 +4,7 @@ Lambda handler for processing files from the SQS queue.
 This module is triggered by the SQS queue and handles:
 1. Moving the file from the 'pending' location to the final location in S3
 2. Storing file metadata in the database
-3. Sending a message to the analysis queue
+3. Sending a message to the analysis queue (through the transactional outbox)
 """
 import os
 import json
@@ -12,9 +12,13 @@ import uuid
 from datetime import datetime, timezone
 from hashlib import sha256
 from utils.logging_utils import get_logger
-from utils.lambda_utils import get_s3_client, get_sqs_client
+from utils.lambda_utils import get_s3_client
+from utils import outbox
 from models.file import FileStatus, File
 from database.database import get_db_session
+from utils.claim_summary import apply_deltas, file_deltas
+from utils.search_index import reindex_files
+from utils.change_log import record_changes, FILE
 
 logger = get_logger(__name__)
 
@@ -56,11 +60,12 @@ def compute_file_hash(s3_bucket, s3_key):
         logger.error("Error computing file hash: %s", str(e))
         raise
 
-def send_to_analysis_queue(file_id, s3_key, file_name, household_id, claim_id) -> str:
+def send_to_analysis_queue(db_session, file_id, s3_key, file_name, household_id, claim_id):
     """
-    Sends a message to the analysis queue.
+    Queues a message for the analysis queue in the outbox.
     
     Args:
+        db_session (Session): SQLAlchemy session (the caller commits)
         file_id (UUID): The ID of the file
         s3_key (str): The S3 key where the file is stored
         file_name (str): The name of the file
@@ -68,7 +73,7 @@ def send_to_analysis_queue(file_id, s3_key, file_name, household_id, claim_id) -
         claim_id (UUID): The ID of the claim
         
     Returns:
-        str: The message ID if successful, or a dummy ID if queue URL is not set
+        UUID: The outbox ID, or None if the queue URL is not set
     """
     # Prepare the message body
     message_body = {
@@ -82,15 +87,9 @@ def send_to_analysis_queue(file_id, s3_key, file_name, household_id, claim_id) -
     # Check if queue URL is set
     if not SQS_ANALYSIS_QUEUE_URL:
         logger.warning("SQS_ANALYSIS_QUEUE_URL environment variable is not set, skipping analysis queue")
-        return "dummy-message-id-for-testing"
+        return None
     
-    # Send the message
-    sqs = get_sqs_client()
-    response = sqs.send_message(
-        QueueUrl=SQS_ANALYSIS_QUEUE_URL,
-        MessageBody=json.dumps(message_body)
-    )
-    return response['MessageId']
+    return outbox.enqueue(db_session, SQS_ANALYSIS_QUEUE_URL, message_body)
 
 def lambda_handler(event, _context):
     """
@@ -181,9 +180,16 @@ def lambda_handler(event, _context):
                         updated_at=datetime.now(timezone.utc),
                     )
                     db_session.add(new_file)
+                    apply_deltas(db_session, file_deltas(new_file))
+                    reindex_files(db_session, [file_id])
+                    record_changes(db_session, FILE, [file_id])
+                    # The analysis message commits with the file, so it is never lost or sent for a missing file
+                    message_id = send_to_analysis_queue(db_session, file_id, target_s3_key, file_name, household_id, claim_id)
+                    outbox.record_delivery(db_session, record)
                     db_session.commit()
                     logger.info("File %s metadata stored in database", file_id)
                 except Exception as e:
+                    db_session.rollback()
                     logger.error("Failed to store file %s metadata in database: %s", file_id, str(e))
                     return {
                         "statusCode": 500,
@@ -192,16 +198,9 @@ def lambda_handler(event, _context):
                         })
                     }
                     
-                # Send to analysis queue
-                warnings = []
-                try:
-                    message_id = send_to_analysis_queue(file_id, target_s3_key, file_name, household_id, claim_id)
-                    logger.info("File %s queued for analysis with message ID %s", file_id, message_id)
-                except Exception as e:
-                    warning_msg = f"Failed to queue file {file_id} for analysis: {str(e)}"
-                    logger.error(warning_msg)
-                    warnings.append(warning_msg)
-                    # We don't return an error here because the file is already uploaded and stored
+                if message_id:
+                    logger.info("File %s queued for analysis with outbox ID %s", file_id, message_id)
+                    outbox.flush(db_session, [message_id])
                 
             except Exception as e:
                 logger.error("Failed to process SQS message: %s", str(e))
@@ -216,8 +215,6 @@ def lambda_handler(event, _context):
         response_body = {
             "message": "File processing complete"
         }
-        if warnings:
-            response_body["warnings"] = warnings
             
         return {
             "statusCode": 200,
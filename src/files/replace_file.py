@@ -11,6 +11,8 @@ from models.file import File
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
 from database.database import get_db_session
+from utils.search_index import reindex_files
+from utils.change_log import record_changes, FILE
 
 logger = get_logger(__name__)
 
@@ -130,6 +132,8 @@ def lambda_handler(event, context=None, _context=None, db_session=None, user=Non
         file_record.file_size = len(file_data)
         file_record.file_hash = file_hash
         file_record.updated_at = datetime.now(timezone.utc)
+        reindex_files(db_session, [file_record.id])
+        record_changes(db_session, FILE, [file_record.id])
         
         db_session.commit()
         
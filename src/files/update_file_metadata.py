@@ -6,6 +6,8 @@ from models.room import Room
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
 from utils.logging_utils import get_logger
+from utils.claim_summary import apply_deltas, file_deltas, merge_deltas
+from utils.change_log import record_changes, FILE
 
 
 logger = get_logger(__name__)
@@ -51,6 +53,9 @@ def lambda_handler(event: dict, context=None, _context=None, db_session=None, us
     if not file_data:
         return response.api_response(404, error_details="File not found")
     
+    # Capture the file's current summary contribution before the room can change
+    summary_deltas = file_deltas(file_data, -1)
+
     # Update file metadata
     metadata = file_data.file_metadata or {}
     
@@ -83,6 +88,8 @@ def lambda_handler(event: dict, context=None, _context=None, db_session=None, us
     try:
         file_data.file_metadata = metadata
         file_data.updated_at = datetime.now(timezone.utc)
+        apply_deltas(db_session, merge_deltas(summary_deltas, file_deltas(file_data)))
+        record_changes(db_session, FILE, [file_data.id])
         db_session.commit()
         
         # Get room name from relationship if room_id exists
@@ -1,8 +1,9 @@
 """
 Lambda handler for file uploads to the ClaimVision system.
 
-This module handles the initial receipt of file uploads and sends them to an SQS queue
-for asynchronous processing. This makes the upload process non-blocking for users.
+This module handles the initial receipt of file uploads and queues them for asynchronous
+processing through the transactional outbox (utils.outbox), so the upload neither waits on
+SQS nor loses a message when SQS is unavailable.
 """
 import os
 import uuid
@@ -10,16 +11,13 @@ import json
 import base64
 from datetime import datetime, timezone
 from hashlib import sha256
-import time
 import re
 
-from botocore.exceptions import ClientError
-
 from utils.logging_utils import get_logger
-from utils.lambda_utils import standard_lambda_handler, get_sqs_client, get_s3_client, extract_uuid_param
+from utils.lambda_utils import standard_lambda_handler, get_s3_client, extract_uuid_param
 from utils.response import api_response
+from utils import auth_utils, outbox
 from models.file import File
-from models.claim import Claim
 from database.database import get_db_session as db_get_session
 from sqlalchemy.exc import SQLAlchemyError
 from models.room import Room
@@ -82,11 +80,15 @@ def upload_to_s3(file_data, file_name, claim_id, file_id):
         logger.error(f"Error uploading file to S3: {str(e)}")
         return False, str(e)
 
-def queue_file_for_processing(file_name, claim_id, s3_key, room_id=None, household_id=None, user=None):
+def queue_file_for_processing(db_session, file_name, claim_id, s3_key, room_id=None, household_id=None, user=None):
     """
-    Queue a file for asynchronous processing via SQS.
+    Queue a file for asynchronous processing via the transactional outbox.
+    
+    The message is written to the outbox in the caller's transaction and
+    relayed to SQS once committed (see utils.outbox).
     
     Args:
+        db_session (Session): SQLAlchemy session (the caller commits)
         file_name (str): Name of the file to process
         claim_id (str): UUID of the claim this file belongs to
         s3_key (str): S3 object key where the file is stored
@@ -95,11 +97,10 @@ def queue_file_for_processing(file_name, claim_id, s3_key, room_id=None, househo
         user (User, optional): Authenticated user object from the standard_lambda_handler
         
     Returns:
-        str: Message ID from SQS if successful
+        UUID: Outbox ID of the message
         
     Raises:
-        ValueError: If SQS queue URL is not set
-        ConnectionError: If SQS message sending fails
+        ValueError: If the user or the SQS queue URL is not set
     """
     # Prepare message payload
     logger.info(f"Preparing SQS message for file: {file_name}")
@@ -128,50 +129,12 @@ def queue_file_for_processing(file_name, claim_id, s3_key, room_id=None, househo
     if household_id:
         message_body["household_id"] = household_id
     
-    # Get SQS client
-    logger.info("Getting SQS client")
-    try:
-        sqs = get_sqs_client()
-        logger.info("SQS client created successfully")
-    except Exception as e:
-        logger.error(f"Failed to create SQS client: {str(e)}")
-        raise ConnectionError(f"Failed to create SQS client: {str(e)}")
-        
     sqs_upload_queue_url = os.getenv("SQS_UPLOAD_QUEUE_URL")
-    logger.info(f"SQS queue URL: {sqs_upload_queue_url}")
-    
     if not sqs_upload_queue_url:
         logger.error("SQS_UPLOAD_QUEUE_URL environment variable is not set")
         raise ValueError("SQS_UPLOAD_QUEUE_URL environment variable is not set")
     
-    try:
-        logger.info(f"Sending message to SQS for file: {file_name}")
-        # Check if we're running in a VPC
-        lambda_vpc_config = os.getenv("AWS_LAMBDA_VPC_SUBNETS")
-        logger.info(f"Lambda VPC config: {lambda_vpc_config}")
-        
-        # Create a copy of the message body for logging
-        log_message_body = message_body.copy()
-        
-        # Set a timeout for the SQS operation
-        start_time = time.time()
-        sqs_response = sqs.send_message(
-            QueueUrl=sqs_upload_queue_url,
-            MessageBody=json.dumps(message_body)
-        )
-        elapsed_time = time.time() - start_time
-        logger.info(f"SQS send_message took {elapsed_time:.2f} seconds")
-        logger.info(f"SQS response: {sqs_response}")
-        logger.info(f"SQS message body: {json.dumps(log_message_body)}")
-        return sqs_response["MessageId"]
-    except ClientError as e:
-        error_code = e.response.get('Error', {}).get('Code', 'Unknown')
-        error_message = e.response.get('Error', {}).get('Message', str(e))
-        logger.error(f"AWS ClientError sending message to SQS: Code={error_code}, Message={error_message}")
-        raise ConnectionError(f"Failed to send message to SQS: {error_message}")
-    except Exception as e:
-        logger.error(f"Error sending message to SQS: {str(e)}")
-        raise ConnectionError(f"Failed to send message to SQS: {str(e)}")
+    return outbox.enqueue(db_session, sqs_upload_queue_url, message_body)
 
 def parse_multipart_form_data(event):
     """
@@ -390,37 +353,28 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
         logger.warning(f"Invalid claim ID format: {claim_id}")
         return api_response(400, error_details='Invalid claim ID format.')
     
-    # Check for the claim
+    # Check the claim (and the room, if provided) with a single household-guarded query
     try:
-        claim = db_session.query(Claim).filter_by(id=claim_uuid, household_id=household_id).first()
-        if not claim:
+        if room_id:
+            room_uuid = uuid.UUID(room_id)
+            claim_found, room = auth_utils.get_claim_resource(db_session, household_id, claim_uuid, Room, room_uuid)
+        else:
+            claim_found, room = auth_utils.claim_in_household(db_session, claim_uuid, household_id), None
+        if not claim_found:
             logger.error(f"Claim not found. claim_id: {claim_id}, household_id: {household_id}")
             return api_response(404, error_details='Claim not found.')
-        logger.info(f"Claim found: {claim.id}")
-    except (ValueError, SQLAlchemyError) as e:
-        if isinstance(e, ValueError):
-            logger.error(f"Invalid claim ID format: {claim_id}")
-            return api_response(400, error_details='Invalid claim ID format. Expected UUID.')
+        if room_id and not room:
+            return api_response(404, error_details='Room not found.')
+    except ValueError:
+        return api_response(400, error_details='Invalid room ID format. Expected UUID.')
+    except SQLAlchemyError as e:
         logger.error(f"Database error when checking claim: {str(e)}")
         return api_response(500, error_details='Database error when checking claim.')
     
-    # Check for the room if provided
-    if room_id:
-        try:
-            room_uuid = uuid.UUID(room_id)
-            room = db_session.query(Room).filter_by(id=room_uuid, claim_id=claim_uuid).first()
-            if not room:
-                return api_response(404, error_details='Room not found.')
-        except (ValueError, SQLAlchemyError) as e:
-            if isinstance(e, ValueError):
-                return api_response(400, error_details='Invalid room ID format. Expected UUID.')
-            else:
-                logger.error("Database error when checking room: %s", str(e))
-                return api_response(500, error_details=f'Database Error: {str(e)}')
-    
     # Check for duplicate content
     uploaded_files = []
     failed_files = []
+    message_ids = []
     
     # Process each file in the request
     for file_obj in files:
@@ -517,9 +471,9 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
         
         # Queue the file for processing
         try:
-            logger.info("Queueing file %s for processing", file_name)            
-            # Queue the file for processing via SQS
+            logger.info("Queueing file %s for processing", file_name)
             message_id = queue_file_for_processing(
+                db_session,
                 file_name=file_name,
                 claim_id=claim_id,
                 s3_key=s3_key_or_error,
@@ -527,8 +481,9 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
                 household_id=str(household_id),
                 user=user
             )
+            message_ids.append(message_id)
             
-            logger.info("File %s queued for processing with message ID %s", file_name, message_id)
+            logger.info("File %s queued for processing with outbox ID %s", file_name, message_id)
             
             # Create a response object for this file
             file_response = {
@@ -538,14 +493,24 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             }
                 
             uploaded_files.append(file_response)
-        except (ValueError, ConnectionError) as e:
+        except ValueError as e:
             logger.error("Failed to queue file %s for processing: %s", file_name, str(e))
             failed_files.append({"file_name": file_name, "reason": "Failed to queue for processing."})
-            # Remove from uploaded files if it failed to queue
-            uploaded_files = [f for f in uploaded_files if f.get("file_hash") != file_hash]
+    
+    # Commit every queued message at once, then publish them if inline flushing is enabled
+    if message_ids:
+        try:
+            db_session.commit()
+        except SQLAlchemyError as e:
+            db_session.rollback()
+            logger.error("Failed to commit queued files: %s", str(e))
+            failed_files.extend({"file_name": f["file_name"], "reason": "Failed to queue for processing."}
+                                for f in uploaded_files)
+            uploaded_files, message_ids = [], []
+        outbox.flush(db_session, message_ids)
     
     if not uploaded_files and failed_files:
-        # Return 500 if SQS failures caused all uploads to fail
+        # Return 500 if queueing failures caused all uploads to fail
         if any(f["reason"] == "Failed to queue for processing." for f in failed_files):
             return api_response(500, error_details='Internal Server Error', data={"files_failed": failed_files})
         elif any(f["reason"] == "Duplicate content detected." for f in failed_files):
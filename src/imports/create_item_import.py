@@ -0,0 +1,102 @@
+"""
+Lambda handler for starting an inventory spreadsheet import.
+
+Usage:
+    POST /claims/{claim_id}/imports   {"file_name": "inventory.xlsx"}
+
+Creates a pending import and returns a pre-signed URL the client uploads
+the CSV or XLSX file to (HTTP PUT). Once the upload finishes the client
+calls `POST /claims/{claim_id}/imports/{import_id}/start` to queue it.
+"""
+import os
+import uuid
+from botocore.exceptions import ClientError
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param, get_s3_client
+from utils import response, auth_utils
+from models.item_import import ItemImport, ItemImportStatus
+from imports.row_schema import SpreadsheetError
+from imports.spreadsheet import detect_format
+
+
+logger = get_logger(__name__)
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+UPLOAD_URL_EXPIRATION = int(os.getenv("IMPORT_UPLOAD_URL_EXPIRATION", "900"))
+
+
+def import_s3_prefix(household_id, claim_id, import_id) -> str:
+    """S3 prefix holding an import's spreadsheet and error report."""
+    return f"imports/{household_id}/{claim_id}/{import_id}"
+
+
+@standard_lambda_handler(requires_auth=True, requires_body=True, required_fields=["file_name"])
+def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=None) -> dict:
+    """
+    Handles creating an item import for a claim of the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing the claim ID and the spreadsheet name.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+        body (dict): Request body containing `file_name` (provided by decorator).
+
+    Returns:
+        dict: API response containing the import and its upload URL, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result
+    claim_id = result
+
+    file_name = os.path.basename(str(body.get("file_name") or "").replace("\\", "/"))
+    try:
+        file_format = detect_format(file_name)
+    except SpreadsheetError as e:
+        return response.api_response(400, error_details=str(e))
+
+    try:
+        if not auth_utils.claim_in_household(db_session, claim_id, user.household_id):
+            return response.api_response(404, error_details="Claim not found")
+
+        import_id = uuid.uuid4()
+        s3_key = f"{import_s3_prefix(user.household_id, claim_id, import_id)}/source.{file_format}"
+        item_import = ItemImport(
+            id=import_id,
+            user_id=user.id,
+            household_id=user.household_id,
+            claim_id=claim_id,
+            file_name=file_name,
+            s3_key=s3_key,
+            status=ItemImportStatus.PENDING.value
+        )
+
+        upload_url = get_s3_client().generate_presigned_url(
+            "put_object",
+            Params={"Bucket": S3_BUCKET_NAME, "Key": s3_key},
+            ExpiresIn=UPLOAD_URL_EXPIRATION
+        )
+
+        db_session.add(item_import)
+        db_session.commit()
+
+        logger.info("Created item import %s for claim %s", import_id, claim_id)
+        return response.api_response(
+            201,
+            success_message="Import created. Upload the spreadsheet, then start the import.",
+            data={**item_import.to_dict(), "upload_url": upload_url}
+        )
+
+    except ClientError as e:
+        logger.error("Failed to create upload URL for claim %s: %s", claim_id, str(e))
+        return response.api_response(500, error_details="Failed to create upload URL")
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error creating item import for claim %s: %s", claim_id, str(e))
+        return response.api_response(500, error_details="Database error when creating import")
+    except Exception as e:
+        db_session.rollback()
+        logger.exception("Unexpected error creating item import: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
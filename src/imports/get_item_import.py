@@ -0,0 +1,69 @@
+"""
+Lambda handler for checking the progress of an inventory spreadsheet import.
+
+Usage:
+    GET /claims/{claim_id}/imports/{import_id}
+
+Returns the import status and row counts. When rows were rejected, the
+response includes a pre-signed URL to the error report CSV, which lists
+each rejected row with its spreadsheet row number and the reason.
+"""
+import os
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param, generate_presigned_url, get_s3_client
+from utils import response
+from models.item_import import ItemImport
+
+
+logger = get_logger(__name__)
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+
+
+@standard_lambda_handler(requires_auth=True)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
+    """
+    Handles retrieving an item import of the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing the claim and import IDs.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+
+    Returns:
+        dict: API response containing the import, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result
+    claim_id = result
+
+    success, result = extract_uuid_param(event, "import_id")
+    if not success:
+        return result
+    import_id = result
+
+    try:
+        item_import = db_session.query(ItemImport).filter(
+            ItemImport.id == import_id,
+            ItemImport.claim_id == claim_id,
+            ItemImport.household_id == user.household_id
+        ).first()
+        if not item_import:
+            return response.api_response(404, error_details="Import not found")
+
+        data = item_import.to_dict()
+        data["error_report_url"] = None
+        if item_import.error_report_key:
+            data["error_report_url"] = generate_presigned_url(get_s3_client(), S3_BUCKET_NAME, item_import.error_report_key)
+
+        return response.api_response(200, data=data)
+
+    except SQLAlchemyError as e:
+        logger.error("Database error retrieving item import %s: %s", import_id, str(e))
+        return response.api_response(500, error_details="Database error when retrieving import")
+    except Exception as e:
+        logger.exception("Unexpected error retrieving item import: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
@@ -0,0 +1,236 @@
+"""
+Bulk loading of spreadsheet rows into a claim's items.
+
+Rows are validated against the compiled row schema as they stream in and
+the valid ones are fed to PostgreSQL with `COPY` into a temporary staging
+table, so no Python object is built per item. The staging table is then
+merged into `items` with one INSERT ... SELECT that resolves room names
+against the claim's rooms (case-insensitively); names with no matching room
+get a new room first. Rejected rows are written to an error report CSV with
+their spreadsheet row number and the reason.
+
+Everything runs in the caller's transaction; the staging table is dropped
+on commit.
+"""
+import csv
+import io
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO
+
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, exists, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from imports import row_schema
+from imports.row_schema import RowError, SpreadsheetError
+from models.item import Item
+from models.room import Room
+from utils.change_log import record_changes, ITEM, ROOM
+from utils.claim_summary import rebuild_claim_summary
+from utils.logging_utils import get_logger
+from utils.search_index import reindex_items
+
+logger = get_logger(__name__)
+
+# Bounds the number of IDs bound into a single search index / change log statement
+FOLLOW_UP_CHUNK_SIZE = 5000
+
+_staging_metadata = MetaData()
+staging = Table(
+    "item_import_staging", _staging_metadata,
+    Column("row_number", Integer, nullable=False),
+    Column("name", String, nullable=False),
+    Column("room_name", String),
+    Column("brand_manufacturer", String),
+    Column("model_number", String),
+    Column("original_vendor", String),
+    Column("quantity", Integer),
+    Column("age_years", Integer),
+    Column("age_months", Integer),
+    Column("condition", String),
+    Column("unit_cost", Float),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+STAGING_COLUMNS = ("row_number",) + row_schema.FIELDS
+
+
+class _CopyStream:
+    """File-like view of validated rows encoded as CSV, read by COPY FROM STDIN."""
+
+    def __init__(self, rows: Iterator[Sequence[Any]]):
+        self._rows = rows
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._exhausted = False
+
+    def read(self, size: int = -1) -> str:
+        while not self._exhausted and (size < 0 or self._buffer.tell() < size):
+            row = next(self._rows, None)
+            if row is None:
+                self._exhausted = True
+            else:
+                # None is written as an unquoted empty field, which COPY reads as NULL
+                self._writer.writerow(row)
+
+        data = self._buffer.getvalue()
+        chunk, rest = (data, "") if size < 0 else (data[:size], data[size:])
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._buffer.write(rest)
+        return chunk
+
+
+class ErrorReport:
+    """CSV of rejected rows: row number, reason and the original cells."""
+
+    def __init__(self, output: TextIO, header: Sequence[Any]):
+        self._writer = csv.writer(output)
+        self._header = ["Row", "Error"] + ["" if value is None else value for value in header]
+        self.count = 0
+
+    def add(self, row_number: int, error: str, row: Sequence[Any]) -> None:
+        if not self.count:
+            self._writer.writerow(self._header)
+        self._writer.writerow([row_number, error] + ["" if value is None else value for value in row])
+        self.count += 1
+
+
+def _validated_rows(rows: Iterator[List[Any]], schema: row_schema.RowSchema, errors: ErrorReport,
+                    counts: Dict[str, int]) -> Iterator[tuple]:
+    # Spreadsheet row numbers are 1-based and the header is row 1
+    for row_number, row in enumerate(rows, 2):
+        if row_schema.is_blank(row):
+            continue
+        counts["total_rows"] += 1
+        try:
+            yield (row_number,) + schema.parse(row)
+        except RowError as e:
+            errors.add(row_number, str(e), row)
+
+
+def _copy_into_staging(db_session: Session, stream: _CopyStream) -> None:
+    cursor = db_session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging.name} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            stream
+        )
+    finally:
+        cursor.close()
+
+
+def _create_missing_rooms(db_session: Session, claim_id: uuid.UUID, household_id: uuid.UUID) -> int:
+    """Create a room for every staged room name the claim does not have yet."""
+    existing = select(Room.id).where(
+        Room.claim_id == claim_id,
+        Room.deleted.is_(False),
+        func.lower(Room.name) == func.lower(staging.c.room_name)
+    )
+    names = db_session.execute(
+        select(staging.c.room_name).where(
+            staging.c.room_name.isnot(None), ~exists(existing)
+        ).group_by(staging.c.room_name).order_by(func.min(staging.c.row_number))
+    ).scalars()
+
+    # Spellings that differ only in case become one room, named as first seen
+    rooms = {}
+    for name in names:
+        rooms.setdefault(name.lower(), name)
+    if not rooms:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    room_ids = [uuid.uuid4() for _ in rooms]
+    db_session.execute(insert(Room.__table__).values([
+        {"id": room_id, "name": name, "description": None, "household_id": household_id,
+         "claim_id": claim_id, "created_at": now, "updated_at": now, "deleted": False}
+        for room_id, name in zip(room_ids, rooms.values())
+    ]))
+    record_changes(db_session, ROOM, room_ids)
+    return len(rooms)
+
+
+def _merge_staging(db_session: Session, claim_id: uuid.UUID) -> List[uuid.UUID]:
+    """Insert the staged rows as items, in spreadsheet order, and return their IDs."""
+    items = Item.__table__
+    room_id = select(Room.id).where(
+        Room.claim_id == claim_id,
+        Room.deleted.is_(False),
+        func.lower(Room.name) == func.lower(staging.c.room_name)
+    ).order_by(Room.created_at).limit(1).scalar_subquery()
+
+    source = select(
+        func.gen_random_uuid(),
+        literal(claim_id, items.c.claim_id.type),
+        staging.c.name,
+        room_id,
+        staging.c.brand_manufacturer,
+        staging.c.model_number,
+        staging.c.original_vendor,
+        func.coalesce(staging.c.quantity, 1),
+        staging.c.age_years,
+        staging.c.age_months,
+        staging.c.condition,
+        staging.c.unit_cost,
+        literal(False),
+        literal(False),
+        func.now(),
+        func.now(),
+    ).order_by(staging.c.row_number)
+
+    stmt = insert(items).from_select([
+        "id", "claim_id", "name", "room_id", "brand_manufacturer", "model_number", "original_vendor",
+        "quantity", "age_years", "age_months", "condition", "unit_cost", "is_ai_suggested", "deleted",
+        "created_at", "updated_at",
+    ], source).returning(items.c.id)
+    return list(db_session.execute(stmt).scalars())
+
+
+def import_rows(db_session: Session, claim_id: uuid.UUID, household_id: uuid.UUID,
+                rows: Iterator[List[Any]], error_output: TextIO) -> Dict[str, int]:
+    """
+    Load spreadsheet rows into a claim's items.
+
+    Args:
+        db_session: Database session (the caller commits)
+        claim_id: Claim to import into
+        household_id: Household that owns the claim
+        rows: Spreadsheet rows, header first
+        error_output: Text stream the error report CSV is written to
+
+    Returns:
+        dict: total_rows, imported_rows, rejected_rows and rooms_created
+
+    Raises:
+        SpreadsheetError: If the spreadsheet is empty or has no usable header
+    """
+    header: Optional[List[Any]] = next(rows, None)
+    if header is None:
+        raise SpreadsheetError("Spreadsheet is empty")
+    schema = row_schema.compile_schema(header)
+    errors = ErrorReport(error_output, header)
+    counts = {"total_rows": 0}
+
+    staging.create(db_session.connection())
+    _copy_into_staging(db_session, _CopyStream(_validated_rows(rows, schema, errors, counts)))
+
+    rooms_created = _create_missing_rooms(db_session, claim_id, household_id)
+    item_ids = _merge_staging(db_session, claim_id)
+
+    if item_ids:
+        # One aggregate pass is cheaper than per-item counter deltas
+        rebuild_claim_summary(db_session, claim_id)
+        for start in range(0, len(item_ids), FOLLOW_UP_CHUNK_SIZE):
+            chunk = item_ids[start:start + FOLLOW_UP_CHUNK_SIZE]
+            reindex_items(db_session, chunk)
+            record_changes(db_session, ITEM, chunk)
+
+    logger.info("Imported %s of %s rows into claim %s (%s rejected, %s rooms created)",
+                len(item_ids), counts["total_rows"], claim_id, errors.count, rooms_created)
+    return {
+        "total_rows": counts["total_rows"],
+        "imported_rows": len(item_ids),
+        "rejected_rows": errors.count,
+        "rooms_created": rooms_created,
+    }
@@ -0,0 +1,135 @@
+"""
+Lambda handler for running queued inventory spreadsheet imports.
+
+This module is triggered by the item import queue and, for each import:
+1. Streams the uploaded CSV/XLSX from S3 and validates it row by row
+2. Loads the valid rows through a staging table into the claim's items
+3. Uploads an error report CSV for rejected rows next to the spreadsheet
+4. Records the row counts and final status on the import
+
+Imports are claimed by moving them from QUEUED to PROCESSING, so a
+redelivered message for an import that already ran is ignored. An import
+still PROCESSING after ITEM_IMPORT_LEASE_SECONDS was abandoned by a worker
+that died or timed out; since an import is loaded in one transaction, none
+of it was saved, and the redelivered message claims and runs it again.
+"""
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from utils.logging_utils import get_logger
+from utils.lambda_utils import get_s3_client
+from database.database import get_db_session
+from models.item_import import ItemImport, ItemImportStatus
+from imports import item_importer, spreadsheet
+from imports.row_schema import SpreadsheetError
+
+logger = get_logger(__name__)
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+
+# Error reports are kept in memory up to this size before spilling to /tmp
+ERROR_REPORT_SPOOL_BYTES = 4 * 1024 * 1024
+# Longer than the worker's Lambda timeout, so a running import is never claimed twice
+LEASE_SECONDS = int(os.getenv("ITEM_IMPORT_LEASE_SECONDS", "960"))
+
+
+def _is_abandoned(item_import):
+    """Whether an import has been PROCESSING for longer than the lease."""
+    lease_start = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=LEASE_SECONDS)
+    return item_import.current_status == ItemImportStatus.PROCESSING and item_import.updated_at < lease_start
+
+
+def _claim_import(db_session, import_id):
+    """Move a queued or abandoned import to PROCESSING, or return None if it is neither."""
+    item_import = db_session.query(ItemImport).filter(ItemImport.id == import_id).with_for_update().first()
+    if not item_import:
+        db_session.rollback()
+        return None
+    if _is_abandoned(item_import):
+        logger.warning("Item import %s was abandoned while processing; running it again", import_id)
+    elif item_import.current_status != ItemImportStatus.QUEUED:
+        db_session.rollback()
+        return None
+    item_import.update_status(ItemImportStatus.PROCESSING)
+    item_import.updated_at = datetime.now(timezone.utc)  # Starts the lease, also when reclaiming
+    db_session.commit()
+    return item_import
+
+
+def run_import(db_session, item_import, s3=None):
+    """
+    Import the spreadsheet of an import that is PROCESSING and record the outcome.
+
+    Args:
+        db_session: Database session
+        item_import (ItemImport): Import to run
+        s3: S3 client (defaults to the standard client)
+    """
+    s3 = s3 or get_s3_client()
+    try:
+        file_format = spreadsheet.detect_format(item_import.file_name)
+        body = s3.get_object(Bucket=S3_BUCKET_NAME, Key=item_import.s3_key)["Body"]
+
+        with tempfile.SpooledTemporaryFile(max_size=ERROR_REPORT_SPOOL_BYTES, mode="w+b") as error_file:
+            error_output = io.TextIOWrapper(error_file, encoding="utf-8", newline="", write_through=True)
+            counts = item_importer.import_rows(
+                db_session,
+                item_import.claim_id,
+                item_import.household_id,
+                spreadsheet.iter_rows(body, file_format),
+                error_output
+            )
+
+            error_output.detach()
+            if counts["rejected_rows"]:
+                error_file.seek(0)
+                error_report_key = item_import.s3_key.rsplit("/", 1)[0] + "/errors.csv"
+                s3.upload_fileobj(error_file, S3_BUCKET_NAME, error_report_key,
+                                  ExtraArgs={"ContentType": "text/csv"})
+                item_import.error_report_key = error_report_key
+
+        for field, value in counts.items():
+            setattr(item_import, field, value)
+        item_import.update_status(ItemImportStatus.COMPLETED)
+        db_session.commit()
+        logger.info("Item import %s completed: %s", item_import.id, counts)
+
+    except SpreadsheetError as e:
+        db_session.rollback()
+        item_import.update_status(ItemImportStatus.FAILED, str(e))
+        db_session.commit()
+        logger.warning("Item import %s rejected: %s", item_import.id, str(e))
+    except Exception as e:
+        db_session.rollback()
+        item_import.update_status(ItemImportStatus.FAILED, "Import failed")
+        db_session.commit()
+        logger.exception("Item import %s failed: %s", item_import.id, str(e))
+
+
+def lambda_handler(event, _context=None):
+    """
+    Processes item imports from the SQS queue.
+
+    Args:
+        event (dict): SQS event whose records carry an `import_id`
+        _context (dict): Lambda execution context
+
+    Returns:
+        dict: Processing status
+    """
+    db_session = get_db_session()
+    try:
+        for record in event.get("Records", []):
+            import_id = uuid.UUID(json.loads(record["body"])["import_id"])
+            item_import = _claim_import(db_session, import_id)
+            if not item_import:
+                logger.info("Item import %s is not queued or abandoned; skipping", import_id)
+                continue
+            run_import(db_session, item_import)
+
+        return {"statusCode": 200, "body": json.dumps({"message": "Imports processed"})}
+    finally:
+        db_session.close()
@@ -0,0 +1,178 @@
+"""
+Row schema for inventory spreadsheet imports.
+
+Spreadsheets are expected to use the columns of the report's
+`items_summary.csv` (a few common alternatives are accepted too). The
+header row is compiled once into a tuple of (field, column index, parser)
+so validating each of up to hundreds of thousands of rows is a single pass
+over prebuilt parsers with no header lookups.
+
+    ```
+    schema = compile_schema(header)
+    values = schema.parse(row)   # tuple in FIELDS order, or raises RowError
+    ```
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Values that spreadsheets (and our own reports) use for "no value"
+EMPTY_VALUES = {"", "n/a", "na", "none", "-"}
+
+MAX_TEXT_LENGTH = 1000
+
+
+class RowError(ValueError):
+    """A spreadsheet row that cannot be imported."""
+
+
+class SpreadsheetError(ValueError):
+    """A spreadsheet that cannot be imported at all."""
+
+
+def _normalize_header(value: Any) -> str:
+    # "#" is kept so "Item #" is not read as "Item"
+    return re.sub(r"[^a-z0-9#]", "", str(value or "").lower())
+
+
+def _clean(value: Any) -> Optional[Any]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if value.lower() in EMPTY_VALUES:
+            return None
+    return value
+
+
+def _text(value: Any) -> Optional[str]:
+    value = _clean(value)
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value)
+    if len(value) > MAX_TEXT_LENGTH:
+        raise RowError(f"longer than {MAX_TEXT_LENGTH} characters")
+    return value
+
+
+def _integer(minimum: int) -> Callable[[Any], Optional[int]]:
+    def parse(value: Any) -> Optional[int]:
+        value = _clean(value)
+        if value is None:
+            return None
+        try:
+            number = float(str(value).replace(",", ""))
+        except ValueError:
+            raise RowError("not a number")
+        if not number.is_integer():
+            raise RowError("not a whole number")
+        if number < minimum:
+            raise RowError(f"must be at least {minimum}")
+        return int(number)
+    return parse
+
+
+def _money(value: Any) -> Optional[float]:
+    value = _clean(value)
+    if value is None:
+        return None
+    try:
+        amount = float(str(value).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        raise RowError("not an amount")
+    if amount < 0:
+        raise RowError("cannot be negative")
+    return amount
+
+
+# Imported fields in staging column order: (field, label, header aliases, parser)
+COLUMNS: List[Tuple[str, str, Tuple[str, ...], Callable[[Any], Any]]] = [
+    ("name", "Item Description", ("Item Description", "Description", "Item Name", "Name", "Item"), _text),
+    ("room_name", "Room", ("Room", "Room Name"), _text),
+    ("brand_manufacturer", "Brand or Manufacturer", ("Brand or Manufacturer", "Brand", "Manufacturer"), _text),
+    ("model_number", "Model#", ("Model#", "Model Number", "Model"), _text),
+    ("original_vendor", "Original Vendor", ("Original Vendor", "Vendor"), _text),
+    ("quantity", "Quantity Lost", ("Quantity Lost", "Quantity", "Qty"), _integer(1)),
+    ("age_years", "Item Age (Years)", ("Item Age (Years)", "Age (Years)", "Age Years"), _integer(0)),
+    ("age_months", "Item Age (Months)", ("Item Age (Months)", "Age (Months)", "Age Months"), _integer(0)),
+    ("condition", "Condition", ("Condition",), _text),
+    ("unit_cost", "Cost to Replace Pre-Tax (each)", ("Cost to Replace Pre-Tax (each)", "Unit Cost", "Cost"), _money),
+]
+
+FIELDS = tuple(field for field, _, _, _ in COLUMNS)
+
+# Header -> field position; exact labels are matched before the other aliases
+_LABELS: Dict[str, int] = {_normalize_header(label): position for position, (_, label, _, _) in enumerate(COLUMNS)}
+_ALIASES: Dict[str, int] = {
+    _normalize_header(alias): position
+    for position, (_, _, aliases, _) in enumerate(COLUMNS)
+    for alias in aliases
+}
+
+
+class RowSchema:
+    """A header row compiled into per-column parsers."""
+
+    __slots__ = ("header", "_parsers", "_defaults")
+
+    def __init__(self, header: Sequence[Any], parsers: Tuple[Tuple[int, int, str, Callable], ...]):
+        self.header = list(header)
+        self._parsers = parsers
+        self._defaults = [None] * len(COLUMNS)
+
+    def parse(self, row: Sequence[Any]) -> Tuple[Any, ...]:
+        """
+        Validate a data row.
+
+        Returns:
+            tuple: Parsed values in FIELDS order
+
+        Raises:
+            RowError: If any cell is invalid (all problems are reported together)
+        """
+        values = list(self._defaults)
+        problems = []
+        width = len(row)
+        for position, index, label, parser in self._parsers:
+            try:
+                values[position] = parser(row[index] if index < width else None)
+            except RowError as e:
+                problems.append(f"{label}: {e}")
+        if values[0] is None:
+            problems.insert(0, "Item Description: required")
+        if problems:
+            raise RowError("; ".join(problems))
+        return tuple(values)
+
+
+def is_blank(row: Sequence[Any]) -> bool:
+    """Check whether a row has no values at all (trailing spreadsheet rows)."""
+    return all(_clean(value) is None for value in row)
+
+
+def compile_schema(header: Sequence[Any]) -> RowSchema:
+    """
+    Compile a header row into a RowSchema.
+
+    Unknown columns (such as "Item #" and "Total Cost") are ignored. Each
+    column maps to at most one field and each field to at most one column:
+    columns titled exactly as a field's label are matched first, then the
+    remaining columns by alias, the first column winning.
+
+    Raises:
+        SpreadsheetError: If no item description column is present
+    """
+    titles = [_normalize_header(title) for title in header]
+    parsers = {}
+    for lookup in (_LABELS, _ALIASES):
+        used = {index for _, index, _, _ in parsers.values()}
+        for index, title in enumerate(titles):
+            position = lookup.get(title)
+            if position is not None and position not in parsers and index not in used:
+                _, label, _, parser = COLUMNS[position]
+                parsers[position] = (position, index, label, parser)
+
+    if 0 not in parsers:
+        raise SpreadsheetError("Spreadsheet has no Item Description column")
+    return RowSchema(header, tuple(parsers[position] for position in sorted(parsers)))
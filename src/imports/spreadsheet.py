@@ -0,0 +1,73 @@
+"""
+Streaming readers for uploaded inventory spreadsheets.
+
+CSV files are decoded and parsed straight off the S3 response body, so
+memory use does not grow with the file. XLSX files are zip archives that
+need random access; they are spooled to local temporary storage first and
+then read row by row in openpyxl's read-only mode.
+"""
+import codecs
+import csv
+import os
+import tempfile
+import zipfile
+from typing import Any, Iterator, List
+
+from imports.row_schema import SpreadsheetError
+
+CSV = "csv"
+XLSX = "xlsx"
+FORMATS = (CSV, XLSX)
+
+
+def detect_format(file_name: str) -> str:
+    """
+    Determine the spreadsheet format from a file name.
+
+    Raises:
+        SpreadsheetError: For unsupported extensions
+    """
+    extension = os.path.splitext(file_name or "")[1].lower().lstrip(".")
+    if extension not in FORMATS:
+        raise SpreadsheetError("Only .csv and .xlsx files can be imported")
+    return extension
+
+
+def iter_csv(stream) -> Iterator[List[Any]]:
+    """Yield the rows of a UTF-8 CSV byte stream (a leading BOM is ignored)."""
+    yield from csv.reader(codecs.getreader("utf-8-sig")(stream))
+
+
+def iter_xlsx(stream) -> Iterator[List[Any]]:
+    """Yield the rows of the first worksheet of an XLSX byte stream."""
+    # openpyxl is only needed by the import worker
+    from openpyxl import load_workbook
+
+    with tempfile.TemporaryFile() as spool:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            spool.write(chunk)
+        spool.seek(0)
+
+        workbook = load_workbook(spool, read_only=True, data_only=True)
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+
+
+def iter_rows(stream, file_format: str) -> Iterator[List[Any]]:
+    """
+    Yield the rows of a spreadsheet, header first.
+
+    Args:
+        stream: Readable binary stream (e.g. an S3 StreamingBody)
+        file_format: CSV or XLSX
+    """
+    try:
+        if file_format == XLSX:
+            yield from iter_xlsx(stream)
+        else:
+            yield from iter_csv(stream)
+    except (csv.Error, UnicodeDecodeError, zipfile.BadZipFile) as e:
+        raise SpreadsheetError(f"Spreadsheet could not be read: {e}")
@@ -0,0 +1,90 @@
+"""
+Lambda handler for queueing an uploaded inventory spreadsheet for import.
+
+Usage:
+    POST /claims/{claim_id}/imports/{import_id}/start
+
+Checks that the spreadsheet was uploaded, marks the import as queued and, in
+the same transaction, hands it to the import worker through the item import
+queue via the transactional outbox.
+"""
+import os
+from botocore.exceptions import ClientError
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param, get_s3_client
+from utils import outbox, response
+from models.item_import import ItemImport, ItemImportStatus
+
+
+logger = get_logger(__name__)
+
+S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
+ITEM_IMPORT_QUEUE_URL = os.getenv("ITEM_IMPORT_QUEUE_URL")
+MAX_IMPORT_FILE_BYTES = int(os.getenv("MAX_IMPORT_FILE_BYTES", str(50 * 1024 * 1024)))
+
+
+@standard_lambda_handler(requires_auth=True)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
+    """
+    Handles queueing an item import of the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing the claim and import IDs.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+
+    Returns:
+        dict: API response containing the queued import, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result
+    claim_id = result
+
+    success, result = extract_uuid_param(event, "import_id")
+    if not success:
+        return result
+    import_id = result
+
+    try:
+        item_import = db_session.query(ItemImport).filter(
+            ItemImport.id == import_id,
+            ItemImport.claim_id == claim_id,
+            ItemImport.household_id == user.household_id
+        ).with_for_update().first()
+        if not item_import:
+            return response.api_response(404, error_details="Import not found")
+        if item_import.current_status != ItemImportStatus.PENDING:
+            return response.api_response(409, error_details="Import has already been started")
+
+        try:
+            head = get_s3_client().head_object(Bucket=S3_BUCKET_NAME, Key=item_import.s3_key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return response.api_response(400, error_details="Spreadsheet has not been uploaded")
+            raise
+        if head.get("ContentLength", 0) > MAX_IMPORT_FILE_BYTES:
+            return response.api_response(400, error_details=f"Spreadsheet exceeds the maximum size of {MAX_IMPORT_FILE_BYTES} bytes")
+
+        item_import.update_status(ItemImportStatus.QUEUED)
+        message_id = outbox.enqueue(db_session, ITEM_IMPORT_QUEUE_URL, {"import_id": str(import_id)})
+        db_session.commit()
+        outbox.flush(db_session, [message_id])
+
+        logger.info("Queued item import %s for claim %s", import_id, claim_id)
+        return response.api_response(200, success_message="Import queued", data=item_import.to_dict())
+
+    except ClientError as e:
+        db_session.rollback()
+        logger.error("AWS error starting item import %s: %s", import_id, str(e))
+        return response.api_response(500, error_details="Failed to queue import")
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error starting item import %s: %s", import_id, str(e))
+        return response.api_response(500, error_details="Database error when starting import")
+    except Exception as e:
+        db_session.rollback()
+        logger.exception("Unexpected error starting item import: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
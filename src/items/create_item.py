@@ -11,6 +11,9 @@ from models.claim import Claim
 from models.user import User
 from models.room import Room
 from utils import response
+from utils.claim_summary import apply_deltas, item_deltas
+from utils.search_index import reindex_items
+from utils.change_log import record_changes, ITEM
 
 # Configure logging
 logger = get_logger(__name__)
@@ -111,6 +114,7 @@ def lambda_handler(event, _context, db_session: Session = None):
 
         db.add(new_item)
         db.flush()  # Flush to get the new item ID
+        apply_deltas(db, item_deltas(new_item))
         
         # Handle file association if file_id is provided
         file_id_str = body.get("file_id")
@@ -136,6 +140,8 @@ def lambda_handler(event, _context, db_session: Session = None):
             # Create the file-item association
             db.add(ItemFile(item_id=new_item.id, file_id=file_id))
 
+        reindex_items(db, [new_item.id])
+        record_changes(db, ITEM, [new_item.id])
         db.commit()
         
         # Prepare response data with item information
@@ -0,0 +1,137 @@
+"""
+Lambda handler for creating many items of a claim in one request.
+
+Usage:
+    POST /claims/{claim_id}/items:batch
+    {"items": [{"name": "Sofa", "room_id": "...", "file_ids": ["..."]}, ...]}
+
+Rows are validated independently and the valid ones are inserted with one
+multi-row INSERT for the items and one for their file links, in a single
+transaction. The response lists the outcome of every row by its index in the
+request. Batches are capped at MAX_ITEM_BATCH_SIZE rows.
+"""
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils import response, auth_utils
+from utils.claim_summary import apply_deltas, item_deltas, merge_deltas
+from utils.search_index import reindex_items
+from utils.change_log import record_changes, ITEM
+from models.item import Item
+from models.item_files import ItemFile
+from items import item_batch
+from items.item_batch import RowError
+
+
+logger = get_logger(__name__)
+
+ITEM_DEFAULTS = {
+    "name": "New Item",
+    "description": None,
+    "condition": None,
+    "is_ai_suggested": False,
+    "room_id": None,
+    "brand_manufacturer": None,
+    "model_number": None,
+    "original_vendor": None,
+    "quantity": 1,
+    "age_years": None,
+    "age_months": None,
+    "unit_cost": None,
+}
+
+
+@standard_lambda_handler(requires_auth=True, requires_body=True, required_fields=["items"])
+def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=None) -> dict:
+    """
+    Handles creating a batch of items in a claim of the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing the claim ID and the items to create.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+        body (dict): Request body containing the `items` list (provided by decorator).
+
+    Returns:
+        dict: API response with the result of every row, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result
+    claim_id = result
+
+    rows, error = item_batch.get_batch_rows(body)
+    if error:
+        return response.api_response(400, error_details=error)
+
+    try:
+        if not auth_utils.claim_in_household(db_session, claim_id, user.household_id):
+            return response.api_response(404, error_details="Claim not found")
+
+        # Parse every row before touching the database for references
+        results = [None] * len(rows)
+        parsed = []
+        for index, row in enumerate(rows):
+            try:
+                if not isinstance(row, dict):
+                    raise RowError("Item must be an object")
+                parsed.append((index, item_batch.parse_fields(row), item_batch.parse_file_ids(row)))
+            except RowError as e:
+                results[index] = item_batch.row_error(index, str(e))
+
+        # One query per referenced table
+        rooms = item_batch.live_rooms(db_session, claim_id, (fields.get("room_id") for _, fields, _ in parsed))
+        files = item_batch.live_files(db_session, claim_id, user.household_id,
+                                      (file_id for _, _, file_ids in parsed for file_id in file_ids))
+
+        now = datetime.now(timezone.utc)
+        items, item_rows, link_rows = [], [], []
+        for index, fields, file_ids in parsed:
+            if fields.get("room_id") and fields["room_id"] not in rooms:
+                results[index] = item_batch.row_error(index, "Room not found")
+                continue
+            if any(file_id not in files for file_id in file_ids):
+                results[index] = item_batch.row_error(index, "File not found")
+                continue
+
+            item_row = {**ITEM_DEFAULTS, **fields, "id": uuid.uuid4(), "claim_id": claim_id,
+                        "deleted": False, "created_at": now, "updated_at": now}
+            item_rows.append(item_row)
+            link_rows.extend({"item_id": item_row["id"], "file_id": file_id} for file_id in file_ids)
+            items.append((index, Item(**item_row)))
+
+        if item_rows:
+            db_session.execute(insert(Item.__table__).values(item_rows))
+            if link_rows:
+                db_session.execute(insert(ItemFile.__table__).values(link_rows))
+
+            apply_deltas(db_session, merge_deltas({}, *(item_deltas(item) for _, item in items)))
+            item_ids = [item.id for _, item in items]
+            reindex_items(db_session, item_ids)
+            record_changes(db_session, ITEM, item_ids)
+            db_session.commit()
+
+        for index, item in items:
+            results[index] = item_batch.row_success(index, "created", item.to_dict())
+
+        response_data = {"claim_id": str(claim_id), "created": len(items), "results": results}
+        logger.info("Created %s of %s batch items in claim %s", len(items), len(rows), claim_id)
+
+        if not items:
+            return response.api_response(400, error_details="No items were created", data=response_data)
+        if len(items) < len(rows):
+            return response.api_response(207, message="Some items failed to create.", data=response_data)
+        return response.api_response(201, success_message="Items created successfully", data=response_data)
+
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error creating batch items in claim %s: %s", claim_id, str(e))
+        return response.api_response(500, error_details="Database error when creating items")
+    except Exception as e:
+        db_session.rollback()
+        logger.exception("Unexpected error creating batch items: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
@@ -4,6 +4,10 @@ from models.item import Item
 from models.item_files import ItemFile
 from models.item_labels import ItemLabel
 from utils import response
+from utils.claim_summary import apply_deltas, item_deltas
+from utils.search_index import reindex_items
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, ITEM
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
 
 # Configure logging
@@ -38,11 +42,18 @@ def lambda_handler(event, context=None, _context=None, db_session=None, user=Non
         # Remove file associations (but keep files intact)
         db_session.query(ItemFile).filter(ItemFile.item_id == item_uuid).delete()
 
-        # Remove label associations for this item
-        db_session.query(ItemLabel).filter(ItemLabel.item_id == item_uuid).delete()
+        # Remove label associations for this item; label counts change with them
+        if db_session.query(ItemLabel).filter(ItemLabel.item_id == item_uuid).delete():
+            bump_label_version(db_session, user.household_id)
 
+        # Remove the item's contribution to the claim summary
+        apply_deltas(db_session, item_deltas(item, -1))
+
+        # Recorded before the delete so the change can still be traced to its claim
+        record_changes(db_session, ITEM, [item_uuid])
         # Delete item itself
         db_session.delete(item)
+        reindex_items(db_session, [item_uuid])
         db_session.commit()
 
         logger.info(f"Deleted item {item_uuid} and cleared file/label associations.")
@@ -1,10 +1,18 @@
 from utils.logging_utils import get_logger
+from sqlalchemy.orm import joinedload
 from models.item import Item
-from models.item_labels import ItemLabel
-from models.label import Label
 from models.claim import Claim
 from utils import response
-from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.fieldsets import resolve_fieldset
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param, get_s3_client
+from items.item_serialization import (
+    ITEM_FIELD_COLUMNS,
+    DEFAULT_ITEM_FIELDS,
+    ITEM_EXPANSIONS,
+    item_loader_options,
+    serialize_item_fields,
+    serialize_item_expansions,
+)
 
 # Configure logging
 logger = get_logger(__name__)
@@ -13,6 +21,10 @@ def lambda_handler(event, context=None, _context=None, db_session=None, user=Non
     """
     Retrieves an item by ID and its associated labels.
 
+    Supports `fields=` and `expand=` (files, files.url, labels, room). The item,
+    its household check and every expanded relationship are fetched in a single
+    joined query.
+
     Parameters:
         event (dict): API Gateway event with item ID.
         context/_context (dict): Lambda execution context (unused).
@@ -26,40 +38,35 @@ def lambda_handler(event, context=None, _context=None, db_session=None, user=Non
     success, result = extract_uuid_param(event, "item_id")
     if not success:
         return result  # Return error response
-        
+
     item_uuid = result
-    
+
+    success, result = resolve_fieldset(
+        event,
+        allowed_fields=ITEM_FIELD_COLUMNS.keys(),
+        default_fields=DEFAULT_ITEM_FIELDS,
+        allowed_expansions=ITEM_EXPANSIONS,
+        default_expansions=["files", "labels"],
+    )
+    if not success:
+        return result  # Return error response
+    fields, expansions = result
+
     # Fetch the item and join with claim to verify household ownership
-    item = db_session.query(Item).join(Claim, Item.claim_id == Claim.id).filter(
+    item = db_session.query(Item).join(Claim, Item.claim_id == Claim.id).options(
+        *item_loader_options(fields, expansions, collection_loader=joinedload)
+    ).filter(
         Item.id == item_uuid,
         Claim.household_id == user.household_id
     ).first()
-    
+
     if not item:
         return response.api_response(404, error_details='Item not found.')
 
-    # Fetch associated labels
-    item_labels = db_session.query(Label).join(ItemLabel, Label.id == ItemLabel.label_id).filter(ItemLabel.item_id == item_uuid).all()
-    
-    # Get associated file IDs
-    file_ids = [str(file.id) for file in item.files]
-    
+    s3_client = get_s3_client() if "files.url" in expansions else None
+
     # Prepare response data
-    item_data = {
-        "id": str(item.id),
-        "name": item.name,
-        "description": item.description,
-        "unit_cost": item.unit_cost,
-        "condition": item.condition,
-        "room_id": str(item.room_id) if item.room_id else None,
-        "file_ids": file_ids,  
-        "labels": [
-            {
-                "id": str(label.id),
-                "text": label.label_text,
-                "is_ai_generated": label.is_ai_generated
-            } for label in item_labels
-        ]
-    }
+    item_data = serialize_item_fields(item, fields)
+    item_data.update(serialize_item_expansions(item, expansions, s3_client))
 
     return response.api_response(200, success_message='Item retrieved successfully.', data=item_data)
@@ -1,10 +1,18 @@
 from utils.logging_utils import get_logger
-from sqlalchemy import desc
+from sqlalchemy import desc, func
 
 from models.item import Item
-from models.claim import Claim
-from utils import response
-from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils import response, auth_utils
+from utils.fieldsets import resolve_fieldset
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param, get_s3_client
+from items.item_serialization import (
+    ITEM_FIELD_COLUMNS,
+    DEFAULT_ITEM_FIELDS,
+    ITEM_EXPANSIONS,
+    item_loader_options,
+    serialize_item_fields,
+    serialize_item_expansions,
+)
 
 # Configure logging
 logger = get_logger(__name__)
@@ -29,13 +37,8 @@ def lambda_handler(event, context=None, _context=None, db_session=None, user=Non
         
     claim_uuid = result
     
-    # Verify the claim exists and belongs to the user's household
-    claim = db_session.query(Claim).filter(
-        Claim.id == claim_uuid,
-        Claim.household_id == user.household_id
-    ).first()
-    
-    if not claim:
+    # Verify the claim exists and belongs to the user's household (cached per container)
+    if not auth_utils.claim_in_household(db_session, claim_uuid, user.household_id):
         return response.api_response(404, error_details='Claim not found.')
 
     # Get pagination parameters from query string
@@ -51,28 +54,43 @@ def lambda_handler(event, context=None, _context=None, db_session=None, user=Non
             return response.api_response(400, error_details='Invalid pagination parameters')
     except ValueError:
         return response.api_response(400, error_details='Invalid pagination parameters')
-    
-    # Fetch total count of items for the claim
-    total_items = db_session.query(Item).filter(Item.claim_id == claim_uuid).count()
-    
-    # Fetch paginated items for the claim - sort by id instead of created_at
-    items = db_session.query(Item).filter(Item.claim_id == claim_uuid).order_by(desc(Item.id)).offset(offset).limit(limit).all()
-    
+
+    success, result = resolve_fieldset(
+        event,
+        allowed_fields=ITEM_FIELD_COLUMNS.keys(),
+        default_fields=DEFAULT_ITEM_FIELDS,
+        allowed_expansions=ITEM_EXPANSIONS,
+        default_expansions=["files"],
+    )
+    if not success:
+        return result  # Return error response
+    fields, expansions = result
+
+    items_query = db_session.query(Item).filter(Item.claim_id == claim_uuid)
+
+    # Fetch the page and its total in one query; collections are batch loaded only when expanded
+    rows = (
+        items_query.add_columns(func.count().over().label("total_count"))
+        .options(*item_loader_options(fields, expansions))
+        .order_by(desc(Item.id))
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+    if rows:
+        total_items = rows[0].total_count
+    elif offset:
+        total_items = items_query.count()
+    else:
+        total_items = 0
+
+    s3_client = get_s3_client() if "files.url" in expansions else None
+
     items_data = []
-    for item in items:
-        # Get associated file IDs for this item
-        file_ids = [str(file.id) for file in item.files]
-        
-        # Build item data with file IDs
-        item_data = {
-            "id": str(item.id),
-            "name": item.name,
-            "description": item.description,
-            "unit_cost": item.unit_cost,
-            "condition": item.condition,
-            "file_ids": file_ids,  # Include associated file IDs
-            "room_id": str(item.room_id) if item.room_id else None
-        }
+    for item, _total in rows:
+        item_data = serialize_item_fields(item, fields)
+        item_data.update(serialize_item_expansions(item, expansions, s3_client))
         items_data.append(item_data)
     
     # Return response with pagination metadata matching files endpoint format
@@ -0,0 +1,77 @@
+"""
+Lambda handler for inheriting labels from all of an item's files.
+
+Usage:
+    POST /items/{item_id}/inherit
+
+Copies the labels of every file associated with the item onto the item in a
+single statement, without overwriting or duplicating existing labels.
+"""
+import uuid
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils import response, auth_utils
+from utils.search_index import reindex_items
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, ITEM_LABELS
+from utils.label_inheritance import inherit_item_file_labels
+from models.item import Item
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = get_logger(__name__)
+
+
+@standard_lambda_handler(requires_auth=True)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
+    """
+    Lambda handler to inherit labels from all files associated with an item.
+
+    Args:
+        event (dict): API Gateway event
+        _context (dict): Lambda execution context (unused)
+        db_session (Session): Database session
+        user (User): Authenticated user object (provided by decorator)
+
+    Returns:
+        dict: API response with inheritance status or error
+    """
+    success, result = extract_uuid_param(event, "item_id")
+    if not success:
+        return result  # This is already an API response with error details
+    item_id = result
+
+    try:
+        # Verify the item exists and belongs to the user's household
+        item = auth_utils.get_household_resource(db_session, user.household_id, Item, item_id)
+        if not item:
+            return response.api_response(404, error_details="Item not found")
+
+        labels_added = inherit_item_file_labels(db_session, [item_id])[uuid.UUID(item_id)]
+
+        if labels_added:
+            reindex_items(db_session, [item_id])
+            bump_label_version(db_session, user.household_id)
+            record_changes(db_session, ITEM_LABELS, [item_id])
+
+        db_session.commit()
+
+        logger.info("Inherited %s labels from the files of item %s", labels_added, item_id)
+
+        return response.api_response(
+            200,
+            success_message=f"Successfully inherited {labels_added} labels from the item's files",
+            data={
+                "item_id": str(item_id),
+                "labels_added": labels_added
+            }
+        )
+
+    except SQLAlchemyError as e:
+        logger.error("Database error while inheriting labels from item files: %s", str(e))
+        db_session.rollback()
+        return response.api_response(500, error_details="Database error occurred")
+
+    except Exception as e:
+        logger.error("Unexpected error while inheriting labels from item files: %s", str(e))
+        db_session.rollback()
+        return response.api_response(500, error_details="Internal server error")
@@ -4,14 +4,16 @@ Lambda handler for inheriting labels from a file to an item.
 This module handles copying labels from a file to an item without 
 overwriting existing labels, ensuring proper deduplication.
 """
+import uuid
 from utils.logging_utils import get_logger
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
-from utils import response
+from utils import response, auth_utils
+from utils.search_index import reindex_items
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, ITEM_LABELS
+from utils.label_inheritance import inherit_file_labels
 from models.item import Item
 from models.file import File
-from models.item_labels import ItemLabel
-from models.file_labels import FileLabel
-from models.label import Label
 from sqlalchemy.exc import SQLAlchemyError
 
 logger = get_logger(__name__)
@@ -30,29 +32,26 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
     Returns:
         dict: API response with inheritance status or error
     """
-    # Extract item_id and file_id from path parameters
-    path_params = event.get("pathParameters") or {}
-    
     # Extract item_id
-    success, result = extract_uuid_param(path_params, "item_id")
+    success, result = extract_uuid_param(event, "item_id")
     if not success:
         return result  # This is already an API response with error details
     item_id = result
     
     # Extract file_id
-    success, result = extract_uuid_param(path_params, "file_id")
+    success, result = extract_uuid_param(event, "file_id")
     if not success:
         return result  # This is already an API response with error details
     file_id = result
     
     try:
         # Verify the item exists and belongs to the user's household
-        item = db_session.query(Item).filter(Item.id == item_id).first()
+        item = auth_utils.get_household_resource(db_session, user.household_id, Item, item_id)
         if not item:
             return response.api_response(404, error_details="Item not found")
         
         # Verify the file exists
-        file = db_session.query(File).filter(File.id == file_id).first()
+        file = auth_utils.get_household_resource(db_session, user.household_id, File, file_id)
         if not file:
             return response.api_response(404, error_details="File not found")
         
@@ -60,43 +59,14 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
         if file.claim_id != item.claim_id:
             return response.api_response(400, error_details="File must belong to the same claim as the item")
         
-        # Get all non-deleted labels associated with the file
-        file_labels = db_session.query(FileLabel, Label).join(
-            Label, FileLabel.label_id == Label.id
-        ).filter(
-            FileLabel.file_id == file_id,
-            FileLabel.deleted.is_(False)
-        ).all()
-        
-        if not file_labels:
-            return response.api_response(
-                200, 
-                success_message="No labels found to inherit from the file",
-                data={
-                    "file_id": str(file_id),
-                    "item_id": str(item_id),
-                    "labels_added": 0
-                }
-            )
-        
-        labels_added = 0
-        
-        for file_label, label in file_labels:
-            # Check if this label is already associated with the item
-            existing_item_label = db_session.query(ItemLabel).filter(
-                ItemLabel.item_id == item_id,
-                ItemLabel.label_id == label.id
-            ).first()
-            
-            if not existing_item_label:
-                # Create new association
-                db_session.add(ItemLabel(item_id=item_id, label_id=label.id))
-                labels_added += 1
-            elif existing_item_label.deleted:
-                # Reactivate deleted association
-                existing_item_label.deleted = False
-                labels_added += 1
+        # Copy the file's labels onto the item in one statement
+        labels_added = inherit_file_labels(db_session, [(item_id, file_id)])[uuid.UUID(item_id)]
         
+        if labels_added:
+            reindex_items(db_session, [item_id])
+            bump_label_version(db_session, user.household_id)
+            record_changes(db_session, ITEM_LABELS, [item_id])
+
         # Commit changes
         db_session.commit()
         
@@ -0,0 +1,135 @@
+"""
+Shared helpers for the batch item endpoints.
+
+Batch requests carry a list of item payloads. Each row is validated on its
+own and reported back by its position in the request, so one bad row does
+not fail the whole batch. Everything a batch references (rooms, files and,
+for updates, the items themselves) is checked with one `IN` query per table
+rather than once per row.
+"""
+import os
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.file import File
+from models.room import Room
+
+MAX_ITEM_BATCH_SIZE = int(os.getenv("MAX_ITEM_BATCH_SIZE", "500"))
+
+# Editable item fields and the JSON types they accept
+ITEM_FIELDS = {
+    "name": (str,),
+    "description": (str,),
+    "condition": (str,),
+    "is_ai_suggested": (bool,),
+    "brand_manufacturer": (str,),
+    "model_number": (str,),
+    "original_vendor": (str,),
+    "quantity": (int,),
+    "age_years": (int,),
+    "age_months": (int,),
+    "unit_cost": (int, float),
+}
+
+# Fields that may not be cleared with null
+REQUIRED_FIELDS = {"name", "quantity", "is_ai_suggested"}
+
+
+class RowError(ValueError):
+    """A batch row that cannot be applied."""
+
+
+def get_batch_rows(body: dict) -> Tuple[Optional[List[Any]], Optional[str]]:
+    """
+    Extract the list of rows from a batch request body.
+
+    Returns:
+        Tuple of (rows, error message); rows is None when the body is invalid
+    """
+    rows = body.get("items")
+    if not isinstance(rows, list) or not rows:
+        return None, "items must be a non-empty list"
+    if len(rows) > MAX_ITEM_BATCH_SIZE:
+        return None, f"Batch exceeds the maximum of {MAX_ITEM_BATCH_SIZE} items"
+    return rows, None
+
+
+def parse_uuid(value: Any, field: str) -> uuid.UUID:
+    """Parse a UUID field of a row, raising RowError when malformed."""
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        raise RowError(f"Invalid {field} format")
+
+
+def parse_fields(row: dict) -> Dict[str, Any]:
+    """
+    Validate the item fields present in a row.
+
+    Returns:
+        dict: The provided fields (room_id parsed to a UUID or None)
+    """
+    fields = {}
+    for field, types in ITEM_FIELDS.items():
+        if field not in row:
+            continue
+        value = row[field]
+        if value is None:
+            if field in REQUIRED_FIELDS:
+                raise RowError(f"{field} cannot be null")
+        # bool is an int subclass, so it has to be rejected explicitly for numeric fields
+        elif not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise RowError(f"Invalid value for {field}")
+        fields[field] = value
+
+    if "room_id" in row:
+        fields["room_id"] = parse_uuid(row["room_id"], "room_id") if row["room_id"] is not None else None
+    return fields
+
+
+def parse_file_ids(row: dict) -> List[uuid.UUID]:
+    """Collect the files a row links to, from `file_ids` or the single `file_id` field."""
+    values = row.get("file_ids")
+    if values is None:
+        values = [row["file_id"]] if row.get("file_id") else []
+    if not isinstance(values, list):
+        raise RowError("file_ids must be a list")
+    return list(dict.fromkeys(parse_uuid(value, "file ID") for value in values))
+
+
+def live_rooms(db_session: Session, claim_id: uuid.UUID, room_ids: Iterable[uuid.UUID]) -> Set[uuid.UUID]:
+    """Return which of the rooms exist in the claim, with one query."""
+    room_ids = {room_id for room_id in room_ids if room_id is not None}
+    if not room_ids:
+        return set()
+    rows = db_session.query(Room.id).filter(
+        Room.id.in_(room_ids),
+        Room.claim_id == claim_id,
+        Room.deleted.is_(False)
+    ).all()
+    return {row.id for row in rows}
+
+
+def live_files(db_session: Session, claim_id: uuid.UUID, household_id: uuid.UUID,
+               file_ids: Iterable[uuid.UUID]) -> Set[uuid.UUID]:
+    """Return which of the files exist in the claim, with one query."""
+    file_ids = set(file_ids)
+    if not file_ids:
+        return set()
+    rows = db_session.query(File.id).filter(
+        File.id.in_(file_ids),
+        File.claim_id == claim_id,
+        File.household_id == household_id,
+        File.deleted.is_(False)
+    ).all()
+    return {row.id for row in rows}
+
+
+def row_error(index: int, message: str) -> dict:
+    return {"index": index, "status": "error", "error": message}
+
+
+def row_success(index: int, status: str, item_data: dict) -> dict:
+    return {"index": index, "status": status, "item": item_data}
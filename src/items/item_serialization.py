@@ -0,0 +1,123 @@
+"""
+Item serialization shared by the item read endpoints.
+
+Maps the `fields=` and `expand=` vocabulary of get_items and get_item onto
+columns, loader options and response dictionaries so both endpoints load and
+return exactly the same shapes.
+"""
+import os
+from sqlalchemy.orm import load_only, selectinload, joinedload
+
+from models.item import Item
+from models.file import File
+from models.label import Label
+from models.room import Room
+from utils.lambda_utils import generate_presigned_url
+
+# Selectable item fields mapped to the columns that back them
+ITEM_FIELD_COLUMNS = {
+    "id": Item.id,
+    "claim_id": Item.claim_id,
+    "name": Item.name,
+    "description": Item.description,
+    "unit_cost": Item.unit_cost,
+    "condition": Item.condition,
+    "room_id": Item.room_id,
+    "is_ai_suggested": Item.is_ai_suggested,
+    "brand_manufacturer": Item.brand_manufacturer,
+    "model_number": Item.model_number,
+    "original_vendor": Item.original_vendor,
+    "quantity": Item.quantity,
+    "age_years": Item.age_years,
+    "age_months": Item.age_months,
+    "created_at": Item.created_at,
+    "updated_at": Item.updated_at,
+}
+DEFAULT_ITEM_FIELDS = ["id", "name", "description", "unit_cost", "condition", "room_id"]
+ITEM_EXPANSIONS = ["files", "files.url", "labels", "room"]
+
+
+def serialize_item_fields(item, fields):
+    """
+    Serialize the requested scalar fields of an item.
+
+    Parameters:
+        item (Item): Item loaded with at least the requested columns.
+        fields (list): Field names to include.
+
+    Returns:
+        dict: Serialized fields.
+    """
+    data = {}
+    for field in fields:
+        value = getattr(item, field)
+        if field in ("id", "claim_id", "room_id"):
+            value = str(value) if value else None
+        elif field in ("created_at", "updated_at"):
+            value = value.isoformat() if value else None
+        data[field] = value
+    return data
+
+
+def serialize_item_expansions(item, expansions, s3_client=None):
+    """
+    Serialize the expanded relationships of an item.
+
+    `files` yields the historical `file_ids` list; `files.url` additionally
+    returns `files` entries carrying presigned URLs.
+
+    Parameters:
+        item (Item): Item with the expanded relationships loaded.
+        expansions (set): Resolved expansions.
+        s3_client: S3 client used for signing when `files.url` is expanded.
+
+    Returns:
+        dict: Serialized expansions.
+    """
+    data = {}
+    if "files" in expansions:
+        data["file_ids"] = [str(file.id) for file in item.files]
+    if "files.url" in expansions:
+        bucket_name = os.getenv("S3_BUCKET_NAME")
+        data["files"] = [
+            {
+                "id": str(file.id),
+                "url": generate_presigned_url(s3_client, bucket_name, file.s3_key) if bucket_name and file.s3_key else None,
+            }
+            for file in item.files
+        ]
+    if "labels" in expansions:
+        data["labels"] = [
+            {
+                "id": str(label.id),
+                "text": label.label_text,
+                "is_ai_generated": label.is_ai_generated
+            } for label in item.labels
+        ]
+    if "room" in expansions:
+        data["room"] = {"id": str(item.room.id), "name": item.room.name} if item.room else None
+    return data
+
+
+def item_loader_options(fields, expansions, collection_loader=selectinload):
+    """
+    Build the loader options for the requested fields and expansions.
+
+    Parameters:
+        fields (list): Requested item fields.
+        expansions (set): Resolved expansions.
+        collection_loader: Loader used for the files/labels collections
+            (selectinload for pages, joinedload for single rows).
+
+    Returns:
+        list: SQLAlchemy loader options.
+    """
+    options = [load_only(*[ITEM_FIELD_COLUMNS[field] for field in fields])]
+    if "files" in expansions:
+        file_columns = [File.id, File.s3_key] if "files.url" in expansions else [File.id]
+        options.append(collection_loader(Item.files).load_only(*file_columns))
+    if "labels" in expansions:
+        options.append(collection_loader(Item.labels).load_only(Label.label_text, Label.is_ai_generated))
+    if "room" in expansions:
+        options.append(joinedload(Item.room).load_only(Room.name))
+    return options
@@ -6,14 +6,50 @@ This module handles adding and removing labels from an item.
 import uuid
 from utils.logging_utils import get_logger
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
-from utils import response
+from utils import response, auth_utils
+from utils.search_index import reindex_items
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, ITEM_LABELS
 from models.item import Item
 from models.item_labels import ItemLabel
 from models.label import Label
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 
 logger = get_logger(__name__)
 
+
+def _parse_label_ids(values):
+    """Split requested label IDs into unique UUIDs (mapped to the value sent) and malformed values."""
+    label_ids, invalid = {}, []
+    for value in values:
+        try:
+            label_ids.setdefault(uuid.UUID(str(value)), value)
+        except ValueError:
+            invalid.append(value)
+    return label_ids, invalid
+
+
+def _add_item_labels(db_session, item_id, label_ids):
+    """
+    Attach labels to an item with one upsert, reactivating removed associations.
+
+    Returns:
+        int: Number of associations created or reactivated (already active ones are untouched)
+    """
+    if not label_ids:
+        return 0
+    stmt = pg_insert(ItemLabel).values([
+        {"item_id": item_id, "label_id": label_id, "deleted": False} for label_id in label_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ItemLabel.item_id, ItemLabel.label_id],
+        set_={"deleted": False},
+        where=ItemLabel.deleted.is_(True)
+    ).returning(ItemLabel.label_id)
+    return len(db_session.execute(stmt).all())
+
+
 @standard_lambda_handler(requires_auth=True, requires_body=True)
 def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=None) -> dict:
     """
@@ -30,8 +66,7 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=
         dict: API response with label management status or error
     """
     # Extract item_id from path parameters
-    path_params = event.get("pathParameters") or {}
-    success, result = extract_uuid_param(path_params, "item_id")
+    success, result = extract_uuid_param(event, "item_id")
     if not success:
         return result  # This is already an API response with error details
     item_id = result
@@ -43,67 +78,41 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=
     if not add_labels and not remove_labels:
         return response.api_response(400, error_details="Request must include at least one label to add or remove")
     
+    add_label_ids, invalid_add_labels = _parse_label_ids(add_labels)
+    remove_label_ids, invalid_remove_labels = _parse_label_ids(remove_labels)
+    
     try:
         # Verify the item exists and belongs to the user's household
-        item = db_session.query(Item).filter(Item.id == item_id).first()
+        item = auth_utils.get_household_resource(db_session, user.household_id, Item, item_id)
         if not item:
             return response.api_response(404, error_details="Item not found")
         
-        # Process labels to add
+        # Validate all labels to add against the user's household in one query
         labels_added = 0
-        invalid_add_labels = []
+        if add_label_ids:
+            valid_label_ids = {row.id for row in db_session.query(Label.id).filter(
+                Label.id.in_(list(add_label_ids)),
+                Label.household_id == user.household_id
+            )}
+            invalid_add_labels.extend(value for label_id, value in add_label_ids.items() if label_id not in valid_label_ids)
+            labels_added = _add_item_labels(
+                db_session, item_id, [label_id for label_id in add_label_ids if label_id in valid_label_ids]
+            )
         
-        for label_id_str in add_labels:
-            try:
-                label_id = uuid.UUID(label_id_str)
-                
-                # Verify the label exists
-                label = db_session.query(Label).filter(Label.id == label_id).first()
-                if not label:
-                    invalid_add_labels.append(label_id_str)
-                    continue
-                
-                # Check if the label is already associated with the item
-                existing_item_label = db_session.query(ItemLabel).filter(
-                    ItemLabel.item_id == item_id,
-                    ItemLabel.label_id == label_id
-                ).first()
-                
-                if not existing_item_label:
-                    # Create new association
-                    db_session.add(ItemLabel(item_id=item_id, label_id=label_id))
-                    labels_added += 1
-                elif existing_item_label.deleted is True:
-                    # Reactivate deleted association
-                    existing_item_label.deleted = False
-                    labels_added += 1
-                    
-            except ValueError:
-                invalid_add_labels.append(label_id_str)
-        
-        # Process labels to remove
+        # Soft delete the active associations being removed in one statement
         labels_removed = 0
-        invalid_remove_labels = []
-        
-        for label_id_str in remove_labels:
-            try:
-                label_id = uuid.UUID(label_id_str)
-                
-                # Check if the label is associated with the item
-                existing_association = db_session.query(ItemLabel).filter(
-                    ItemLabel.item_id == item_id,
-                    ItemLabel.label_id == label_id,
-                    ItemLabel.deleted.is_(False)
-                ).first()
-                
-                if existing_association:
-                    # Soft delete the association
-                    existing_association.deleted = True
-                    labels_removed += 1
-                    
-            except ValueError:
-                invalid_remove_labels.append(label_id_str)
+        if remove_label_ids:
+            labels_removed = db_session.query(ItemLabel).filter(
+                ItemLabel.item_id == item_id,
+                ItemLabel.label_id.in_(list(remove_label_ids)),
+                ItemLabel.deleted.is_(False)
+            ).update({"deleted": True}, synchronize_session=False)
         
+        if labels_added or labels_removed:
+            reindex_items(db_session, [item_id])
+            bump_label_version(db_session, user.household_id)
+            record_changes(db_session, ITEM_LABELS, [item_id])
+
         # Commit changes
         db_session.commit()
         
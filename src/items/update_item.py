@@ -8,6 +8,9 @@ from models.claim import Claim
 from models.user import User
 from models.room import Room
 from utils import response
+from utils.claim_summary import apply_deltas, item_deltas, merge_deltas
+from utils.search_index import reindex_items
+from utils.change_log import record_changes, ITEM
 
 # Configure logging
 logger = get_logger(__name__)
@@ -77,6 +80,9 @@ def lambda_handler(event, _context, db_session=None):
         # Check if the user's household matches the claim's household
         if user.household_id != claim.household_id:
             return response.api_response(404, error_details='Item not found.')
+
+        # Capture the item's current summary contribution before it changes
+        summary_deltas = item_deltas(item, -1)
             
         # Handle item property updates (name, description, etc.)
         item_updated = False
@@ -135,7 +141,10 @@ def lambda_handler(event, _context, db_session=None):
         # Check if any updates were made
         if not item_updated:
             return response.api_response(400, error_details='No updates provided.')
-            
+
+        apply_deltas(db, merge_deltas(summary_deltas, item_deltas(item)))
+        reindex_items(db, [item.id])
+        record_changes(db, ITEM, [item.id])
         db.commit()
         
         # Prepare response data with updated item information
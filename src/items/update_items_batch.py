@@ -0,0 +1,156 @@
+"""
+Lambda handler for updating many items of a claim in one request.
+
+Usage:
+    PATCH /claims/{claim_id}/items:batch
+    {"items": [{"id": "...", "unit_cost": 120.0}, {"id": "...", "room_id": null}, ...]}
+
+Each row names an item and the fields to change. The items are loaded and
+locked with one query, merged with the changes, and written back with a
+single UPDATE ... FROM (VALUES ...) statement in one transaction. The
+response lists the outcome of every row by its index in the request.
+Batches are capped at MAX_ITEM_BATCH_SIZE rows.
+"""
+from datetime import datetime, timezone
+from sqlalchemy import cast, column, update, values
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils import response, auth_utils
+from utils.claim_summary import apply_deltas, item_deltas, merge_deltas
+from utils.search_index import reindex_items
+from utils.change_log import record_changes, ITEM
+from models.item import Item
+from items import item_batch
+from items.item_batch import RowError
+
+
+logger = get_logger(__name__)
+
+# Columns written by the batch update
+UPDATE_COLUMNS = list(item_batch.ITEM_FIELDS) + ["room_id"]
+
+
+def _update_items(db_session, merged_rows):
+    """Write the merged rows back with one multi-row UPDATE."""
+    table = Item.__table__
+    names = ["id"] + UPDATE_COLUMNS
+    # Column types are cast explicitly since VALUES infers all-NULL columns as text
+    changes = values(*(column(name, table.c[name].type) for name in names), name="changes").data(
+        [tuple(row[name] for name in names) for row in merged_rows]
+    )
+    stmt = update(table).where(
+        table.c.id == cast(changes.c.id, table.c.id.type)
+    ).values({
+        **{name: cast(changes.c[name], table.c[name].type) for name in UPDATE_COLUMNS},
+        "updated_at": datetime.now(timezone.utc),
+    })
+    db_session.execute(stmt)
+
+
+@standard_lambda_handler(requires_auth=True, requires_body=True, required_fields=["items"])
+def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=None) -> dict:
+    """
+    Handles updating a batch of items in a claim of the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing the claim ID and the item changes.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+        body (dict): Request body containing the `items` list (provided by decorator).
+
+    Returns:
+        dict: API response with the result of every row, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result
+    claim_id = result
+
+    rows, error = item_batch.get_batch_rows(body)
+    if error:
+        return response.api_response(400, error_details=error)
+
+    try:
+        if not auth_utils.claim_in_household(db_session, claim_id, user.household_id):
+            return response.api_response(404, error_details="Claim not found")
+
+        results = [None] * len(rows)
+        parsed = []
+        seen = set()
+        for index, row in enumerate(rows):
+            try:
+                if not isinstance(row, dict):
+                    raise RowError("Item must be an object")
+                if not row.get("id"):
+                    raise RowError("Missing required field: id")
+                item_id = item_batch.parse_uuid(row["id"], "item ID")
+                if item_id in seen:
+                    raise RowError("Item appears more than once in the batch")
+                fields = item_batch.parse_fields(row)
+                if not fields:
+                    raise RowError("No updates provided")
+                seen.add(item_id)
+                parsed.append((index, item_id, fields))
+            except RowError as e:
+                results[index] = item_batch.row_error(index, str(e))
+
+        # Load and lock every referenced item with one query, then check rooms with another
+        items = {}
+        if seen:
+            items = {item.id: item for item in db_session.query(Item).filter(
+                Item.id.in_(seen),
+                Item.claim_id == claim_id,
+                Item.deleted.is_(False)
+            ).with_for_update()}
+        rooms = item_batch.live_rooms(db_session, claim_id, (fields.get("room_id") for _, _, fields in parsed))
+
+        summary_deltas = {}
+        merged_rows, updated = [], []
+        for index, item_id, fields in parsed:
+            item = items.get(item_id)
+            if not item:
+                results[index] = item_batch.row_error(index, "Item not found")
+                continue
+            if fields.get("room_id") and fields["room_id"] not in rooms:
+                results[index] = item_batch.row_error(index, "Room not found")
+                continue
+
+            merge_deltas(summary_deltas, item_deltas(item, -1))
+            merged_rows.append({"id": item_id, **{name: getattr(item, name) for name in UPDATE_COLUMNS}, **fields})
+            updated.append((index, item_id))
+
+        if merged_rows:
+            _update_items(db_session, merged_rows)
+
+            # Reload the written state for the counters and the response
+            items = {item.id: item for item in db_session.query(Item).populate_existing().filter(
+                Item.id.in_([item_id for _, item_id in updated])
+            )}
+            merge_deltas(summary_deltas, *(item_deltas(item) for item in items.values()))
+            apply_deltas(db_session, summary_deltas)
+            reindex_items(db_session, list(items))
+            record_changes(db_session, ITEM, list(items))
+            db_session.commit()
+
+        for index, item_id in updated:
+            results[index] = item_batch.row_success(index, "updated", items[item_id].to_dict())
+
+        response_data = {"claim_id": str(claim_id), "updated": len(updated), "results": results}
+        logger.info("Updated %s of %s batch items in claim %s", len(updated), len(rows), claim_id)
+
+        if not updated:
+            return response.api_response(400, error_details="No items were updated", data=response_data)
+        if len(updated) < len(rows):
+            return response.api_response(207, message="Some items failed to update.", data=response_data)
+        return response.api_response(200, success_message="Items updated successfully", data=response_data)
+
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error updating batch items in claim %s: %s", claim_id, str(e))
+        return response.api_response(500, error_details="Database error when updating items")
+    except Exception as e:
+        db_session.rollback()
+        logger.exception("Unexpected error updating batch items: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
@@ -0,0 +1,201 @@
+"""
+Lambda handler for applying labels to many files of a claim at once.
+
+Usage:
+    POST /claims/{claim_id}/labels:apply
+    {"labels": ["Water Damage"], "label_ids": ["..."], "file_ids": ["..."]}
+
+Labels are given as texts (matched case-insensitively against the
+household's user labels and created when missing) and/or existing label IDs.
+The files are selected by exactly one of:
+    - `file_ids`: explicit file IDs
+    - `room_id`: every file in a room of the claim
+    - `filter_label_ids` (+ `label_match=any|all`): files carrying those labels
+
+The labels are resolved once and attached with one multi-row insert, in a
+single transaction. Files that would end up with more than
+MAX_LABELS_PER_FILE labels are skipped and reported, using one grouped
+count over the selected files.
+"""
+import uuid
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils import response, auth_utils
+from utils.search_index import reindex_files, reindex_labels
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, FILE_LABELS
+from utils.label_filters import files_with_labels, LABEL_MATCH_MODES
+from models.file import File
+from models.label import Label
+from models.room import Room
+from labels import label_batch
+
+
+logger = get_logger(__name__)
+
+FILE_SELECTORS = ("file_ids", "room_id", "filter_label_ids")
+
+
+def _parse_uuids(values, field):
+    """Parse a list of UUIDs from the body, returning (uuids, error message)."""
+    if not isinstance(values, list):
+        return None, f"{field} must be a list"
+    try:
+        return list(dict.fromkeys(uuid.UUID(str(value)) for value in values)), None
+    except ValueError:
+        return None, f"Invalid ID format in {field}"
+
+
+@standard_lambda_handler(requires_auth=True, requires_body=True)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=None) -> dict:
+    """
+    Handles applying labels to a selection of files in a claim of the authenticated user's household.
+
+    Args:
+        event (dict): API Gateway event containing the claim ID, labels and file selection.
+        _context (dict): Lambda execution context (unused).
+        db_session (Session, optional): SQLAlchemy session for testing. Defaults to None.
+        user (User): Authenticated user object (provided by decorator).
+        body (dict): Request body (provided by decorator).
+
+    Returns:
+        dict: API response with the applied labels and the files that were skipped, or an error message.
+    """
+    success, result = extract_uuid_param(event, "claim_id")
+    if not success:
+        return result
+    claim_id = result
+
+    # Labels to apply
+    label_texts = body.get("labels", [])
+    if not isinstance(label_texts, list) or not all(label_batch.is_valid_label_text(text) for text in label_texts):
+        return response.api_response(400, error_details="Invalid label format. Only letters, numbers, spaces, dashes, and underscores are allowed.")
+    label_texts = label_batch.unique_label_texts(label_texts)
+    label_ids, error = _parse_uuids(body.get("label_ids", []), "label_ids")
+    if error:
+        return response.api_response(400, error_details=error)
+    if not label_texts and not label_ids:
+        return response.api_response(400, error_details='Provide "labels" or "label_ids" to apply.')
+    if len(label_texts) + len(label_ids) > label_batch.MAX_LABELS_PER_REQUEST:
+        return response.api_response(400, error_details=f"Cannot apply more than {label_batch.MAX_LABELS_PER_REQUEST} labels at once.")
+
+    # File selection
+    selectors = [name for name in FILE_SELECTORS if body.get(name) is not None]
+    if len(selectors) != 1:
+        return response.api_response(400, error_details="Provide exactly one of file_ids, room_id or filter_label_ids.")
+    label_match = body.get("label_match", "any")
+    if label_match not in LABEL_MATCH_MODES:
+        return response.api_response(400, error_details="Invalid label_match: must be 'any' or 'all'")
+
+    try:
+        if not auth_utils.claim_in_household(db_session, claim_id, user.household_id):
+            return response.api_response(404, error_details="Claim not found")
+
+        files_query = db_session.query(File.id).filter(
+            File.claim_id == claim_id,
+            File.household_id == user.household_id,
+            File.deleted.is_(False)
+        )
+        requested_file_ids = None
+        if selectors[0] == "file_ids":
+            requested_file_ids, error = _parse_uuids(body["file_ids"], "file_ids")
+            if error:
+                return response.api_response(400, error_details=error)
+            files_query = files_query.filter(File.id.in_(requested_file_ids))
+        elif selectors[0] == "room_id":
+            try:
+                room_id = uuid.UUID(str(body["room_id"]))
+            except ValueError:
+                return response.api_response(400, error_details="Invalid room ID format")
+            room_found = db_session.query(Room.id).filter(
+                Room.id == room_id, Room.claim_id == claim_id, Room.deleted.is_(False)
+            ).first()
+            if not room_found:
+                return response.api_response(404, error_details="Room not found")
+            files_query = files_query.filter(File.room_id == room_id)
+        else:
+            filter_label_ids, error = _parse_uuids(body["filter_label_ids"], "filter_label_ids")
+            if error or not filter_label_ids:
+                return response.api_response(400, error_details=error or "filter_label_ids must not be empty")
+            files_query = files_query.filter(File.id.in_(files_with_labels(filter_label_ids, label_match)))
+
+        file_ids = [row.id for row in files_query.limit(label_batch.MAX_LABEL_APPLY_FILES + 1)]
+        if len(file_ids) > label_batch.MAX_LABEL_APPLY_FILES:
+            return response.api_response(400, error_details=f"Selection exceeds the maximum of {label_batch.MAX_LABEL_APPLY_FILES} files")
+        if not file_ids:
+            return response.api_response(404, error_details="No files matched the selection")
+
+        files_failed = []
+        if requested_file_ids is not None:
+            found = set(file_ids)
+            files_failed = [{"file_id": str(file_id), "reason": "File not found."}
+                            for file_id in requested_file_ids if file_id not in found]
+
+        # Resolve the labels: one query for the given IDs, one for the texts
+        labels = {}
+        if label_ids:
+            rows = db_session.query(Label.id, Label.label_text).filter(
+                Label.id.in_(label_ids),
+                Label.household_id == user.household_id,
+                Label.deleted.is_(False)
+            ).all()
+            labels.update((row.id, {"label_id": str(row.id), "label_text": row.label_text, "created": False})
+                          for row in rows)
+            missing = [str(label_id) for label_id in label_ids if label_id not in labels]
+            if missing:
+                return response.api_response(404, error_details="Label not found", data={"label_ids": missing})
+        existing = label_batch.find_user_labels(db_session, user.household_id, label_texts)
+        for label_id, label_text in existing.values():
+            labels[label_id] = {"label_id": str(label_id), "label_text": label_text, "created": False}
+        new_label_texts = [text for text in label_texts if text.lower() not in existing]
+
+        # Skip files the new labels would push over the per-file limit
+        counts = label_batch.active_label_counts(db_session, file_ids, labels)
+        label_count = len(labels) + len(new_label_texts)
+        accepted = []
+        for file_id in file_ids:
+            active, already = counts.get(file_id, (0, 0))
+            if active + label_count - already > label_batch.MAX_LABELS_PER_FILE:
+                files_failed.append({"file_id": str(file_id), "reason": "Too many labels on this file."})
+            else:
+                accepted.append(file_id)
+
+        attached = {}
+        if accepted:
+            created = label_batch.create_user_labels(db_session, user.household_id, new_label_texts)
+            for label_id, label_text in created:
+                labels[label_id] = {"label_id": str(label_id), "label_text": label_text, "created": True}
+
+            attached = label_batch.attach_labels(db_session, accepted, labels)
+            if attached:
+                reindex_files(db_session, list(attached))
+                reindex_labels(db_session, [label_id for label_id, _ in created])
+                bump_label_version(db_session, user.household_id)
+                record_changes(db_session, FILE_LABELS, list(attached))
+            db_session.commit()
+
+        response_data = {
+            "claim_id": str(claim_id),
+            "labels": list(labels.values()),
+            "files_labeled": len(accepted),
+            "labels_attached": sum(attached.values()),
+            "files_failed": files_failed
+        }
+        logger.info("Applied %s labels to %s of %s files in claim %s",
+                    len(labels), len(accepted), len(file_ids), claim_id)
+
+        if not accepted:
+            return response.api_response(400, error_details="No files could be labeled.", data=response_data)
+        if files_failed:
+            return response.api_response(207, message="Some files could not be labeled.", data=response_data)
+        return response.api_response(200, success_message="Labels applied successfully.", data=response_data)
+
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error applying labels in claim %s: %s", claim_id, str(e))
+        return response.api_response(500, error_details="Database error when applying labels")
+    except Exception as e:
+        db_session.rollback()
+        logger.exception("Unexpected error applying labels: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
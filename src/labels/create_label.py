@@ -1,147 +1,134 @@
-import json
-from utils.logging_utils import get_logger
-import re
+"""
+Create Labels for a File
+
+This module handles adding one or multiple user-created labels to a file.
+
+Example Usage:
+    POST /files/{file_id}/labels
+    {"labels": ["Water Damage", "Kitchen"]}  or  {"label_text": "Water Damage"}
 
-from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+Labels already on the file (ignoring case) are reported as duplicates. The
+duplicates are found with one `lower(label_text) IN (...)` query. A household
+label with the same text, ignoring case, is reused as stored; the rest are
+written with one upsert into `labels`, and all are attached with one insert
+into `file_labels`, in a single transaction.
+"""
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from database.database import get_db_session
 from models import File, Label
 from models.file_labels import FileLabel
-from utils import response
-from utils import auth_utils
+from utils import response, auth_utils
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.search_index import reindex_files, reindex_labels
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, FILE_LABELS
+from labels import label_batch
 
 
 logger = get_logger(__name__)
 
 
-# Configure logging
-# Set max labels per file & max labels per request
-MAX_LABELS_PER_FILE = 50
-MAX_LABELS_PER_REQUEST = 10
-MAX_LABEL_LENGTH = 255
-# Allowed label format: only letters, numbers, spaces, dashes, underscores
-LABEL_REGEX = re.compile(r"^[A-Za-z0-9 _-]+$")
-
-
-def lambda_handler(event, _context, db_session: Session = None):
-    """Handles adding one or multiple user-created labels to a file."""
-    db = db_session if db_session else get_db_session()
+@standard_lambda_handler(requires_auth=True, requires_body=True)
+def lambda_handler(event: dict, _context=None, db_session: Session = None, user=None, body=None) -> dict:
+    """
+    Handles adding one or multiple user-created labels to a file.
+
+    Parameters
+    ----------
+    event : dict
+        The API Gateway event payload.
+    _context : dict
+        The AWS Lambda execution context (unused).
+    db_session : Session
+        SQLAlchemy session (provided by decorator).
+    user : User
+        Authenticated user object (provided by decorator).
+    body : dict
+        Request body with `label_text` or `labels` (provided by decorator).
+
+    Returns
+    -------
+    dict
+        201 when every label was created, 207 when some were duplicates, 409 when all were.
+    """
+    success, result = extract_uuid_param(event, "file_id")
+    if not success:
+        return result  # Return error response
+    file_id = result
+
+    # Detect whether it's a batch or single label request
+    labels_to_add = body.get("label_text") or body.get("labels")
+    if isinstance(labels_to_add, str):
+        labels_to_add = [labels_to_add]
+    elif not isinstance(labels_to_add, list):
+        return response.api_response(400, error_details='Invalid label format. Provide "label_text" or "labels".')
+
+    # Validate format before anything else
+    if not all(label_batch.is_valid_label_text(label) for label in labels_to_add):
+        return response.api_response(400, error_details="Invalid label format. Only letters, numbers, spaces, dashes, and underscores are allowed.")
+
+    # Strip whitespace before checking duplicates
+    labels_to_add = [label.strip() for label in labels_to_add if label.strip()]
+    if not labels_to_add:
+        return response.api_response(400, error_details='No valid labels provided.')
+
+    # Enforce batch size limit
+    if len(labels_to_add) > label_batch.MAX_LABELS_PER_REQUEST:
+        return response.api_response(400, error_details=f"Cannot add more than {label_batch.MAX_LABELS_PER_REQUEST} labels at once.")
 
     try:
-        # Extract and validate user ID
-        success, result = auth_utils.extract_user_id(event)
-        if not success:
-            return result  # Return error response
-        
-        user_id = result
-        
-        # Extract and validate file ID
-        success, result = auth_utils.extract_resource_id(event, "file_id")
-        if not success:
-            return result  # Return error response
-            
-        file_id = result
-
-        # Get authenticated user
-        success, result = auth_utils.get_authenticated_user(db, user_id)
-        if not success:
-            return result  # Return error response
-            
-        user = result
-
-        body = json.loads(event.get("body", "{}"))
-
-        # Detect whether it's a batch or single label request
-        labels_to_add = body.get("label_text") or body.get("labels")
-        if isinstance(labels_to_add, str):
-            labels_to_add = [labels_to_add]
-        elif isinstance(labels_to_add, list):
-            labels_to_add = labels_to_add
-        else:
-            return response.api_response(400, error_details='Invalid label format. Provide "label_text" or "labels".')
-        
-        # Ensure at least one valid label remains
-        if not labels_to_add:
-            return response.api_response(400, error_details='No valid labels provided.')
-
-        # Validate format before anything else
-        invalid_labels = [label for label in labels_to_add if not LABEL_REGEX.fullmatch(label) or len(label) > MAX_LABEL_LENGTH or '\n' in label or '\t' in label or '\r' in label or '\f' in label or '\v' in label]
-        if invalid_labels:
-            return response.api_response(400, error_details="Invalid label format. Only letters, numbers, spaces, dashes, and underscores are allowed.")
-
-        # Strip whitespace before checking duplicates
-        labels_to_add = [label.strip() for label in labels_to_add if isinstance(label, str) and label.strip()]
-
-        # Enforce batch size limit
-        if len(labels_to_add) > MAX_LABELS_PER_REQUEST:
-            return response.api_response(400, message=f"Cannot add more than {MAX_LABELS_PER_REQUEST} labels at once.")
-        
-        # Ensure file exists and user owns it
-        file = db.query(File).filter(File.id == file_id).first()
+        # Ensure file exists in the user's household
+        file = auth_utils.get_household_resource(db_session, user.household_id, File, file_id)
         if not file:
             return response.api_response(404, error_details='File not found.')
-            
-        # Check if user has access to the file's household
-        success, error_response = auth_utils.check_resource_access(user, file.household_id)
-        if not success:
-            return error_response
 
         # Check max label count
-        existing_label_count = (
-            db.query(FileLabel)
-            .join(Label, Label.id == FileLabel.label_id)
-            .filter(FileLabel.file_id == file_id)
-            .count()
-        )
-        
-        if existing_label_count + len(labels_to_add) > MAX_LABELS_PER_FILE:
+        active_labels, _ = label_batch.active_label_counts(db_session, [file_id], []).get(file_id, (0, 0))
+        if active_labels + len(labels_to_add) > label_batch.MAX_LABELS_PER_FILE:
             return response.api_response(400, error_details='Too many labels on this file.')
 
-        # Insert labels
-        created_labels = []
-        failed_labels = []
+        # One query for the requested labels already on the file
+        on_file = {row[0] for row in db_session.query(func.lower(Label.label_text)).join(
+            FileLabel, FileLabel.label_id == Label.id
+        ).filter(
+            FileLabel.file_id == file_id,
+            FileLabel.deleted.is_(False),
+            func.lower(Label.label_text).in_({label.lower() for label in labels_to_add})
+        )}
 
+        new_labels = {}
+        failed_labels = []
         for label_text in labels_to_add:
-            # Strip whitespace before checking duplicates
-            label_text = label_text.strip()
-
-            # Validate format (reject special characters)
-            if not LABEL_REGEX.match(label_text):
-                failed_labels.append({"label_text": label_text, "reason": "Invalid label format."})
-                continue
-
-            # Check for duplicates before adding new labels
-            existing_label = (
-                db.query(Label)
-                .join(FileLabel, FileLabel.label_id == Label.id)
-                .filter(FileLabel.file_id == file_id, Label.label_text.ilike(label_text))
-                .first()
-            )
-            if existing_label:
+            key = label_text.lower()
+            if key in on_file or key in new_labels:
                 failed_labels.append({"label_text": label_text, "reason": "Duplicate label."})
-                continue
-                
-            # Only add new labels
-            new_label = Label(label_text=label_text, is_ai_generated=False, household_id=user.household_id)
-            db.add(new_label)
-            created_labels.append(new_label)
-            try:
-                db.commit()  # Attempt DB commit
-            except (IntegrityError, SQLAlchemyError):
-                db.rollback()  # Ensure rollback
-                return response.api_response(500, error_details='Database error occurred.')
-            file_label = FileLabel(file_id=file_id, label_id=new_label.id)
-            db.add(file_label)
-            try:
-                db.commit()  # Attempt DB commit
-            except (IntegrityError, SQLAlchemyError):
-                db.rollback()  # Ensure rollback
-                return response.api_response(500, error_details='Database error occurred.')
+            else:
+                new_labels[key] = label_text
+
+        # Reuse household labels whatever their case, and create only the labels still missing
+        existing = label_batch.find_user_labels(db_session, user.household_id, new_labels.values())
+        missing = [label_text for key, label_text in new_labels.items() if key not in existing]
+        new_household_labels = label_batch.create_user_labels(db_session, user.household_id, missing)
+        created_labels = list(existing.values()) + new_household_labels
+        if created_labels:
+            label_ids = [label_id for label_id, _ in created_labels]
+            attached = label_batch.attach_labels(db_session, [file_id], label_ids)
+            reindex_files(db_session, [file_id])
+            reindex_labels(db_session, label_ids)
+            # New labels, and existing ones newly on the file, both change the claim's label counts
+            if new_household_labels or attached:
+                bump_label_version(db_session, user.household_id)
+            record_changes(db_session, FILE_LABELS, [file_id])
+            db_session.commit()
 
         # Construct response
         response_data = {
-            "labels_created": [{"label_id": str(label.id), "label_text": label.label_text} for label in created_labels],
+            "labels_created": [{"label_id": str(label_id), "label_text": label_text}
+                               for label_id, label_text in created_labels],
             "labels_failed": failed_labels
         }
 
@@ -153,15 +140,12 @@ def lambda_handler(event, _context, db_session: Session = None):
         else:
             return response.api_response(409, error_details='All labels failed due to duplicates or errors.', data=response_data)
 
-    except IntegrityError:
-        db.rollback()
-        logger.error("Database integrity error occurred.")
+    except SQLAlchemyError as e:
+        db_session.rollback()
+        logger.error("Database error creating labels for file %s: %s", file_id, str(e))
         return response.api_response(500, error_details='Database error occurred.')
 
     except Exception as e:
-        db.rollback()
+        db_session.rollback()
         logger.exception("Unexpected error creating labels")
-        return response.api_response(500, error_details=f'Internal Server Error: {str(e)}')
-
-    finally:
-        db.close()
+        return response.api_response(500, error_details='Internal server error')
@@ -5,6 +5,9 @@ from models import Label
 from models.file_labels import FileLabel
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.search_index import label_holders, reindex_items, reindex_files, reindex_labels
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, ITEM_LABELS, FILE_LABELS
 
 # Configure logging
 logger = get_logger(__name__)
@@ -43,9 +46,18 @@ def lambda_handler(event: dict, context=None, _context=None, db_session: Session
             # Return 404 for security - don't reveal that the label exists
             return response.api_response(404, error_details="Label not found.")
 
+        # Items and files carrying the label lose its text from their search documents
+        holder_item_ids, holder_file_ids = label_holders(db_session, [label_id])
+
         # Prevent AI labels from being deleted globally
         if label.is_ai_generated:
             db_session.query(Label).filter(Label.id == label_id).update({"deleted": True})
+            reindex_labels(db_session, [label_id])
+            reindex_items(db_session, holder_item_ids)
+            reindex_files(db_session, holder_file_ids)
+            bump_label_version(db_session, label.household_id)
+            record_changes(db_session, ITEM_LABELS, holder_item_ids)
+            record_changes(db_session, FILE_LABELS, holder_file_ids)
             db_session.commit()
             return response.api_response(204, success_message='Label deleted successfully.')
 
@@ -54,6 +66,12 @@ def lambda_handler(event: dict, context=None, _context=None, db_session: Session
 
         # Delete label globally
         db_session.delete(label)
+        reindex_labels(db_session, [label_id])
+        reindex_items(db_session, holder_item_ids)
+        reindex_files(db_session, holder_file_ids)
+        bump_label_version(db_session, label.household_id)
+        record_changes(db_session, ITEM_LABELS, holder_item_ids)
+        record_changes(db_session, FILE_LABELS, holder_file_ids)
         db_session.commit()
 
         logger.info("User label %s deleted globally.", label_id)
@@ -0,0 +1,130 @@
+"""
+Shared helpers for writing user labels to many files at once.
+
+User labels are matched case-insensitively within a household, so "water
+damage" reuses an existing "Water Damage" label instead of creating a
+second one. Every helper works on a whole set of labels or files with one
+statement, so the cost of a request does not grow in round trips with the
+number of labels or files it touches. None of them commit.
+"""
+import os
+import re
+import uuid
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.file_labels import FileLabel
+from models.label import Label
+
+# Max labels per file & max labels per request
+MAX_LABELS_PER_FILE = 50
+MAX_LABELS_PER_REQUEST = 10
+MAX_LABEL_LENGTH = 255
+# Allowed label format: only letters, numbers, spaces, dashes, underscores
+LABEL_REGEX = re.compile(r"^[A-Za-z0-9 _-]+$")
+# Max files a single bulk label request may touch
+MAX_LABEL_APPLY_FILES = int(os.getenv("MAX_LABEL_APPLY_FILES", "1000"))
+
+
+def is_valid_label_text(label_text) -> bool:
+    """Check that a label is a string of allowed characters within the length limit."""
+    return (isinstance(label_text, str) and len(label_text) <= MAX_LABEL_LENGTH
+            and LABEL_REGEX.fullmatch(label_text) is not None)
+
+
+def unique_label_texts(label_texts: Iterable[str]) -> List[str]:
+    """Strip label texts and drop empty and case-insensitive duplicates, keeping the first spelling."""
+    unique = {}
+    for label_text in label_texts:
+        label_text = label_text.strip()
+        if label_text:
+            unique.setdefault(label_text.lower(), label_text)
+    return list(unique.values())
+
+
+def find_user_labels(db_session: Session, household_id: uuid.UUID,
+                     label_texts: Iterable[str]) -> Dict[str, Tuple[uuid.UUID, str]]:
+    """
+    Look up the household's live user labels matching the texts, ignoring case, with one query.
+
+    Returns:
+        dict: Lower-cased label text -> (label ID, stored label text)
+    """
+    keys = {label_text.lower() for label_text in label_texts}
+    if not keys:
+        return {}
+    rows = db_session.query(Label.id, Label.label_text).filter(
+        Label.household_id == household_id,
+        Label.is_ai_generated.is_(False),
+        Label.deleted.is_(False),
+        func.lower(Label.label_text).in_(keys)
+    ).all()
+    return {row.label_text.lower(): (row.id, row.label_text) for row in rows}
+
+
+def create_user_labels(db_session: Session, household_id: uuid.UUID,
+                       label_texts: Iterable[str]) -> List[Tuple[uuid.UUID, str]]:
+    """
+    Create user labels with one upsert; a soft-deleted label with the same text is restored instead.
+
+    Returns:
+        list: (label ID, label text) of every created or restored label
+    """
+    rows = [{"id": uuid.uuid4(), "label_text": label_text, "is_ai_generated": False,
+             "deleted": False, "household_id": household_id} for label_text in label_texts]
+    if not rows:
+        return []
+    stmt = pg_insert(Label).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint="label_text_is_ai_generated_unique",
+        set_={"deleted": False}
+    ).returning(Label.id, Label.label_text)
+    return [(row.id, row.label_text) for row in db_session.execute(stmt)]
+
+
+def active_label_counts(db_session: Session, file_ids: Iterable[uuid.UUID],
+                        label_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, Tuple[int, int]]:
+    """
+    Count the active labels of each file with one grouped query.
+
+    Returns:
+        dict: File ID -> (active labels, how many of them are among `label_ids`);
+              files without active labels are absent
+    """
+    file_ids, label_ids = list(file_ids), list(label_ids)
+    if not file_ids:
+        return {}
+    rows = db_session.query(
+        FileLabel.file_id,
+        func.count(),
+        func.count().filter(FileLabel.label_id.in_(label_ids))
+    ).filter(
+        FileLabel.file_id.in_(file_ids),
+        FileLabel.deleted.is_(False)
+    ).group_by(FileLabel.file_id).all()
+    return {file_id: (total, matching) for file_id, total, matching in rows}
+
+
+def attach_labels(db_session: Session, file_ids: Iterable[uuid.UUID], label_ids: Iterable[uuid.UUID]) -> Counter:
+    """
+    Attach every label to every file with one multi-row upsert, reactivating removed associations.
+
+    Returns:
+        Counter: Labels attached per file ID; already active associations are not counted
+    """
+    label_ids = list(label_ids)
+    rows = [{"file_id": file_id, "label_id": label_id, "deleted": False}
+            for file_id in file_ids for label_id in label_ids]
+    if not rows:
+        return Counter()
+    stmt = pg_insert(FileLabel).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FileLabel.file_id, FileLabel.label_id],
+        set_={"deleted": False},
+        where=FileLabel.deleted.is_(True)
+    ).returning(FileLabel.file_id)
+    return Counter(row.file_id for row in db_session.execute(stmt))
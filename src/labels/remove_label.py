@@ -6,6 +6,9 @@ from models.file_labels import FileLabel
 from models import Label
 from utils import response
 from utils import auth_utils
+from utils.search_index import reindex_files, reindex_labels
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, FILE_LABELS
 
 # Configure logging
 logger = get_logger(__name__)
@@ -78,6 +81,9 @@ def lambda_handler(event: dict, _context: dict, db_session: Session = None) -> d
         if label.is_ai_generated:
             # AI Label → Soft delete by setting `deleted = True` in `file_labels`
             file_label.deleted = True
+            reindex_files(db, [file_id])
+            bump_label_version(db, label.household_id)
+            record_changes(db, FILE_LABELS, [file_id])
             db.commit()
             logger.info("Soft deleted AI label %s from file %s in household %s", label_id, file_id, label.household_id)
             return response.api_response(204, success_message='AI label removed from file.')
@@ -90,6 +96,11 @@ def lambda_handler(event: dict, _context: dict, db_session: Session = None) -> d
             if remaining_links == 0:
                 db.delete(label)  # Only delete globally if no remaining links
                 db.commit()
+            reindex_files(db, [file_id])
+            reindex_labels(db, [label_id])
+            bump_label_version(db, label.household_id)
+            record_changes(db, FILE_LABELS, [file_id])
+            db.commit()
             logger.info(f"Deleted user label {label_id} globally from household {label.household_id}")
             return response.api_response(204, success_message='User label deleted globally.')
 
@@ -6,6 +6,9 @@ from database.database import get_db_session
 from models.file_labels import FileLabel
 from models import Label, File, User
 from utils import response
+from utils.search_index import reindex_files
+from utils.label_version import bump_label_version
+from utils.change_log import record_changes, FILE_LABELS
 
 # Configure logging
 logger = get_logger(__name__)
@@ -78,6 +81,9 @@ def lambda_handler(event: dict, _context: dict, db_session: Session = None) -> d
 
         # ✅ Restore label by setting `deleted = False`
         file_label.deleted = False
+        reindex_files(db, [file_uuid])
+        bump_label_version(db, label.household_id)
+        record_changes(db, FILE_LABELS, [file_uuid])
         db.commit()
 
         logger.info(f"Restored AI label {label_id} for file {file_id}")
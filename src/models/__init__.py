@@ -10,5 +10,11 @@ from .file_labels import FileLabel
 from .item_labels import ItemLabel
 from .item_files import ItemFile
 from .report import Report, ReportStatus
+from .claim_summary import ClaimSummary
+from .search_document import SearchDocument
+from .label_version import LabelVersion
+from .claim_change import ClaimChange
+from .item_import import ItemImport, ItemImportStatus
+from .outbox_message import OutboxMessage
 
-__all__ = ['Base', 'File', 'Claim', 'Household', 'User', 'Room', 'Label', 'Item', 'FileLabel', 'ItemLabel', 'ItemFile', 'Report', 'ReportStatus']
+__all__ = ['Base', 'File', 'Claim', 'Household', 'User', 'Room', 'Label', 'Item', 'FileLabel', 'ItemLabel', 'ItemFile', 'Report', 'ReportStatus', 'ClaimSummary', 'SearchDocument', 'LabelVersion', 'ClaimChange', 'ItemImport', 'ItemImportStatus', 'OutboxMessage']
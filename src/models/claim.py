@@ -1,13 +1,20 @@
-from sqlalchemy import String, ForeignKey, UUID, DateTime, Boolean, UniqueConstraint
+from sqlalchemy import String, ForeignKey, UUID, DateTime, Boolean, UniqueConstraint, select, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 import uuid
 import os
 import csv
+import hashlib
 from datetime import datetime, timezone
 from models.base import Base  
 from models.item import Item
 from models.file import File
 from models.room import Room
+from models.item_files import ItemFile
+from models.report_data import ReportData, ReportItem, ReportFile
+
+# Rows fetched per round trip when streaming report data
+REPORT_BATCH_SIZE = int(os.getenv("REPORT_BATCH_SIZE", "1000"))
+
 class Claim(Base):
     """
     Represents an insurance claim filed by a household.
@@ -51,97 +58,135 @@ class Claim(Base):
             "deleted_at": self.deleted_at.isoformat() if self.deleted_at else None
         }
         
-    def generate_report_data(self, session):
+    def build_report_data(self, session, batch_size: int = REPORT_BATCH_SIZE,
+                          include_files: bool = True) -> ReportData:
         """
-        Generate structured data for a claim report.
+        Collect the data for a claim report as compact records.
         
-        This method collects and structures all data needed for a claim report,
-        but does not create any files. File creation is handled by downstream processes.
+        Issues exactly two queries, both streamed `batch_size` rows at a time:
+        live items left-joined to their room, and live files left-joined to
+        the items they are attached to. Without `include_files` only the items
+        query is issued and `files` stays empty.
         
         Args:
             session: SQLAlchemy database session
+            batch_size: Rows fetched per round trip
+            include_files: Whether to collect the claim's files
             
         Returns:
-            dict: Structured report data
+            ReportData: Claim, item, room and file records
         """
-        # Initialize report data structure
-        report_data = {
-            'claim': {
-                'id': str(self.id),
-                'title': self.title,
-                'description': self.description,
-                'date_of_loss': self.date_of_loss.isoformat() if self.date_of_loss else None,
-                'created_at': self.created_at.isoformat() if self.created_at else None
-            },
-            'rooms': {},
-            'files': [],
-            'items': []
-        }
+        report_data = ReportData({
+            'id': str(self.id),
+            'title': self.title,
+            'description': self.description,
+            'date_of_loss': self.date_of_loss.isoformat() if self.date_of_loss else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        })
         
-        # Get all items associated with the claim
-        items = session.query(Item).filter(
+        items = select(
+            Item.id, Item.name, Item.brand_manufacturer, Item.model_number, Item.description,
+            Item.original_vendor, Item.quantity, Item.age_years, Item.age_months, Item.condition,
+            Item.unit_cost, Room.name.label("room_name")
+        ).outerjoin(Room, Room.id == Item.room_id).where(
             Item.claim_id == self.id,
             Item.deleted.is_(False)
-        ).all()
-        
-        # Process items
-        for i, item in enumerate(items, 1):
-            room_name = 'N/A'
-            if item.room_id:
-                room = session.query(Room).filter(Room.id == item.room_id).first()
-                if room:
-                    room_name = room.name
-                    
-            # Create room entry if it doesn't exist
-            if room_name != 'N/A' and room_name not in report_data['rooms']:
-                report_data['rooms'][room_name] = {
-                    'name': room_name,
-                    'items': []
-                }
-            
-            # Create item data structure
-            item_data = {
-                'id': str(item.id),
-                'number': i,
-                'name': item.name,
-                'room': room_name,
-                'brand_manufacturer': item.brand_manufacturer or 'N/A',
-                'model_number': item.model_number or 'N/A',
-                'description': item.description or item.name,
-                'original_vendor': item.original_vendor or 'N/A',
-                'quantity': item.quantity or 1,
-                'age_years': item.age_years or 'N/A',
-                'age_months': item.age_months or 'N/A',
-                'condition': item.condition or 'N/A',
-                'unit_cost': item.unit_cost,
-                'total_cost': item.total_cost
-            }
+        ).order_by(Item.created_at, Item.id)
+        
+        for number, row in enumerate(session.execute(items.execution_options(yield_per=batch_size)), 1):
+            report_data.add_item(ReportItem(number, row))
+        
+        if not include_files:
+            return report_data
+        
+        files = select(
+            File.id, File.file_name, File.s3_key, File.content_type, File.file_size, ItemFile.item_id
+        ).outerjoin(ItemFile, ItemFile.file_id == File.id).where(
+            File.claim_id == self.id,
+            File.deleted.is_(False)
+        ).order_by(File.created_at, File.id)
+        
+        # Rows of one file are adjacent, one per attached item
+        file = None
+        for row in session.execute(files.execution_options(yield_per=batch_size)):
+            if file is None or file.id != str(row.id):
+                file = ReportFile(row)
+                report_data.files.append(file)
+            if row.item_id:
+                file.item_ids.append(str(row.item_id))
+        
+        return report_data
+
+    def report_fingerprint(self, session, batch_size: int = REPORT_BATCH_SIZE) -> str:
+        """
+        Fingerprint the claim content a report is built from.
+        
+        Covers the claim fields, the count and latest update of live items
+        and rooms, and every live file's ID and content hash together with
+        the items it is attached to. Two requests with the same fingerprint
+        produce the same report. Issues two queries.
+        
+        Args:
+            session: SQLAlchemy database session
+            batch_size: File rows fetched per round trip
             
-            # Add item to main items list
-            report_data['items'].append(item_data)
+        Returns:
+            str: Hex SHA-256 fingerprint
+        """
+        digest = hashlib.sha256()
+        digest.update(repr((str(self.id), self.title, self.description, self.date_of_loss)).encode())
+        
+        live_items = (Item.claim_id == self.id, Item.deleted.is_(False))
+        live_rooms = (Room.claim_id == self.id, Room.deleted.is_(False))
+        summary = session.execute(select(
+            select(func.count(Item.id)).where(*live_items).scalar_subquery(),
+            select(func.max(Item.updated_at)).where(*live_items).scalar_subquery(),
+            select(func.count(Room.id)).where(*live_rooms).scalar_subquery(),
+            select(func.max(Room.updated_at)).where(*live_rooms).scalar_subquery()
+        )).one()
+        digest.update(repr(tuple(summary)).encode())
+        
+        files = select(File.id, File.file_hash, ItemFile.item_id).outerjoin(
+            ItemFile, ItemFile.file_id == File.id
+        ).where(
+            File.claim_id == self.id,
+            File.deleted.is_(False)
+        ).order_by(File.id, ItemFile.item_id)
+        for row in session.execute(files.execution_options(yield_per=batch_size)):
+            digest.update(f"{row.id}:{row.file_hash}:{row.item_id}\n".encode())
+        
+        return digest.hexdigest()
+
+    def report_size(self, session) -> tuple:
+        """
+        Measure the files a full report of the claim would hold, in one query.
+        
+        Args:
+            session: SQLAlchemy database session
             
-            # Add item reference to room data
-            if room_name != 'N/A' and room_name in report_data['rooms']:
-                report_data['rooms'][room_name]['items'].append({
-                    'id': str(item.id),
-                    'number': i,
-                    'name': item.name,
-                    'description': item.description
-                })
-        
-        # Get all files associated with the claim
-        claim_files = session.query(File).filter(
+        Returns:
+            tuple: (number of live files, their total size in bytes, or None if
+            the size of any of them is unknown)
+        """
+        count, total, sized = session.execute(select(
+            func.count(File.id), func.coalesce(func.sum(File.file_size), 0), func.count(File.file_size)
+        ).where(
             File.claim_id == self.id,
             File.deleted.is_(False)
-        ).all()
+        )).one()
+        return count, (total if sized == count else None)
+
+    def generate_report_data(self, session):
+        """
+        Generate structured data for a claim report.
         
-        # Add files to the report data
-        for file in claim_files:
-            report_data['files'].append({
-                'id': str(file.id),
-                'filename': file.file_name,
-                's3_key': file.s3_key,
-                'content_type': file.content_type
-            })
+        This method collects and structures all data needed for a claim report,
+        but does not create any files. File creation is handled by downstream processes.
         
-        return report_data
+        Args:
+            session: SQLAlchemy database session
+            
+        Returns:
+            dict: Structured report data
+        """
+        return self.build_report_data(session).to_dict()
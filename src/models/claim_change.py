@@ -0,0 +1,47 @@
+"""
+Claim change model for the ClaimVision application.
+
+This module defines the ClaimChange model, an append-only log of the
+entities touched in each claim that backs the delta-sync endpoint.
+"""
+import uuid
+from datetime import datetime
+from sqlalchemy import BigInteger, String, DateTime, ForeignKey, Index, func, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from models.base import Base
+
+
+class ClaimChange(Base):
+    """
+    A record that an entity of a claim was created, updated or deleted.
+
+    Rows only identify the entity; readers load its current state (or report
+    it as deleted) when syncing. Each row stores the ID of the transaction
+    that wrote it so sync tokens can be derived from transaction snapshots
+    rather than clocks (see utils.change_log).
+
+    Attributes:
+        id (int): Sequential primary key
+        claim_id (UUID): Claim the entity belongs to
+        entity_type (str): "claim", "item", "room", "file", "item_labels", "file_labels",
+            or "pruned" for the marker left when older changes are pruned
+        entity_id (UUID): ID of the changed entity (the item or file for label associations,
+            the claim for the pruned marker)
+        txid (int): ID of the writing transaction
+        changed_at (datetime): Timestamp of the change
+    """
+    __tablename__ = "claim_changes"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    claim_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("claims.id", ondelete="CASCADE"), nullable=False)
+    entity_type: Mapped[str] = mapped_column(String, nullable=False)
+    entity_id: Mapped[uuid.UUID] = mapped_column(UUID, nullable=False)
+    txid: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("txid_current()"))
+    changed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index('idx_claim_changes_claim_txid', 'claim_id', 'txid'),
+        # Pruning deletes the oldest changes first
+        Index('idx_claim_changes_changed_at', 'changed_at'),
+    )
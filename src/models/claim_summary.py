@@ -0,0 +1,37 @@
+"""
+Claim summary model for the ClaimVision application.
+
+This module defines the ClaimSummary model, a set of denormalized counters
+per claim that back the claim overview endpoint.
+"""
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import String, Float, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from models.base import Base
+
+
+class ClaimSummary(Base):
+    """
+    A single summary counter for a claim.
+
+    Counters are keyed by metric and an optional key so that per-room and
+    per-status breakdowns share one table. The item, file and room write
+    handlers adjust the counters in the same transaction as their change
+    (see utils.claim_summary), so reads never aggregate the source tables.
+
+    Attributes:
+        claim_id (UUID): Claim the counter belongs to
+        metric (str): Counter name (e.g. "items", "room_files", "file_status")
+        key (str): Breakdown key (room ID or file status), empty for claim totals
+        value (float): Current counter value
+        updated_at (datetime): Timestamp of the last adjustment
+    """
+    __tablename__ = "claim_summaries"
+
+    claim_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("claims.id", ondelete="CASCADE"), primary_key=True)
+    metric: Mapped[str] = mapped_column(String, primary_key=True)
+    key: Mapped[str] = mapped_column(String, primary_key=True, default="")
+    value: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
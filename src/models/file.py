@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey, UUID, JSON, Enum, Boolean, DateTime, UniqueConstraint, Integer
+from sqlalchemy import String, ForeignKey, UUID, JSON, Enum, Boolean, DateTime, UniqueConstraint, Integer, Index, text
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 import uuid
 from datetime import datetime, timezone
@@ -49,6 +49,8 @@ class File(Base):
         # Create a composite unique constraint on file_hash and deleted
         # This allows the same file_hash to exist if one is deleted and one is not
         UniqueConstraint('file_hash', 'deleted', name='uq_file_hash_deleted'),
+        # Live files of a claim, answered from the index alone (label facets, label filters)
+        Index('idx_files_claim_live', 'claim_id', 'id', postgresql_where=text('NOT deleted')),
     )
 
     def to_dict(self):
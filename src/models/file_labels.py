@@ -1,4 +1,4 @@
-from sqlalchemy import UUID, ForeignKey
+from sqlalchemy import UUID, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy import Boolean
 import uuid
@@ -17,6 +17,13 @@ class FileLabel(Base):
     label_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("labels.id", ondelete="CASCADE"), primary_key=True, index=True)
     deleted: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
 
+    __table_args__ = (
+        # Covering indexes over active associations in both directions:
+        # file -> labels for facet counts, label -> files for label filters
+        Index('idx_file_labels_file_label_active', 'file_id', 'label_id', postgresql_where=text('NOT deleted')),
+        Index('idx_file_labels_label_file_active', 'label_id', 'file_id', postgresql_where=text('NOT deleted')),
+    )
+
     def to_dict(self):
         return {
             "file_id": str(self.file_id),
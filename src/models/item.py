@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, Float, ForeignKey, Boolean, Integer, DateTime
+from sqlalchemy import Column, String, UUID, Float, ForeignKey, Boolean, Integer, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from models.base import Base
 import uuid
@@ -37,7 +37,18 @@ class Item(Base):
     claim = relationship("Claim", back_populates="items")
     files = relationship("File", secondary="item_files", back_populates="items")
     room = relationship("Room", back_populates="items")
-    
+    # Read-only view of the item's active labels; writes go through ItemLabel
+    labels = relationship(
+        "Label", secondary="item_labels", viewonly=True,
+        primaryjoin="and_(Item.id == ItemLabel.item_id, ItemLabel.deleted.is_(False))",
+        secondaryjoin="and_(Label.id == ItemLabel.label_id, Label.deleted.is_(False))",
+    )
+
+    __table_args__ = (
+        # Live items of a claim, answered from the index alone (label facets, item listings)
+        Index('idx_items_claim_live', 'claim_id', 'id', postgresql_where=text('NOT deleted')),
+    )
+
     def to_dict(self):
         """
         Convert the item to a dictionary representation.
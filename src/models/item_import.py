@@ -0,0 +1,106 @@
+"""
+Item import model for the ClaimVision application.
+
+This module defines the ItemImport model, which tracks a spreadsheet of
+inventory items uploaded by a user and loaded into a claim.
+"""
+import enum
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Enum
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from models.base import Base
+
+
+class ItemImportStatus(enum.Enum):
+    """
+    Enum representing the possible statuses of an item import.
+    """
+    PENDING = "PENDING"          # Created, waiting for the spreadsheet upload
+    QUEUED = "QUEUED"            # Uploaded and queued for processing
+    PROCESSING = "PROCESSING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class ItemImport(Base):
+    """
+    A CSV or XLSX inventory import into a claim.
+
+    Attributes:
+        id (UUID): Primary key for the import
+        user_id (UUID): User who requested the import
+        household_id (UUID): Household that owns the claim
+        claim_id (UUID): Claim the items are imported into
+        file_name (str): Original name of the uploaded spreadsheet
+        s3_key (str): S3 key the spreadsheet is uploaded to
+        status (str): Current ItemImportStatus
+        total_rows (int): Data rows read from the spreadsheet
+        imported_rows (int): Rows created as items
+        rejected_rows (int): Rows that failed validation
+        rooms_created (int): Rooms created for unknown room names
+        error_report_key (str): S3 key of the CSV listing rejected rows
+        error_message (str): Reason the import failed
+    """
+    __tablename__ = "item_imports"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("users.id"), nullable=False)
+    household_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("households.id"), nullable=False, index=True)
+    claim_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("claims.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_name: Mapped[str] = mapped_column(String, nullable=False)
+    s3_key: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(
+        Enum(ItemImportStatus, native_enum=False),
+        default=ItemImportStatus.PENDING.value,
+        nullable=False
+    )
+    total_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    imported_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rejected_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rooms_created: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error_report_key: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    error_message: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    @property
+    def current_status(self) -> ItemImportStatus:
+        """The status as an ItemImportStatus, whether loaded from the database or just assigned."""
+        return ItemImportStatus(self.status.value if isinstance(self.status, ItemImportStatus) else self.status)
+
+    def update_status(self, status: ItemImportStatus, error_message: Optional[str] = None) -> None:
+        """
+        Update the status of the import, recording the error or completion time.
+        """
+        self.status = status.value
+        if error_message:
+            self.error_message = error_message
+        if status in (ItemImportStatus.COMPLETED, ItemImportStatus.FAILED):
+            self.completed_at = datetime.now(timezone.utc)
+
+    def to_dict(self):
+        """
+        Convert the import to a dictionary representation.
+        """
+        return {
+            "id": str(self.id),
+            "claim_id": str(self.claim_id),
+            "file_name": self.file_name,
+            "status": self.current_status.value,
+            "total_rows": self.total_rows,
+            "imported_rows": self.imported_rows,
+            "rejected_rows": self.rejected_rows,
+            "rooms_created": self.rooms_created,
+            "error_message": self.error_message,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, UUID, Boolean
+from sqlalchemy import Column, ForeignKey, UUID, Boolean, Index, text
 from models.base import Base
 
 class ItemLabel(Base):
@@ -13,3 +13,8 @@ class ItemLabel(Base):
     item_id = Column(UUID, ForeignKey("items.id"), primary_key=True, index=True)
     label_id = Column(UUID, ForeignKey("labels.id"), primary_key=True, index=True)
     deleted = Column(Boolean, default=False, index=True)  # Allows selective removal of labels per item
+
+    __table_args__ = (
+        # Covering index over active associations for facet counts
+        Index('idx_item_labels_item_label_active', 'item_id', 'label_id', postgresql_where=text('NOT deleted')),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, UUID, Boolean, ForeignKey, UniqueConstraint, Index, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 import uuid
 from models.base import Base
@@ -18,6 +18,8 @@ class Label(Base):
 
     __table_args__ = (
         UniqueConstraint('label_text', 'is_ai_generated', 'household_id', name='label_text_is_ai_generated_unique'),
+        # Case-insensitive label lookups: lower(label_text) IN (...) within a household
+        Index('idx_labels_household_lower_text', 'household_id', func.lower(label_text)),
     )
     def to_dict(self):
         return {
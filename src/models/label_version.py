@@ -0,0 +1,29 @@
+"""
+Label version model for the ClaimVision application.
+
+This module defines the LabelVersion model, a per-household counter that is
+bumped whenever labels or label associations change so cached label data
+(such as claim facet counts) can be invalidated across Lambda containers.
+"""
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from models.base import Base
+
+
+class LabelVersion(Base):
+    """
+    The current label version of a household.
+
+    Attributes:
+        household_id (UUID): Household the counter belongs to
+        version (int): Incremented by every label write (see utils.label_version)
+        updated_at (datetime): Timestamp of the last bump
+    """
+    __tablename__ = "label_versions"
+
+    household_id: Mapped[uuid.UUID] = mapped_column(UUID, ForeignKey("households.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
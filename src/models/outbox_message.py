@@ -0,0 +1,55 @@
+"""
+Outbox message model for the ClaimVision application.
+
+This module defines the OutboxMessage model, the transactional outbox that
+SQS messages are written to alongside the state change that produces them.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, Text, Integer, DateTime, Index, JSON, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from models.base import Base
+
+
+class OutboxMessage(Base):
+    """
+    An SQS message waiting to be published, or already published.
+
+    Rows are inserted in the same transaction as the change that produces the
+    message and relayed to SQS afterwards (see utils.outbox), so a message
+    exists if and only if its change committed. Consumers count the times
+    they processed a message, which makes duplicates and losses measurable.
+
+    Attributes:
+        id (UUID): Primary key, also sent as the OutboxId message attribute
+        queue_url (str): SQS queue the message is published to
+        body (str): Message body
+        message_attributes (dict): Extra SQS message attributes
+        created_at (datetime): Timestamp the message was enqueued
+        published_at (datetime): Timestamp SQS accepted the message (None while pending)
+        attempts (int): Failed publish attempts
+        retry_at (datetime): Earliest time a failed message is published again
+        last_error (str): Error of the last failed attempt
+        deliveries (int): Times a consumer committed work for the message
+    """
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True, default=uuid.uuid4)
+    queue_url: Mapped[str] = mapped_column(String, nullable=False)
+    body: Mapped[str] = mapped_column(Text, nullable=False)
+    message_attributes: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    published_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+    retry_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    deliveries: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+
+    __table_args__ = (
+        # The relay only ever scans pending rows, oldest first
+        Index('idx_outbox_messages_pending', 'created_at', postgresql_where=text('published_at IS NULL')),
+        # The stats read recently published rows, and the purge the oldest ones
+        Index('idx_outbox_messages_published', 'published_at', postgresql_where=text('published_at IS NOT NULL')),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey, UUID, DateTime, Enum
+from sqlalchemy import String, ForeignKey, UUID, DateTime, Enum, Integer, JSON
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 import uuid
 from datetime import datetime, timezone
@@ -17,6 +17,17 @@ class ReportStatus(enum.Enum):
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
 
+class ReportType(enum.Enum):
+    """
+    Enum representing the kinds of report that can be requested.
+    
+    FULL reports include the claim's files; SUMMARY and CSV_ONLY reports only
+    list its items and are built within the request.
+    """
+    FULL = "FULL"
+    SUMMARY = "SUMMARY"
+    CSV_ONLY = "CSV_ONLY"
+
 class Report(Base):
     """
     Represents a report generated for a claim.
@@ -43,6 +54,15 @@ class Report(Base):
     email_address: Mapped[str] = mapped_column(String, nullable=False)  # Email address for report delivery
     s3_key: Mapped[str | None] = mapped_column(String, nullable=True)
     error_message: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Claim.report_fingerprint of the content the report was built from
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    
+    # Sharded generation (see reports/report_shards.py): shard -> {"size", "skipped"} of completed shards
+    shard_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    shards_completed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    shard_state: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    # Percent of the files the current stage has processed
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     
     # Tracking fields
     created_at: Mapped[datetime] = mapped_column(
@@ -78,6 +98,10 @@ class Report(Base):
             "email_address": self.email_address,
             "s3_key": self.s3_key,
             "error_message": self.error_message,
+            "fingerprint": self.fingerprint,
+            "shard_count": self.shard_count,
+            "shards_completed": self.shards_completed,
+            "progress": self.progress,
             "created_at": self.created_at.isoformat() if hasattr(self, 'created_at') else None,
             "updated_at": self.updated_at.isoformat() if hasattr(self, 'updated_at') else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None
@@ -95,5 +119,6 @@ class Report(Base):
             
         if new_status == ReportStatus.COMPLETED:
             self.completed_at = datetime.now(timezone.utc)
+            self.progress = 100
             
         self.updated_at = datetime.now(timezone.utc)
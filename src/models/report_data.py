@@ -0,0 +1,141 @@
+"""
+Report data records for the ClaimVision application.
+
+This module defines the compact records `Claim.build_report_data` assembles
+from its two streamed queries. They use `__slots__` so a claim with tens of
+thousands of items does not pay for a dictionary per row; rooms reference the
+same item records instead of copies. `ReportData.to_dict` produces the JSON
+structure passed between the report stages.
+"""
+from typing import Dict, List, Optional
+
+
+class ReportItem:
+    """
+    An item row of a claim report.
+
+    Attributes:
+        id (str): Item ID
+        number (int): Position of the item in the report (1-based)
+        room (str): Name of the item's room, or None
+        total_cost (float): unit_cost * quantity, or None without a unit cost
+        (other attributes mirror the Item columns)
+    """
+    __slots__ = ("id", "number", "name", "room", "brand_manufacturer", "model_number", "description",
+                 "original_vendor", "quantity", "age_years", "age_months", "condition", "unit_cost")
+
+    def __init__(self, number: int, row):
+        self.id = str(row.id)
+        self.number = number
+        self.name = row.name
+        self.room = row.room_name
+        self.brand_manufacturer = row.brand_manufacturer
+        self.model_number = row.model_number
+        self.description = row.description
+        self.original_vendor = row.original_vendor
+        self.quantity = row.quantity
+        self.age_years = row.age_years
+        self.age_months = row.age_months
+        self.condition = row.condition
+        self.unit_cost = row.unit_cost
+
+    @property
+    def total_cost(self) -> Optional[float]:
+        if self.unit_cost is not None and self.quantity is not None:
+            return self.unit_cost * self.quantity
+        return None
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'number': self.number,
+            'name': self.name,
+            'room': self.room or 'N/A',
+            'brand_manufacturer': self.brand_manufacturer or 'N/A',
+            'model_number': self.model_number or 'N/A',
+            'description': self.description or self.name,
+            'original_vendor': self.original_vendor or 'N/A',
+            'quantity': self.quantity or 1,
+            'age_years': self.age_years or 'N/A',
+            'age_months': self.age_months or 'N/A',
+            'condition': self.condition or 'N/A',
+            'unit_cost': self.unit_cost,
+            'total_cost': self.total_cost
+        }
+
+    def room_entry(self) -> dict:
+        """The short form of the item listed under its room."""
+        return {
+            'id': self.id,
+            'number': self.number,
+            'name': self.name,
+            'description': self.description
+        }
+
+
+class ReportFile:
+    """
+    A file of a claim report.
+
+    Attributes:
+        id (str): File ID
+        filename (str): Original file name
+        s3_key (str): S3 key of the file
+        content_type (str): MIME type of the file
+        size (int): Size of the file in bytes, if known
+        item_ids (list): IDs of the items the file is attached to
+    """
+    __slots__ = ("id", "filename", "s3_key", "content_type", "size", "item_ids")
+
+    def __init__(self, row):
+        self.id = str(row.id)
+        self.filename = row.file_name
+        self.s3_key = row.s3_key
+        self.content_type = row.content_type
+        self.size = row.file_size
+        self.item_ids = []
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            's3_key': self.s3_key,
+            'content_type': self.content_type,
+            'size': self.size,
+            'item_ids': self.item_ids
+        }
+
+
+class ReportData:
+    """
+    Everything a claim report is built from.
+
+    Attributes:
+        claim (dict): Claim fields shown on the report
+        items (list): ReportItem records in report order
+        rooms (dict): Room name -> the ReportItem records in that room
+        files (list): ReportFile records
+    """
+    __slots__ = ("claim", "items", "rooms", "files")
+
+    def __init__(self, claim: dict):
+        self.claim = claim
+        self.items: List[ReportItem] = []
+        self.rooms: Dict[str, List[ReportItem]] = {}
+        self.files: List[ReportFile] = []
+
+    def add_item(self, item: ReportItem) -> None:
+        self.items.append(item)
+        if item.room:
+            self.rooms.setdefault(item.room, []).append(item)
+
+    def to_dict(self) -> dict:
+        return {
+            'claim': self.claim,
+            'rooms': {
+                name: {'name': name, 'items': [item.room_entry() for item in items]}
+                for name, items in self.rooms.items()
+            },
+            'files': [file.to_dict() for file in self.files],
+            'items': [item.to_dict() for item in self.items]
+        }
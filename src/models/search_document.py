@@ -0,0 +1,59 @@
+"""
+Search document model for the ClaimVision application.
+
+This module defines the SearchDocument model, the denormalized full-text
+index over items, files and labels used by the household search endpoint.
+"""
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import String, Text, DateTime, Index, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column
+from models.base import Base
+
+
+class SearchDocument(Base):
+    """
+    A searchable document for a single item, file or label.
+
+    Documents are rebuilt by the write handlers (see utils.search_index)
+    whenever the underlying entity or its labels change. The `document`
+    column is matched with full-text queries and `title` with trigram
+    similarity for fuzzy and prefix matching.
+
+    Attributes:
+        entity_type (str): "item", "file" or "label"
+        entity_id (UUID): ID of the indexed entity
+        household_id (UUID): Household that owns the entity
+        claim_id (UUID): Claim of the entity (None for labels)
+        title (str): Display text (item name, file name or label text)
+        body (str): Secondary text folded into the document
+        document (tsvector): Weighted full-text document
+        updated_at (datetime): Timestamp of the last reindex
+    """
+    __tablename__ = "search_documents"
+
+    entity_type: Mapped[str] = mapped_column(String, primary_key=True)
+    entity_id: Mapped[uuid.UUID] = mapped_column(UUID, primary_key=True)
+    household_id: Mapped[uuid.UUID] = mapped_column(UUID, nullable=False)
+    claim_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID, nullable=True)
+    title: Mapped[str] = mapped_column(String, nullable=False, default="")
+    body: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    document = mapped_column(TSVECTOR, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('idx_search_documents_household_claim', 'household_id', 'claim_id'),
+        Index('idx_search_documents_document', 'document', postgresql_using='gin'),
+        Index('idx_search_documents_title_trgm', 'title', postgresql_using='gin',
+              postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
+
+
+# Trigram operators and index classes come from the pg_trgm extension
+event.listen(
+    SearchDocument.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
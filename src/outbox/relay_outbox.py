@@ -0,0 +1,82 @@
+"""
+Outbox Relay Handler
+
+This module publishes pending outbox messages (see utils.outbox) to SQS. It
+runs on a schedule; each invocation keeps polling the outbox until shortly
+before its timeout, so messages wait about OUTBOX_RELAY_POLL_SECONDS rather
+than a whole schedule interval. Overlapping invocations are safe because rows
+are claimed with `FOR UPDATE SKIP LOCKED`.
+
+Every invocation ends by purging messages published longer ago than
+OUTBOX_RETENTION_SECONDS, pruning claim changes older than
+CLAIM_CHANGES_RETENTION_SECONDS, and logging `outbox_stats` per queue
+(pending, oldest pending age, failed, unconfirmed and duplicated messages).
+"""
+
+import json
+import os
+import time
+
+from database.database import get_db_session
+from utils.change_log import prune_changes
+from utils.lambda_utils import get_sqs_client
+from utils.logging_utils import get_logger
+from utils.outbox import RELAY_BATCH_SIZE, outbox_stats, purge_published, relay
+
+logger = get_logger(__name__)
+
+# Pause between polls of an empty outbox
+POLL_SECONDS = float(os.getenv("OUTBOX_RELAY_POLL_SECONDS", "1"))
+# Stop polling this long before the Lambda times out
+STOP_SECONDS = float(os.getenv("OUTBOX_RELAY_STOP_SECONDS", "10"))
+
+
+def _has_time_left(context) -> bool:
+    """Whether another poll fits in the invocation (a single pass without a Lambda context)."""
+    remaining = getattr(context, "get_remaining_time_in_millis", None)
+    return bool(remaining) and remaining() / 1000 > STOP_SECONDS + POLL_SECONDS
+
+
+def lambda_handler(_event, context):
+    """
+    Relay pending outbox messages to SQS.
+
+    Args:
+        _event (dict): Scheduled event (unused)
+        context (object): Lambda execution context
+
+    Returns:
+        dict: Published and failed counts and the outbox stats per queue
+    """
+    session = get_db_session()
+    totals = {"published": 0, "failed": 0}
+    try:
+        sqs = get_sqs_client()
+        while True:
+            result = relay(session, sqs=sqs)
+            totals["published"] += result["published"]
+            totals["failed"] += result["failed"]
+            if result["published"] >= RELAY_BATCH_SIZE:
+                continue  # More messages are waiting
+            if not _has_time_left(context):
+                break
+            time.sleep(POLL_SECONDS)
+
+        purged = purge_published(session)
+        pruned = prune_changes(session)
+        stats = outbox_stats(session)
+        logger.info("Outbox relay published %d messages, %d failed, purged %d, pruned %d claim changes; stats: %s",
+                    totals["published"], totals["failed"], purged, pruned, json.dumps(stats))
+        return {
+            "statusCode": 200,
+            "body": json.dumps({**totals, "purged": purged, "pruned_changes": pruned, "queues": stats})
+        }
+    except Exception as e:
+        session.rollback()
+        logger.error("Error relaying outbox messages: %s", str(e))
+        return {
+            "statusCode": 500,
+            "body": json.dumps({"error": f"Error relaying outbox messages: {str(e)}", **totals})
+        }
+    finally:
+        session.close()
@@ -2,7 +2,10 @@
 Report Aggregation Handler
 
 This module processes messages from the report request queue,
-aggregates claim data, and sends batch messages to the file organization queue.
+aggregates claim data into a report data artifact in S3 (see report_artifact), and
+queues a pointer to it for the file organization queue through the transactional outbox.
+Claims too big for one report zipper invocation are instead fanned out as one message
+per shard on the deliver report queue (see report_shards).
 """
 
 import os
@@ -14,23 +17,26 @@ from datetime import datetime, timezone
 from database.database import get_db_session
 from models.report import Report, ReportStatus
 from models.claim import Claim
+from utils import outbox
+from reports import report_archive, report_artifact, report_shards
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
-sqs_client = boto3.client('sqs')
 s3_client = boto3.client('s3')
 
 # Get environment variables
 FILE_ORGANIZATION_QUEUE_URL = os.environ.get('FILE_ORGANIZATION_QUEUE_URL')
+REPORTS_BUCKET_NAME = os.environ.get('REPORTS_BUCKET_NAME')
+DELIVER_REPORT_QUEUE_URL = os.environ.get('DELIVER_REPORT_QUEUE_URL')
 
 def lambda_handler(event, context):
     """
     Process messages from the report request queue.
     
-    Aggregates claim data and sends batch messages to the file organization queue.
+    Aggregates claim data into S3 and queues a pointer to it for the file organization queue.
     
     Parameters
     ----------
@@ -78,8 +84,13 @@ def lambda_handler(event, context):
                     
                     # Update report status
                     report.update_status(ReportStatus.AGGREGATING)
+                    outbox.record_delivery(session, record)
                     session.commit()
                     
+                    # Read the fingerprint and the report data from one snapshot, so the fingerprint
+                    # describes exactly the content aggregated even if the claim changes in between
+                    session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+                    
                     # Get claim data
                     claim = session.query(Claim).filter(Claim.id == report.claim_id).first()
                     
@@ -89,27 +100,42 @@ def lambda_handler(event, context):
                         session.commit()
                         continue
                     
-                    # Generate structured report data using the Claim's method
-                    report_data = claim.generate_report_data(session)
+                    # Record the fingerprint of the content actually aggregated, so later requests can reuse the report
+                    report.fingerprint = claim.report_fingerprint(session)
+                    
+                    # Write the structured report data once; the next stages read it from S3
+                    report_data = claim.build_report_data(session)
+                    report_data_ref = report_artifact.write_report_data(s3_client, REPORTS_BUCKET_NAME, report_id, report_data)
+                    
+                    # Plan the archive the way the zipper will, to see whether it needs sharding
+                    items = {}
+                    for _ in report_archive.index_items((item.to_dict() for item in report_data.items), items):
+                        pass
+                    entries = list(report_archive.plan_files((file.to_dict() for file in report_data.files), items))
+                    shards = report_shards.plan_shards(entries)
                     
-                    # Send message to file organization queue
                     message = {
                         'report_id': report_id,
-                        'report_data': report_data,
+                        'report_data_ref': report_data_ref,
                         'email_address': email_address,  # Pass email address to next step
                         'timestamp': datetime.now(timezone.utc).isoformat()
                     }
                     
-                    sqs_client.send_message(
-                        QueueUrl=FILE_ORGANIZATION_QUEUE_URL,
-                        MessageBody=json.dumps(message),
-                        MessageAttributes={
-                            'ReportId': {
-                                'DataType': 'String',
-                                'StringValue': report_id
-                            }
-                        }
-                    )
+                    if len(shards) > 1:
+                        # Fan out one zipper message per shard through the outbox
+                        logger.info(f"Sharding report {report_id} into {len(shards)} shards")
+                        report_shards.start_shards(report, len(shards))
+                        shard_plan = {'budget': report_shards.SHARD_BYTES, 'by': report_shards.SHARD_BY}
+                        message_ids = [
+                            outbox.enqueue(session, DELIVER_REPORT_QUEUE_URL, dict(message, shard=shard, shard_plan=shard_plan),
+                                           {'ReportId': report_id})
+                            for shard in range(len(shards))
+                        ]
+                    else:
+                        # Queue the file organization message through the outbox
+                        message_ids = [outbox.enqueue(session, FILE_ORGANIZATION_QUEUE_URL, message, {'ReportId': report_id})]
+                    session.commit()
+                    outbox.flush(session, message_ids)
                     
                     logger.info(f"Report aggregation completed for report ID: {report_id}")
                     
@@ -11,13 +11,12 @@ import logging
 import uuid
 import boto3
 import shutil
-import zipfile
-import csv
 from datetime import datetime, timezone
 from database.database import get_db_session
 from models.report import Report, ReportStatus
 from models.user import User
 from models.claim import Claim
+from reports import report_archive, report_artifact
 
 # Configure logging
 logger = logging.getLogger()
@@ -62,10 +61,10 @@ def lambda_handler(event, context):
                 # Extract message data
                 report_id = message_body.get('report_id')
                 report_dir = message_body.get('report_dir')
-                report_data = message_body.get('report_data', {})  # Get the structured report data
+                report_data_ref = message_body.get('report_data_ref')  # Pointer to the structured report data
                 email_address = message_body.get('email_address')
                 
-                if not report_id or not report_dir:
+                if not report_id or not report_dir or not report_data_ref:
                     logger.error("Required parameters not found in message")
                     continue
                 
@@ -101,59 +100,17 @@ def lambda_handler(event, context):
                         session.commit()
                         continue
                     
-                    logger.info("Getting submission directory path")
-                    # Get the submission directory path
-                    submission_dir = os.path.join(report_dir, "submission")
-                    
-                    logger.info("Generating CSV file from structured data")
-                    # Generate CSV file from the structured data
-                    # Items summary CSV
-                    items_path = os.path.join(submission_dir, 'items_summary.csv')
-                    with open(items_path, 'w', newline='') as csvfile:
-                        writer = csv.writer(csvfile)
-                        writer.writerow([
-                            'Item #', 
-                            'Room', 
-                            'Brand or Manufacturer', 
-                            'Model#', 
-                            'Item Description', 
-                            'Original Vendor', 
-                            'Quantity Lost', 
-                            'Item Age (Years)', 
-                            'Item Age (Months)', 
-                            'Condition', 
-                            'Cost to Replace Pre-Tax (each)', 
-                            'Total Cost'
-                        ])
-                        
-                        for item in report_data.get('items', []):
-                            writer.writerow([
-                                item.get('number', ''),
-                                item.get('room', 'N/A'),
-                                item.get('brand_manufacturer', 'N/A'),
-                                item.get('model_number', 'N/A'),
-                                item.get('description', ''),
-                                item.get('original_vendor', 'N/A'),
-                                item.get('quantity', 1),
-                                item.get('age_years', 'N/A'),
-                                item.get('age_months', 'N/A'),
-                                item.get('condition', 'N/A'),
-                                f"${item.get('unit_cost', 0):.2f}" if item.get('unit_cost') is not None else 'N/A',
-                                f"${item.get('total_cost', 0):.2f}" if item.get('total_cost') is not None else 'N/A'
-                            ])
-                    
-                    
-                    # Create zip file
+                    # Create zip file, items summary CSV included
                     zip_filename = f"claim_report_{claim.title.replace(' ', '_')}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
                     zip_path = os.path.join(report_dir, zip_filename)
                     logger.info("Creating zip file at %s", zip_path)
-                    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                        for root, dirs, files in os.walk(submission_dir):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                # Create relative path for the zip file - preserve the submission directory structure
-                                arcname = os.path.relpath(file_path, os.path.dirname(submission_dir))
-                                zipf.write(file_path, arcname)
+                    with open(zip_path, 'wb') as zip_file:
+                        report_archive.write_archive(
+                            zip_file,
+                            report_archive.local_entries(report_dir),
+                            report_artifact.ReportDataStream(s3_client, report_data_ref).items(),
+                            report_archive.open_local_entry
+                        )
                     
                     # Upload zip file to S3
                     s3_key = f"reports/{report.household_id}/{report.claim_id}/{zip_filename}"
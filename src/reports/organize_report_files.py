@@ -2,7 +2,12 @@
 File Organization Handler
 
 This module processes messages from the file organization queue,
-organizes files in EFS, and prepares them for zipping and delivery.
+organizes files in EFS when REPORT_USE_EFS is enabled, and prepares them
+for zipping and delivery. Otherwise the report zipper streams the files
+straight from S3 and this step only hands the report on.
+
+Downloads are checkpointed in the report directory, so a retry after a timeout
+only fetches the files that remain, and progress is kept on the Report row.
 """
 
 import os
@@ -10,30 +15,43 @@ import json
 import logging
 import uuid
 import boto3
-import mimetypes
+from botocore.config import Config
 from datetime import datetime, timezone
 from database.database import get_db_session
 from models.report import Report, ReportStatus
-from models.file import File
+from utils import outbox
+from reports import report_archive, report_artifact
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-sqs_client = boto3.client('sqs')
-s3_client = boto3.client('s3')
+# Initialize AWS clients, with a connection for every concurrent download
+s3_client = boto3.client('s3', config=Config(max_pool_connections=report_archive.DOWNLOAD_WORKERS))
 
 # Get environment variables
 DELIVER_REPORT_QUEUE_URL = os.environ.get('DELIVER_REPORT_QUEUE_URL')
 EFS_MOUNT_PATH = os.environ.get('EFS_MOUNT_PATH', '/mnt/reports')
 S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME')
 
+# Percentage points between progress updates on the report
+PROGRESS_STEP = 5
+
+
+def progress_recorder(session, report):
+    """Return a download_entries progress callback committing the report's progress every PROGRESS_STEP percent."""
+    def record_progress(done, total):
+        progress = done * 100 // total
+        if progress >= report.progress + PROGRESS_STEP or done == total:
+            report.progress = progress
+            session.commit()
+    return record_progress
+
 def lambda_handler(event, context):
     """
     Process messages from the file organization queue.
     
-    Organizes files in EFS and prepares them for zipping and delivery.
+    Organizes files in EFS (when enabled) and prepares them for zipping and delivery.
     
     Parameters
     ----------
@@ -58,11 +76,11 @@ def lambda_handler(event, context):
                 
                 # Extract message data
                 report_id = message_body.get('report_id')
-                report_data = message_body.get('report_data', {})
+                report_data_ref = message_body.get('report_data_ref')
                 email_address = message_body.get('email_address')  # Get email address from message
                 
-                if not report_id:
-                    logger.error("Report ID not found in message")
+                if not report_id or not report_data_ref:
+                    logger.error("Report ID or report data not found in message")
                     continue
                 
                 if not email_address:
@@ -82,136 +100,46 @@ def lambda_handler(event, context):
                     
                     # Update report status
                     report.update_status(ReportStatus.ORGANIZING)
+                    report.progress = 0
+                    outbox.record_delivery(session, record)
                     session.commit()
                     
-                    # Create report directory in EFS
-                    report_dir = os.path.join(EFS_MOUNT_PATH, str(report.id))
-                    os.makedirs(report_dir, exist_ok=True)
-                    
-                    # Create submission directory
-                    submission_dir = os.path.join(report_dir, "submission")
-                    os.makedirs(submission_dir, exist_ok=True)
+                    # Without EFS the zipper streams the files straight from S3
+                    report_dir = None
+                    failed_files = []
+                    if report_archive.USE_EFS:
+                        report_dir = os.path.join(EFS_MOUNT_PATH, str(report.id))
+                        os.makedirs(os.path.join(report_dir, report_archive.SUBMISSION_DIR), exist_ok=True)
+                        
+                        # Index the items, then download the claim files to their place in the submission directory,
+                        # skipping those an earlier attempt already downloaded
+                        report_data = report_artifact.ReportDataStream(s3_client, report_data_ref)
+                        items = {}
+                        for _ in report_archive.index_items(report_data.items(), items):
+                            pass
+                        failed_files = report_archive.download_entries(
+                            s3_client,
+                            S3_BUCKET_NAME,
+                            report_archive.plan_files(report_data.files(), items),
+                            report_dir,
+                            on_progress=progress_recorder(session, report)
+                        )
+                        if failed_files:
+                            logger.warning(f"{len(failed_files)} files could not be downloaded for report {report_id}")
                     
-                    # Create room directories
-                    for room_name, room_data in report_data.get('rooms', {}).items():
-                        room_dir = os.path.join(submission_dir, room_name)
-                        os.makedirs(room_dir, exist_ok=True)
-                    
-                    # Download and organize claim files from S3
-                    claim_files = session.query(File).filter(
-                        File.claim_id == report.claim_id,
-                        File.deleted.is_(False)
-                    ).all()
-                    
-                    # Track file counts for each item to handle multiple files per item
-                    item_file_counts = {}
-                    
-                    for file in claim_files:
-                        try:
-                            # Determine which room and item this file belongs to
-                            file_item_id = None
-                            for item_file in file.items:
-                                file_item_id = item_file.id
-                                break
-                            
-                            if file_item_id:
-                                # Find the room and item number for this file
-                                target_room = None
-                                item_number = None
-                                item_name = None
-                                
-                                for room_name, room_data in report_data.get('rooms', {}).items():
-                                    for item in room_data.get('items', []):
-                                        if item.get('id') == str(file_item_id):
-                                            target_room = room_name
-                                            item_number = item.get('number')
-                                            item_name = item.get('name')
-                                            break
-                                    if target_room:
-                                        break
-                                
-                                if target_room and item_number and item_name:
-                                    # Create a sanitized item name for the filename
-                                    safe_item_name = "".join(c if c.isalnum() or c in " -_" else "_" for c in item_name)
-                                    safe_item_name = safe_item_name.strip()
-                                    
-                                    # Get the file count for this item
-                                    if str(file_item_id) not in item_file_counts:
-                                        item_file_counts[str(file_item_id)] = 0
-                                    item_file_counts[str(file_item_id)] += 1
-                                    
-                                    # Format the filename: <item number> - <Short description> (x of y).extension
-                                    file_ext = mimetypes.guess_extension(file.content_type)
-                                    if not file_ext:
-                                        file_ext = os.path.splitext(file.file_name)[-1] or ".bin"
-                                    
-                                    file_ext = file_ext.lstrip(".")
-                                    new_filename = f"{item_number} - {safe_item_name} ({item_file_counts[str(file_item_id)]}).{file_ext}"
-                                    
-                                    # Create the target directory if it doesn't exist
-                                    target_dir = os.path.join(submission_dir, target_room)
-                                    os.makedirs(target_dir, exist_ok=True)
-                                    
-                                    # Download file from S3
-                                    local_path = os.path.join(target_dir, new_filename)
-                                    s3_client.download_file(
-                                        S3_BUCKET_NAME,
-                                        file.s3_key,
-                                        local_path
-                                    )
-                                    
-                                    logger.info(f"Downloaded file {file.file_name} to {local_path}")
-                                else:
-                                    # If we can't determine the room/item, put it in a misc folder
-                                    misc_dir = os.path.join(submission_dir, "misc")
-                                    os.makedirs(misc_dir, exist_ok=True)
-                                    
-                                    local_path = os.path.join(misc_dir, file.file_name)
-                                    
-                                    s3_client.download_file(
-                                        S3_BUCKET_NAME,
-                                        file.s3_key,
-                                        local_path
-                                    )
-                                    
-                                    logger.info(f"Downloaded file {file.file_name} to misc directory")
-                            else:
-                                # If the file isn't associated with an item, put it in a misc folder
-                                misc_dir = os.path.join(submission_dir, "misc")
-                                os.makedirs(misc_dir, exist_ok=True)
-                                
-                                local_path = os.path.join(misc_dir, file.file_name)
-                                
-                                s3_client.download_file(
-                                    S3_BUCKET_NAME,
-                                    file.s3_key,
-                                    local_path
-                                )
-                                
-                                logger.info(f"Downloaded file {file.file_name} to misc directory")
-                            
-                        except Exception as e:
-                            logger.error(f"Error downloading file {file.id}: {str(e)}")
-                    
-                    # Send message to deliver report queue
+                    # Queue the deliver report message through the outbox
                     message = {
                         'report_id': report_id,
                         'report_dir': report_dir,
-                        'report_data': report_data,  # Pass the structured report data to the next step
+                        'report_data_ref': report_data_ref,  # Pass the report data pointer to the next step
                         'email_address': email_address,  # Pass email address to next step
+                        'failed_files': failed_files,
                         'timestamp': datetime.now(timezone.utc).isoformat()
                     }
                     
-                    sqs_client.send_message(
-                        QueueUrl=DELIVER_REPORT_QUEUE_URL,
-                        MessageBody=json.dumps(message),
-                        MessageAttributes={
-                            'ReportId': {
-                                'DataType': 'String',
-                                'StringValue': report_id
-                            }
-                        }
-                    )
+                    message_id = outbox.enqueue(session, DELIVER_REPORT_QUEUE_URL, message, {'ReportId': report_id})
+                    session.commit()
+                    outbox.flush(session, [message_id])
                     
                     logger.info(f"File organization completed for report ID: {report_id}")
                     
@@ -0,0 +1,712 @@
+"""
+Report Archive Utilities
+
+This module builds claim report ZIP archives as a stream. Entries are read
+from S3 (or from files staged on EFS) in order and written through
+`zipfile` straight into an S3 multipart upload, so the archive never touches
+local or network storage and memory stays bounded by one upload part plus one
+copy buffer:
+
+    ```
+    entries = plan_entries(report_data)
+    with S3MultipartWriter(s3_client, REPORTS_BUCKET_NAME, s3_key) as upload:
+        skipped = write_archive(upload, entries, report_data['items'],
+                                partial(open_s3_entry, s3_client, S3_BUCKET_NAME))
+    ```
+
+The upload is not seekable, so entries are written with data descriptors and
+ZIP64 records are used wherever sizes call for them. The items summary CSV
+is generated row by row into its entry.
+
+Photos, videos and PDFs are already compressed, so deflating them again costs
+most of the CPU time of a report for no size gain. Such entries, recognised by
+content type or by their leading magic bytes, are stored as they are; text
+and other files are deflated at REPORT_COMPRESS_LEVEL. With
+REPORT_COMPRESS_WORKERS set, small text entries are read and compressed on a
+thread pool while the archive is written.
+"""
+
+import csv
+import io
+import json
+import logging
+import mimetypes
+import os
+import shutil
+import uuid
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing, nullcontext
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger()
+
+# Stage report files on EFS (organize_report_files) instead of streaming them from S3
+USE_EFS = os.getenv("REPORT_USE_EFS", "false").lower() == "true"
+# Size of each multipart upload part (S3 requires at least 5 MiB for all but the last)
+PART_SIZE = max(int(os.getenv("REPORT_PART_SIZE_MB", "16")), 5) * 1024 * 1024
+# Concurrent S3 downloads when staging report files on EFS
+DOWNLOAD_WORKERS = int(os.getenv("REPORT_DOWNLOAD_WORKERS", "16"))
+# S3 minimum size of every multipart upload part but the last
+MIN_PART_SIZE = 5 * 1024 * 1024
+# Bytes copied server side per upload_part_copy (S3 allows up to 5 GiB)
+COPY_PART_SIZE = 1024 * 1024 * 1024
+# Bytes copied per read from a source object
+COPY_CHUNK_SIZE = 1024 * 1024
+# Deflate level for text and other compressible entries (1 fastest - 9 smallest)
+COMPRESS_LEVEL = int(os.getenv("REPORT_COMPRESS_LEVEL", "6"))
+# Threads compressing text entries ahead of the writer (0 compresses them inline)
+COMPRESS_WORKERS = int(os.getenv("REPORT_COMPRESS_WORKERS", "0"))
+# Larger text entries are streamed by the writer rather than held in memory by a worker
+PARALLEL_MAX_BYTES = 8 * 1024 * 1024
+
+# Content types whose data is already compressed
+STORED_CONTENT_TYPES = {
+    "image/jpeg", "image/png", "image/gif", "image/webp", "image/heic", "image/heif", "image/avif",
+    "application/pdf", "application/zip", "application/gzip", "application/x-7z-compressed",
+    "audio/mpeg", "audio/mp4", "audio/aac", "audio/ogg",
+}
+# Leading bytes of already compressed formats, for files with a missing or generic content type
+STORED_MAGIC_BYTES = (
+    b"\xff\xd8\xff",          # JPEG
+    b"\x89PNG\r\n\x1a\n",     # PNG
+    b"GIF87a", b"GIF89a",
+    b"%PDF-",
+    b"PK\x03\x04",           # ZIP (and DOCX/XLSX)
+    b"\x1f\x8b",             # gzip
+    b"7z\xbc\xaf\x27\x1c",   # 7-Zip
+    b"ID3",                  # MP3
+)
+# Content types deflated on the thread pool when COMPRESS_WORKERS is set
+TEXT_CONTENT_TYPES = {"application/json", "application/xml", "application/csv"}
+MAGIC_BYTES_LENGTH = 12
+
+SUBMISSION_DIR = "submission"
+MISC_DIR = "misc"
+# Download checkpoints organize_report_files keeps in the report directory, one JSON line per file
+MANIFEST_NAME = "manifest.jsonl"
+ITEMS_CSV_NAME = "items_summary.csv"
+
+ITEMS_CSV_HEADER = [
+    'Item #',
+    'Room',
+    'Brand or Manufacturer',
+    'Model#',
+    'Item Description',
+    'Original Vendor',
+    'Quantity Lost',
+    'Item Age (Years)',
+    'Item Age (Months)',
+    'Condition',
+    'Cost to Replace Pre-Tax (each)',
+    'Total Cost'
+]
+
+
+class ArchiveEntry:
+    """
+    A file to be written into a report archive.
+
+    Attributes:
+        arcname (str): Path of the entry inside the archive
+        source (str): S3 key or local path to read the file from
+        content_type (str): MIME type of the file, if known
+        size (int): Size of the file in bytes, if known
+    """
+    __slots__ = ("arcname", "source", "content_type", "size")
+
+    def __init__(self, arcname: str, source: str, content_type: Optional[str] = None, size: Optional[int] = None):
+        self.arcname = arcname
+        self.source = source
+        self.content_type = content_type
+        self.size = size
+
+
+class S3MultipartWriter:
+    """
+    A write-only, non-seekable file object that uploads to S3 in parts.
+
+    Data is buffered until a part is full and then sent with `upload_part`.
+    Closing the writer uploads the last part and completes the upload; leaving
+    its context with an exception aborts the upload instead.
+    """
+
+    def __init__(self, s3_client, bucket: str, key: str, part_size: int = PART_SIZE,
+                 content_type: str = "application/zip"):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.upload_id = s3_client.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        )["UploadId"]
+        self.parts = []
+        self.position = 0
+        self.closed = False
+        self._buffer = bytearray()
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.position += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(bytes(self._buffer[:self.part_size]))
+            del self._buffer[:self.part_size]
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def _upload_part(self, body: bytes) -> None:
+        number = len(self.parts) + 1
+        result = self.s3_client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=body
+        )
+        self.parts.append({"PartNumber": number, "ETag": result["ETag"]})
+
+    def copy_from(self, bucket: str, key: str, size: int) -> None:
+        """
+        Append an existing S3 object, copying it server side where S3 allows.
+
+        Parts copied with `upload_part_copy` must be at least MIN_PART_SIZE
+        like any other part, so the start of the object tops up a partly
+        filled buffer and a short tail is read into the buffer.
+        """
+        offset = 0
+        if self._buffer:
+            offset = min(self.part_size - len(self._buffer), size)
+            if size - offset < MIN_PART_SIZE:
+                offset = size
+            self.write(self._read_range(bucket, key, 0, offset))
+        while size - offset >= MIN_PART_SIZE:
+            length = min(size - offset, COPY_PART_SIZE)
+            if 0 < size - offset - length < MIN_PART_SIZE:
+                length -= MIN_PART_SIZE  # Leave a full part for the next copy instead of a short tail
+            number = len(self.parts) + 1
+            result = self.s3_client.upload_part_copy(
+                Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number,
+                CopySource={"Bucket": bucket, "Key": key}, CopySourceRange=f"bytes={offset}-{offset + length - 1}"
+            )
+            self.parts.append({"PartNumber": number, "ETag": result["CopyPartResult"]["ETag"]})
+            self.position += length
+            offset += length
+        if offset < size:
+            self.write(self._read_range(bucket, key, offset, size))
+
+    def _read_range(self, bucket: str, key: str, start: int, end: int) -> bytes:
+        if start >= end:
+            return b""
+        response = self.s3_client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end - 1}")
+        return response['Body'].read()
+
+    def close(self) -> None:
+        """Upload the buffered data as the last part and complete the upload."""
+        if self.closed:
+            return
+        if self._buffer or not self.parts:
+            self._upload_part(bytes(self._buffer))
+            self._buffer.clear()
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={"Parts": self.parts}
+        )
+        self.closed = True
+
+    def abort(self) -> None:
+        """Discard the uploaded parts."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.s3_client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        except Exception as e:
+            logger.warning("Error aborting multipart upload of %s: %s", self.key, str(e))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def _safe_name(name: str) -> str:
+    return "".join(c if c.isalnum() or c in " -_" else "_" for c in name).strip()
+
+
+def _unique(arcname: str, used: set) -> str:
+    """Suffix a name taken by an earlier entry (zip entry names must be unique)."""
+    candidate, stem, ext, n = arcname, *os.path.splitext(arcname), 1
+    while candidate in used:
+        n += 1
+        candidate = f"{stem} ({n}){ext}"
+    used.add(candidate)
+    return candidate
+
+
+def plan_entries(report_data: dict) -> List[ArchiveEntry]:
+    """
+    Lay out the files of a report inside the archive.
+
+    A file attached to an item in a room is named
+    `submission/<room>/<item number> - <item name> (<n>).<ext>`; every other
+    file keeps its name under `submission/misc/`.
+
+    Args:
+        report_data: Structured report data (see Claim.generate_report_data)
+
+    Returns:
+        The archive entries, in report file order
+    """
+    index = {}
+    for _ in index_items(report_data.get('items', []), index):
+        pass
+    return list(plan_files(report_data.get('files', []), index))
+
+
+def index_items(items: Iterable[dict], index: Dict[str, dict]) -> Iterator[dict]:
+    """
+    Pass items through, recording in `index` the fields plan_files names files by.
+
+    This lets one pass over a streamed report feed the items summary CSV and
+    build the item lookup at the same time.
+    """
+    for item in items:
+        index[item['id']] = {key: item.get(key) for key in ('id', 'number', 'name', 'room')}
+        yield item
+
+
+def plan_files(files: Iterable[dict], items: Dict[str, dict]) -> Iterator[ArchiveEntry]:
+    """
+    Lay out report files one at a time (see plan_entries).
+
+    Args:
+        files: Report file records
+        items: Item records by ID, as built by index_items
+    """
+    item_file_counts = {}
+    used = set()
+    for file in files:
+        item = next((items[item_id] for item_id in file.get('item_ids', []) if item_id in items), None)
+        if item and item.get('room') and item['room'] != 'N/A':
+            item_file_counts[item['id']] = item_file_counts.get(item['id'], 0) + 1
+            file_ext = mimetypes.guess_extension(file.get('content_type') or '')
+            if not file_ext:
+                file_ext = os.path.splitext(file['filename'])[-1] or ".bin"
+            file_ext = file_ext.lstrip(".")
+            name = f"{item['number']} - {_safe_name(item['name'])} ({item_file_counts[item['id']]}).{file_ext}"
+            arcname = f"{SUBMISSION_DIR}/{item['room']}/{name}"
+        else:
+            arcname = f"{SUBMISSION_DIR}/{MISC_DIR}/{file['filename']}"
+        yield ArchiveEntry(_unique(arcname, used), file['s3_key'], file.get('content_type'), file.get('size'))
+
+
+def local_entries(report_dir: str) -> List[ArchiveEntry]:
+    """List the files organize_report_files staged under `report_dir` (EFS mode)."""
+    entries = []
+    submission_dir = os.path.join(report_dir, SUBMISSION_DIR)
+    for root, dirs, files in os.walk(submission_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            arcname = os.path.relpath(path, report_dir).replace(os.sep, "/")
+            if arcname != f"{SUBMISSION_DIR}/{ITEMS_CSV_NAME}":
+                entries.append(ArchiveEntry(arcname, path, mimetypes.guess_type(name)[0]))
+    return entries
+
+
+def read_manifest(report_dir: str) -> Dict[str, dict]:
+    """Load the download checkpoints under `report_dir`, keyed by archive name."""
+    checkpoints = {}
+    path = os.path.join(report_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as manifest:
+            for line in manifest:
+                try:
+                    checkpoint = json.loads(line)
+                except ValueError:
+                    continue  # Blank, or cut short by an attempt that timed out mid-write
+                checkpoints[checkpoint['file']] = checkpoint
+    return checkpoints
+
+
+def download_entries(s3_client, bucket: str, entries: Iterable[ArchiveEntry], report_dir: str,
+                     workers: int = DOWNLOAD_WORKERS,
+                     on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict[str, str]]:
+    """
+    Download entries from S3 to their place under `report_dir` on a bounded thread pool.
+
+    Every completed download is checkpointed in the MANIFEST_NAME file with the
+    object's size and ETag. A file checkpointed by an earlier attempt is not
+    downloaded again while the object (checked with a HEAD request) and the
+    file on disk still match, so a retried download only costs the files that
+    remain. Files are written to a temporary name and moved into place once
+    complete.
+
+    Args:
+        s3_client: boto3 S3 client, with at least `workers` pooled connections
+        bucket: Bucket holding the files
+        entries: Files to download (see plan_entries)
+        report_dir: Directory the archive names are relative to
+        workers: Concurrent downloads
+        on_progress: Called as on_progress(done, total) on the calling thread after each file
+
+    Returns:
+        One {'file', 's3_key', 'error'} dict per file that could not be downloaded
+    """
+    entries = list(entries)
+    for directory in {os.path.dirname(os.path.join(report_dir, entry.arcname)) for entry in entries}:
+        os.makedirs(directory, exist_ok=True)
+    checkpoints = read_manifest(report_dir)
+
+    def download(entry):
+        path = os.path.join(report_dir, entry.arcname)
+        checkpoint = checkpoints.get(entry.arcname)
+        if (checkpoint and checkpoint['s3_key'] == entry.source and os.path.exists(path)
+                and os.path.getsize(path) == checkpoint['size']):
+            head = s3_client.head_object(Bucket=bucket, Key=entry.source)
+            if (head['ContentLength'], head['ETag']) == (checkpoint['size'], checkpoint['etag']):
+                return None
+        # The response's ETag and length describe exactly the bytes written, so the checkpoint cannot go stale
+        response = s3_client.get_object(Bucket=bucket, Key=entry.source)
+        # Written outside the submission directory until complete, so local_entries never sees a partial file
+        partial_path = os.path.join(report_dir, f".{uuid.uuid4().hex}.part")
+        try:
+            with closing(response['Body']) as body, open(partial_path, 'wb') as target:
+                shutil.copyfileobj(body, target, COPY_CHUNK_SIZE)
+            os.replace(partial_path, path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        return {'file': entry.arcname, 's3_key': entry.source, 'size': response['ContentLength'],
+                'etag': response['ETag']}
+
+    failures = []
+    reused = 0
+    with open(os.path.join(report_dir, MANIFEST_NAME), "a", encoding="utf-8") as manifest, \
+            ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        if manifest.tell():
+            manifest.write("\n")  # Start past a line an earlier attempt may have cut short
+        futures = {pool.submit(download, entry): entry for entry in entries}
+        for done, future in enumerate(as_completed(futures), 1):
+            entry = futures[future]
+            try:
+                checkpoint = future.result()
+            except Exception as e:
+                logger.error("Error downloading file %s: %s", entry.source, str(e))
+                failures.append({'file': entry.arcname, 's3_key': entry.source, 'error': str(e)})
+            else:
+                if checkpoint:
+                    manifest.write(json.dumps(checkpoint) + "\n")
+                    manifest.flush()
+                else:
+                    reused += 1
+            if on_progress:
+                on_progress(done, len(entries))
+    logger.info("Downloaded %d of %d files to %s (%d from an earlier attempt)",
+                len(entries) - len(failures), len(entries), report_dir, reused)
+    return failures
+
+
+def open_s3_entry(s3_client, bucket: str, entry: ArchiveEntry) -> Tuple[io.RawIOBase, int]:
+    """Open an entry stored in S3, returning (stream, size)."""
+    response = s3_client.get_object(Bucket=bucket, Key=entry.source)
+    return response['Body'], response['ContentLength']
+
+
+def open_local_entry(entry: ArchiveEntry) -> Tuple[io.BufferedReader, int]:
+    """Open an entry stored on disk, returning (stream, size)."""
+    return open(entry.source, 'rb'), os.path.getsize(entry.source)
+
+
+def fetch_entries(s3_client, bucket: str, entries: Iterable[ArchiveEntry],
+                  workers: int = DOWNLOAD_WORKERS) -> Dict[str, bytes]:
+    """
+    Read entries from S3 into memory on a bounded thread pool.
+
+    Every file is held in memory at once, so this is only meant for small
+    reports (see report_inline).
+
+    Args:
+        s3_client: boto3 S3 client, with at least `workers` pooled connections
+        bucket: Bucket holding the files
+        entries: Files to read
+        workers: Concurrent reads
+
+    Returns:
+        The contents of the files read, by S3 key; files that could not be read are left out
+    """
+    def fetch(entry):
+        return s3_client.get_object(Bucket=bucket, Key=entry.source)['Body'].read()
+
+    contents = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {pool.submit(fetch, entry): entry for entry in entries}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                contents[entry.source] = future.result()
+            except Exception as e:
+                logger.error("Error fetching file %s: %s", entry.source, str(e))
+    return contents
+
+
+def open_memory_entry(contents: Dict[str, bytes], entry: ArchiveEntry) -> Tuple[io.BytesIO, int]:
+    """Open an entry read by fetch_entries, returning (stream, size)."""
+    data = contents[entry.source]
+    return io.BytesIO(data), len(data)
+
+
+def compress_type_for(content_type: Optional[str], head: bytes = b"") -> int:
+    """
+    Choose how to store an entry.
+
+    Args:
+        content_type: MIME type of the file, if known
+        head: The first MAGIC_BYTES_LENGTH bytes of the file
+
+    Returns:
+        zipfile.ZIP_STORED for already compressed data, otherwise zipfile.ZIP_DEFLATED
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in STORED_CONTENT_TYPES or content_type.startswith("video/"):
+        return zipfile.ZIP_STORED
+    if head.startswith(STORED_MAGIC_BYTES):
+        return zipfile.ZIP_STORED
+    # RIFF....WEBP, and the ISO media family (MP4, MOV, HEIC, AVIF) with `ftyp` at offset 4
+    if (head[:4] == b"RIFF" and head[8:12] == b"WEBP") or head[4:8] == b"ftyp":
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def is_text(content_type: Optional[str]) -> bool:
+    """Whether an entry is text, and so worth compressing on the thread pool."""
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type.startswith("text/") or content_type in TEXT_CONTENT_TYPES
+
+
+def write_items_csv(stream, items: Iterable[dict]) -> None:
+    """Write the items summary CSV, row by row, to a binary stream."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(ITEMS_CSV_HEADER)
+    for item in items:
+        writer.writerow([
+            item.get('number', ''),
+            item.get('room', 'N/A'),
+            item.get('brand_manufacturer', 'N/A'),
+            item.get('model_number', 'N/A'),
+            item.get('description', ''),
+            item.get('original_vendor', 'N/A'),
+            item.get('quantity', 1),
+            item.get('age_years', 'N/A'),
+            item.get('age_months', 'N/A'),
+            item.get('condition', 'N/A'),
+            f"${item.get('unit_cost', 0):.2f}" if item.get('unit_cost') is not None else 'N/A',
+            f"${item.get('total_cost', 0):.2f}" if item.get('total_cost') is not None else 'N/A'
+        ])
+    text.flush()
+    text.detach()
+
+
+def _zip_info(arcname: str, date_time: tuple, compress_type: int = zipfile.ZIP_DEFLATED,
+              size: Optional[int] = None) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(arcname, date_time=date_time)
+    info.compress_type = compress_type
+    info._compresslevel = COMPRESS_LEVEL  # ZipFile.open only applies its own level to entries given by name
+    info.external_attr = 0o644 << 16
+    if size is not None:
+        info.file_size = size  # Lets zipfile decide whether the entry needs ZIP64 sizes
+    return info
+
+
+def _compress_entry(entry: ArchiveEntry, open_entry: Callable) -> tuple:
+    """
+    Read and deflate a text entry on a worker thread.
+
+    Returns ("deflated", data, crc, size), or ("stream", source, size) for an
+    entry too large to hold in memory, which the writer then streams itself.
+    """
+    source, size = open_entry(entry)
+    if size > PARALLEL_MAX_BYTES:
+        return "stream", source, size
+    with closing(source):
+        raw = source.read()
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -15)
+    return "deflated", compressor.compress(raw) + compressor.flush(), zlib.crc32(raw), len(raw)
+
+
+def _write_deflated(archive: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes, crc: int, size: int) -> None:
+    """
+    Append an entry whose data was deflated elsewhere.
+
+    Mirrors what ZipFile does when an entry is closed: the sizes and CRC are
+    known up front, so the local header carries them and no descriptor follows.
+    """
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.flag_bits = 0
+    info.CRC, info.compress_size, info.file_size = crc, len(data), size
+    info.header_offset = archive.fp.tell()
+    archive.fp.write(info.FileHeader())
+    archive.fp.write(data)
+    archive.start_dir = archive.fp.tell()
+    archive.filelist.append(info)
+    archive.NameToInfo[info.filename] = info
+
+
+def _stream_entry(archive: zipfile.ZipFile, entry: ArchiveEntry, source, size: int, date_time: tuple) -> None:
+    """Copy an open source into the archive, sniffing its first bytes to choose the compression."""
+    with closing(source):
+        head = source.read(MAGIC_BYTES_LENGTH)
+        info = _zip_info(entry.arcname, date_time, compress_type_for(entry.content_type, head), size)
+        with archive.open(info, 'w') as target:
+            target.write(head)
+            shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+
+
+def _write_entries(archive: zipfile.ZipFile, entries: Iterable[ArchiveEntry], open_entry: Callable,
+                   workers: int, date_time: tuple) -> List[str]:
+    """Write entries in order, compressing text entries on a thread pool when `workers` is set."""
+    skipped = []
+
+    def write_next(window):
+        entry, future = window.popleft()
+        try:
+            if future:
+                kind, data, *rest = future.result()
+            else:
+                kind, data, *rest = ("stream", *open_entry(entry))
+        except Exception as e:
+            logger.error("Skipping %s, could not open %s: %s", entry.arcname, entry.source, str(e))
+            skipped.append(entry.arcname)
+            return
+        if kind == "deflated":
+            _write_deflated(archive, _zip_info(entry.arcname, date_time), data, *rest)
+        else:
+            _stream_entry(archive, entry, data, rest[0], date_time)
+
+    with ThreadPoolExecutor(max_workers=workers) if workers > 0 else nullcontext() as pool:
+        window = deque()
+        for entry in entries:
+            future = pool.submit(_compress_entry, entry, open_entry) if pool and is_text(entry.content_type) else None
+            window.append((entry, future))
+            # Write entries as soon as they are ready, waiting only when the look-ahead is full
+            while window and (window[0][1] is None or window[0][1].done() or len(window) > 2 * workers):
+                write_next(window)
+        while window:
+            write_next(window)
+    return skipped
+
+
+def write_archive(fileobj, entries: Iterable[ArchiveEntry], items: Iterable[dict],
+                  open_entry: Callable[[ArchiveEntry], Tuple[object, int]],
+                  workers: int = COMPRESS_WORKERS) -> List[str]:
+    """
+    Write a report archive to a (possibly non-seekable) file object.
+
+    The items summary CSV comes first, followed by every entry copied from its
+    source in COPY_CHUNK_SIZE reads. An entry whose source cannot be opened is
+    skipped; a failure once an entry has started aborts the archive.
+
+    With `workers`, text entries are read and deflated on a thread pool up to
+    2 * workers entries ahead of the writer, which keeps the archive order.
+
+    Args:
+        fileobj: Destination, e.g. an S3MultipartWriter
+        entries: Files to add
+        items: Report items for the summary CSV
+        open_entry: Returns (stream, size) for an entry
+        workers: Threads compressing text entries (0 to compress inline)
+
+    Returns:
+        Archive names of the skipped entries
+    """
+    date_time = datetime.now(timezone.utc).timetuple()[:6]
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED, allowZip64=True,
+                         compresslevel=COMPRESS_LEVEL) as archive:
+        with archive.open(_zip_info(f"{SUBMISSION_DIR}/{ITEMS_CSV_NAME}", date_time), 'w') as target:
+            write_items_csv(target, items)
+        return _write_entries(archive, entries, open_entry, workers, date_time)
+
+
+# ZipInfo fields a central directory record is written from
+_SEGMENT_INFO_FIELDS = ("filename", "date_time", "compress_type", "CRC", "compress_size", "file_size",
+                        "header_offset", "flag_bits", "external_attr", "create_system", "create_version",
+                        "extract_version")
+
+
+class _SegmentSink:
+    """Passes writes through until sealed, then only counts them (drops the central directory)."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.position = 0
+        self.sealed = False
+
+    def write(self, data) -> int:
+        if not self.sealed:
+            self.fileobj.write(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+
+def write_segment(fileobj, entries: Iterable[ArchiveEntry], open_entry: Callable[[ArchiveEntry], Tuple[object, int]],
+                  workers: int = COMPRESS_WORKERS) -> Tuple[List[dict], List[str], int]:
+    """
+    Write the entries of one shard of a report archive, without a central directory.
+
+    Segments written by several workers are concatenated by finish_archive.
+
+    Returns:
+        (entry records for finish_archive, archive names of the skipped entries, segment size in bytes)
+    """
+    date_time = datetime.now(timezone.utc).timetuple()[:6]
+    sink = _SegmentSink(fileobj)
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED, allowZip64=True,
+                         compresslevel=COMPRESS_LEVEL) as archive:
+        skipped = _write_entries(archive, entries, open_entry, workers, date_time)
+        size = sink.tell()
+        sink.sealed = True
+        records = [{field: getattr(info, field) for field in _SEGMENT_INFO_FIELDS} for info in archive.filelist]
+    return records, skipped, size
+
+
+def finish_archive(fileobj, segments: Iterable[Tuple[int, List[dict]]], items: Iterable[dict]) -> None:
+    """
+    Complete an archive whose entry data has already been written to `fileobj`.
+
+    Appends the items summary CSV and the central directory for the segment
+    entries followed by the CSV. `fileobj.tell()` must give the size of the
+    segments written so far.
+
+    Args:
+        fileobj: Destination holding the concatenated segments, e.g. an S3MultipartWriter
+        segments: (offset of the segment in the archive, entry records from write_segment), in order
+        items: Report items for the summary CSV
+    """
+    date_time = datetime.now(timezone.utc).timetuple()[:6]
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED, allowZip64=True,
+                         compresslevel=COMPRESS_LEVEL) as archive:
+        for offset, records in segments:
+            for record in records:
+                info = zipfile.ZipInfo(record["filename"], date_time=tuple(record["date_time"]))
+                for field in _SEGMENT_INFO_FIELDS[2:]:
+                    setattr(info, field, record[field])
+                info.header_offset += offset
+                archive.filelist.append(info)
+                archive.NameToInfo[info.filename] = info
+        with archive.open(_zip_info(f"{SUBMISSION_DIR}/{ITEMS_CSV_NAME}", date_time), 'w') as target:
+            write_items_csv(target, items)
@@ -0,0 +1,151 @@
+"""
+Report Data Artifacts
+
+aggregate_report writes the data of a report to S3 once, as gzip'd JSON
+lines keyed by report ID, and the pipeline messages only carry a pointer to
+it. This keeps messages far below the SQS size limit for any claim, and lets
+each stage stream just the part of the report it needs:
+
+    ```
+    pointer = write_report_data(s3_client, REPORTS_BUCKET_NAME, report_id, claim.build_report_data(session))
+    ...
+    report = ReportDataStream(s3_client, pointer)
+    for item in report.items(): ...
+    for file in report.files(): ...
+    ```
+
+The artifact holds one JSON object per line: `{"claim": {...}}` first, then
+one `{"item": {...}}` per item in report order, then one `{"file": {...}}`
+per file. The pointer is `{"bucket", "key", "sha256", "items", "files"}`,
+where `sha256` is the digest of the compressed artifact.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import tempfile
+from typing import Iterator, Optional, Tuple
+
+from models.report_data import ReportData
+
+logger = logging.getLogger()
+
+ARTIFACT_PREFIX = "report-data"
+# Artifacts up to this size are built in memory, larger ones spill to /tmp
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def artifact_key(report_id: str) -> str:
+    """The S3 key of a report's data artifact."""
+    return f"{ARTIFACT_PREFIX}/{report_id}.jsonl.gz"
+
+
+def _line(kind: str, value: dict) -> bytes:
+    return json.dumps({kind: value}, separators=(',', ':'), default=str).encode('utf-8') + b"\n"
+
+
+def write_report_data(s3_client, bucket: str, report_id: str, report_data: ReportData) -> dict:
+    """
+    Write a report's data artifact to S3.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Bucket to write to
+        report_id: Report the data belongs to
+        report_data: Records from Claim.build_report_data
+
+    Returns:
+        The pointer to pass to ReportDataStream
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as artifact:
+        with gzip.GzipFile(fileobj=artifact, mode='wb', mtime=0) as lines:
+            lines.write(_line("claim", report_data.claim))
+            for item in report_data.items:
+                lines.write(_line("item", item.to_dict()))
+            for file in report_data.files:
+                lines.write(_line("file", file.to_dict()))
+
+        artifact.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: artifact.read(1024 * 1024), b""):
+            digest.update(chunk)
+        artifact.seek(0)
+
+        key = artifact_key(report_id)
+        s3_client.upload_fileobj(artifact, bucket, key, ExtraArgs={'ContentType': 'application/gzip'})
+
+    logger.info("Wrote report data for %s to s3://%s/%s", report_id, bucket, key)
+    return {
+        'bucket': bucket,
+        'key': key,
+        'sha256': digest.hexdigest(),
+        'items': len(report_data.items),
+        'files': len(report_data.files)
+    }
+
+
+class _HashingReader:
+    """Wraps a stream, hashing every byte read from it."""
+
+    def __init__(self, stream, digest):
+        self.stream = stream
+        self.digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.digest.update(data)
+        return data
+
+
+class ReportDataStream:
+    """
+    Reads a report's data artifact from S3 as a stream.
+
+    The claim is read on open. `items()` and `files()` then yield their
+    records in order and must be consumed in that order; a section that is
+    not needed can be skipped by calling the next one. The checksum is checked
+    once the artifact has been read to the end.
+
+    Attributes:
+        claim (dict): Claim fields shown on the report
+        item_count (int): Number of items in the report
+        file_count (int): Number of files in the report
+    """
+
+    def __init__(self, s3_client, pointer: dict):
+        self.pointer = pointer
+        self.item_count = pointer.get('items')
+        self.file_count = pointer.get('files')
+        body = s3_client.get_object(Bucket=pointer['bucket'], Key=pointer['key'])['Body']
+        self._digest = hashlib.sha256()
+        self._records = self._read(body)
+        self._next: Optional[Tuple[str, dict]] = next(self._records, None)
+        if not self._next or self._next[0] != "claim":
+            raise ValueError(f"Report data {pointer['key']} does not start with the claim")
+        self.claim = self._next[1]
+        self._next = next(self._records, None)
+
+    def _read(self, body) -> Iterator[Tuple[str, dict]]:
+        with gzip.GzipFile(fileobj=_HashingReader(body, self._digest), mode='rb') as lines:
+            for line in lines:
+                (kind, value), = json.loads(line).items()
+                yield kind, value
+        if self._digest.hexdigest() != self.pointer['sha256']:
+            raise ValueError(f"Report data {self.pointer['key']} does not match its checksum")
+
+    def _section(self, kind: str) -> Iterator[dict]:
+        while self._next and self._next[0] != kind and self._next[0] != "file":
+            self._next = next(self._records, None)  # Skip the items when only the files are wanted
+        while self._next and self._next[0] == kind:
+            value = self._next[1]
+            self._next = next(self._records, None)
+            yield value
+
+    def items(self) -> Iterator[dict]:
+        """Yield the item records in report order."""
+        return self._section("item")
+
+    def files(self) -> Iterator[dict]:
+        """Yield the file records."""
+        return self._section("file")
@@ -0,0 +1,69 @@
+"""
+Inline Reports
+
+A FULL report of a small claim is built within the request instead of going
+through the aggregate, organize and zip stages: its files are read from S3 in
+parallel into memory, zipped in memory and uploaded in one request, so the
+report is emailed seconds after it is asked for rather than after four queue
+hops and cold starts.
+
+Claims are small when Claim.report_size finds at most REPORT_INLINE_MAX_FILES
+files of known size totalling at most REPORT_INLINE_MAX_MB. Larger claims
+keep the queued pipeline.
+"""
+
+import io
+import logging
+import os
+from datetime import datetime, timezone
+from functools import partial
+from typing import List, Optional, Tuple
+
+from models.report_data import ReportData
+from reports import report_archive
+
+logger = logging.getLogger()
+
+# Largest claim, in files and MiB of files, built within the request
+INLINE_MAX_FILES = int(os.getenv("REPORT_INLINE_MAX_FILES", "25"))
+INLINE_MAX_BYTES = int(os.getenv("REPORT_INLINE_MAX_MB", "64")) * 1024 * 1024
+# Concurrent S3 reads of the claim files
+FETCH_WORKERS = int(os.getenv("REPORT_INLINE_FETCH_WORKERS", "8"))
+
+
+def is_small(file_count: int, file_bytes: Optional[int]) -> bool:
+    """Whether a claim measured by Claim.report_size is built within the request."""
+    return file_count <= INLINE_MAX_FILES and file_bytes is not None and file_bytes <= INLINE_MAX_BYTES
+
+
+def write_report(s3_client, reports_bucket: str, files_bucket: str, report,
+                 report_data: ReportData) -> Tuple[str, List[str]]:
+    """
+    Build a small FULL report in memory and upload it.
+
+    Args:
+        s3_client: boto3 S3 client, with at least FETCH_WORKERS pooled connections
+        reports_bucket: Bucket the report is uploaded to
+        files_bucket: Bucket holding the claim files
+        report: The Report being delivered
+        report_data: Records from Claim.build_report_data
+
+    Returns:
+        (S3 key of the report, archive names of the files that could not be read)
+    """
+    data = report_data.to_dict()
+    entries = report_archive.plan_entries(data)
+    contents = report_archive.fetch_entries(s3_client, files_bucket, entries, FETCH_WORKERS)
+
+    archive = io.BytesIO()
+    skipped = report_archive.write_archive(
+        archive, entries, data['items'], partial(report_archive.open_memory_entry, contents)
+    )
+
+    title = (report_data.claim.get('title') or "claim").replace(' ', '_')
+    filename = f"claim_report_{title}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
+    s3_key = f"reports/{report.household_id}/{report.claim_id}/{filename}"
+    s3_client.put_object(Bucket=reports_bucket, Key=s3_key, Body=archive.getvalue(), ContentType="application/zip")
+    logger.info("Uploaded report of %d files (%d skipped) to s3://%s/%s", len(entries), len(skipped),
+                reports_bucket, s3_key)
+    return s3_key, skipped
@@ -0,0 +1,116 @@
+"""
+Report Shards
+
+A claim too big for one report zipper invocation is split into shards that
+are zipped in parallel and then joined:
+
+    1. aggregate_report plans the shards with plan_shards and queues one shard
+       message per shard for the report zipper.
+    2. Each shard worker writes its files as an archive segment (see
+       report_archive.write_segment) to `segment_key`, the segment's entry
+       records to `records_key`, and marks its shard complete on the Report.
+    3. The worker completing the last shard queues a finalize message. The
+       zipper then copies the segments server side into the final archive and
+       appends the items summary CSV and the central directory.
+
+Shard state lives on the Report row: `shard_count`, `shards_completed` and
+`shard_state` ({shard: {"size", "skipped"}}), updated under a row lock so
+exactly one worker sees the last shard complete.
+"""
+
+import os
+import uuid
+from typing import Dict, List, Optional
+
+from models.report import Report
+from reports.report_archive import ArchiveEntry
+
+# Bytes of files per shard; claims within one shard are zipped in a single invocation
+SHARD_BYTES = int(os.getenv("REPORT_SHARD_MB", "2048")) * 1024 * 1024
+# "room" keeps the files of a room in one shard where they fit, "bytes" only fills shards in file order
+SHARD_BY = os.getenv("REPORT_SHARD_BY", "room")
+SHARD_PREFIX = "report-shards"
+
+
+def segment_key(report_id: str, shard: int) -> str:
+    """The S3 key of a shard's archive segment."""
+    return f"{SHARD_PREFIX}/{report_id}/{shard}.zip"
+
+
+def records_key(report_id: str, shard: int) -> str:
+    """The S3 key of a shard's entry records."""
+    return f"{SHARD_PREFIX}/{report_id}/{shard}.json"
+
+
+def plan_shards(entries: List[ArchiveEntry], budget: int = SHARD_BYTES, by: str = SHARD_BY) -> List[List[int]]:
+    """
+    Split archive entries into shards of at most `budget` bytes of files.
+
+    With `by="room"` the entries of a room (archive directory) stay together
+    unless the room alone exceeds the budget, in which case it is split. A
+    single file larger than the budget gets a shard of its own. Files of
+    unknown size count as empty.
+
+    Args:
+        entries: The planned archive entries (see report_archive.plan_files)
+        budget: Bytes of files per shard
+        by: "room" or "bytes"
+
+    Returns:
+        Indices into `entries` for each shard, in archive order
+    """
+    if by == "room":
+        groups: Dict[str, List[int]] = {}
+        for index, entry in enumerate(entries):
+            groups.setdefault(entry.arcname.rsplit("/", 1)[0], []).append(index)
+        groups = list(groups.values())
+    else:
+        groups = [list(range(len(entries)))]
+
+    shards, shard, shard_bytes = [], [], 0
+    for group in groups:
+        group_bytes = sum(entries[index].size or 0 for index in group)
+        if shard and shard_bytes + group_bytes > budget:
+            shards.append(shard)
+            shard, shard_bytes = [], 0
+        for index in group:
+            size = entries[index].size or 0
+            if shard and shard_bytes + size > budget:
+                shards.append(shard)
+                shard, shard_bytes = [], 0
+            shard.append(index)
+            shard_bytes += size
+    if shard or not shards:
+        shards.append(shard)
+    return shards
+
+
+def start_shards(report: Report, count: int) -> None:
+    """Reset a report's shard state before its shards are queued."""
+    report.shard_count = count
+    report.shards_completed = 0
+    report.shard_state = {}
+
+
+def complete_shard(session, report_id: str, shard: int, size: int, skipped: List[str]) -> Optional[Report]:
+    """
+    Record a shard as complete.
+
+    Locks the report row so concurrent workers see each other's completions.
+    The locked row is re-read even if the session already holds the report,
+    since a copy loaded before the lock may miss another shard's completion.
+    A shard already recorded (a redelivered message) is not counted twice.
+
+    Returns:
+        The locked report if this call completed its last shard, else None
+    """
+    report = session.query(Report).filter(
+        Report.id == uuid.UUID(report_id)
+    ).with_for_update().populate_existing().one()
+    state = dict(report.shard_state or {})
+    if str(shard) in state:
+        return None
+    state[str(shard)] = {"size": size, "skipped": skipped}
+    report.shard_state = state  # Reassigned so the JSON change is detected
+    report.shards_completed = len(state)
+    return report if report.shards_completed == report.shard_count else None
@@ -0,0 +1,102 @@
+"""
+Report Summaries
+
+SUMMARY and CSV_ONLY reports list a claim's items without collecting its
+photos, so request_report builds them within the request from a single items
+query, uploads them and queues the email, skipping the aggregate, organize
+and zip stages (and EFS) altogether:
+
+    - CSV_ONLY: the items summary CSV on its own
+    - SUMMARY: a zip of the items summary CSV and an HTML item schedule
+"""
+
+import html
+import io
+import logging
+import zipfile
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from models.report import ReportType
+from models.report_data import ReportData
+from reports import report_archive
+
+logger = logging.getLogger()
+
+SCHEDULE_HTML_NAME = "items_schedule.html"
+
+
+def _money(value) -> str:
+    return f"${value:.2f}" if value is not None else "N/A"
+
+
+def items_schedule_html(claim: dict, items: List[dict]) -> bytes:
+    """Render the item schedule of a claim as a standalone HTML page."""
+    columns = ("number", "room", "description", "brand_manufacturer", "model_number", "quantity", "condition")
+    rows = "".join(
+        "<tr>"
+        + "".join(f"<td>{html.escape(str(item[column]))}</td>" for column in columns)
+        + f"<td>{_money(item['unit_cost'])}</td><td>{_money(item['total_cost'])}</td></tr>\n"
+        for item in items
+    )
+    total = sum(item['total_cost'] for item in items if item['total_cost'] is not None)
+    title = html.escape(claim.get('title') or "Claim")
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{title} - Item Schedule</title></head><body>\n"
+        f"<h1>{title}</h1>\n<p>Date of loss: {html.escape(claim.get('date_of_loss') or 'N/A')}</p>\n"
+        "<table border=\"1\" cellspacing=\"0\" cellpadding=\"4\">\n<tr>"
+        + "".join(f"<th>{html.escape(heading)}</th>" for heading in (
+            "Item #", "Room", "Description", "Brand or Manufacturer", "Model#", "Quantity", "Condition",
+            "Unit Cost", "Total Cost"))
+        + "</tr>\n" + rows
+        + f"</table>\n<p>{len(items)} items, total {_money(total)}</p>\n</body></html>\n"
+    ).encode("utf-8")
+
+
+def build_summary(report_type: str, report_data: ReportData) -> Tuple[bytes, str, str]:
+    """
+    Build a SUMMARY or CSV_ONLY report in memory.
+
+    Args:
+        report_type: ReportType.SUMMARY or ReportType.CSV_ONLY value
+        report_data: Records from Claim.build_report_data (the files are not used)
+
+    Returns:
+        (report body, file extension, content type)
+    """
+    items = [item.to_dict() for item in report_data.items]
+    csv_data = io.BytesIO()
+    report_archive.write_items_csv(csv_data, items)
+    if report_type == ReportType.CSV_ONLY.value:
+        return csv_data.getvalue(), "csv", "text/csv"
+
+    archive_data = io.BytesIO()
+    with zipfile.ZipFile(archive_data, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{report_archive.SUBMISSION_DIR}/{report_archive.ITEMS_CSV_NAME}", csv_data.getvalue())
+        archive.writestr(f"{report_archive.SUBMISSION_DIR}/{SCHEDULE_HTML_NAME}",
+                         items_schedule_html(report_data.claim, items))
+    return archive_data.getvalue(), "zip", "application/zip"
+
+
+def write_summary(s3_client, bucket: str, report, report_data: ReportData) -> str:
+    """
+    Build a SUMMARY or CSV_ONLY report and upload it next to the claim's full reports.
+
+    Args:
+        s3_client: boto3 S3 client
+        bucket: Reports bucket
+        report: The Report being delivered
+        report_data: Records from Claim.build_report_data
+
+    Returns:
+        The S3 key of the uploaded report
+    """
+    body, extension, content_type = build_summary(report.report_type, report_data)
+    title = (report_data.claim.get('title') or "claim").replace(' ', '_')
+    filename = f"claim_summary_{title}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.{extension}"
+    s3_key = f"reports/{report.household_id}/{report.claim_id}/{filename}"
+    s3_client.put_object(Bucket=bucket, Key=s3_key, Body=body, ContentType=content_type)
+    logger.info("Uploaded %s report of %d items to s3://%s/%s", report.report_type, len(report_data.items),
+                bucket, s3_key)
+    return s3_key
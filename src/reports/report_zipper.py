@@ -2,7 +2,13 @@
 Report Zipper Handler
 
 This module processes messages from the file organization queue,
-zips the organized files, uploads them to S3, and sends the report details to an email queue.
+streams the report files (from S3, or from EFS when they were staged there) into a zip
+file uploaded to S3 in parts, and queues the report details for an email queue
+through the transactional outbox.
+
+Large claims arrive as one message per shard instead (see report_shards): each shard
+is written as an archive segment, and the worker completing the last shard queues a
+finalize message that joins the segments into the report archive.
 """
 
 import os
@@ -11,13 +17,14 @@ import logging
 import uuid
 import boto3
 import shutil
-import zipfile
-import csv
 from datetime import datetime, timezone
+from functools import partial
 from database.database import get_db_session
 from models.report import Report, ReportStatus
 from models.user import User
 from models.claim import Claim
+from utils import outbox
+from reports import report_archive, report_artifact, report_shards
 
 # Configure logging
 logger = logging.getLogger()
@@ -25,12 +32,103 @@ logger.setLevel(logging.INFO)
 
 # Initialize AWS clients
 s3_client = boto3.client('s3')
-sqs_client = boto3.client('sqs')
 
 # Get environment variables
 REPORTS_BUCKET_NAME = os.environ.get('REPORTS_BUCKET_NAME')
+S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME')
 EFS_MOUNT_PATH = os.environ.get('EFS_MOUNT_PATH', '/mnt/reports')
 EMAIL_QUEUE_URL = os.environ.get('EMAIL_QUEUE_URL')
+DELIVER_REPORT_QUEUE_URL = os.environ.get('DELIVER_REPORT_QUEUE_URL')
+
+
+def write_shard(report_id, report_data_ref, shard, shard_plan):
+    """
+    Write one shard of a sharded report as an archive segment.
+    
+    Parameters
+    ----------
+    report_id : str
+        The report the shard belongs to
+    report_data_ref : dict
+        Pointer to the report data artifact
+    shard : int
+        Index of the shard
+    shard_plan : dict
+        The "budget" and "by" the shards were planned with
+    
+    Returns
+    -------
+    tuple
+        (segment size in bytes, archive names of the skipped files)
+    """
+    report_data = report_artifact.ReportDataStream(s3_client, report_data_ref)
+    items = {}
+    for _ in report_archive.index_items(report_data.items(), items):
+        pass
+    entries = list(report_archive.plan_files(report_data.files(), items))
+    shards = report_shards.plan_shards(
+        entries,
+        shard_plan.get('budget', report_shards.SHARD_BYTES),
+        shard_plan.get('by', report_shards.SHARD_BY)
+    )
+    
+    logger.info("Writing shard %d of %d (%d files) for report %s", shard + 1, len(shards), len(shards[shard]), report_id)
+    open_entry = partial(report_archive.open_s3_entry, s3_client, S3_BUCKET_NAME)
+    segment_key = report_shards.segment_key(report_id, shard)
+    with report_archive.S3MultipartWriter(s3_client, REPORTS_BUCKET_NAME, segment_key) as upload:
+        records, skipped, size = report_archive.write_segment(
+            upload, (entries[index] for index in shards[shard]), open_entry
+        )
+    s3_client.put_object(
+        Bucket=REPORTS_BUCKET_NAME,
+        Key=report_shards.records_key(report_id, shard),
+        Body=json.dumps(records).encode('utf-8'),
+        ContentType='application/json'
+    )
+    return size, skipped
+
+
+def finish_shards(report, report_data_ref, s3_key):
+    """
+    Join the segments of a sharded report into its archive at `s3_key`.
+    
+    The segments are copied server side in shard order, then the items summary
+    CSV and the central directory are appended.
+    
+    Returns
+    -------
+    list
+        Archive names of the files the shards skipped
+    """
+    report_id = str(report.id)
+    shard_state = report.shard_state or {}
+    with report_archive.S3MultipartWriter(s3_client, REPORTS_BUCKET_NAME, s3_key) as upload:
+        offsets = []
+        for shard in range(report.shard_count):
+            offsets.append(upload.tell())
+            upload.copy_from(REPORTS_BUCKET_NAME, report_shards.segment_key(report_id, shard),
+                             shard_state[str(shard)]['size'])
+        segments = (
+            (offset, json.loads(s3_client.get_object(
+                Bucket=REPORTS_BUCKET_NAME, Key=report_shards.records_key(report_id, shard)
+            )['Body'].read()))
+            for shard, offset in enumerate(offsets)
+        )
+        report_archive.finish_archive(
+            upload, segments, report_artifact.ReportDataStream(s3_client, report_data_ref).items()
+        )
+    return [name for shard in range(report.shard_count) for name in shard_state[str(shard)]['skipped']]
+
+
+def delete_shards(report):
+    """Delete the segments and entry records of a sharded report once its archive is complete."""
+    keys = [key for shard in range(report.shard_count or 0)
+            for key in (report_shards.segment_key(str(report.id), shard), report_shards.records_key(str(report.id), shard))]
+    for start in range(0, len(keys), 1000):
+        s3_client.delete_objects(
+            Bucket=REPORTS_BUCKET_NAME,
+            Delete={'Objects': [{'Key': key} for key in keys[start:start + 1000]], 'Quiet': True}
+        )
 
 def lambda_handler(event, context):
     """
@@ -66,11 +164,14 @@ def lambda_handler(event, context):
                 
                 # Extract message data
                 report_id = message_body.get('report_id')
-                report_dir = message_body.get('report_dir')
-                report_data = message_body.get('report_data', {})  # Get the structured report data
+                report_dir = message_body.get('report_dir')  # Only set when the files were staged on EFS
+                report_data_ref = message_body.get('report_data_ref')  # Pointer to the structured report data
                 email_address = message_body.get('email_address')
+                failed_files = message_body.get('failed_files', [])  # Files organize could not stage on EFS
+                shard = message_body.get('shard')  # Set for one shard of a sharded report
+                finalize = message_body.get('finalize', False)  # Set to join the shards of a sharded report
                 
-                if not report_id or not report_dir:
+                if not report_id or not report_data_ref:
                     logger.error("Required parameters not found in message")
                     continue
                 
@@ -90,10 +191,16 @@ def lambda_handler(event, context):
                     if not report:
                         logger.error("Report with ID %s not found", report_id)
                         continue
-                    
+
+                    if (shard is not None or finalize) and ReportStatus(report.status) in (ReportStatus.FAILED, ReportStatus.COMPLETED):
+                        # Another shard failed, or this is a redelivery; leave the report as it is
+                        logger.info("Report %s is already %s, skipping", report_id, report.status)
+                        continue
+
                     logger.info("Updating report status to DELIVERING")
                     # Update report status
                     report.update_status(ReportStatus.DELIVERING)
+                    outbox.record_delivery(session, record)
                     session.commit()
                     
                     logger.info("Getting user and claim information")
@@ -108,97 +215,76 @@ def lambda_handler(event, context):
                         session.commit()
                         continue
                     
-                    logger.info("Getting submission directory path")
-                    # Get the submission directory path
-                    submission_dir = os.path.join(report_dir, "submission")
-                    
-                    if not os.path.exists(submission_dir):
-                        error_msg = "Submission directory not found"
-                        logger.error("%s: %s", error_msg, submission_dir)
-                        report.update_status(ReportStatus.FAILED, error_msg)
-                        session.commit()
-                        continue
-                    
-                    try:
-                        logger.info("Generating CSV file from structured data")
-                        # Generate CSV file from the structured data
-                        # Items summary CSV
-                        items_path = os.path.join(submission_dir, 'items_summary.csv')
-                        with open(items_path, 'w', newline='') as csvfile:
-                            writer = csv.writer(csvfile)
-                            writer.writerow([
-                                'Item #', 
-                                'Room', 
-                                'Brand or Manufacturer', 
-                                'Model#', 
-                                'Item Description', 
-                                'Original Vendor', 
-                                'Quantity Lost', 
-                                'Item Age (Years)', 
-                                'Item Age (Months)', 
-                                'Condition', 
-                                'Cost to Replace Pre-Tax (each)', 
-                                'Total Cost'
-                            ])
-                            
-                            for item in report_data.get('items', []):
-                                writer.writerow([
-                                    item.get('number', ''),
-                                    item.get('room', 'N/A'),
-                                    item.get('brand_manufacturer', 'N/A'),
-                                    item.get('model_number', 'N/A'),
-                                    item.get('description', ''),
-                                    item.get('original_vendor', 'N/A'),
-                                    item.get('quantity', 1),
-                                    item.get('age_years', 'N/A'),
-                                    item.get('age_months', 'N/A'),
-                                    item.get('condition', 'N/A'),
-                                    f"${item.get('unit_cost', 0):.2f}" if item.get('unit_cost') is not None else 'N/A',
-                                    f"${item.get('total_cost', 0):.2f}" if item.get('total_cost') is not None else 'N/A'
-                                ])
-                    except Exception as e:
-                        error_msg = f"Error generating CSV file: {str(e)}"
+                    if not REPORTS_BUCKET_NAME:
+                        error_msg = "REPORTS_BUCKET_NAME environment variable not set"
                         logger.error(error_msg)
                         report.update_status(ReportStatus.FAILED, error_msg)
                         session.commit()
                         continue
                     
-                    try:
-                        # Create zip file
-                        zip_filename = f"claim_report_{claim.title.replace(' ', '_')}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
-                        zip_path = os.path.join(report_dir, zip_filename)
-                        logger.info("Creating zip file at %s", zip_path)
-                        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                            for root, dirs, files in os.walk(submission_dir):
-                                for file in files:
-                                    file_path = os.path.join(root, file)
-                                    # Create relative path for the zip file - preserve the submission directory structure
-                                    arcname = os.path.relpath(file_path, os.path.dirname(submission_dir))
-                                    zipf.write(file_path, arcname)
-                    except Exception as e:
-                        error_msg = f"Error creating zip file: {str(e)}"
-                        logger.error(error_msg)
-                        report.update_status(ReportStatus.FAILED, error_msg)
+                    if shard is not None:
+                        try:
+                            size, skipped = write_shard(report_id, report_data_ref, shard, message_body.get('shard_plan', {}))
+                        except Exception as e:
+                            error_msg = f"Error creating zip file shard {shard}: {str(e)}"
+                            logger.error(error_msg)
+                            report.update_status(ReportStatus.FAILED, error_msg)
+                            session.commit()
+                            continue
+                        
+                        # Record the shard and, once all are complete, queue the finalize message in the same transaction
+                        completed = report_shards.complete_shard(session, report_id, shard, size, skipped)
+                        message_id = None
+                        if completed and ReportStatus(completed.status) != ReportStatus.FAILED:
+                            finalize_message = {
+                                'report_id': report_id,
+                                'report_data_ref': report_data_ref,
+                                'email_address': email_address,
+                                'finalize': True,
+                                'timestamp': datetime.now(timezone.utc).isoformat()
+                            }
+                            message_id = outbox.enqueue(session, DELIVER_REPORT_QUEUE_URL, finalize_message, {'ReportId': report_id})
                         session.commit()
+                        if message_id:
+                            outbox.flush(session, [message_id])
+                        logger.info("Shard %s completed for report ID: %s", shard, report_id)
                         continue
                     
-                    try:
-                        # Upload zip file to S3
-                        s3_key = f"reports/{report.household_id}/{report.claim_id}/{zip_filename}"
-                        logger.info("Uploading zip file to S3 at %s", s3_key)
-                        
-                        if not REPORTS_BUCKET_NAME:
-                            error_msg = "REPORTS_BUCKET_NAME environment variable not set"
-                            logger.error(error_msg)
+                    # Stream the report data: the items feed the CSV (and the item index), then the files
+                    report_data = report_artifact.ReportDataStream(s3_client, report_data_ref)
+                    items = {}
+                    if finalize:
+                        entries, open_entry = None, None
+                    elif report_dir:
+                        # Files were staged on EFS by organize_report_files
+                        submission_dir = os.path.join(report_dir, report_archive.SUBMISSION_DIR)
+                        if not os.path.exists(submission_dir):
+                            error_msg = "Submission directory not found"
+                            logger.error("%s: %s", error_msg, submission_dir)
                             report.update_status(ReportStatus.FAILED, error_msg)
                             session.commit()
                             continue
-                            
-                        s3_client.upload_file(
-                            zip_path,
-                            REPORTS_BUCKET_NAME,
-                            s3_key
-                        )
+                        entries = report_archive.local_entries(report_dir)
+                        open_entry = report_archive.open_local_entry
+                    else:
+                        entries = report_archive.plan_files(report_data.files(), items)
+                        open_entry = partial(report_archive.open_s3_entry, s3_client, S3_BUCKET_NAME)
+                    
+                    try:
+                        # Stream the zip file, items summary CSV included, into a multipart upload
+                        zip_filename = f"claim_report_{claim.title.replace(' ', '_')}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.zip"
+                        s3_key = f"reports/{report.household_id}/{report.claim_id}/{zip_filename}"
+                        logger.info("Streaming %s files into zip file at %s", report_data.file_count, s3_key)
+                        if finalize:
+                            skipped = finish_shards(report, report_data_ref, s3_key)
+                        else:
+                            with report_archive.S3MultipartWriter(s3_client, REPORTS_BUCKET_NAME, s3_key) as upload:
+                                skipped = report_archive.write_archive(
+                                    upload, entries, report_archive.index_items(report_data.items(), items), open_entry
+                                )
+                        skipped += [failed['file'] for failed in failed_files]
+                        if skipped:
+                            warnings.append(f"Report {report_id} is missing {len(skipped)} files: {', '.join(skipped)}")
                         
                         # Generate a pre-signed URL for the report
                         presigned_url = s3_client.generate_presigned_url(
@@ -211,18 +297,13 @@ def lambda_handler(event, context):
                         )
                         logger.info("Generated presigned URL: %s", presigned_url)
                     except Exception as e:
-                        error_msg = f"Error uploading to S3: {str(e)}"
+                        error_msg = f"Error creating zip file: {str(e)}"
                         logger.error(error_msg)
                         report.update_status(ReportStatus.FAILED, error_msg)
                         session.commit()
                         continue
                     
-                    # Update report with S3 key
-                    report.s3_key = s3_key
-                    report.update_status(ReportStatus.COMPLETED)
-                    session.commit()
-                    
-                    # Send message to email queue
+                    # Update report with S3 key and queue the email message in the same transaction
                     email_message = {
                         "report_id": str(report_id),
                         "presigned_url": presigned_url,
@@ -231,32 +312,32 @@ def lambda_handler(event, context):
                         "claim_title": claim.title
                     }
                     
+                    report.s3_key = s3_key
+                    report.update_status(ReportStatus.COMPLETED)
+                    message_id = None
                     if EMAIL_QUEUE_URL:
-                        try:
-                            logger.info("Sending message to email queue: %s", EMAIL_QUEUE_URL)
-                            response = sqs_client.send_message(
-                                QueueUrl=EMAIL_QUEUE_URL,
-                                MessageBody=json.dumps(email_message)
-                            )
-                            logger.info("Message sent to email queue with ID: %s", response.get('MessageId'))
-                        except Exception as e:
-                            error_msg = f"Error sending message to email queue: {str(e)}"
-                            logger.error(error_msg)
-                            warnings.append(f"Failed to send email notification: {str(e)}")
-                            # Don't mark as failed since the report is already processed and stored in S3
-                            # Just add a warning for monitoring
+                        message_id = outbox.enqueue(session, EMAIL_QUEUE_URL, email_message)
                     else:
                         warning_msg = "EMAIL_QUEUE_URL environment variable not set"
                         logger.warning(warning_msg)
                         warnings.append(warning_msg)
+                    session.commit()
+                    if message_id:
+                        outbox.flush(session, [message_id])
                     
                     logger.info("Report zipping completed for report ID: %s", report_id)
                     
                     # Clean up temporary files
-                    try:
-                        shutil.rmtree(report_dir)
-                    except Exception as cleanup_error:
-                        logger.warning("Error cleaning up temporary files: %s", str(cleanup_error))
+                    if finalize:
+                        try:
+                            delete_shards(report)
+                        except Exception as cleanup_error:
+                            logger.warning("Error deleting report shards: %s", str(cleanup_error))
+                    if report_dir:
+                        try:
+                            shutil.rmtree(report_dir)
+                        except Exception as cleanup_error:
+                            logger.warning("Error cleaning up temporary files: %s", str(cleanup_error))
                     
                 except Exception as e:
                     error_msg = f"Error processing report: {str(e)}"
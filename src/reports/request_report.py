@@ -2,7 +2,16 @@
 Report Request Handler
 
 This module handles incoming report requests, creates entries in the reports table,
-and sends messages to the report aggregation queue.
+and queues messages for the report aggregation queue through the transactional outbox.
+
+A request for a claim whose content matches the fingerprint of a completed report
+re-signs that report's archive and queues the email straight away, and a duplicate of
+a report still being built is answered with that report instead of starting another.
+SUMMARY and CSV_ONLY reports have no files to collect, and FULL reports of small claims
+have few, so both are built, uploaded and emailed within the request (see report_summary
+and report_inline). Such a report is committed before it is built and marked FAILED if the
+request then errors; one cut short by the Lambda timeout stops being joined by duplicate
+requests after REPORT_INLINE_COALESCE_WINDOW_SECONDS.
 """
 
 import os
@@ -10,29 +19,158 @@ import json
 import logging
 import uuid
 import boto3
-from datetime import datetime, timezone
+from botocore.config import Config
+from datetime import datetime, timedelta, timezone
 from database.database import get_db_session
-from models.report import Report, ReportStatus
+from models.report import Report, ReportStatus, ReportType
 from models.claim import Claim
 from models.user import User
 from utils.response import api_response
+from utils import outbox
+from reports import report_inline, report_summary
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-sqs_client = boto3.client('sqs')
+# Initialize AWS clients, with a connection for every concurrent read of a small claim's files
+s3_client = boto3.client('s3', config=Config(max_pool_connections=report_inline.FETCH_WORKERS))
 
 # Get environment variables
 REPORT_REQUEST_QUEUE_URL = os.environ.get('REPORT_REQUEST_QUEUE_URL')
+EMAIL_QUEUE_URL = os.environ.get('EMAIL_QUEUE_URL')
+REPORTS_BUCKET_NAME = os.environ.get('REPORTS_BUCKET_NAME')
+S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME')
+# Reports still in progress after this long are assumed stuck and not joined by new requests
+COALESCE_WINDOW_SECONDS = int(os.environ.get('REPORT_COALESCE_WINDOW_SECONDS', '3600'))
+# The same for reports built within the request, which cannot outlive the request's Lambda timeout
+INLINE_COALESCE_WINDOW_SECONDS = int(os.environ.get('REPORT_INLINE_COALESCE_WINDOW_SECONDS', '60'))
+PRESIGNED_URL_EXPIRY_SECONDS = 604800  # 7 days, as for a freshly built report
+
+IN_FLIGHT_STATUSES = [
+    ReportStatus.REQUESTED.value,
+    ReportStatus.PROCESSING.value,
+    ReportStatus.AGGREGATING.value,
+    ReportStatus.ORGANIZING.value,
+    ReportStatus.DELIVERING.value
+]
+
+
+def find_in_flight_report(session, claim_id, report_type, fingerprint, email_address,
+                          window_seconds=COALESCE_WINDOW_SECONDS):
+    """
+    Find a report for the same claim content and recipient that is still being built,
+    created within the last `window_seconds`.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=window_seconds)
+    return session.query(Report).filter(
+        Report.claim_id == claim_id,
+        Report.report_type == report_type,
+        Report.fingerprint == fingerprint,
+        Report.email_address == email_address,
+        Report.status.in_(IN_FLIGHT_STATUSES),
+        Report.created_at >= cutoff
+    ).order_by(Report.created_at.desc()).first()
+
+
+def find_reusable_report(session, claim_id, report_type, fingerprint):
+    """
+    Find the latest completed report built from the same claim content whose archive still exists.
+    """
+    report = session.query(Report).filter(
+        Report.claim_id == claim_id,
+        Report.report_type == report_type,
+        Report.fingerprint == fingerprint,
+        Report.status == ReportStatus.COMPLETED.value,
+        Report.s3_key.isnot(None)
+    ).order_by(Report.completed_at.desc()).first()
+    if not report or not REPORTS_BUCKET_NAME or not EMAIL_QUEUE_URL:
+        return None
+    try:
+        s3_client.head_object(Bucket=REPORTS_BUCKET_NAME, Key=report.s3_key)
+    except Exception as e:
+        logger.info(f"Report {report.id} archive is no longer available: {str(e)}")
+        return None
+    return report
+
+
+def email_message(report, presigned_url, user, claim):
+    """
+    Build the email queue message delivering a report.
+    """
+    return {
+        "report_id": str(report.id),
+        "presigned_url": presigned_url,
+        "email": report.email_address,
+        "recipient_name": user.first_name,
+        "claim_title": claim.title
+    }
+
+
+def deliver_in_request(session, report, user, claim):
+    """
+    Build a report in process, upload it and queue its email.
+    
+    SUMMARY and CSV_ONLY reports are built by report_summary, FULL reports of
+    small claims by report_inline.
+    
+    Called at the start of a transaction, which reads the claim from one snapshot: the
+    report's fingerprint is recomputed there so it describes exactly the content built,
+    even if the claim changed since the request was checked.
+    
+    Returns the outbox ID of the email message, or None if the report failed.
+    """
+    session.connection(execution_options={'isolation_level': 'REPEATABLE READ'})
+    report.fingerprint = claim.report_fingerprint(session)
+    try:
+        if report.report_type == ReportType.FULL.value:
+            s3_key, skipped = report_inline.write_report(
+                s3_client, REPORTS_BUCKET_NAME, S3_BUCKET_NAME, report, claim.build_report_data(session)
+            )
+            if skipped:
+                logger.warning(f"Report {report.id} is missing {len(skipped)} files: {', '.join(skipped)}")
+        else:
+            s3_key = report_summary.write_summary(
+                s3_client, REPORTS_BUCKET_NAME, report, claim.build_report_data(session, include_files=False)
+            )
+        presigned_url = s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': REPORTS_BUCKET_NAME,
+                'Key': s3_key
+            },
+            ExpiresIn=PRESIGNED_URL_EXPIRY_SECONDS
+        )
+    except Exception as e:
+        logger.error(f"Error creating report {report.id}: {str(e)}")
+        report.update_status(ReportStatus.FAILED, f"Error creating report: {str(e)}")
+        return None
+    report.s3_key = s3_key
+    report.update_status(ReportStatus.COMPLETED)
+    return outbox.enqueue(session, EMAIL_QUEUE_URL, email_message(report, presigned_url, user, claim))
+
+
+def fail_report(session, report_id, error_message):
+    """
+    Mark a committed report FAILED so new requests are not joined onto it.
+    """
+    try:
+        report = session.query(Report).filter(Report.id == report_id).first()
+        if report:
+            report.update_status(ReportStatus.FAILED, error_message)
+            session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Could not mark report {report_id} as failed: {str(e)}")
+
 
 def lambda_handler(event, context):
     """
     Handle incoming report requests.
     
-    Creates a new entry in the reports table and sends a message to the
-    report aggregation queue to start the report generation process.
+    Creates a new entry in the reports table and, in the same transaction, an
+    outbox message for the report aggregation queue to start the report
+    generation process.
     
     Parameters
     ----------
@@ -74,9 +212,14 @@ def lambda_handler(event, context):
             
         if not email_address:
             return api_response(400, error_details="Email address is required for report delivery")
+        
+        if report_type not in {member.value for member in ReportType}:
+            return api_response(400, error_details=f"Invalid report type: {report_type}")
             
         # Get database session
         session = get_db_session()
+        # Set once a report built within the request is committed, so a later error can fail it
+        inline_report_id = None
         
         try:
             # Verify user has access to claim
@@ -84,14 +227,39 @@ def lambda_handler(event, context):
             if not user:
                 return api_response(404, error_details="User not found")
                 
-            claim = session.query(Claim).filter(Claim.id == uuid.UUID(claim_id)).first()
+            # Lock the claim so concurrent requests for it are decided one at a time
+            claim = session.query(Claim).filter(Claim.id == uuid.UUID(claim_id)).with_for_update().first()
             if not claim:
                 return api_response(404, error_details="Claim not found")
                 
             # Verify user has access to claim (user's household matches claim's household)
             if str(user.household_id) != str(claim.household_id):
                 return api_response(403, error_details="User does not have access to this claim")
-                
+            
+            fingerprint = claim.report_fingerprint(session)
+            # Nothing to collect for a summary, and little for a small claim: build it within the request
+            inline = report_type != ReportType.FULL.value or report_inline.is_small(*claim.report_size(session))
+            
+            # Join a duplicate request onto the report already being built. A report built
+            # within an earlier request that is still unfinished after that request's timeout
+            # was cut short, so it is only joined for INLINE_COALESCE_WINDOW_SECONDS
+            in_flight = find_in_flight_report(
+                session, claim.id, report_type, fingerprint, email_address,
+                INLINE_COALESCE_WINDOW_SECONDS if inline else COALESCE_WINDOW_SECONDS
+            )
+            if in_flight:
+                session.commit()
+                logger.info(f"Report request coalesced onto report {in_flight.id}")
+                return api_response(
+                    200,
+                    success_message="Report request already in progress",
+                    data={
+                        'report_id': str(in_flight.id),
+                        'status': in_flight.status,
+                        'email_address': email_address
+                    }
+                )
+            
             # Create new report record
             report = Report(
                 user_id=uuid.UUID(user_id),
@@ -99,33 +267,51 @@ def lambda_handler(event, context):
                 claim_id=uuid.UUID(claim_id),
                 report_type=report_type,
                 email_address=email_address,  # Store email address in the Report model
-                status=ReportStatus.REQUESTED.value
+                status=ReportStatus.REQUESTED.value,
+                fingerprint=fingerprint
             )
             
             session.add(report)
-            session.commit()
-            
-            # Send message to report aggregation queue
-            message = {
-                'report_id': str(report.id),
-                'user_id': user_id,
-                'claim_id': claim_id,
-                'household_id': str(user.household_id),
-                'report_type': report_type,
-                'email_address': email_address,  # Include email address in the message
-                'timestamp': datetime.now(timezone.utc).isoformat()
-            }
+            session.flush()
             
-            sqs_client.send_message(
-                QueueUrl=REPORT_REQUEST_QUEUE_URL,
-                MessageBody=json.dumps(message),
-                MessageAttributes={
-                    'ReportId': {
-                        'DataType': 'String',
-                        'StringValue': str(report.id)
-                    }
+            reused = find_reusable_report(session, claim.id, report_type, fingerprint)
+            if reused:
+                # Nothing changed since the last report: re-sign its archive and email it
+                presigned_url = s3_client.generate_presigned_url(
+                    'get_object',
+                    Params={
+                        'Bucket': REPORTS_BUCKET_NAME,
+                        'Key': reused.s3_key
+                    },
+                    ExpiresIn=PRESIGNED_URL_EXPIRY_SECONDS
+                )
+                report.s3_key = reused.s3_key
+                report.update_status(ReportStatus.COMPLETED)
+                message_id = outbox.enqueue(session, EMAIL_QUEUE_URL, email_message(report, presigned_url, user, claim))
+                logger.info(f"Report request {report.id} reuses the archive of report {reused.id}")
+            elif inline:
+                # Commit the report first, releasing the claim lock, so writes to the claim's items,
+                # files and rooms are not blocked while the report is built
+                session.commit()
+                inline_report_id = report.id
+                message_id = deliver_in_request(session, report, user, claim)
+                if message_id is None:
+                    session.commit()
+                    return api_response(500, error_details=report.error_message)
+            else:
+                # Queue the aggregation message in the same transaction as the report
+                message = {
+                    'report_id': str(report.id),
+                    'user_id': user_id,
+                    'claim_id': claim_id,
+                    'household_id': str(user.household_id),
+                    'report_type': report_type,
+                    'email_address': email_address,  # Include email address in the message
+                    'timestamp': datetime.now(timezone.utc).isoformat()
                 }
-            )
+                message_id = outbox.enqueue(session, REPORT_REQUEST_QUEUE_URL, message, {'ReportId': str(report.id)})
+            session.commit()
+            outbox.flush(session, [message_id])
             
             logger.info(f"Report request created with ID: {report.id}")
             
@@ -142,6 +328,8 @@ def lambda_handler(event, context):
         except Exception as e:
             session.rollback()
             logger.error(f"Database error: {str(e)}")
+            if inline_report_id:
+                fail_report(session, inline_report_id, f"Error creating report: {str(e)}")
             return api_response(500, error_details=f"Database error: {str(e)}")
         finally:
             session.close()
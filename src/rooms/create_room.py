@@ -8,6 +8,7 @@ from utils.logging_utils import get_logger
 from sqlalchemy.exc import SQLAlchemyError
 from utils import response
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.change_log import record_changes, ROOM
 from models.room import Room
 from models import Claim
 
@@ -66,6 +67,8 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None, body=
         )
         
         db_session.add(new_room)
+        db_session.flush()
+        record_changes(db_session, ROOM, [new_room.id])
         db_session.commit()
         
         logger.info("Room created successfully: %s", new_room.id)
@@ -5,11 +5,13 @@ This module handles the deletion of rooms in the ClaimVision system,
 ensuring proper authorization and data validation.
 """
 from utils.logging_utils import get_logger
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError
-from utils import response
+from utils import response, auth_utils
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.claim_summary import drop_room_counters
+from utils.change_log import record_changes, ROOM, ITEM, FILE
 from models.room import Room
-from models.claim import Claim
 from models.item import Item
 from models.file import File
 from datetime import datetime, timezone
@@ -43,16 +45,6 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             
         claim_id = result
         
-        # Verify claim exists and belongs to user's household
-        claim = db_session.query(Claim).filter(
-            Claim.id == claim_id,
-            Claim.household_id == user.household_id
-        ).first()
-        
-        if not claim:
-            logger.info("Claim not found or access denied: %s", claim_id)
-            return response.api_response(404, error_details="Claim not found or access denied")
-            
         # Extract room ID from path parameters
         if not event.get("pathParameters") or "room_id" not in event.get("pathParameters", {}):
             logger.warning("Missing room ID in path parameters")
@@ -65,40 +57,37 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             
         room_id = result
             
-        # Query the room
-        room = db_session.query(Room).filter(
-            Room.id == room_id,
-            Room.claim_id == claim_id,
-            Room.household_id == user.household_id,
-            Room.deleted.is_(False)
-        ).first()
-        
+        # Verify the claim belongs to the user's household and load the room in one query
+        claim_found, room = auth_utils.get_claim_resource(db_session, user.household_id, claim_id, Room, room_id)
+        if not claim_found:
+            logger.info("Claim not found or access denied: %s", claim_id)
+            return response.api_response(404, error_details="Claim not found or access denied")
+
         if not room:
             logger.info("Room not found: %s", room_id)
             return response.api_response(404, error_details="Room not found")
             
         # Soft delete the room
+        now = datetime.now(timezone.utc)
         room.deleted = True
-        room.updated_at = datetime.now(timezone.utc)
-        
-        # Update associated items to remove room association
-        items = db_session.query(Item).filter(
-            Item.room_id == room_id
-        ).all()
+        room.updated_at = now
         
-        for item in items:
-            item.room_id = None
-            item.updated_at = datetime.now(timezone.utc)
-            
-        # Update associated files to remove room association
-        files = db_session.query(File).filter(
-            File.room_id == room_id,
-            File.deleted.is_(False)
-        ).all()
-        
-        for file in files:
-            file.room_id = None
-            file.updated_at = datetime.now(timezone.utc)
+        # Detach the room's items and files with one UPDATE each
+        item_ids = db_session.execute(
+            update(Item).where(Item.room_id == room_id).values(room_id=None, updated_at=now).returning(Item.id),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+        file_ids = db_session.execute(
+            update(File).where(File.room_id == room_id, File.deleted.is_(False))
+            .values(room_id=None, updated_at=now).returning(File.id),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+
+        # The room's items and files now count as unassigned in the claim summary
+        drop_room_counters(db_session, claim_id, room_id)
+        record_changes(db_session, ROOM, [room_id])
+        record_changes(db_session, ITEM, item_ids)
+        record_changes(db_session, FILE, file_ids)
             
         # Save changes
         db_session.commit()
@@ -6,10 +6,9 @@ ensuring proper authorization and data validation.
 """
 from utils.logging_utils import get_logger
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
-from utils import response
+from utils import response, auth_utils
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
 from models.room import Room
-from models.claim import Claim
 
 logger = get_logger(__name__)
 
@@ -40,16 +39,6 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             
         claim_id = result
         
-        # Verify claim exists and belongs to user's household
-        claim = db_session.query(Claim).filter(
-            Claim.id == claim_id,
-            Claim.household_id == user.household_id
-        ).first()
-        
-        if not claim:
-            logger.info("Claim not found or access denied: %s", claim_id)
-            return response.api_response(404, error_details="Claim not found or access denied")
-        
         # Extract room ID from path parameters
         if not event.get("pathParameters") or "room_id" not in event.get("pathParameters", {}):
             logger.warning("Missing room ID in path parameters")
@@ -62,14 +51,12 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             
         room_id = result
             
-        # Query the room
-        room = db_session.query(Room).filter(
-            Room.id == room_id,
-            Room.claim_id == claim_id,
-            Room.household_id == user.household_id,
-            Room.deleted.is_(False)
-        ).first()
-        
+        # Verify the claim belongs to the user's household and load the room in one query
+        claim_found, room = auth_utils.get_claim_resource(db_session, user.household_id, claim_id, Room, room_id)
+        if not claim_found:
+            logger.info("Claim not found or access denied: %s", claim_id)
+            return response.api_response(404, error_details="Claim not found or access denied")
+
         if not room:
             logger.info("Room not found: %s", room_id)
             return response.api_response(404, error_details="Room not found")
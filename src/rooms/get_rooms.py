@@ -6,10 +6,9 @@ ensuring proper authorization and data access.
 """
 from utils.logging_utils import get_logger
 from sqlalchemy.exc import SQLAlchemyError
-from utils import response
+from utils import response, auth_utils
 from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
 from models.room import Room
-from models.claim import Claim
 
 logger = get_logger(__name__)
 
@@ -40,13 +39,8 @@ def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> di
             
         claim_id = result
             
-        # Verify claim exists and belongs to user's household
-        claim = db_session.query(Claim).filter(
-            Claim.id == claim_id,
-            Claim.household_id == user.household_id
-        ).first()
-        
-        if not claim:
+        # Verify claim exists and belongs to user's household (cached per container)
+        if not auth_utils.claim_in_household(db_session, claim_id, user.household_id):
             logger.info("Claim not found or access denied: %s", claim_id)
             return response.api_response(404, error_details="Claim not found or access denied")
             
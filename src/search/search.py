@@ -0,0 +1,142 @@
+"""
+Lambda handler for searching a household's items, files and labels.
+
+This module matches a free-text query against the `search_documents` index
+using Postgres full-text search (stemmed, weighted by field) combined with
+pg_trgm similarity for typos and partially typed words, and returns one
+ranked, paginated list of mixed results.
+"""
+from sqlalchemy import func, literal, or_
+from sqlalchemy.exc import SQLAlchemyError
+from utils.logging_utils import get_logger
+from utils.lambda_utils import standard_lambda_handler
+from utils.fieldsets import parse_list_param
+from utils.search_index import TEXT_SEARCH_CONFIG, ITEM, FILE, LABEL
+from utils import response
+from models.search_document import SearchDocument
+import uuid
+
+logger = get_logger(__name__)
+
+MAX_QUERY_LENGTH = 200
+SEARCHABLE_TYPES = (ITEM, FILE, LABEL)
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@standard_lambda_handler(requires_auth=True)
+def lambda_handler(event: dict, _context=None, db_session=None, user=None) -> dict:
+    """
+    Lambda handler to search the authenticated user's household.
+
+    Query parameters:
+        q (str): Search text (required)
+        claim_id (str): Restrict results to one claim (labels are household-wide and excluded)
+        types (str): Comma separated subset of item, file, label
+        limit/offset (int): Pagination (limit 1-100)
+
+    Args:
+        event (dict): API Gateway event
+        _context (dict): Lambda execution context (unused)
+        db_session (Session, optional): Database session for testing
+        user (User): Authenticated user object (provided by decorator)
+
+    Returns:
+        dict: API response with ranked results or error
+    """
+    try:
+        query_params = event.get("queryStringParameters") or {}
+        search_text = (query_params.get("q") or "").strip()
+        if not search_text:
+            return response.api_response(400, error_details="Search query 'q' is required")
+        if len(search_text) > MAX_QUERY_LENGTH:
+            return response.api_response(400, error_details=f"Search query cannot exceed {MAX_QUERY_LENGTH} characters")
+
+        try:
+            limit = int(query_params.get("limit", "20"))
+            offset = int(query_params.get("offset", "0"))
+            if limit < 1 or limit > 100 or offset < 0:
+                return response.api_response(400, error_details="Invalid pagination parameters")
+        except ValueError:
+            return response.api_response(400, error_details="Invalid pagination parameters")
+
+        types = parse_list_param(query_params, "types") or list(SEARCHABLE_TYPES)
+        invalid_types = [entity_type for entity_type in types if entity_type not in SEARCHABLE_TYPES]
+        if invalid_types:
+            return response.api_response(400, error_details=f"Invalid types: {', '.join(invalid_types)}")
+
+        claim_id = None
+        if query_params.get("claim_id"):
+            try:
+                claim_id = uuid.UUID(query_params["claim_id"])
+            except ValueError:
+                return response.api_response(400, error_details="Invalid claim ID format")
+
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, search_text)
+        text_rank = func.ts_rank_cd(SearchDocument.document, ts_query)
+        fuzzy_rank = func.word_similarity(search_text, SearchDocument.title)
+        rank = (text_rank + fuzzy_rank).label("rank")
+
+        search_query = db_session.query(
+            SearchDocument.entity_type,
+            SearchDocument.entity_id,
+            SearchDocument.claim_id,
+            SearchDocument.title,
+            rank,
+            func.count().over().label("total_count"),
+        ).filter(
+            SearchDocument.household_id == user.household_id,
+            SearchDocument.entity_type.in_(types),
+            or_(
+                SearchDocument.document.op("@@")(ts_query),
+                # Typo tolerance (uses the trigram index)
+                SearchDocument.title.op("%")(literal(search_text)),
+                # Prefix matching while typing (also served by the trigram index)
+                SearchDocument.title.ilike(_escape_like(search_text) + "%", escape="\\"),
+            ),
+        )
+
+        if claim_id:
+            search_query = search_query.filter(SearchDocument.claim_id == claim_id)
+
+        rows = search_query.order_by(rank.desc(), SearchDocument.title).offset(offset).limit(limit).all()
+
+        results = [
+            {
+                "type": row.entity_type,
+                "id": str(row.entity_id),
+                "claim_id": str(row.claim_id) if row.claim_id else None,
+                "title": row.title,
+                "rank": round(float(row.rank), 4),
+            }
+            for row in rows
+        ]
+
+        if rows:
+            total_count = rows[0].total_count
+        elif offset:
+            total_count = search_query.count()
+        else:
+            total_count = 0
+
+        response_data = {
+            "results": results,
+            "pagination": {
+                "total": total_count,
+                "limit": limit,
+                "offset": offset,
+            },
+        }
+
+        logger.info("Search returned %s results for household %s", len(results), user.household_id)
+        return response.api_response(200, data=response_data)
+
+    except SQLAlchemyError as e:
+        logger.error("Database error when searching: %s", str(e))
+        return response.api_response(500, error_details="Database error when searching")
+    except Exception as e:
+        logger.exception("Unexpected error searching: %s", str(e))
+        return response.api_response(500, error_details="Internal server error")
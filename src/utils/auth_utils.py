@@ -3,19 +3,29 @@ Authentication and Authorization Utilities
 
 This module provides common functions for user authentication, authorization,
 and parameter validation used across Lambda functions.
+
+Household guards resolve a claim's resources and verify ownership in a single
+query. The owning household of each claim seen is cached per warm container
+for `CLAIM_HOUSEHOLD_CACHE_TTL` seconds; claims never change household, so
+the TTL only bounds memory and the lifetime of entries for deleted claims.
 """
 
 from utils.logging_utils import get_logger
+import os
 import uuid
-from typing import Tuple, Optional, Union
+from typing import Any, Tuple, Optional, Union
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
-from models import User
+from models import User, Claim
 from utils import response
+from utils.ttl_cache import TTLCache
 
 # Configure logging
 logger = get_logger(__name__)
 
+_claim_households = TTLCache(ttl_seconds=float(os.getenv("CLAIM_HOUSEHOLD_CACHE_TTL", "300")), max_entries=4096)
+
 def extract_user_id(event: dict) -> Tuple[bool, Union[str, dict]]:
     """
     Extract and validate user ID from JWT claims in the event.
@@ -199,3 +209,89 @@ def check_resource_access(user: User, resource_household_id: uuid.UUID) -> Tuple
     if user.household_id != resource_household_id:
         return False, response.api_response(404, error_details="Resource not found.")
     return True, None
+
+
+def claim_in_household(db: Session, claim_id: Union[str, uuid.UUID], household_id: Union[str, uuid.UUID]) -> bool:
+    """
+    Check whether a claim belongs to a household.
+
+    Served from the per-container cache when the claim was seen recently,
+    otherwise resolved with one primary key lookup.
+
+    Parameters:
+        db (Session): Database session
+        claim_id (UUID): Claim to check
+        household_id (UUID): Household of the authenticated user
+
+    Returns:
+        bool: True if the claim exists and belongs to the household
+    """
+    owner = _claim_households.get(str(claim_id))
+    if owner is None:
+        row = db.query(Claim.household_id).filter(Claim.id == claim_id).first()
+        if not row:
+            return False
+        owner = str(row.household_id)
+        _claim_households.set(str(claim_id), owner)
+    return owner == str(household_id)
+
+
+def get_claim_resource(db: Session, household_id: Union[str, uuid.UUID], claim_id: Union[str, uuid.UUID],
+                       model: Any, resource_id: Union[str, uuid.UUID]) -> Tuple[bool, Optional[Any]]:
+    """
+    Load a live resource of a claim and verify the claim's household in one query.
+
+    The claim is outer-joined to the resource so a missing claim and a missing
+    resource can still be told apart.
+
+    Parameters:
+        db (Session): Database session
+        household_id (UUID): Household of the authenticated user
+        claim_id (UUID): Claim the resource must belong to
+        model: Model with `id`, `claim_id` and optionally `deleted` columns
+        resource_id (UUID): ID of the resource
+
+    Returns:
+        Tuple[bool, Optional[Any]]:
+            - True if the claim exists and belongs to the household
+            - The resource, or None if it does not exist in the claim
+    """
+    conditions = [model.id == resource_id, model.claim_id == Claim.id]
+    if hasattr(model, "deleted"):
+        conditions.append(model.deleted.is_(False))
+
+    row = db.query(Claim.household_id, model).outerjoin(model, and_(*conditions)).filter(
+        Claim.id == claim_id
+    ).first()
+    if not row:
+        return False, None
+
+    _claim_households.set(str(claim_id), str(row[0]))
+    if str(row[0]) != str(household_id):
+        return False, None
+    return True, row[1]
+
+
+def get_household_resource(db: Session, household_id: Union[str, uuid.UUID], model: Any,
+                           resource_id: Union[str, uuid.UUID]) -> Optional[Any]:
+    """
+    Load a resource addressed by ID only, if it belongs to the household.
+
+    Resources without their own household column (items) are checked through
+    their claim in the same query.
+
+    Parameters:
+        db (Session): Database session
+        household_id (UUID): Household of the authenticated user
+        model: Model with `id` and either `household_id` or `claim_id` columns
+        resource_id (UUID): ID of the resource
+
+    Returns:
+        The resource, or None if it does not exist or belongs to another household
+    """
+    query = db.query(model).filter(model.id == resource_id)
+    if hasattr(model, "household_id"):
+        query = query.filter(model.household_id == household_id)
+    else:
+        query = query.join(Claim, Claim.id == model.claim_id).filter(Claim.household_id == household_id)
+    return query.first()
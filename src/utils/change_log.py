@@ -0,0 +1,175 @@
+"""
+Change Log Utilities
+
+This module records which entities of a claim changed so clients can sync
+deltas instead of re-downloading whole lists. Write handlers call
+`record_changes` with the IDs they touched, inside the same transaction as
+their change:
+
+    ```
+    item.name = "New name"
+    record_changes(db_session, ITEM, [item.id])
+    db_session.commit()
+    ```
+
+Pending ORM changes are flushed first and the claim of each entity is
+resolved in SQL, so one INSERT ... SELECT covers any number of IDs. Hard
+deletes must be recorded before the row is deleted.
+
+Sync tokens are transaction snapshot horizons rather than timestamps: every
+change row carries the ID of the transaction that wrote it, and a token is
+the oldest transaction still running when it was issued. Reading rows with a
+transaction ID at or above the previous token therefore never misses a
+change that committed late; at worst a change is returned twice, which is
+harmless because readers return current state.
+
+Changes are kept for CLAIM_CHANGES_RETENTION_SECONDS and then deleted by
+`prune_changes` (run by the outbox relay). Pruning leaves one PRUNED row per
+claim carrying the newest transaction ID it deleted, so a sync from an older
+token finds that row and is told to resync in full rather than silently
+missing the deleted changes.
+"""
+
+from datetime import timedelta
+from typing import Iterable, List
+import os
+import uuid
+
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm import Session
+
+from models.claim import Claim
+from models.claim_change import ClaimChange
+from models.file import File
+from models.item import Item
+from models.room import Room
+
+CLAIM = "claim"
+ITEM = "item"
+ROOM = "room"
+FILE = "file"
+ITEM_LABELS = "item_labels"
+FILE_LABELS = "file_labels"
+# Marks that older changes of the claim were pruned
+PRUNED = "pruned"
+
+# Changes older than this are deleted
+RETENTION_SECONDS = int(os.getenv("CLAIM_CHANGES_RETENTION_SECONDS", str(30 * 24 * 3600)))
+# Rows deleted per prune batch
+PRUNE_BATCH_SIZE = int(os.getenv("CLAIM_CHANGES_PRUNE_BATCH_SIZE", "5000"))
+
+# Table holding each entity type and the column naming its claim
+_SOURCES = {
+    CLAIM: (Claim, Claim.id),
+    ITEM: (Item, Item.claim_id),
+    ITEM_LABELS: (Item, Item.claim_id),
+    ROOM: (Room, Room.claim_id),
+    FILE: (File, File.claim_id),
+    FILE_LABELS: (File, File.claim_id),
+}
+
+
+def _unique_ids(ids: Iterable) -> List[uuid.UUID]:
+    return list({uuid.UUID(str(value)) for value in ids if value is not None})
+
+
+def record_changes(session: Session, entity_type: str, entity_ids: Iterable) -> None:
+    """
+    Record that entities changed.
+
+    Args:
+        session: Database session (the caller commits)
+        entity_type: One of CLAIM, ITEM, ROOM, FILE, ITEM_LABELS, FILE_LABELS
+        entity_ids: IDs of the changed entities (items/files for label associations);
+            entities without a claim are ignored
+    """
+    ids = _unique_ids(entity_ids)
+    if not ids:
+        return
+    session.flush()
+
+    model, claim_column = _SOURCES[entity_type]
+    source = select(claim_column, literal(entity_type), model.id).where(
+        model.id.in_(ids), claim_column.isnot(None)
+    )
+    session.execute(ClaimChange.__table__.insert().from_select(
+        ["claim_id", "entity_type", "entity_id"], source
+    ))
+
+
+def current_sync_token(session: Session) -> int:
+    """
+    Return a token covering every transaction that has finished.
+
+    Take the token before reading changes: anything still in flight has a
+    transaction ID at or above it and will be returned by the next sync.
+    """
+    return session.execute(select(func.txid_snapshot_xmin(func.txid_current_snapshot()))).scalar()
+
+
+def changed_entities(session: Session, claim_id: uuid.UUID, since: int, limit: int):
+    """
+    List the distinct entities of a claim changed since a token.
+
+    Args:
+        session: Database session
+        claim_id: Claim to sync
+        since: Token from a previous sync
+        limit: Maximum number of entities to return
+
+    Returns:
+        List of (entity_type, entity_id) rows, at most `limit` long
+    """
+    return session.query(ClaimChange.entity_type, ClaimChange.entity_id).filter(
+        ClaimChange.claim_id == claim_id,
+        ClaimChange.txid >= since,
+    ).distinct().limit(limit).all()
+
+
+def prune_changes(session: Session, batch_size: int = PRUNE_BATCH_SIZE) -> int:
+    """
+    Delete changes older than RETENTION_SECONDS, committing after each batch.
+
+    Rows are claimed with `FOR UPDATE SKIP LOCKED` so concurrent runs never
+    wait on each other. Each batch replaces the PRUNED row of every claim it
+    touched with one carrying the newest transaction ID deleted.
+
+    Returns:
+        The number of changes deleted
+    """
+    changes = ClaimChange.__table__
+    cutoff = func.now() - timedelta(seconds=RETENTION_SECONDS)
+    deleted = 0
+    while True:
+        batch = select(changes.c.id).where(
+            changes.c.changed_at < cutoff, changes.c.entity_type != PRUNED
+        ).limit(batch_size).with_for_update(skip_locked=True)
+        rows = session.execute(
+            changes.delete().where(changes.c.id.in_(batch.scalar_subquery()))
+            .returning(changes.c.claim_id, changes.c.txid)
+        ).all()
+
+        horizons = {}
+        for claim_id, txid in rows:
+            horizons[claim_id] = max(txid, horizons.get(claim_id, txid))
+        if horizons:
+            session.execute(changes.insert(), [
+                {"claim_id": claim_id, "entity_type": PRUNED, "entity_id": claim_id, "txid": txid}
+                for claim_id, txid in horizons.items()
+            ])
+            newer = aliased(ClaimChange)
+            session.execute(delete(ClaimChange).where(
+                ClaimChange.claim_id.in_(list(horizons)),
+                ClaimChange.entity_type == PRUNED,
+                select(newer.id).where(
+                    newer.claim_id == ClaimChange.claim_id,
+                    newer.entity_type == PRUNED,
+                    newer.txid > ClaimChange.txid
+                ).exists()
+            ), execution_options={"synchronize_session": False})
+        session.commit()
+
+        deleted += len(rows)
+        if len(rows) < batch_size:
+            return deleted
@@ -0,0 +1,220 @@
+"""
+Claim Summary Utilities
+
+This module maintains the `claim_summaries` counters that back the claim
+overview endpoint. Write handlers describe their change as a set of deltas and
+apply them in the same transaction as the change itself:
+
+    ```
+    deltas = item_deltas(item, -1)          # before the update
+    ... mutate item ...
+    merge_deltas(deltas, item_deltas(item))  # after the update
+    apply_deltas(db_session, deltas)
+    db_session.commit()
+    ```
+
+Counters only exist for claims whose summary has been initialized (at claim
+creation or by `rebuild_claim_summary` on first read). Deltas for
+uninitialized claims are dropped because the rebuild will count the source
+rows anyway. Writers take a shared advisory lock per claim and rebuilds an
+exclusive one, so a rebuild never races a concurrent delta.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, Tuple
+import uuid
+
+from sqlalchemy import column, exists, func, literal, select, values, String, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID
+from sqlalchemy.orm import Session
+
+from models.claim_summary import ClaimSummary
+from models.file import File
+from models.item import Item
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+ITEMS = "items"
+FILES = "files"
+TOTAL_VALUE = "total_value"
+FILE_STATUS = "file_status"
+ROOM_ITEMS = "room_items"
+ROOM_FILES = "room_files"
+
+# The claim-level item counter doubles as the "summary initialized" marker
+MARKER_METRIC = ITEMS
+
+DeltaKey = Tuple[uuid.UUID, str, str]
+Deltas = Dict[DeltaKey, float]
+
+
+def _lock_claims(session: Session, claim_ids: Iterable[uuid.UUID], exclusive: bool = False) -> None:
+    """Take per-claim transaction-scoped advisory locks in a stable order."""
+    lock_function = func.pg_advisory_xact_lock if exclusive else func.pg_advisory_xact_lock_shared
+    for claim_id in sorted({str(claim_id) for claim_id in claim_ids}):
+        session.execute(select(lock_function(func.hashtext("claim_summary:" + claim_id))))
+
+
+def _item_value(item: Item) -> float:
+    if item.unit_cost is None:
+        return 0.0
+    return float(item.unit_cost) * (item.quantity if item.quantity is not None else 1)
+
+
+def item_deltas(item: Item, sign: int = 1) -> Deltas:
+    """
+    Describe an item's contribution to its claim summary.
+
+    Args:
+        item: Item in its current state
+        sign: +1 to add the contribution, -1 to remove it
+
+    Returns:
+        Deltas keyed by (claim_id, metric, key); empty for deleted items
+    """
+    deltas: Deltas = defaultdict(float)
+    if item.deleted or item.claim_id is None:
+        return deltas
+    deltas[(item.claim_id, ITEMS, "")] += sign
+    deltas[(item.claim_id, TOTAL_VALUE, "")] += sign * _item_value(item)
+    if item.room_id:
+        deltas[(item.claim_id, ROOM_ITEMS, str(item.room_id))] += sign
+    return deltas
+
+
+def file_deltas(file: File, sign: int = 1) -> Deltas:
+    """
+    Describe a file's contribution to its claim summary.
+
+    Args:
+        file: File in its current state
+        sign: +1 to add the contribution, -1 to remove it
+
+    Returns:
+        Deltas keyed by (claim_id, metric, key); empty for deleted or unclaimed files
+    """
+    deltas: Deltas = defaultdict(float)
+    if file.deleted or file.claim_id is None:
+        return deltas
+    deltas[(file.claim_id, FILES, "")] += sign
+    if file.status is not None:
+        deltas[(file.claim_id, FILE_STATUS, file.status.value)] += sign
+    if file.room_id:
+        deltas[(file.claim_id, ROOM_FILES, str(file.room_id))] += sign
+    return deltas
+
+
+def merge_deltas(target: Deltas, *others: Deltas) -> Deltas:
+    """Add the other deltas into target (in place) and return it."""
+    for other in others:
+        for key, value in other.items():
+            target[key] = target.get(key, 0.0) + value
+    return target
+
+
+def apply_deltas(session: Session, deltas: Deltas) -> None:
+    """
+    Apply counter deltas inside the caller's transaction.
+
+    All deltas are written with one multi-row upsert. Zero deltas are skipped
+    and claims without an initialized summary are ignored.
+
+    Args:
+        session: Database session (the caller commits)
+        deltas: Deltas keyed by (claim_id, metric, key)
+    """
+    rows = [(claim_id, metric, key, value) for (claim_id, metric, key), value in deltas.items() if value]
+    if not rows:
+        return
+
+    _lock_claims(session, {row[0] for row in rows})
+
+    delta_values = values(
+        column("claim_id", UUID(as_uuid=True)),
+        column("metric", String),
+        column("key", String),
+        column("value", Float),
+        name="delta",
+    ).data(rows)
+
+    marker = select(literal(1)).where(
+        ClaimSummary.claim_id == delta_values.c.claim_id,
+        ClaimSummary.metric == MARKER_METRIC,
+        ClaimSummary.key == "",
+    )
+
+    stmt = pg_insert(ClaimSummary).from_select(
+        ["claim_id", "metric", "key", "value"],
+        select(delta_values).where(exists(marker)),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClaimSummary.claim_id, ClaimSummary.metric, ClaimSummary.key],
+        set_={"value": ClaimSummary.value + stmt.excluded.value, "updated_at": func.now()},
+    )
+    session.execute(stmt)
+
+
+def drop_room_counters(session: Session, claim_id: uuid.UUID, room_id: uuid.UUID) -> None:
+    """
+    Remove the counters of a deleted room.
+
+    Items and files of a deleted room fall back to "unassigned", which is
+    derived as the claim total minus the per-room counters.
+    """
+    _lock_claims(session, [claim_id])
+    session.query(ClaimSummary).filter(
+        ClaimSummary.claim_id == claim_id,
+        ClaimSummary.metric.in_([ROOM_ITEMS, ROOM_FILES]),
+        ClaimSummary.key == str(room_id),
+    ).delete(synchronize_session=False)
+
+
+def initialize_claim_summary(session: Session, claim_id: uuid.UUID) -> None:
+    """Create the zeroed counters for a new claim (the claim must already be flushed)."""
+    stmt = pg_insert(ClaimSummary).values([
+        {"claim_id": claim_id, "metric": metric, "key": "", "value": 0}
+        for metric in (ITEMS, FILES, TOTAL_VALUE)
+    ]).on_conflict_do_nothing()
+    session.execute(stmt)
+
+
+def rebuild_claim_summary(session: Session, claim_id: uuid.UUID) -> None:
+    """
+    Recompute a claim's counters from the source tables.
+
+    Used to initialize claims that predate the summary table and to repair
+    drift. Runs inside the caller's transaction.
+    """
+    _lock_claims(session, [claim_id], exclusive=True)
+    session.query(ClaimSummary).filter(ClaimSummary.claim_id == claim_id).delete(synchronize_session=False)
+
+    item_value = func.coalesce(Item.unit_cost, 0) * func.coalesce(Item.quantity, 1)
+    item_totals = session.query(func.count(Item.id), func.coalesce(func.sum(item_value), 0)).filter(
+        Item.claim_id == claim_id, Item.deleted.is_(False)
+    ).one()
+    room_items = session.query(Item.room_id, func.count(Item.id)).filter(
+        Item.claim_id == claim_id, Item.deleted.is_(False), Item.room_id.isnot(None)
+    ).group_by(Item.room_id).all()
+    file_groups = session.query(File.room_id, File.status, func.count(File.id)).filter(
+        File.claim_id == claim_id, File.deleted.is_(False)
+    ).group_by(File.room_id, File.status).all()
+
+    counters: Dict[Tuple[str, str], float] = defaultdict(float)
+    counters[(ITEMS, "")] = item_totals[0]
+    counters[(TOTAL_VALUE, "")] = float(item_totals[1])
+    counters[(FILES, "")] = 0
+    for room_id, count in room_items:
+        counters[(ROOM_ITEMS, str(room_id))] = count
+    for room_id, status, count in file_groups:
+        counters[(FILES, "")] += count
+        if status is not None:
+            counters[(FILE_STATUS, status.value)] += count
+        if room_id:
+            counters[(ROOM_FILES, str(room_id))] += count
+
+    session.execute(pg_insert(ClaimSummary).values([
+        {"claim_id": claim_id, "metric": metric, "key": key, "value": value}
+        for (metric, key), value in counters.items()
+    ]))
+    logger.info("Rebuilt claim summary for claim %s", claim_id)
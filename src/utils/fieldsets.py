@@ -0,0 +1,119 @@
+"""
+Sparse Fieldset and Expansion Utilities
+
+This module parses the `fields=` and `expand=` query string parameters used by
+list and detail endpoints. Handlers use the resolved sets to decide which columns
+to load, which relationships to join and which S3 URLs to sign, so a lightweight
+request only pays for the data it asks for.
+
+Usage Example:
+    ```
+    success, result = resolve_fieldset(
+        event,
+        allowed_fields=["id", "file_name", "status"],
+        default_fields=["id", "file_name", "status"],
+        allowed_expansions=["labels", "url"],
+        default_expansions=["labels", "url"],
+    )
+    if not success:
+        return result  # 400 response
+    fields, expansions = result
+    ```
+
+Dotted expansions such as `files.url` imply their parent (`files`).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from utils import response
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_list_param(query_params: Dict[str, Any], param_name: str) -> Optional[List[str]]:
+    """
+    Parse a comma separated query string parameter.
+
+    Args:
+        query_params: The event's queryStringParameters (may be empty)
+        param_name: Name of the parameter to parse
+
+    Returns:
+        None if the parameter is absent, otherwise the list of non-empty, stripped values
+        (an explicitly empty parameter such as `expand=` yields an empty list)
+    """
+    if param_name not in query_params or query_params.get(param_name) is None:
+        return None
+    raw_value = query_params.get(param_name) or ""
+    return [value.strip() for value in raw_value.split(",") if value.strip()]
+
+
+def _with_parents(expansions: Iterable[str]) -> Set[str]:
+    """Add the parent of every dotted expansion (`files.url` implies `files`)."""
+    resolved = set()
+    for expansion in expansions:
+        resolved.add(expansion)
+        parts = expansion.split(".")
+        for i in range(1, len(parts)):
+            resolved.add(".".join(parts[:i]))
+    return resolved
+
+
+def resolve_fieldset(
+    event: Dict[str, Any],
+    allowed_fields: Iterable[str],
+    default_fields: Iterable[str],
+    allowed_expansions: Iterable[str] = (),
+    default_expansions: Iterable[str] = (),
+) -> Tuple[bool, Union[Tuple[List[str], Set[str]], Dict[str, Any]]]:
+    """
+    Resolve the requested fields and expansions for a request.
+
+    The `id` field is always included so clients can key the results.
+
+    Args:
+        event: API Gateway event
+        allowed_fields: Fields the endpoint can return
+        default_fields: Fields returned when `fields=` is absent
+        allowed_expansions: Expansions the endpoint supports
+        default_expansions: Expansions applied when `expand=` is absent
+
+    Returns:
+        Tuple containing success flag and either (fields, expansions) or an error response
+    """
+    query_params = event.get("queryStringParameters") or {}
+    allowed_fields = list(allowed_fields)
+    allowed_expansions = set(allowed_expansions)
+
+    requested_fields = parse_list_param(query_params, "fields")
+    if requested_fields is None:
+        fields = list(default_fields)
+    else:
+        invalid_fields = [field for field in requested_fields if field not in allowed_fields]
+        if invalid_fields:
+            logger.warning("Invalid fields requested: %s", invalid_fields)
+            return False, response.api_response(
+                400, error_details=f"Invalid fields: {', '.join(invalid_fields)}"
+            )
+        # Preserve the endpoint's canonical ordering
+        fields = [field for field in allowed_fields if field in requested_fields]
+
+    if "id" not in fields:
+        fields.insert(0, "id")
+
+    requested_expansions = parse_list_param(query_params, "expand")
+    if requested_expansions is None:
+        expansions = _with_parents(default_expansions)
+    else:
+        invalid_expansions = [
+            expansion for expansion in requested_expansions if expansion not in allowed_expansions
+        ]
+        if invalid_expansions:
+            logger.warning("Invalid expansions requested: %s", invalid_expansions)
+            return False, response.api_response(
+                400, error_details=f"Invalid expand: {', '.join(invalid_expansions)}"
+            )
+        expansions = _with_parents(requested_expansions)
+
+    return True, (fields, expansions)
@@ -0,0 +1,42 @@
+"""
+Label Filter Utilities
+
+Builds the subquery that narrows a file query to the files carrying given
+labels, shared by the handlers that accept `label_ids=`/`filter_label_ids`
+with `label_match=any|all`:
+
+    ```
+    files_query = files_query.filter(File.id.in_(files_with_labels(label_ids, "all")))
+    ```
+"""
+
+from sqlalchemy import func, select
+
+from models.file_labels import FileLabel
+
+LABEL_MATCH_MODES = ("any", "all")
+
+
+def files_with_labels(label_ids: list, match: str = "any"):
+    """
+    Build a subquery of the IDs of files carrying the given labels.
+
+    Only active associations are considered, so the subquery is answered from
+    the (label_id, file_id) partial index on `file_labels`.
+
+    Args:
+        label_ids (list): Label IDs to match
+        match (str): "any" for files with at least one label, "all" for files with every label
+
+    Returns:
+        Select: File IDs for use with `File.id.in_(...)`
+    """
+    matches = select(FileLabel.file_id).where(
+        FileLabel.label_id.in_(label_ids),
+        FileLabel.deleted.is_(False)
+    )
+    if match == "all":
+        matches = matches.group_by(FileLabel.file_id).having(
+            func.count(FileLabel.label_id.distinct()) == len(label_ids)
+        )
+    return matches
@@ -0,0 +1,85 @@
+"""
+Label Inheritance Utilities
+
+Copies the active labels of files onto items in the database with one
+`INSERT INTO item_labels SELECT ... ON CONFLICT DO UPDATE` statement instead
+of loading every label into Python. New associations are created, soft
+deleted ones are reactivated and already active ones are left untouched, so
+the rows returned by the statement are exactly the labels each item gained.
+
+The caller commits, and is responsible for the follow-up writes of a label
+change (search reindex, label version bump, change log) for the items that
+gained labels.
+"""
+
+import uuid
+from collections import Counter
+from typing import Iterable, Tuple
+
+from sqlalchemy import UUID, and_, column, literal, select, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.file import File
+from models.file_labels import FileLabel
+from models.item_files import ItemFile
+from models.item_labels import ItemLabel
+from models.label import Label
+
+
+def _copy_labels(session: Session, sources) -> Counter:
+    """Copy the labels of each source's file onto its item; `sources` has item_id and file_id columns."""
+    labels = select(sources.c.item_id, FileLabel.label_id, literal(False)).select_from(sources).join(
+        FileLabel, and_(FileLabel.file_id == sources.c.file_id, FileLabel.deleted.is_(False))
+    ).join(
+        Label, and_(Label.id == FileLabel.label_id, Label.deleted.is_(False))
+    ).distinct()  # ON CONFLICT cannot touch the same row twice in one statement
+
+    stmt = pg_insert(ItemLabel).from_select(["item_id", "label_id", "deleted"], labels)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ItemLabel.item_id, ItemLabel.label_id],
+        set_={"deleted": False},
+        where=ItemLabel.deleted.is_(True)
+    ).returning(ItemLabel.item_id)
+    return Counter(row.item_id for row in session.execute(stmt))
+
+
+def inherit_file_labels(session: Session, pairs: Iterable[Tuple[uuid.UUID, uuid.UUID]]) -> Counter:
+    """
+    Copy the labels of files onto items.
+
+    Args:
+        session: Database session (the caller commits)
+        pairs: (item_id, file_id) pairs; each item inherits the labels of its file
+
+    Returns:
+        Counter: Labels added (created or reactivated) per item ID, keyed by uuid.UUID; items
+            that gained nothing are absent
+    """
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return Counter()
+    sources = values(column("item_id", UUID), column("file_id", UUID), name="sources").data(pairs)
+    return _copy_labels(session, sources)
+
+
+def inherit_item_file_labels(session: Session, item_ids: Iterable[uuid.UUID]) -> Counter:
+    """
+    Copy the labels of every live file associated with each item onto that item.
+
+    Args:
+        session: Database session (the caller commits)
+        item_ids: Items whose associated files' labels are inherited
+
+    Returns:
+        Counter: Labels added (created or reactivated) per item ID, keyed by uuid.UUID; items
+            that gained nothing are absent
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return Counter()
+    sources = select(ItemFile.item_id, ItemFile.file_id).join(File, File.id == ItemFile.file_id).where(
+        ItemFile.item_id.in_(item_ids),
+        File.deleted.is_(False)
+    ).subquery("sources")
+    return _copy_labels(session, sources)
@@ -0,0 +1,35 @@
+"""
+Label Version Utilities
+
+Label write handlers call `bump_label_version` in the same transaction as
+their change. Readers that cache label-derived data include the current
+version in their cache key, so a label change anywhere in the household makes
+every container miss on its next read instead of waiting for the TTL.
+Deleting an item or file bumps it too when the deleted row carried labels,
+since label counts change with it. Readers join LabelVersion into the query
+they already run (see labels.get_label_facets) rather than reading it apart.
+"""
+
+import uuid
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.label_version import LabelVersion
+
+
+def bump_label_version(session: Session, household_id: uuid.UUID) -> None:
+    """
+    Increment the household's label version.
+
+    Args:
+        session: Database session (the caller commits)
+        household_id: Household whose labels changed
+    """
+    stmt = pg_insert(LabelVersion).values(household_id=household_id, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LabelVersion.household_id],
+        set_={"version": LabelVersion.version + 1, "updated_at": func.now()},
+    )
+    session.execute(stmt)
@@ -5,7 +5,7 @@ This module provides standardized patterns for AWS Lambda handlers, including:
 - Common error handling patterns
 - Request validation
 - Authentication and authorization flows
-- Database session management
+- Database session management (read replica routing for GET requests)
 - S3 operations with proper error handling
 
 These utilities help ensure consistent behavior across all Lambda functions
@@ -14,6 +14,8 @@ and reduce code duplication.
 
 import json
 import inspect
+import os
+import time
 import uuid
 from functools import wraps
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TypeVar
@@ -22,7 +24,7 @@ import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 from sqlalchemy.exc import SQLAlchemyError
 
-from database.database import get_db_session
+from database.database import get_db_session, READ, WRITE
 from utils import response, auth_utils
 from utils.logging_utils import get_logger
 
@@ -33,11 +35,53 @@ logger = get_logger(__name__)
 T = TypeVar('T')
 HandlerFunction = Callable[..., Dict[str, Any]]
 
+READ_METHODS = ("GET", "HEAD")
+
+# Mutating responses carry the write time; clients that echo it back on reads
+# within the window are served by the primary so they see their own writes.
+LAST_WRITE_HEADER = "X-ClaimVision-Last-Write"
+READ_YOUR_WRITES_WINDOW_SECONDS = float(os.getenv("READ_YOUR_WRITES_WINDOW_SECONDS", "5"))
+
+
+def _get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    """Look up a request header case-insensitively."""
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def resolve_session_intent(event: Dict[str, Any], db_intent: Optional[str] = None) -> str:
+    """
+    Decide whether a request's session may be served by the read replica.
+
+    Args:
+        event: API Gateway event
+        db_intent: Explicit READ or WRITE intent declared by the handler
+
+    Returns:
+        READ for GET/HEAD requests outside a client's read-your-writes window, WRITE otherwise
+    """
+    if db_intent:
+        return db_intent
+    if event.get("httpMethod", "").upper() not in READ_METHODS:
+        return WRITE
+
+    last_write = _get_header(event, LAST_WRITE_HEADER)
+    if last_write and READ_YOUR_WRITES_WINDOW_SECONDS > 0:
+        try:
+            if time.time() - float(last_write) / 1000 < READ_YOUR_WRITES_WINDOW_SECONDS:
+                return WRITE
+        except ValueError:
+            logger.debug("Ignoring malformed %s header: %s", LAST_WRITE_HEADER, last_write)
+    return READ
+
 
 def standard_lambda_handler(
     requires_auth: bool = True,
     requires_body: bool = False,
-    required_fields: Optional[List[str]] = None
+    required_fields: Optional[List[str]] = None,
+    db_intent: Optional[str] = None
 ) -> Callable[[HandlerFunction], HandlerFunction]:
     """
     Decorator for standardizing Lambda handlers with common error handling patterns.
@@ -46,6 +90,8 @@ def standard_lambda_handler(
         requires_auth: Whether the endpoint requires authentication
         requires_body: Whether the endpoint requires a request body
         required_fields: List of required fields in the request body
+        db_intent: READ or WRITE to override the session routing derived from the
+            HTTP method (GET handlers that write must declare WRITE)
         
     Returns:
         Decorated handler function with standardized error handling
@@ -64,14 +110,15 @@ def standard_lambda_handler(
             # Initialize database session
             db_session = kwargs.get('db_session')
             session_created = False
+            intent = resolve_session_intent(event, db_intent)
             
             try:
                 # Create a new session if one wasn't provided
                 if db_session is None:
                     try:
-                        db_session = get_db_session()
+                        db_session = get_db_session(intent)
                         session_created = True
-                        logger.debug(f"{function_name}: Created new database session")
+                        logger.debug(f"{function_name}: Created new {intent} database session")
                     except SQLAlchemyError as db_error:
                         logger.error(f"{function_name}: Failed to get database session: {str(db_error)}")
                         return response.api_response(500, error_details="Failed to establish database connection")
@@ -163,6 +210,12 @@ def standard_lambda_handler(
                     
                     # Log response status code
                     status_code = result.get("statusCode", 0)
+
+                    # Stamp successful mutations so the client can request read-your-writes
+                    if intent == WRITE and http_method.upper() not in READ_METHODS and 200 <= status_code < 300:
+                        headers = result.setdefault("headers", {})
+                        headers[LAST_WRITE_HEADER] = str(int(time.time() * 1000))
+                        headers["Access-Control-Expose-Headers"] = LAST_WRITE_HEADER
                     logger.info(f"Request completed: {http_method} {path} -> {function_name} (Status: {status_code})")
                     
                     return result
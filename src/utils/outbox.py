@@ -0,0 +1,341 @@
+"""
+Transactional Outbox Utilities
+
+This module publishes SQS messages through the `outbox_messages` table
+instead of calling SQS inside the request path. Handlers enqueue messages in
+the same transaction as the state change that produces them, so a message
+exists if and only if its change committed:
+
+    ```
+    report.update_status(ReportStatus.COMPLETED)
+    message_id = enqueue(db_session, EMAIL_QUEUE_URL, email_message)
+    db_session.commit()
+    flush(db_session, [message_id])   # optional, see OUTBOX_INLINE_FLUSH
+    ```
+
+Pending rows are relayed with `send_message_batch` by the relay Lambda
+(outbox.relay_outbox). Functions that want lower latency set
+OUTBOX_INLINE_FLUSH=true to publish their own messages right after commit;
+anything the flush cannot publish is left to the relay. Rows are claimed with
+`FOR UPDATE SKIP LOCKED`, so the relay and inline flushes never publish the
+same row at the same time.
+
+Delivery is at least once: a message is sent again if its row could not be
+marked published. Every message carries its outbox ID as the `OutboxId`
+attribute and consumers call `record_delivery` in the transaction that
+processes it, so `outbox_stats` can report duplicates (processed more than
+once) and losses (never published, or published but never processed).
+
+Published rows are kept for OUTBOX_RETENTION_SECONDS, then deleted by
+`purge_published` (run by the relay), so the table stays as small as its
+recent traffic.
+"""
+
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from models.outbox_message import OutboxMessage
+from utils.lambda_utils import get_sqs_client
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+OUTBOX_ID_ATTRIBUTE = "OutboxId"
+
+# Publish messages right after the enqueuing transaction commits
+INLINE_FLUSH = os.getenv("OUTBOX_INLINE_FLUSH", "false").lower() == "true"
+# Rows published per relay pass
+RELAY_BATCH_SIZE = int(os.getenv("OUTBOX_RELAY_BATCH_SIZE", "500"))
+# Failed publish attempts before a message is given up (and counted as lost)
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+# Retries back off exponentially (2, 4, 8, ... seconds) up to this delay
+MAX_RETRY_DELAY_SECONDS = int(os.getenv("OUTBOX_MAX_RETRY_DELAY_SECONDS", "900"))
+# Published messages not processed within this window are counted as unconfirmed
+DELIVERY_WINDOW_SECONDS = int(os.getenv("OUTBOX_DELIVERY_WINDOW_SECONDS", "3600"))
+# Published messages older than this are left out of the stats
+STATS_WINDOW_SECONDS = int(os.getenv("OUTBOX_STATS_WINDOW_SECONDS", "86400"))
+# Published messages older than this are deleted
+RETENTION_SECONDS = int(os.getenv("OUTBOX_RETENTION_SECONDS", "604800"))
+# Rows deleted per purge batch
+PURGE_BATCH_SIZE = int(os.getenv("OUTBOX_PURGE_BATCH_SIZE", "5000"))
+
+# send_message_batch limits
+SQS_BATCH_ENTRIES = 10
+SQS_BATCH_BYTES = 256 * 1024
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue(session: Session, queue_url: str, body: dict, attributes: Optional[Dict[str, str]] = None) -> uuid.UUID:
+    """
+    Add a message to the outbox.
+
+    Args:
+        session: Database session (the caller commits)
+        queue_url: SQS queue to publish to
+        body: JSON-serializable message body
+        attributes: String message attributes (e.g. {"ReportId": "..."})
+
+    Returns:
+        The outbox ID of the message
+
+    Raises:
+        ValueError: If the queue URL is not set
+    """
+    if not queue_url:
+        raise ValueError("Queue URL is not set")
+
+    message = OutboxMessage(
+        id=uuid.uuid4(),
+        queue_url=queue_url,
+        body=json.dumps(body),
+        message_attributes=attributes or None,
+        attempts=0,
+        deliveries=0,
+    )
+    session.add(message)
+    return message.id
+
+
+def _entry(message: OutboxMessage) -> dict:
+    attributes = dict(message.message_attributes or {})
+    attributes[OUTBOX_ID_ATTRIBUTE] = str(message.id)
+    return {
+        "Id": str(message.id),
+        "MessageBody": message.body,
+        "MessageAttributes": {name: {"DataType": "String", "StringValue": str(value)}
+                              for name, value in attributes.items()},
+    }
+
+
+def _entry_size(entry: dict) -> int:
+    size = len(entry["MessageBody"].encode("utf-8"))
+    for name, attribute in entry["MessageAttributes"].items():
+        size += len(name.encode("utf-8")) + len(attribute["DataType"]) + len(attribute["StringValue"].encode("utf-8"))
+    return size
+
+
+def _batches(entries: List[dict]) -> Iterable[List[dict]]:
+    """Split entries into send_message_batch calls within the entry count and payload size limits."""
+    batch, batch_bytes = [], 0
+    for entry in entries:
+        size = _entry_size(entry)
+        if batch and (len(batch) == SQS_BATCH_ENTRIES or batch_bytes + size > SQS_BATCH_BYTES):
+            yield batch
+            batch, batch_bytes = [], 0
+        batch.append(entry)
+        batch_bytes += size
+    if batch:
+        yield batch
+
+
+def relay(session: Session, sqs=None, ids: Optional[Iterable[uuid.UUID]] = None,
+          limit: int = RELAY_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Publish pending outbox messages and commit.
+
+    Rows are claimed with `FOR UPDATE SKIP LOCKED` and published per queue in
+    `send_message_batch` chunks. Accepted messages are marked published;
+    rejected ones record the error and are retried by a later pass, with
+    exponential backoff, until MAX_ATTEMPTS is reached.
+
+    Args:
+        session: Database session (committed by this function)
+        sqs: SQS client (created on demand)
+        ids: Only publish these messages (used by `flush`)
+        limit: Maximum number of messages to publish
+
+    Returns:
+        Counts of "published" and "failed" messages
+    """
+    now = _now()
+    query = select(OutboxMessage).where(
+        OutboxMessage.published_at.is_(None),
+        OutboxMessage.attempts < MAX_ATTEMPTS,
+        or_(OutboxMessage.retry_at.is_(None), OutboxMessage.retry_at <= now)
+    )
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return {"published": 0, "failed": 0}
+        query = query.where(OutboxMessage.id.in_(ids))
+    messages = session.execute(
+        query.order_by(OutboxMessage.created_at).limit(limit).with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not messages:
+        session.commit()
+        return {"published": 0, "failed": 0}
+
+    if sqs is None:
+        sqs = get_sqs_client()
+
+    by_queue = defaultdict(list)
+    for message in messages:
+        by_queue[message.queue_url].append(message)
+
+    by_id = {str(message.id): message for message in messages}
+    errors = {}
+    for queue_url, queue_messages in by_queue.items():
+        for batch in _batches([_entry(message) for message in queue_messages]):
+            try:
+                result = sqs.send_message_batch(QueueUrl=queue_url, Entries=batch)
+            except Exception as e:
+                logger.error("Error publishing %d outbox messages to %s: %s", len(batch), queue_url, str(e))
+                errors.update({entry["Id"]: str(e) for entry in batch})
+                continue
+            for success in result.get("Successful", []):
+                by_id[success["Id"]].published_at = now
+            for failure in result.get("Failed", []):
+                errors[failure["Id"]] = f"{failure.get('Code')}: {failure.get('Message')}"
+
+    for message_id, error in errors.items():
+        message = by_id[message_id]
+        message.attempts += 1
+        message.last_error = error[:1000]
+        message.retry_at = now + timedelta(seconds=min(2 ** message.attempts, MAX_RETRY_DELAY_SECONDS))
+        if message.attempts >= MAX_ATTEMPTS:
+            logger.error("Giving up on outbox message %s after %d attempts: %s", message_id, message.attempts, error)
+    published = sum(1 for message in messages if message.published_at is not None)
+    session.commit()
+
+    return {"published": published, "failed": len(errors)}
+
+
+def flush(session: Session, ids: Iterable[uuid.UUID], sqs=None) -> None:
+    """
+    Publish just-committed messages in process when OUTBOX_INLINE_FLUSH is enabled.
+
+    Never raises: whatever is not published here is left to the relay.
+
+    Args:
+        session: Database session whose transaction enqueued the messages (already committed)
+        ids: Outbox IDs returned by `enqueue`
+        sqs: SQS client (created on demand)
+    """
+    ids = [message_id for message_id in ids if message_id is not None]
+    if not INLINE_FLUSH or not ids:
+        return
+    try:
+        result = relay(session, sqs=sqs, ids=ids)
+        if result["failed"]:
+            logger.warning("Inline flush left %d outbox messages for the relay", result["failed"])
+    except Exception as e:
+        session.rollback()
+        logger.warning("Inline flush failed, leaving %d outbox messages for the relay: %s", len(ids), str(e))
+
+
+def outbox_id(record: dict) -> Optional[uuid.UUID]:
+    """Return the outbox ID carried by an SQS event record, if any."""
+    attribute = (record.get("messageAttributes") or {}).get(OUTBOX_ID_ATTRIBUTE) or {}
+    value = attribute.get("stringValue")
+    try:
+        return uuid.UUID(value) if value else None
+    except ValueError:
+        return None
+
+
+def record_delivery(session: Session, record: dict) -> int:
+    """
+    Count one processing of an outbox message by a consumer.
+
+    Call it in the transaction that commits the consumer's work, so a failed
+    attempt (rolled back and redelivered by SQS) is not counted.
+
+    Args:
+        session: Database session (the caller commits)
+        record: SQS event record
+
+    Returns:
+        The number of times the message has now been processed (0 if the
+        record did not come from the outbox)
+    """
+    message_id = outbox_id(record)
+    if not message_id:
+        return 0
+    deliveries = session.execute(
+        update(OutboxMessage).where(OutboxMessage.id == message_id)
+        .values(deliveries=OutboxMessage.deliveries + 1)
+        .returning(OutboxMessage.deliveries),
+        execution_options={"synchronize_session": False}
+    ).scalar()
+    if deliveries and deliveries > 1:
+        logger.warning("Outbox message %s processed %d times", message_id, deliveries)
+    return deliveries or 0
+
+
+def purge_published(session: Session, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Delete messages published more than RETENTION_SECONDS ago, committing after each batch.
+
+    Rows are claimed with `FOR UPDATE SKIP LOCKED`, like the relay, so
+    concurrent purges never wait on each other.
+
+    Returns:
+        The number of messages deleted
+    """
+    cutoff = _now() - timedelta(seconds=RETENTION_SECONDS)
+    deleted = 0
+    while True:
+        batch = select(OutboxMessage.id).where(
+            OutboxMessage.published_at < cutoff
+        ).limit(batch_size).with_for_update(skip_locked=True)
+        count = session.execute(
+            delete(OutboxMessage).where(OutboxMessage.id.in_(batch.scalar_subquery())),
+            execution_options={"synchronize_session": False}
+        ).rowcount
+        session.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def outbox_stats(session: Session) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the outbox per queue in one query.
+
+    Only pending messages and those published in the last
+    STATS_WINDOW_SECONDS are read, through the partial indexes on each.
+
+    Returns:
+        For each queue URL:
+            pending: messages not yet published (and still retried)
+            oldest_pending_seconds: age of the oldest pending message
+            failed: messages given up after MAX_ATTEMPTS (lost)
+            unconfirmed: messages published within the stats window, more than
+                DELIVERY_WINDOW_SECONDS ago, but never processed (only
+                meaningful for queues whose consumer calls `record_delivery`)
+            duplicated: recently published messages processed more than once
+    """
+    pending = OutboxMessage.published_at.is_(None)
+    retried = OutboxMessage.attempts < MAX_ATTEMPTS
+    now = _now()
+    cutoff = now - timedelta(seconds=DELIVERY_WINDOW_SECONDS)
+    recent = OutboxMessage.published_at >= now - timedelta(seconds=STATS_WINDOW_SECONDS)
+    rows = session.execute(select(
+        OutboxMessage.queue_url,
+        func.count().filter(pending, retried),
+        func.min(OutboxMessage.created_at).filter(pending, retried),
+        func.count().filter(pending, OutboxMessage.attempts >= MAX_ATTEMPTS),
+        func.count().filter(OutboxMessage.published_at < cutoff, OutboxMessage.deliveries == 0),
+        func.count().filter(OutboxMessage.deliveries > 1),
+    ).where(or_(pending, recent)).group_by(OutboxMessage.queue_url)).all()
+
+    return {
+        queue_url: {
+            "pending": pending_count,
+            "oldest_pending_seconds": round((now - oldest).total_seconds(), 3) if oldest else 0.0,
+            "failed": failed,
+            "unconfirmed": unconfirmed,
+            "duplicated": duplicated,
+        }
+        for queue_url, pending_count, oldest, failed, unconfirmed, duplicated in rows
+    }
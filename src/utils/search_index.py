@@ -0,0 +1,188 @@
+"""
+Search Index Utilities
+
+This module keeps the `search_documents` table in step with items, files and
+labels. Write handlers call the reindex helpers with the IDs they touched,
+inside the same transaction as their change:
+
+    ```
+    db_session.add(new_item)
+    db_session.flush()
+    reindex_items(db_session, [new_item.id])
+    db_session.commit()
+    ```
+
+Pending ORM changes are flushed first so the documents see them. Each
+helper is then two statements regardless of how many IDs are passed: an
+INSERT ... SELECT ... ON CONFLICT DO UPDATE that rebuilds the documents of
+live entities, and a DELETE for entities that are gone or soft-deleted.
+Documents are weighted so that names (A) outrank brand/model (B), which
+outrank descriptions and label text (C).
+"""
+
+from typing import Iterable, List
+import uuid
+
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from models.claim import Claim
+from models.file import File
+from models.file_labels import FileLabel
+from models.item import Item
+from models.item_labels import ItemLabel
+from models.label import Label
+from models.search_document import SearchDocument
+from utils.logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Stemmed configuration for prose; model numbers and brands are matched verbatim
+TEXT_SEARCH_CONFIG = "english"
+VERBATIM_SEARCH_CONFIG = "simple"
+
+ITEM = "item"
+FILE = "file"
+LABEL = "label"
+
+
+def _weighted(text, weight: str, config: str = TEXT_SEARCH_CONFIG):
+    return func.setweight(func.to_tsvector(config, func.coalesce(text, "")), weight)
+
+
+def _unique_ids(ids: Iterable) -> List[uuid.UUID]:
+    return list({uuid.UUID(str(value)) for value in ids if value is not None})
+
+
+def _upsert(session: Session, source) -> None:
+    stmt = pg_insert(SearchDocument).from_select(
+        ["entity_type", "entity_id", "household_id", "claim_id", "title", "body", "document"],
+        source,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SearchDocument.entity_type, SearchDocument.entity_id],
+        set_={
+            "household_id": stmt.excluded.household_id,
+            "claim_id": stmt.excluded.claim_id,
+            "title": stmt.excluded.title,
+            "body": stmt.excluded.body,
+            "document": stmt.excluded.document,
+            "updated_at": func.now(),
+        },
+    )
+    session.execute(stmt)
+
+
+def _delete_missing(session: Session, entity_type: str, ids: List[uuid.UUID], live_ids) -> None:
+    session.query(SearchDocument).filter(
+        SearchDocument.entity_type == entity_type,
+        SearchDocument.entity_id.in_(ids),
+        SearchDocument.entity_id.notin_(live_ids),
+    ).delete(synchronize_session=False)
+
+
+def reindex_items(session: Session, item_ids: Iterable) -> None:
+    """
+    Rebuild the search documents of the given items.
+
+    Args:
+        session: Database session (the caller commits)
+        item_ids: IDs of created, updated, relabeled or deleted items
+    """
+    ids = _unique_ids(item_ids)
+    if not ids:
+        return
+    session.flush()
+
+    label_text = select(func.string_agg(Label.label_text, " ")).select_from(ItemLabel).join(
+        Label, Label.id == ItemLabel.label_id
+    ).where(
+        ItemLabel.item_id == Item.id,
+        ItemLabel.deleted.is_(False),
+        Label.deleted.is_(False),
+    ).scalar_subquery()
+
+    body = func.concat_ws(" ", Item.brand_manufacturer, Item.model_number, Item.description, label_text)
+    document = (
+        _weighted(Item.name, "A")
+        .op("||")(_weighted(func.concat_ws(" ", Item.brand_manufacturer, Item.model_number), "B", VERBATIM_SEARCH_CONFIG))
+        .op("||")(_weighted(func.concat_ws(" ", Item.description, label_text), "C"))
+    )
+
+    live_items = select(Item.id).where(Item.id.in_(ids), Item.deleted.is_(False))
+    _upsert(session, select(
+        literal(ITEM), Item.id, Claim.household_id, Item.claim_id, Item.name, body, document
+    ).join(Claim, Claim.id == Item.claim_id).where(Item.id.in_(ids), Item.deleted.is_(False)))
+    _delete_missing(session, ITEM, ids, live_items)
+
+
+def reindex_files(session: Session, file_ids: Iterable) -> None:
+    """
+    Rebuild the search documents of the given files.
+
+    Args:
+        session: Database session (the caller commits)
+        file_ids: IDs of created, renamed, relabeled or deleted files
+    """
+    ids = _unique_ids(file_ids)
+    if not ids:
+        return
+    session.flush()
+
+    label_text = select(func.string_agg(Label.label_text, " ")).select_from(FileLabel).join(
+        Label, Label.id == FileLabel.label_id
+    ).where(
+        FileLabel.file_id == File.id,
+        FileLabel.deleted.is_(False),
+        Label.deleted.is_(False),
+    ).scalar_subquery()
+
+    # File names such as "samsung_tv_01.jpg" are split into words before indexing
+    words_in_name = func.regexp_replace(File.file_name, r"[_\-.]+", " ", "g")
+    document = _weighted(words_in_name, "A").op("||")(_weighted(label_text, "C"))
+
+    live_files = select(File.id).where(File.id.in_(ids), File.deleted.is_(False))
+    _upsert(session, select(
+        literal(FILE), File.id, File.household_id, File.claim_id, File.file_name, label_text, document
+    ).where(File.id.in_(ids), File.deleted.is_(False)))
+    _delete_missing(session, FILE, ids, live_files)
+
+
+def label_holders(session: Session, label_ids: Iterable):
+    """
+    Find the items and files carrying any of the given labels.
+
+    Call this before removing label associations so the holders can be
+    reindexed afterwards.
+
+    Returns:
+        Tuple of (item_ids, file_ids)
+    """
+    ids = _unique_ids(label_ids)
+    if not ids:
+        return [], []
+    item_ids = [row[0] for row in session.query(ItemLabel.item_id).filter(ItemLabel.label_id.in_(ids)).distinct()]
+    file_ids = [row[0] for row in session.query(FileLabel.file_id).filter(FileLabel.label_id.in_(ids)).distinct()]
+    return item_ids, file_ids
+
+
+def reindex_labels(session: Session, label_ids: Iterable) -> None:
+    """
+    Rebuild the search documents of the given labels.
+
+    Args:
+        session: Database session (the caller commits)
+        label_ids: IDs of created, restored or deleted labels
+    """
+    ids = _unique_ids(label_ids)
+    if not ids:
+        return
+    session.flush()
+
+    live_labels = select(Label.id).where(Label.id.in_(ids), Label.deleted.is_(False))
+    _upsert(session, select(
+        literal(LABEL), Label.id, Label.household_id, literal(None), Label.label_text, literal(None),
+        _weighted(Label.label_text, "A")
+    ).where(Label.id.in_(ids), Label.deleted.is_(False)))
+    _delete_missing(session, LABEL, ids, live_labels)
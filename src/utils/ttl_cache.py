@@ -0,0 +1,80 @@
+"""
+TTL Cache Utilities
+
+A small in-process cache for values that are expensive to compute but may be
+served slightly stale. Lambda containers are reused between invocations, so a
+module-level cache survives across warm requests of the same function:
+
+    ```
+    _facet_cache = TTLCache(ttl_seconds=30)
+
+    cached = _facet_cache.get(key)
+    if cached is None:
+        cached = compute()
+        _facet_cache.set(key, cached)
+    ```
+
+Each container keeps its own copy, so callers that need changes made by
+other functions to show up immediately should fold a version number into the
+key rather than rely on expiry alone.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Thread-safe least-recently-used cache whose entries expire after a fixed TTL.
+
+    Attributes:
+        ttl_seconds (float): Lifetime of an entry; 0 disables the cache
+        max_entries (int): Entries kept before the least recently used is evicted
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Cache value under key for the configured TTL."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -6,6 +6,9 @@ from claims.delete_claim import lambda_handler
 from models.claim import Claim
 from models.household import Household
 from models.user import User
+from models.item import Item
+from models.file import File
+from models.room import Room
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 
@@ -29,6 +32,35 @@ def test_delete_claim_success(test_db, api_gateway_event):
     assert response["statusCode"] == 200
     assert "Claim deleted successfully" in body["message"]
 
+def test_delete_claim_cascades_to_items_files_and_rooms(test_db, api_gateway_event):
+    """ Test that deleting a claim soft deletes its items, files and rooms"""
+    household_id = uuid.uuid4()
+    claim_id = uuid.uuid4()
+    user_id = uuid.uuid4()
+    test_household = Household(id=household_id, name="Test Household")
+    test_user = User(id=user_id, email="test@example.com", first_name="Test", last_name="User", household_id=household_id)
+    test_claim = Claim(id=claim_id, household_id=household_id, title="Test Claim", date_of_loss=datetime(2024, 1, 10))
+    test_room = Room(id=uuid.uuid4(), name="Kitchen", household_id=household_id, claim_id=claim_id)
+    test_items = [Item(id=uuid.uuid4(), claim_id=claim_id, name=f"Item {n}", room_id=test_room.id) for n in range(3)]
+    test_file = File(id=uuid.uuid4(), file_name="photo.jpg", household_id=household_id, uploaded_by=user_id,
+                     claim_id=claim_id, file_hash="cascade-hash", s3_key="test/photo.jpg")
+    # An earlier deleted copy of the same photo must not block the soft delete
+    old_file = File(id=uuid.uuid4(), file_name="photo.jpg", household_id=household_id, uploaded_by=user_id,
+                    file_hash="cascade-hash", s3_key="test/old.jpg", deleted=True)
+    test_db.add_all([test_household, test_user, test_claim, test_room, *test_items, test_file, old_file])
+    test_db.commit()
+
+    event = api_gateway_event(http_method="DELETE", path_params={"claim_id": str(claim_id)},
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    assert test_db.query(Item).filter(Item.claim_id == claim_id, Item.deleted.is_(False)).count() == 0
+    assert test_db.query(Room).filter(Room.claim_id == claim_id, Room.deleted.is_(False)).count() == 0
+    deleted_file = test_db.query(File).filter(File.id == test_file.id).one()
+    assert deleted_file.deleted is True and deleted_file.deleted_at is not None
+    assert test_db.query(File).filter(File.id == old_file.id).first() is None
+
 def test_delete_claim_unauthorized(test_db, api_gateway_event):
     """ Test deleting a claim that belongs to another user"""
 
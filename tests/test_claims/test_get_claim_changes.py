@@ -0,0 +1,149 @@
+import json
+import uuid
+from datetime import timedelta
+from sqlalchemy import func
+from claims.get_claim_changes import lambda_handler
+from models.claim import Claim
+from models.file import File, FileStatus
+from models.item import Item
+from models.item_labels import ItemLabel
+from models.label import Label
+from models.room import Room
+from models.claim_change import ClaimChange
+from utils import change_log
+from utils.change_log import record_changes, ITEM, ROOM, FILE, ITEM_LABELS
+
+
+def _changes_event(api_gateway_event, claim_id, user_id, household_id, since=None):
+    return api_gateway_event(http_method="GET", path_params={"claim_id": str(claim_id)},
+                             query_params={"since": since} if since is not None else None,
+                             auth_user=str(user_id), household_id=str(household_id))
+
+
+def _sync(api_gateway_event, test_db, claim_id, user_id, household_id, since=None):
+    event = _changes_event(api_gateway_event, claim_id, user_id, household_id, since)
+    response = lambda_handler(event, {}, db_session=test_db)
+    assert response["statusCode"] == 200
+    return json.loads(response["body"])["data"]
+
+
+def test_get_claim_changes_without_token_returns_token_only(test_db, api_gateway_event, seed_claim):
+    """ Test that the first call only hands out a starting token"""
+    claim_id, user_id, _ = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+
+    data = _sync(api_gateway_event, test_db, claim_id, user_id, household_id)
+
+    assert data["next_token"].isdigit()
+    assert data["changes"] == {}
+    assert data["resync_required"] is False
+
+
+def test_get_claim_changes_returns_changes_since_token(test_db, api_gateway_event, seed_claim):
+    """ Test that entities touched after the token are returned with their current state"""
+    claim_id, user_id, file_id = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    token = _sync(api_gateway_event, test_db, claim_id, user_id, household_id)["next_token"]
+
+    room = Room(id=uuid.uuid4(), name="Kitchen", household_id=household_id, claim_id=claim_id)
+    item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Mixer")
+    label = Label(id=uuid.uuid4(), label_text="Appliance", household_id=household_id)
+    test_db.add_all([room, item, label])
+    test_db.flush()
+    test_db.add(ItemLabel(item_id=item.id, label_id=label.id))
+    test_db.query(File).filter(File.id == file_id).update({"status": FileStatus.ANALYZED})
+    record_changes(test_db, ROOM, [room.id])
+    record_changes(test_db, ITEM, [item.id])
+    record_changes(test_db, ITEM_LABELS, [item.id])
+    record_changes(test_db, FILE, [file_id])
+    test_db.commit()
+
+    data = _sync(api_gateway_event, test_db, claim_id, user_id, household_id, since=token)
+
+    changes = data["changes"]
+    assert [r["id"] for r in changes["rooms"]] == [str(room.id)]
+    assert [i["id"] for i in changes["items"]] == [str(item.id)]
+    assert changes["files"][0]["status"] == FileStatus.ANALYZED.value
+    assert "s3_key" not in changes["files"][0]
+    assert changes["item_labels"] == [
+        {"item_id": str(item.id), "labels": [{"id": str(label.id), "label_text": "Appliance"}]}
+    ]
+    assert int(data["next_token"]) >= int(token)
+
+    # Nothing changed since the new token
+    again = _sync(api_gateway_event, test_db, claim_id, user_id, household_id, since=data["next_token"])
+    assert again["changes"]["items"] == []
+    assert again["deleted"]["items"] == []
+
+
+def test_get_claim_changes_reports_deletions(test_db, api_gateway_event, seed_claim):
+    """ Test that hard and soft deleted entities are returned as deletions"""
+    claim_id, user_id, file_id = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Mixer")
+    test_db.add(item)
+    test_db.commit()
+    token = _sync(api_gateway_event, test_db, claim_id, user_id, household_id)["next_token"]
+
+    record_changes(test_db, ITEM, [item.id])
+    test_db.delete(item)
+    test_db.query(File).filter(File.id == file_id).update({"deleted": True})
+    record_changes(test_db, FILE, [file_id])
+    test_db.commit()
+
+    data = _sync(api_gateway_event, test_db, claim_id, user_id, household_id, since=token)
+
+    assert data["deleted"]["items"] == [str(item.id)]
+    assert data["deleted"]["files"] == [str(file_id)]
+    assert data["changes"]["items"] == []
+
+
+def test_get_claim_changes_invalid_token(test_db, api_gateway_event, seed_claim):
+    """ Test that a malformed token is rejected"""
+    claim_id, user_id, _ = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+
+    event = _changes_event(api_gateway_event, claim_id, user_id, household_id, since="yesterday")
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
+
+
+def test_get_claim_changes_other_household(test_db, api_gateway_event, seed_claim):
+    """ Test that a claim from another household is not found"""
+    claim_id, user_id, _ = seed_claim
+
+    event = _changes_event(api_gateway_event, claim_id, user_id, uuid.uuid4(), since="0")
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 404
+
+
+def test_get_claim_changes_requires_resync_after_pruning(test_db, api_gateway_event, seed_claim):
+    """ Test that a token older than the pruned changes asks for a full resync"""
+    claim_id, user_id, file_id = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    token = _sync(api_gateway_event, test_db, claim_id, user_id, household_id)["next_token"]
+
+    item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Mixer")
+    test_db.add(item)
+    record_changes(test_db, ITEM, [item.id])
+    test_db.commit()
+    test_db.query(ClaimChange).filter(ClaimChange.claim_id == claim_id).update(
+        {ClaimChange.changed_at: func.now() - timedelta(seconds=change_log.RETENTION_SECONDS + 60)},
+        synchronize_session=False)
+    test_db.commit()
+    record_changes(test_db, FILE, [file_id])
+    test_db.commit()
+
+    change_log.prune_changes(test_db, batch_size=1)
+    remaining = test_db.query(ClaimChange.entity_type).filter(ClaimChange.claim_id == claim_id).all()
+    assert sorted(entity_type for entity_type, in remaining) == [FILE, change_log.PRUNED]
+
+    stale = _sync(api_gateway_event, test_db, claim_id, user_id, household_id, since=token)
+    assert stale["resync_required"] is True
+    assert stale["changes"] == {}
+
+    # After reloading, syncing from the new token works again
+    fresh = _sync(api_gateway_event, test_db, claim_id, user_id, household_id, since=stale["next_token"])
+    assert fresh["resync_required"] is False
@@ -0,0 +1,100 @@
+import json
+import uuid
+from claims.get_claim_overview import lambda_handler
+from models.claim import Claim
+from models.claim_summary import ClaimSummary
+from models.file import File, FileStatus
+from models.item import Item
+from models.room import Room
+from utils.claim_summary import apply_deltas, item_deltas
+
+
+def _seed_room_and_item(test_db, claim_id):
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    room = Room(id=uuid.uuid4(), name="Kitchen", household_id=household_id, claim_id=claim_id)
+    test_db.add(room)
+    test_db.commit()
+    item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Mixer", unit_cost=50.0, quantity=2, room_id=room.id)
+    test_db.add(item)
+    test_db.commit()
+    return household_id, room, item
+
+
+def test_get_claim_overview_rebuilds_missing_summary(test_db, api_gateway_event, seed_claim):
+    """ Test that a claim without counters is summarized on first read"""
+    claim_id, user_id, _ = seed_claim
+    household_id, room, _ = _seed_room_and_item(test_db, claim_id)
+
+    event = api_gateway_event(http_method="GET", path_params={"claim_id": str(claim_id)},
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    data = body["data"]
+    assert data["claim"]["title"] == "Test Claim"
+    assert data["item_count"] == 1
+    assert data["file_count"] == 1
+    assert data["total_replacement_value"] == 100.0
+    assert data["rooms"] == [{"id": str(room.id), "name": "Kitchen", "item_count": 1, "file_count": 0}]
+    assert data["unassigned"] == {"item_count": 0, "file_count": 1}
+    assert data["file_status_counts"] == {FileStatus.UPLOADED.value: 1}
+    assert test_db.query(ClaimSummary).filter(ClaimSummary.claim_id == claim_id).count() > 0
+
+
+def test_get_claim_overview_applies_deltas(test_db, api_gateway_event, seed_claim):
+    """ Test that counters adjusted by write handlers are reflected without re-aggregation"""
+    claim_id, user_id, _ = seed_claim
+    household_id, _, _ = _seed_room_and_item(test_db, claim_id)
+
+    event = api_gateway_event(http_method="GET", path_params={"claim_id": str(claim_id)},
+                              auth_user=str(user_id), household_id=str(household_id))
+    lambda_handler(event, {}, db_session=test_db)
+
+    new_item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Toaster", unit_cost=25.0, quantity=1)
+    test_db.add(new_item)
+    test_db.flush()
+    apply_deltas(test_db, item_deltas(new_item))
+    test_db.commit()
+
+    response = lambda_handler(event, {}, db_session=test_db)
+    data = json.loads(response["body"])["data"]
+
+    assert data["item_count"] == 2
+    assert data["total_replacement_value"] == 125.0
+    assert data["unassigned"]["item_count"] == 1
+
+
+def test_get_claim_overview_ignores_deleted_files(test_db, api_gateway_event, seed_claim):
+    """ Test that soft-deleted files are not counted"""
+    claim_id, user_id, file_id = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    test_db.query(File).filter(File.id == file_id).update({"deleted": True})
+    test_db.commit()
+
+    event = api_gateway_event(http_method="GET", path_params={"claim_id": str(claim_id)},
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+    data = json.loads(response["body"])["data"]
+
+    assert data["file_count"] == 0
+    assert data["file_status_counts"] == {}
+
+
+def test_get_claim_overview_other_household(test_db, api_gateway_event, seed_claim):
+    """ Test that a claim from another household is not found"""
+    claim_id, user_id, _ = seed_claim
+
+    event = api_gateway_event(http_method="GET", path_params={"claim_id": str(claim_id)},
+                              auth_user=str(user_id), household_id=str(uuid.uuid4()))
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 404
+
+
+def test_get_claim_overview_invalid_id(test_db, api_gateway_event):
+    """ Test that an invalid claim ID is rejected"""
+    event = api_gateway_event(http_method="GET", path_params={"claim_id": "not-a-uuid"})
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
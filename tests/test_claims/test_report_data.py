@@ -0,0 +1,64 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+from models import Claim, Item, ItemFile
+from models.room import Room
+
+
+def test_generate_report_data_uses_two_queries(test_db, seed_claim):
+    """Test that report data is built from one items query and one files query"""
+    claim_id, _, file_id = seed_claim
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    room = Room(id=uuid.uuid4(), name="Kitchen", household_id=claim.household_id, claim_id=claim_id)
+    now = datetime.now(timezone.utc)
+    fridge = Item(id=uuid.uuid4(), claim_id=claim_id, room_id=room.id, name="Fridge", quantity=2, unit_cost=500.0,
+                  created_at=now)
+    lamp = Item(id=uuid.uuid4(), claim_id=claim_id, name="Lamp", description="Floor lamp",
+                created_at=now + timedelta(seconds=1))
+    deleted = Item(id=uuid.uuid4(), claim_id=claim_id, name="Gone", deleted=True)
+    test_db.add_all([room, fridge, lamp, deleted])
+    test_db.flush()
+    test_db.add_all([ItemFile(item_id=fridge.id, file_id=file_id), ItemFile(item_id=lamp.id, file_id=file_id)])
+    test_db.commit()
+    test_db.refresh(claim)
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+    try:
+        report_data = claim.generate_report_data(test_db)
+    finally:
+        event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 2
+    assert [(item["number"], item["name"], item["room"]) for item in report_data["items"]] == [
+        (1, "Fridge", "Kitchen"), (2, "Lamp", "N/A")
+    ]
+    assert report_data["items"][0]["total_cost"] == 1000.0
+    assert report_data["items"][1]["description"] == "Floor lamp"
+    assert report_data["rooms"] == {"Kitchen": {"name": "Kitchen", "items": [
+        {"id": str(fridge.id), "number": 1, "name": "Fridge", "description": None}
+    ]}}
+    assert len(report_data["files"]) == 1
+    assert report_data["files"][0]["id"] == str(file_id)
+    assert sorted(report_data["files"][0]["item_ids"]) == sorted([str(fridge.id), str(lamp.id)])
+
+
+def test_report_fingerprint_tracks_report_content(test_db, seed_claim):
+    """Test that the fingerprint is stable for unchanged content and changes with items and file links"""
+    claim_id, _, file_id = seed_claim
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    first = claim.report_fingerprint(test_db)
+    assert claim.report_fingerprint(test_db) == first
+
+    item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Fridge")
+    test_db.add(item)
+    test_db.commit()
+    with_item = claim.report_fingerprint(test_db)
+    assert with_item != first
+
+    test_db.add(ItemFile(item_id=item.id, file_id=file_id))
+    test_db.commit()
+    assert claim.report_fingerprint(test_db) not in (first, with_item)
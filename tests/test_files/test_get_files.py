@@ -4,7 +4,8 @@ import uuid
 import pytest
 from unittest.mock import patch
 from files.get_files import lambda_handler
-from models import User, Household
+from models import User, Household, Label
+from models.file_labels import FileLabel
 
 
 @pytest.mark.usefixtures("seed_files")
@@ -112,4 +113,132 @@ def test_get_files_s3_failure(api_gateway_event, test_db, mock_s3, seed_files):
         assert response["statusCode"] == 200  # ✅ Still returns a 200
         assert "files" in body["data"]
         assert len(body["data"]["files"]) >= 0
-        assert all(file["signed_url"] is None for file in body["data"]["files"])
\ No newline at end of file
+        assert all(file["signed_url"] is None for file in body["data"]["files"])
+
+def test_get_files_sparse_fields_skips_labels_and_urls(api_gateway_event, test_db, seed_files):
+    """Test that fields= narrows the payload and an empty expand= skips labels and URL signing."""
+    user_id, _, _ = seed_files
+
+    event = api_gateway_event(
+        http_method="GET",
+        query_params={"fields": "file_name,status", "expand": ""},
+        auth_user=str(user_id),
+    )
+
+    with patch("files.get_files.generate_presigned_url") as mock_sign:
+        response = lambda_handler(event, {}, db_session=test_db)
+        mock_sign.assert_not_called()
+
+    body = json.loads(response["body"])
+    assert response["statusCode"] == 200
+    assert body["data"]["pagination"]["total"] == 5
+    for file in body["data"]["files"]:
+        assert set(file.keys()) == {"id", "file_name", "status"}
+
+
+def test_get_files_expand_url_only(api_gateway_event, test_db, seed_files, mock_s3):
+    """Test that expand=url signs URLs without loading labels."""
+    user_id, _, _ = seed_files
+    mock_s3.generate_presigned_url.return_value = "https://signed-url.com/file"
+
+    event = api_gateway_event(
+        http_method="GET",
+        query_params={"fields": "file_name", "expand": "url"},
+        auth_user=str(user_id),
+    )
+
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    for file in body["data"]["files"]:
+        assert "url" in file
+        assert "labels" not in file
+
+
+def test_get_files_invalid_field(api_gateway_event, test_db, seed_files):
+    """Test that unknown fields are rejected."""
+    user_id, _, _ = seed_files
+
+    event = api_gateway_event(
+        http_method="GET",
+        query_params={"fields": "file_name,s3_key"},
+        auth_user=str(user_id),
+    )
+
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 400
+    assert body["error_details"] == "Invalid fields: s3_key"
+
+
+def test_get_files_pagination_total_past_end(api_gateway_event, test_db, seed_files):
+    """Test that the total is still reported when paging past the last file."""
+    user_id, _, _ = seed_files
+
+    event = api_gateway_event(
+        http_method="GET",
+        query_params={"limit": "10", "offset": "20"},
+        auth_user=str(user_id),
+    )
+
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert body["data"]["files"] == []
+    assert body["data"]["pagination"]["total"] == 5
+
+
+def _label_files(test_db, household_id, files):
+    """Label files 0-1 "Kitchen", files 1-2 "Damage" and return the label IDs."""
+    kitchen = Label(id=uuid.uuid4(), label_text="Kitchen", household_id=household_id)
+    damage = Label(id=uuid.uuid4(), label_text="Damage", household_id=household_id)
+    test_db.add_all([kitchen, damage])
+    test_db.commit()
+    test_db.add_all([
+        FileLabel(file_id=files[0].id, label_id=kitchen.id),
+        FileLabel(file_id=files[1].id, label_id=kitchen.id),
+        FileLabel(file_id=files[1].id, label_id=damage.id),
+        FileLabel(file_id=files[2].id, label_id=damage.id, deleted=True),
+    ])
+    test_db.commit()
+    return kitchen.id, damage.id
+
+
+@pytest.mark.parametrize("label_match, expected_count", [("any", 2), ("all", 1)])
+def test_get_files_filter_by_labels(api_gateway_event, test_db, seed_files, label_match, expected_count):
+    """Test filtering files by labels with any/all semantics."""
+    user_id, household_id, files = seed_files
+    kitchen_id, damage_id = _label_files(test_db, household_id, files)
+
+    event = api_gateway_event(
+        http_method="GET",
+        query_params={"label_ids": f"{kitchen_id},{damage_id}", "label_match": label_match, "fields": "id"},
+        auth_user=str(user_id),
+    )
+
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert body["data"]["pagination"]["total"] == expected_count
+    returned_ids = {file["id"] for file in body["data"]["files"]}
+    assert str(files[1].id) in returned_ids
+    assert str(files[2].id) not in returned_ids  # Removed association
+
+
+def test_get_files_filter_by_labels_invalid(api_gateway_event, test_db, seed_files):
+    """Test that malformed label filters are rejected."""
+    user_id, _, _ = seed_files
+
+    for query_params, error in [
+        ({"label_ids": "not-a-uuid"}, "Invalid label ID format"),
+        ({"label_ids": str(uuid.uuid4()), "label_match": "some"}, "Invalid label_match: must be 'any' or 'all'"),
+    ]:
+        event = api_gateway_event(http_method="GET", query_params=query_params, auth_user=str(user_id))
+        response = lambda_handler(event, {}, db_session=test_db)
+
+        assert response["statusCode"] == 400
+        assert json.loads(response["body"])["error_details"] == error
@@ -6,7 +6,7 @@ This module tests the functionality of the process_file Lambda handler, which:
 2. Decodes base64 file data
 3. Uploads files to S3
 4. Stores file metadata in the database
-5. Sends a message to the analysis queue
+5. Queues a message for the analysis queue in the transactional outbox
 """
 import json
 import uuid
@@ -19,6 +19,7 @@ from models.user import User
 from models.household import Household
 from models.claim import Claim
 from models.room import Room
+from models.outbox_message import OutboxMessage
 
 
 def test_process_file_success(test_db, mock_sqs):
@@ -64,7 +65,7 @@ def test_process_file_success(test_db, mock_sqs):
     
     # Mock S3 client and ensure SQS_ANALYSIS_QUEUE_URL is set
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs, \
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs, \
          patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"):
         mock_s3 = MagicMock()
         mock_get_s3.return_value = mock_s3
@@ -98,11 +99,11 @@ def test_process_file_success(test_db, mock_sqs):
         assert file.status == FileStatus.UPLOADED
         assert file.file_hash == file_hash
         
-        # Verify SQS was called to send to analysis queue
-        mock_sqs.send_message.assert_called_once()
-        call_args = mock_sqs.send_message.call_args[1]
-        assert "MessageBody" in call_args
-        message_body = json.loads(call_args["MessageBody"])
+        # Verify the analysis message was committed to the outbox with the file
+        outbox_message = test_db.query(OutboxMessage).one()
+        assert outbox_message.queue_url == "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"
+        assert outbox_message.published_at is None
+        message_body = json.loads(outbox_message.body)
         assert message_body["file_id"] == str(file_id)
         assert message_body["s3_key"] == f"files/{file_id}.jpg"
         assert message_body["file_name"] == "test_image.jpg"
@@ -150,7 +151,7 @@ def test_process_file_no_room_id(test_db, mock_sqs):
     
     # Mock S3 client and ensure SQS_ANALYSIS_QUEUE_URL is set
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs, \
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs, \
          patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"):
         mock_s3 = MagicMock()
         mock_get_s3.return_value = mock_s3
@@ -184,8 +185,8 @@ def test_process_file_no_room_id(test_db, mock_sqs):
         assert file.status == FileStatus.UPLOADED
         assert file.file_hash == file_hash
         
-        # Verify SQS was called to send to analysis queue
-        mock_sqs.send_message.assert_called_once()
+        # Verify the analysis message was committed to the outbox
+        assert test_db.query(OutboxMessage).count() == 1
 
 
 def test_process_file_invalid_base64(test_db, mock_sqs):
@@ -231,7 +232,7 @@ def test_process_file_invalid_base64(test_db, mock_sqs):
     
     # Mock S3 client
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs:
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs:
         mock_s3 = MagicMock()
         mock_get_s3.return_value = mock_s3
         
@@ -293,7 +294,7 @@ def test_process_file_s3_failure(test_db, mock_sqs):
     
     # Mock S3 client with failure
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs:
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs:
         mock_s3 = MagicMock()
         mock_s3.put_object.side_effect = Exception("S3 upload failed")
         mock_get_s3.return_value = mock_s3
@@ -359,7 +360,7 @@ def test_process_file_db_failure(test_db, mock_sqs):
     
     # Mock S3 client and DB session with failure
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs, \
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs, \
          patch("files.process_file.get_db_session") as mock_get_db:
         mock_s3 = MagicMock()
         mock_get_s3.return_value = mock_s3
@@ -425,7 +426,7 @@ def test_process_file_analysis_queue_failure(test_db, mock_sqs):
     
     # Mock S3 client
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs:
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs:
         mock_s3 = MagicMock()
         mock_get_s3.return_value = mock_s3
         
@@ -489,7 +490,7 @@ def test_process_file_sqs_failure(test_db, mock_sqs):
     
     # Mock S3 client and SQS client with failure
     with patch("files.process_file.get_s3_client") as mock_get_s3, \
-         patch("files.process_file.get_sqs_client") as mock_get_sqs, \
+         patch("utils.outbox.get_sqs_client") as mock_get_sqs, \
          patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"):
         mock_s3 = MagicMock()
         mock_get_s3.return_value = mock_s3
@@ -501,15 +502,11 @@ def test_process_file_sqs_failure(test_db, mock_sqs):
         # Call the lambda handler
         response = lambda_handler(sqs_event, {})
         
-        # Assertions - we should still get a success response even if SQS fails
+        # Assertions - SQS is not called in the request path, the message waits in the outbox
         assert response["statusCode"] == 200
         assert json.loads(response["body"])["message"] == "File processing complete"
-        
-        # Check that there's a warning about the SQS failure
-        response_body = json.loads(response["body"])
-        assert "warnings" in response_body
-        assert len(response_body["warnings"]) > 0
-        assert any("Failed to queue file" in warning for warning in response_body["warnings"])
+        mock_sqs.send_message.assert_not_called()
+        assert test_db.query(OutboxMessage).filter(OutboxMessage.published_at.is_(None)).count() == 1
         
         # Verify S3 was called
         mock_s3.put_object.assert_called_once()
@@ -557,15 +554,9 @@ def test_upload_to_s3_missing_env_var():
             upload_to_s3("test_key.jpg", b"test_data")
 
 
-def test_send_to_analysis_queue_function():
+def test_send_to_analysis_queue_function(test_db):
     """Test the send_to_analysis_queue function directly"""
-    # Mock SQS client
-    with patch("files.process_file.get_sqs_client") as mock_get_sqs, \
-         patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"):
-        mock_sqs_client = MagicMock()
-        mock_sqs_client.send_message.return_value = {"MessageId": "test-message-id"}
-        mock_get_sqs.return_value = mock_sqs_client
-        
+    with patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"):
         # Call the function
         file_id = uuid.uuid4()
         s3_key = f"files/{file_id}.jpg"
@@ -573,16 +564,15 @@ def test_send_to_analysis_queue_function():
         household_id = uuid.uuid4()
         claim_id = uuid.uuid4()
         
-        result = send_to_analysis_queue(file_id, s3_key, file_name, household_id, claim_id)
+        result = send_to_analysis_queue(test_db, file_id, s3_key, file_name, household_id, claim_id)
+        test_db.commit()
         
         # Assertions
-        assert result == "test-message-id"
-        mock_sqs_client.send_message.assert_called_once()
+        outbox_message = test_db.query(OutboxMessage).filter(OutboxMessage.id == result).one()
+        assert outbox_message.queue_url == "https://sqs.us-east-1.amazonaws.com/123456789012/test-analysis-queue"
         
         # Verify the message body
-        call_args = mock_sqs_client.send_message.call_args[1]
-        assert "MessageBody" in call_args
-        message_body = json.loads(call_args["MessageBody"])
+        message_body = json.loads(outbox_message.body)
         assert message_body["file_id"] == str(file_id)
         assert message_body["s3_key"] == s3_key
         assert message_body["file_name"] == file_name
@@ -590,14 +580,9 @@ def test_send_to_analysis_queue_function():
         assert message_body["claim_id"] == str(claim_id)
 
 
-def test_send_to_analysis_queue_function_no_queue_url():
+def test_send_to_analysis_queue_function_no_queue_url(test_db):
     """Test the send_to_analysis_queue function with no queue URL"""
-    # Mock SQS client with no queue URL
-    with patch("files.process_file.get_sqs_client") as mock_get_sqs, \
-         patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", None):
-        mock_sqs_client = MagicMock()
-        mock_get_sqs.return_value = mock_sqs_client
-        
+    with patch("files.process_file.SQS_ANALYSIS_QUEUE_URL", None):
         # Call the function
         file_id = uuid.uuid4()
         s3_key = f"files/{file_id}.jpg"
@@ -605,8 +590,8 @@ def test_send_to_analysis_queue_function_no_queue_url():
         household_id = uuid.uuid4()
         claim_id = uuid.uuid4()
         
-        result = send_to_analysis_queue(file_id, s3_key, file_name, household_id, claim_id)
+        result = send_to_analysis_queue(test_db, file_id, s3_key, file_name, household_id, claim_id)
         
         # Assertions
-        assert result == "dummy-message-id-for-testing"
-        mock_sqs_client.send_message.assert_not_called()
+        assert result is None
+        assert test_db.query(OutboxMessage).count() == 0
@@ -6,7 +6,7 @@ import uuid
 import base64
 from unittest.mock import patch, MagicMock
 from sqlalchemy.exc import SQLAlchemyError
-from models import Household, User, Claim
+from models import Household, User, Claim, OutboxMessage
 from files.upload_file import lambda_handler
 
 def test_upload_file_success(test_db, api_gateway_event, mock_sqs):
@@ -40,13 +40,14 @@ def test_upload_file_success(test_db, api_gateway_event, mock_sqs):
     assert len(body["data"]["files_queued"]) == 1
     assert body["data"]["files_queued"][0]["file_name"] == "test.jpg"
     
-    # Verify SQS was called
-    mock_sqs.send_message.assert_called_once()
+    # Verify the message was committed to the outbox instead of being sent in the request
+    mock_sqs.send_message.assert_not_called()
+    outbox_message = test_db.query(OutboxMessage).one()
+    assert outbox_message.queue_url == "https://sqs.us-east-1.amazonaws.com/123456789012/test-upload-queue"
+    assert outbox_message.published_at is None
     
     # Verify the message payload
-    call_args = mock_sqs.send_message.call_args[1]
-    assert "MessageBody" in call_args
-    message_body = json.loads(call_args["MessageBody"])
+    message_body = json.loads(outbox_message.body)
     assert "file_name" in message_body
     assert message_body["file_name"] == "test.jpg"
     assert "claim_id" in message_body
@@ -55,7 +56,7 @@ def test_upload_file_success(test_db, api_gateway_event, mock_sqs):
     assert message_body["household_id"] == str(household_id)
 
 def test_upload_s3_called(test_db, api_gateway_event, mock_sqs):
-    """ Test that SQS is called for file uploads"""
+    """ Test that SQS is called after commit when the outbox is flushed inline"""
     household_id = uuid.uuid4()
     user_id = uuid.uuid4()
     
@@ -73,18 +74,26 @@ def test_upload_s3_called(test_db, api_gateway_event, mock_sqs):
     
     event = api_gateway_event(http_method="POST", body=json.dumps(upload_payload), auth_user=str(user_id))
     
-    response = lambda_handler(event, {}, db_session=test_db)
+    mock_sqs.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+        "Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []
+    }
+    with patch("utils.outbox.INLINE_FLUSH", True):
+        response = lambda_handler(event, {}, db_session=test_db)
     
     # Verify response is successful
     assert response["statusCode"] == 200
     
-    # Verify SQS was called
-    mock_sqs.send_message.assert_called_once()
+    # Verify SQS was called once with the outbox ID attached
+    mock_sqs.send_message_batch.assert_called_once()
+    call_args = mock_sqs.send_message_batch.call_args[1]
+    assert call_args["QueueUrl"] == "https://sqs.us-east-1.amazonaws.com/123456789012/test-upload-queue"
+    entry = call_args["Entries"][0]
+    outbox_message = test_db.query(OutboxMessage).one()
+    assert entry["MessageAttributes"]["OutboxId"]["StringValue"] == str(outbox_message.id)
+    assert outbox_message.published_at is not None
     
     # Verify the message payload
-    call_args = mock_sqs.send_message.call_args[1]
-    assert "MessageBody" in call_args
-    message_body = json.loads(call_args["MessageBody"])
+    message_body = json.loads(entry["MessageBody"])
     assert "file_name" in message_body
     assert message_body["file_name"] == "test.jpg"
     assert "claim_id" in message_body
@@ -446,7 +455,7 @@ def test_upload_mixed_success_failure(test_db, api_gateway_event, mock_sqs):
     assert len(body["data"]["files_failed"]) == 1
 
 def test_upload_sqs_failure(test_db, api_gateway_event, mock_sqs):
-    """ Test handling an SQS failure during file upload (should return 500 Internal Server Error)"""
+    """ Test that an SQS failure during the inline flush leaves the message for the relay"""
     household_id = uuid.uuid4()
     user_id = uuid.uuid4()
 
@@ -457,7 +466,7 @@ def test_upload_sqs_failure(test_db, api_gateway_event, mock_sqs):
     test_db.commit()
 
     # Configure mock_sqs to raise an exception
-    mock_sqs.send_message.side_effect = ValueError("SQS Failure")
+    mock_sqs.send_message_batch.side_effect = ValueError("SQS Failure")
     
     upload_payload = {
         "files": [{"file_name": "s3fail.jpg", "file_data": base64.b64encode(b"dummydata").decode("utf-8")}],
@@ -466,19 +475,19 @@ def test_upload_sqs_failure(test_db, api_gateway_event, mock_sqs):
     event = api_gateway_event(http_method="POST", body=json.dumps(upload_payload), auth_user=str(user_id))
     
     # Call the handler with our mocked session
-    response = lambda_handler(event, {}, db_session=test_db)
+    with patch("utils.outbox.INLINE_FLUSH", True):
+        response = lambda_handler(event, {}, db_session=test_db)
     body = json.loads(response["body"])
     
-    # Assertions
-    mock_sqs.send_message.assert_called_once()
-    assert response["statusCode"] == 500
-    assert "error_details" in body
-    assert "Internal Server Error" in body["error_details"]
-    
-    # This is the key assertion - make sure files_failed exists and contains our failed file
-    assert "files_failed" in body["data"], f"Expected 'files_failed' in data, got keys: {list(body['data'].keys())}"
-    assert len(body["data"]["files_failed"]) > 0
-    assert any("Failed to queue for processing." in f["reason"] for f in body["data"]["files_failed"])
+    # Assertions - the file is queued and the message waits in the outbox for a retry
+    mock_sqs.send_message_batch.assert_called_once()
+    assert response["statusCode"] == 200
+    assert len(body["data"]["files_queued"]) == 1
+    
+    outbox_message = test_db.query(OutboxMessage).one()
+    assert outbox_message.published_at is None
+    assert outbox_message.attempts == 1
+    assert "SQS Failure" in outbox_message.last_error
 
 def test_upload_database_failure(test_db, api_gateway_event, mock_sqs):
     """ Test handling database failures gracefully"""
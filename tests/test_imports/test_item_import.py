@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+import pytest
+from imports import create_item_import, item_importer, process_item_import, row_schema, spreadsheet, start_item_import
+from models import OutboxMessage
+from models.claim import Claim
+from models.claim_change import ClaimChange
+from models.item import Item
+from models.item_import import ItemImport, ItemImportStatus
+from models.room import Room
+from utils.change_log import ROOM
+
+HEADER = "Item #,Room,Brand or Manufacturer,Model#,Item Description,Original Vendor,Quantity Lost," \
+         "Item Age (Years),Item Age (Months),Condition,Cost to Replace Pre-Tax (each),Total Cost\n"
+
+
+def _claim(test_db, claim_id):
+    return test_db.query(Claim).filter(Claim.id == claim_id).first()
+
+
+def test_row_schema_parses_report_columns():
+    """ Test that a report style row is parsed and empty markers become None"""
+    schema = row_schema.compile_schema(next(csv.reader(io.StringIO(HEADER))))
+
+    values = schema.parse(["1", "Kitchen", "N/A", "", "Mixer", "Store", "2", "3", "N/A", "Good", "$1,299.50", "$2,599.00"])
+
+    assert dict(zip(row_schema.FIELDS, values)) == {
+        "name": "Mixer", "room_name": "Kitchen", "brand_manufacturer": None, "model_number": None,
+        "original_vendor": "Store", "quantity": 2, "age_years": 3, "age_months": None,
+        "condition": "Good", "unit_cost": 1299.5,
+    }
+
+
+def test_row_schema_reports_every_problem():
+    """ Test that all invalid cells of a row are reported together"""
+    schema = row_schema.compile_schema(["Name", "Qty", "Unit Cost"])
+
+    with pytest.raises(row_schema.RowError) as e:
+        schema.parse(["", "0", "-5"])
+
+    assert str(e.value) == ("Item Description: required; Quantity Lost: must be at least 1; "
+                            "Cost to Replace Pre-Tax (each): cannot be negative")
+
+
+def test_row_schema_matches_exact_labels_before_aliases():
+    """ Test that an "Item #" column is not read as the item name, whatever the column order"""
+    schema = row_schema.compile_schema(["Item", "Item #", "Item Description"])
+
+    assert schema.parse(["Lamp shade", "7", "Lamp"])[0] == "Lamp"
+
+
+def test_row_schema_requires_description_column():
+    """ Test that a spreadsheet without an item description column is rejected"""
+    with pytest.raises(row_schema.SpreadsheetError):
+        row_schema.compile_schema(["Room", "Quantity"])
+
+
+def test_import_rows_resolves_rooms_and_reports_rejects(test_db, seed_claim):
+    """ Test that rows are merged with existing and new rooms and rejects are reported"""
+    claim_id, _, _ = seed_claim
+    claim = _claim(test_db, claim_id)
+    kitchen = Room(id=uuid.uuid4(), name="Kitchen", household_id=claim.household_id, claim_id=claim_id)
+    test_db.add(kitchen)
+    test_db.commit()
+
+    data = (HEADER
+            + "1,kitchen,,,Mixer,,1,,,,$49.99,\n"
+            + "2,Garage,,,Drill,,2,,,,$89.00,\n"
+            + "3,GARAGE,,,Saw,,1,,,,abc,\n"
+            + ",,,,,,,,,,,\n"
+            + "5,garage,,,Ladder,,,,,,,\n").encode("utf-8")
+    errors = io.StringIO()
+
+    counts = item_importer.import_rows(test_db, claim_id, claim.household_id,
+                                       spreadsheet.iter_csv(io.BytesIO(data)), errors)
+    test_db.commit()
+
+    assert counts == {"total_rows": 4, "imported_rows": 3, "rejected_rows": 1, "rooms_created": 1}
+    items = {item.name: item for item in test_db.query(Item).filter(Item.claim_id == claim_id)}
+    garage = test_db.query(Room).filter(Room.claim_id == claim_id, Room.name == "Garage").one()
+    assert items["Mixer"].room_id == kitchen.id
+    assert items["Drill"].room_id == items["Ladder"].room_id == garage.id
+    assert items["Drill"].quantity == 2 and items["Ladder"].quantity == 1
+    room_changes = test_db.query(ClaimChange.entity_id).filter(ClaimChange.entity_type == ROOM).all()
+    assert [entity_id for entity_id, in room_changes] == [garage.id]
+
+    report = list(csv.reader(io.StringIO(errors.getvalue())))
+    assert report[0][:3] == ["Row", "Error", "Item #"]
+    assert report[1][:2] == ["4", "Cost to Replace Pre-Tax (each): not an amount"]
+
+
+def _processing_import(test_db, claim_id, user_id):
+    item_import = ItemImport(user_id=user_id, household_id=_claim(test_db, claim_id).household_id,
+                             claim_id=claim_id, file_name="inventory.csv",
+                             s3_key=f"imports/{claim_id}/source.csv",
+                             status=ItemImportStatus.PROCESSING.value)
+    test_db.add(item_import)
+    test_db.commit()
+    return item_import
+
+
+def test_run_import_completes_and_uploads_error_report(test_db, seed_claim):
+    """ Test that the worker records counts and uploads the rejected rows"""
+    claim_id, user_id, _ = seed_claim
+    item_import = _processing_import(test_db, claim_id, user_id)
+    s3 = MagicMock()
+    s3.get_object.return_value = {"Body": io.BytesIO((HEADER + "1,,,,Lamp,,1,,,,$20,\n2,,,,,,1,,,,,\n").encode("utf-8"))}
+
+    process_item_import.run_import(test_db, item_import, s3=s3)
+
+    test_db.refresh(item_import)
+    assert item_import.current_status == ItemImportStatus.COMPLETED
+    assert (item_import.imported_rows, item_import.rejected_rows) == (1, 1)
+    assert item_import.error_report_key == f"imports/{claim_id}/errors.csv"
+    assert s3.upload_fileobj.call_args[0][2] == item_import.error_report_key
+
+
+def test_run_import_fails_on_unusable_spreadsheet(test_db, seed_claim):
+    """ Test that a spreadsheet without usable columns fails the import without importing"""
+    claim_id, user_id, _ = seed_claim
+    item_import = _processing_import(test_db, claim_id, user_id)
+    s3 = MagicMock()
+    s3.get_object.return_value = {"Body": io.BytesIO(b"Room,Quantity\nKitchen,1\n")}
+
+    process_item_import.run_import(test_db, item_import, s3=s3)
+
+    test_db.refresh(item_import)
+    assert item_import.current_status == ItemImportStatus.FAILED
+    assert item_import.error_message == "Spreadsheet has no Item Description column"
+    assert test_db.query(Item).filter(Item.claim_id == claim_id).count() == 0
+
+
+def test_create_item_import(test_db, api_gateway_event, seed_claim, monkeypatch):
+    """ Test that an import is created with an upload URL and bad file types are rejected"""
+    claim_id, user_id, _ = seed_claim
+    household_id = _claim(test_db, claim_id).household_id
+    s3 = MagicMock()
+    s3.generate_presigned_url.return_value = "https://signed-url.com/upload"
+    monkeypatch.setattr(create_item_import, "get_s3_client", lambda: s3)
+
+    event = api_gateway_event(http_method="POST", path_params={"claim_id": str(claim_id)},
+                              body=json.dumps({"file_name": "inventory.xlsx"}),
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = create_item_import.lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 201
+    data = json.loads(response["body"])["data"]
+    assert data["status"] == "PENDING"
+    assert data["upload_url"] == "https://signed-url.com/upload"
+    item_import = test_db.query(ItemImport).filter(ItemImport.id == uuid.UUID(data["id"])).one()
+    assert item_import.s3_key.endswith(f"/{claim_id}/{item_import.id}/source.xlsx")
+
+    event = api_gateway_event(http_method="POST", path_params={"claim_id": str(claim_id)},
+                              body=json.dumps({"file_name": "inventory.pdf"}),
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = create_item_import.lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
+
+
+def test_claim_import_reclaims_abandoned_imports(test_db, seed_claim):
+    """ Test that an import left PROCESSING past the lease is claimed again, and a running one is not"""
+    claim_id, user_id, _ = seed_claim
+    running = _processing_import(test_db, claim_id, user_id)
+    abandoned = _processing_import(test_db, claim_id, user_id)
+    abandoned.updated_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        seconds=process_item_import.LEASE_SECONDS + 60)
+    test_db.commit()
+
+    assert process_item_import._claim_import(test_db, running.id) is None
+    assert process_item_import._claim_import(test_db, abandoned.id) is abandoned
+    # The lease starts over, so a second redelivery is skipped
+    assert process_item_import._claim_import(test_db, abandoned.id) is None
+
+
+def test_start_item_import_queues_through_the_outbox(test_db, api_gateway_event, seed_claim, monkeypatch):
+    """ Test that starting an import queues it and its message in one transaction"""
+    claim_id, user_id, _ = seed_claim
+    household_id = _claim(test_db, claim_id).household_id
+    item_import = ItemImport(user_id=user_id, household_id=household_id, claim_id=claim_id,
+                             file_name="inventory.csv", s3_key=f"imports/{claim_id}/source.csv")
+    test_db.add(item_import)
+    test_db.commit()
+    s3 = MagicMock()
+    s3.head_object.return_value = {"ContentLength": 100}
+    monkeypatch.setattr(start_item_import, "get_s3_client", lambda: s3)
+    monkeypatch.setattr(start_item_import, "ITEM_IMPORT_QUEUE_URL", "https://sqs.us-east-1.amazonaws.com/1/imports")
+    monkeypatch.setattr("utils.outbox.INLINE_FLUSH", False)
+
+    event = api_gateway_event(http_method="POST",
+                              path_params={"claim_id": str(claim_id), "import_id": str(item_import.id)},
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = start_item_import.lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["data"]["status"] == "QUEUED"
+    message = test_db.query(OutboxMessage).one()
+    assert message.queue_url == "https://sqs.us-east-1.amazonaws.com/1/imports"
+    assert json.loads(message.body) == {"import_id": str(item_import.id)}
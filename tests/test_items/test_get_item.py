@@ -219,3 +219,49 @@ def test_get_item_database_error(mock_session, api_gateway_event, test_db, seed_
     assert response["statusCode"] == 500
     response_body = json.loads(response["body"])
     assert "Database error" in response_body["error_details"]
+
+def test_get_item_expand_files_url(api_gateway_event, test_db, seed_item_with_file_labels):
+    """Test that expand=files.url returns signed file URLs alongside file_ids."""
+    item_id, user_id, file_id = seed_item_with_file_labels
+
+    event = api_gateway_event(
+        "GET",
+        path_params={"item_id": str(item_id)},
+        query_params={"fields": "name", "expand": "files.url"},
+        auth_user=str(user_id),
+    )
+    with patch.dict("os.environ", {"S3_BUCKET_NAME": "test-bucket"}), \
+            patch("items.item_serialization.generate_presigned_url", return_value="https://signed-url.com/file"):
+        response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    data = json.loads(response["body"])["data"]
+    assert data["file_ids"] == [str(file_id)]
+    assert data["files"][0]["id"] == str(file_id)
+    assert data["files"][0]["url"] == "https://signed-url.com/file"
+    assert "labels" not in data
+    assert "description" not in data
+
+def test_get_item_expand_labels_skips_removed_labels(api_gateway_event, test_db, seed_item_with_file_labels):
+    """Test that expand=labels leaves out removed associations and deleted labels."""
+    item_id, user_id, _ = seed_item_with_file_labels
+    household_id = test_db.query(Claim.household_id).join(Item, Item.claim_id == Claim.id).filter(
+        Item.id == item_id).scalar()
+    couch = test_db.query(Label).filter(Label.label_text == "Couch", Label.household_id == household_id).first()
+    lamp = Label(id=uuid.uuid4(), label_text="Lamp", is_ai_generated=False, household_id=household_id, deleted=True)
+    test_db.add(lamp)
+    test_db.flush()
+    test_db.add_all([ItemLabel(item_id=item_id, label_id=couch.id, deleted=True),
+                     ItemLabel(item_id=item_id, label_id=lamp.id)])
+    test_db.commit()
+
+    event = api_gateway_event(
+        "GET",
+        path_params={"item_id": str(item_id)},
+        query_params={"fields": "name", "expand": "labels"},
+        auth_user=str(user_id),
+    )
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    assert [label["text"] for label in json.loads(response["body"])["data"]["labels"]] == ["TV"]
@@ -207,3 +207,54 @@ def test_get_items_empty_result(api_gateway_event, test_db, seed_claim):
     response_body = json.loads(response["body"])
     assert len(response_body["data"]["items"]) == 0
     assert response_body["data"]["pagination"]["total"] == 0
+
+def test_get_items_sparse_fields(api_gateway_event, test_db, seed_multiple_items):
+    """Test that fields= and an empty expand= return only the requested columns."""
+    claim_id, user_id, item_ids = seed_multiple_items
+
+    event = api_gateway_event(
+        "GET",
+        path_params={"claim_id": str(claim_id)},
+        query_params={"fields": "name,unit_cost", "expand": ""},
+        auth_user=str(user_id),
+    )
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    response_data = json.loads(response["body"])
+    assert response_data["data"]["pagination"]["total"] == len(item_ids)
+    for item in response_data["data"]["items"]:
+        assert set(item.keys()) == {"id", "name", "unit_cost"}
+
+def test_get_items_expand_labels_and_room(api_gateway_event, test_db, seed_multiple_items):
+    """Test that expand=labels,room adds the related data."""
+    claim_id, user_id, _ = seed_multiple_items
+
+    event = api_gateway_event(
+        "GET",
+        path_params={"claim_id": str(claim_id)},
+        query_params={"expand": "labels,room"},
+        auth_user=str(user_id),
+    )
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    for item in json.loads(response["body"])["data"]["items"]:
+        assert item["labels"] == []
+        assert item["room"] is None
+        assert "file_ids" not in item
+
+def test_get_items_invalid_expand(api_gateway_event, test_db, seed_multiple_items):
+    """Test that unknown expansions are rejected."""
+    claim_id, user_id, _ = seed_multiple_items
+
+    event = api_gateway_event(
+        "GET",
+        path_params={"claim_id": str(claim_id)},
+        query_params={"expand": "owner"},
+        auth_user=str(user_id),
+    )
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
+    assert json.loads(response["body"])["error_details"] == "Invalid expand: owner"
@@ -0,0 +1,101 @@
+import json
+import uuid
+from items.inherit_all_labels import lambda_handler as inherit_all_labels_handler
+from items.inherit_labels import lambda_handler as inherit_labels_handler
+from models import File, Label, User
+from models.item import Item
+from models.item_files import ItemFile
+from models.item_labels import ItemLabel
+from models.file_labels import FileLabel
+from models.claim_change import ClaimChange
+from models.label_version import LabelVersion
+from models.search_document import SearchDocument
+from utils.change_log import ITEM_LABELS
+
+
+def _file(test_db, user, claim_id, label_ids, deleted=False):
+    file = File(id=uuid.uuid4(), uploaded_by=user.id, household_id=user.household_id, claim_id=claim_id,
+                file_name="photo.jpg", s3_key=f"key-{uuid.uuid4()}", file_hash=str(uuid.uuid4()), deleted=deleted)
+    test_db.add(file)
+    test_db.flush()
+    test_db.add_all([FileLabel(file_id=file.id, label_id=label_id) for label_id in label_ids])
+    test_db.commit()
+    return file
+
+
+def _labels(test_db, user, *texts):
+    labels = [Label(id=uuid.uuid4(), label_text=text, is_ai_generated=True, household_id=user.household_id)
+              for text in texts]
+    test_db.add_all(labels)
+    test_db.commit()
+    return [label.id for label in labels]
+
+
+def _active_label_ids(test_db, item_id):
+    return {row.label_id for row in test_db.query(ItemLabel).filter(ItemLabel.item_id == item_id,
+                                                                    ItemLabel.deleted.is_(False))}
+
+
+def test_inherit_labels_from_file(test_db, api_gateway_event, seed_item):
+    """ Test that a file's labels are copied once and removed item labels are reactivated"""
+    item_id, user_id, _ = seed_item
+    user = test_db.query(User).filter(User.id == user_id).first()
+    item = test_db.query(Item).filter(Item.id == item_id).first()
+    tv, couch = _labels(test_db, user, "TV", "Couch")
+    file = _file(test_db, user, item.claim_id, [tv, couch])
+    test_db.add(ItemLabel(item_id=item_id, label_id=tv, deleted=True))
+    test_db.commit()
+
+    event = api_gateway_event(http_method="POST", path_params={"item_id": str(item_id), "file_id": str(file.id)},
+                              auth_user=str(user_id), household_id=str(user.household_id))
+    response = inherit_labels_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["data"]["labels_added"] == 2
+    assert _active_label_ids(test_db, item_id) == {tv, couch}
+
+    response = inherit_labels_handler(event, {}, db_session=test_db)
+    assert json.loads(response["body"])["data"]["labels_added"] == 0
+
+
+def test_inherit_labels_from_all_item_files(test_db, api_gateway_event, seed_item):
+    """ Test that labels of every live associated file are inherited, deduplicated across files"""
+    item_id, user_id, _ = seed_item
+    user = test_db.query(User).filter(User.id == user_id).first()
+    item = test_db.query(Item).filter(Item.id == item_id).first()
+    tv, couch, lamp, rug = _labels(test_db, user, "TV", "Couch", "Lamp", "Rug")
+    first = _file(test_db, user, item.claim_id, [tv, couch])
+    second = _file(test_db, user, item.claim_id, [couch, lamp])
+    removed = _file(test_db, user, item.claim_id, [rug], deleted=True)
+    test_db.add_all([ItemFile(item_id=item_id, file_id=file.id) for file in (first, second, removed)])
+    test_db.commit()
+
+    event = api_gateway_event(http_method="POST", path_params={"item_id": str(item_id)},
+                              auth_user=str(user_id), household_id=str(user.household_id))
+    response = inherit_all_labels_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["data"]["labels_added"] == 3
+    assert _active_label_ids(test_db, item_id) == {tv, couch, lamp}
+
+
+def test_inherit_labels_records_label_change(test_db, api_gateway_event, seed_item):
+    """ Test that inherited labels are reindexed, bump the label version and are recorded for delta sync"""
+    item_id, user_id, _ = seed_item
+    user = test_db.query(User).filter(User.id == user_id).first()
+    item = test_db.query(Item).filter(Item.id == item_id).first()
+    tv, = _labels(test_db, user, "Television")
+    file = _file(test_db, user, item.claim_id, [tv])
+
+    event = api_gateway_event(http_method="POST", path_params={"item_id": str(item_id), "file_id": str(file.id)},
+                              auth_user=str(user_id), household_id=str(user.household_id))
+    response = inherit_labels_handler(event, {}, db_session=test_db)
+
+    assert json.loads(response["body"])["data"]["labels_added"] == 1
+    document = test_db.query(SearchDocument).filter(SearchDocument.entity_id == item_id).first()
+    assert "Television" in document.body
+    version = test_db.query(LabelVersion.version).filter(LabelVersion.household_id == user.household_id).scalar()
+    assert version == 1
+    changes = test_db.query(ClaimChange.entity_id).filter(
+        ClaimChange.claim_id == item.claim_id, ClaimChange.entity_type == ITEM_LABELS).all()
+    assert [entity_id for entity_id, in changes] == [item_id]
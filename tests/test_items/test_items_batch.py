@@ -0,0 +1,155 @@
+import json
+import uuid
+from items.create_items_batch import lambda_handler as create_batch_handler
+from items.update_items_batch import lambda_handler as update_batch_handler
+from items import item_batch
+from models.claim import Claim
+from models.household import Household
+from models.item import Item
+from models.item_files import ItemFile
+from models.room import Room
+
+
+def _batch_event(api_gateway_event, method, claim_id, user_id, household_id, rows):
+    return api_gateway_event(http_method=method, path_params={"claim_id": str(claim_id)},
+                             body=json.dumps({"items": rows}), auth_user=str(user_id),
+                             household_id=str(household_id))
+
+
+def _seed_room(test_db, claim_id, household_id):
+    room = Room(id=uuid.uuid4(), name="Living Room", household_id=household_id, claim_id=claim_id)
+    test_db.add(room)
+    test_db.commit()
+    return room
+
+
+def test_create_items_batch(test_db, api_gateway_event, seed_claim):
+    """ Test that all rows are created with their rooms and file links"""
+    claim_id, user_id, file_id = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    room = _seed_room(test_db, claim_id, household_id)
+
+    rows = [
+        {"name": "Sofa", "unit_cost": 800.0, "room_id": str(room.id), "file_ids": [str(file_id)]},
+        {"name": "Lamp", "quantity": 2},
+        {},
+    ]
+    event = _batch_event(api_gateway_event, "POST", claim_id, user_id, household_id, rows)
+    response = create_batch_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 201
+    data = json.loads(response["body"])["data"]
+    assert data["created"] == 3
+    assert [result["status"] for result in data["results"]] == ["created"] * 3
+    assert data["results"][2]["item"]["name"] == "New Item"
+
+    items = {item.name: item for item in test_db.query(Item).filter(Item.claim_id == claim_id)}
+    assert items["Sofa"].room_id == room.id
+    assert items["Lamp"].quantity == 2
+    links = test_db.query(ItemFile).filter(ItemFile.item_id == items["Sofa"].id).all()
+    assert [link.file_id for link in links] == [file_id]
+
+
+def test_create_items_batch_reports_failed_rows(test_db, api_gateway_event, seed_claim):
+    """ Test that invalid rows are reported by index while valid rows are created"""
+    claim_id, user_id, _ = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+
+    rows = [
+        {"name": "Sofa"},
+        {"name": "Chair", "room_id": str(uuid.uuid4())},
+        {"name": "Table", "file_ids": [str(uuid.uuid4())]},
+        {"name": "Rug", "unit_cost": "expensive"},
+        {"name": None},
+    ]
+    event = _batch_event(api_gateway_event, "POST", claim_id, user_id, household_id, rows)
+    response = create_batch_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 207
+    results = json.loads(response["body"])["data"]["results"]
+    assert results[0]["status"] == "created"
+    assert results[1]["error"] == "Room not found"
+    assert results[2]["error"] == "File not found"
+    assert results[3]["error"] == "Invalid value for unit_cost"
+    assert results[4]["error"] == "name cannot be null"
+    assert test_db.query(Item).filter(Item.claim_id == claim_id).count() == 1
+
+
+def test_create_items_batch_size_cap(test_db, api_gateway_event, seed_claim, monkeypatch):
+    """ Test that batches above the configured size are rejected"""
+    claim_id, user_id, _ = seed_claim
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    monkeypatch.setattr(item_batch, "MAX_ITEM_BATCH_SIZE", 2)
+
+    event = _batch_event(api_gateway_event, "POST", claim_id, user_id, household_id, [{}, {}, {}])
+    response = create_batch_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
+    assert test_db.query(Item).filter(Item.claim_id == claim_id).count() == 0
+
+
+def test_create_items_batch_other_household(test_db, api_gateway_event, seed_claim):
+    """ Test that a claim from another household is not found"""
+    _, user_id, _ = seed_claim
+    other_household = Household(id=uuid.uuid4(), name="Other Household")
+    other_claim = Claim(id=uuid.uuid4(), household_id=other_household.id, title="Other Claim")
+    test_db.add_all([other_household, other_claim])
+    test_db.commit()
+
+    event = _batch_event(api_gateway_event, "POST", other_claim.id, user_id, other_household.id, [{"name": "Sofa"}])
+    response = create_batch_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 404
+    assert test_db.query(Item).filter(Item.claim_id == other_claim.id).count() == 0
+
+
+def test_update_items_batch(test_db, api_gateway_event, seed_multiple_items):
+    """ Test that each row only changes the fields it provides"""
+    claim_id, user_id, item_ids = seed_multiple_items
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+    room = _seed_room(test_db, claim_id, household_id)
+
+    rows = [
+        {"id": str(item_ids[0]), "unit_cost": 250.0, "room_id": str(room.id)},
+        {"id": str(item_ids[1]), "name": "Renamed", "description": None},
+    ]
+    event = _batch_event(api_gateway_event, "PATCH", claim_id, user_id, household_id, rows)
+    response = update_batch_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    data = json.loads(response["body"])["data"]
+    assert data["updated"] == 2
+    assert data["results"][0]["item"]["unit_cost"] == 250.0
+
+    test_db.expire_all()
+    first, second, third = (test_db.query(Item).filter(Item.id == item_id).first() for item_id in item_ids)
+    assert (first.unit_cost, first.room_id, first.name) == (250.0, room.id, "Test Item 0")
+    assert (second.name, second.description, second.unit_cost) == ("Renamed", None, 100.0)
+    assert third.name == "Test Item 2"
+
+
+def test_update_items_batch_reports_failed_rows(test_db, api_gateway_event, seed_multiple_items):
+    """ Test that unknown, duplicate and empty rows are reported by index"""
+    claim_id, user_id, item_ids = seed_multiple_items
+    household_id = test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+
+    rows = [
+        {"id": str(item_ids[0]), "name": "Kept"},
+        {"id": str(item_ids[0]), "name": "Duplicate"},
+        {"id": str(uuid.uuid4()), "name": "Missing"},
+        {"id": str(item_ids[1])},
+        {"name": "No ID"},
+    ]
+    event = _batch_event(api_gateway_event, "PATCH", claim_id, user_id, household_id, rows)
+    response = update_batch_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 207
+    results = json.loads(response["body"])["data"]["results"]
+    assert results[0]["status"] == "updated"
+    assert results[1]["error"] == "Item appears more than once in the batch"
+    assert results[2]["error"] == "Item not found"
+    assert results[3]["error"] == "No updates provided"
+    assert results[4]["error"] == "Missing required field: id"
+
+    test_db.expire_all()
+    assert test_db.query(Item).filter(Item.id == item_ids[0]).first().name == "Kept"
@@ -0,0 +1,81 @@
+import json
+import uuid
+from items.manage_labels import lambda_handler
+from models import Household, Label, User
+from models.item_labels import ItemLabel
+
+
+def _label(test_db, household_id, text):
+    label = Label(id=uuid.uuid4(), label_text=text, is_ai_generated=False, household_id=household_id)
+    test_db.add(label)
+    test_db.commit()
+    return label
+
+
+def _manage(test_db, api_gateway_event, item_id, user, body):
+    event = api_gateway_event(http_method="PATCH", path_params={"item_id": str(item_id)}, body=json.dumps(body),
+                              auth_user=str(user.id), household_id=str(user.household_id))
+    return lambda_handler(event, {}, db_session=test_db)
+
+
+def _active_label_ids(test_db, item_id):
+    return {row.label_id for row in test_db.query(ItemLabel).filter(ItemLabel.item_id == item_id,
+                                                                    ItemLabel.deleted.is_(False))}
+
+
+def test_add_labels_counts_new_and_reactivated(test_db, api_gateway_event, seed_item):
+    """ Test that adding creates or reactivates associations and skips already active ones"""
+    item_id, user_id, _ = seed_item
+    user = test_db.query(User).filter(User.id == user_id).first()
+    active, removed, new = (_label(test_db, user.household_id, text) for text in ("TV", "Couch", "Lamp"))
+    test_db.add_all([ItemLabel(item_id=item_id, label_id=active.id),
+                     ItemLabel(item_id=item_id, label_id=removed.id, deleted=True)])
+    test_db.commit()
+
+    response = _manage(test_db, api_gateway_event, item_id, user,
+                       {"add": [str(active.id), str(removed.id), str(new.id), str(new.id)]})
+
+    assert response["statusCode"] == 200
+    data = json.loads(response["body"])["data"]
+    assert (data["labels_added"], data["labels_removed"]) == (2, 0)
+    assert "invalid_add_labels" not in data
+    assert _active_label_ids(test_db, item_id) == {active.id, removed.id, new.id}
+
+
+def test_add_labels_rejects_other_household_and_malformed_ids(test_db, api_gateway_event, seed_item):
+    """ Test that labels outside the household and malformed IDs are reported as invalid"""
+    item_id, user_id, _ = seed_item
+    user = test_db.query(User).filter(User.id == user_id).first()
+    other_household = Household(id=uuid.uuid4(), name="Other Household")
+    test_db.add(other_household)
+    test_db.commit()
+    foreign = _label(test_db, other_household.id, "TV")
+    own = _label(test_db, user.household_id, "Couch")
+
+    response = _manage(test_db, api_gateway_event, item_id, user,
+                       {"add": [str(own.id), str(foreign.id), "not-a-uuid"]})
+
+    data = json.loads(response["body"])["data"]
+    assert data["labels_added"] == 1
+    assert data["invalid_add_labels"] == ["not-a-uuid", str(foreign.id)]
+    assert _active_label_ids(test_db, item_id) == {own.id}
+
+
+def test_remove_labels_soft_deletes_active_associations(test_db, api_gateway_event, seed_item):
+    """ Test that removing only counts associations that were active"""
+    item_id, user_id, _ = seed_item
+    user = test_db.query(User).filter(User.id == user_id).first()
+    tv, couch, lamp = (_label(test_db, user.household_id, text) for text in ("TV", "Couch", "Lamp"))
+    test_db.add_all([ItemLabel(item_id=item_id, label_id=tv.id),
+                     ItemLabel(item_id=item_id, label_id=couch.id),
+                     ItemLabel(item_id=item_id, label_id=lamp.id, deleted=True)])
+    test_db.commit()
+
+    response = _manage(test_db, api_gateway_event, item_id, user,
+                       {"remove": [str(tv.id), str(lamp.id), str(uuid.uuid4()), "bad"]})
+
+    data = json.loads(response["body"])["data"]
+    assert (data["labels_added"], data["labels_removed"]) == (0, 1)
+    assert data["invalid_remove_labels"] == ["bad"]
+    test_db.expire_all()
+    assert _active_label_ids(test_db, item_id) == {couch.id}
@@ -0,0 +1,83 @@
+import json
+import uuid
+from labels import label_batch
+from labels.apply_labels import lambda_handler
+from models import File, Label, User
+from models.file_labels import FileLabel
+from models.room import Room
+
+
+def _add_file(test_db, user, claim_id, room_id=None):
+    file = File(id=uuid.uuid4(), uploaded_by=user.id, household_id=user.household_id, claim_id=claim_id,
+                room_id=room_id, file_name="photo.jpg", s3_key=f"key-{uuid.uuid4()}", file_hash=str(uuid.uuid4()))
+    test_db.add(file)
+    test_db.commit()
+    return file.id
+
+
+def _apply(test_db, api_gateway_event, claim_id, user, body):
+    event = api_gateway_event(http_method="POST", path_params={"claim_id": str(claim_id)}, body=json.dumps(body),
+                              auth_user=str(user.id), household_id=str(user.household_id))
+    return lambda_handler(event, {}, db_session=test_db)
+
+
+def _file_label_texts(test_db, file_id):
+    return {row.label_text for row in test_db.query(Label.label_text).join(FileLabel, FileLabel.label_id == Label.id)
+            .filter(FileLabel.file_id == file_id, FileLabel.deleted.is_(False))}
+
+
+def test_apply_labels_to_files_reuses_and_creates_labels(test_db, api_gateway_event, seed_claim):
+    """ Test that label texts are matched ignoring case or created once and attached to every file"""
+    claim_id, user_id, file_id = seed_claim
+    user = test_db.query(User).filter(User.id == user_id).first()
+    existing = Label(id=uuid.uuid4(), label_text="Water Damage", is_ai_generated=False, household_id=user.household_id)
+    test_db.add(existing)
+    test_db.commit()
+    other_file_id = _add_file(test_db, user, claim_id)
+
+    response = _apply(test_db, api_gateway_event, claim_id, user,
+                      {"labels": ["water damage", "Mold", "mold"], "file_ids": [str(file_id), str(other_file_id)]})
+
+    assert response["statusCode"] == 200
+    data = json.loads(response["body"])["data"]
+    assert (data["files_labeled"], data["labels_attached"]) == (2, 4)
+    assert {(label["label_text"], label["created"]) for label in data["labels"]} == {("Water Damage", False), ("Mold", True)}
+    assert _file_label_texts(test_db, file_id) == _file_label_texts(test_db, other_file_id) == {"Water Damage", "Mold"}
+    assert test_db.query(Label).filter(Label.household_id == user.household_id).count() == 2
+
+
+def test_apply_labels_to_room_skips_full_files(test_db, api_gateway_event, seed_claim):
+    """ Test that a room selection is labeled and files at the label limit are reported"""
+    claim_id, user_id, _ = seed_claim
+    user = test_db.query(User).filter(User.id == user_id).first()
+    room = Room(id=uuid.uuid4(), name="Kitchen", household_id=user.household_id, claim_id=claim_id)
+    test_db.add(room)
+    test_db.commit()
+    open_file_id, full_file_id = _add_file(test_db, user, claim_id, room.id), _add_file(test_db, user, claim_id, room.id)
+    outside_file_id = _add_file(test_db, user, claim_id)
+    fillers = [Label(id=uuid.uuid4(), label_text=f"Filler {n}", is_ai_generated=False, household_id=user.household_id)
+               for n in range(label_batch.MAX_LABELS_PER_FILE)]
+    test_db.add_all(fillers)
+    test_db.flush()
+    test_db.add_all([FileLabel(file_id=full_file_id, label_id=label.id) for label in fillers])
+    test_db.commit()
+
+    response = _apply(test_db, api_gateway_event, claim_id, user, {"labels": ["Smoke"], "room_id": str(room.id)})
+
+    assert response["statusCode"] == 207
+    data = json.loads(response["body"])["data"]
+    assert data["files_labeled"] == 1
+    assert data["files_failed"] == [{"file_id": str(full_file_id), "reason": "Too many labels on this file."}]
+    assert _file_label_texts(test_db, open_file_id) == {"Smoke"}
+    assert _file_label_texts(test_db, outside_file_id) == set()
+
+
+def test_apply_labels_requires_one_file_selection(test_db, api_gateway_event, seed_claim):
+    """ Test that a request without exactly one file selector is rejected"""
+    claim_id, user_id, file_id = seed_claim
+    user = test_db.query(User).filter(User.id == user_id).first()
+
+    response = _apply(test_db, api_gateway_event, claim_id, user,
+                      {"labels": ["Mold"], "file_ids": [str(file_id)], "room_id": str(uuid.uuid4())})
+
+    assert response["statusCode"] == 400
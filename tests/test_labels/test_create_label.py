@@ -8,6 +8,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from labels.create_label import lambda_handler
 from models import Label, File
 from models.file_labels import FileLabel
+from models.label_version import LabelVersion
 
 
 def test_create_label_success(api_gateway_event, test_db, seed_file_with_labels):
@@ -229,3 +230,71 @@ def test_ai_and_user_can_have_identical_labels(api_gateway_event, test_db, seed_
     assert ai_label_from_db is not None, "AI label should exist."
     assert user_label_from_db is not None, "User label should exist."
     assert ai_label_from_db.id != user_label_from_db.id, "AI and User labels should be distinct."
+
+def test_create_label_reuses_household_label(api_gateway_event, test_db, seed_file_with_labels):
+    """✅ Test that a household label from another file is reused and case-insensitive duplicates fail."""
+    file_id, user_id, household_id, _, _ = seed_file_with_labels
+    first_file = test_db.query(File).filter(File.id == file_id).first()
+    second_file = File(id=uuid.uuid4(), uploaded_by=user_id, household_id=household_id,
+                       claim_id=first_file.claim_id, file_name="test2.jpg", s3_key="test-key-2")
+    test_db.add(second_file)
+    test_db.commit()
+
+    payload = {"labels": ["User Label", "Mold", "MOLD"]}
+    event = api_gateway_event("POST", path_params={"file_id": str(second_file.id)}, body=json.dumps(payload),
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 207
+    assert {label["label_text"] for label in body["data"]["labels_created"]} == {"User Label", "Mold"}
+    assert body["data"]["labels_failed"] == [{"label_text": "MOLD", "reason": "Duplicate label."}]
+    assert test_db.query(Label).filter(Label.household_id == household_id, Label.label_text == "User Label").count() == 1
+
+    payload = {"label_text": "user label"}
+    event["body"] = json.dumps(payload)
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 409
+
+
+def test_create_label_reuses_household_label_ignoring_case(api_gateway_event, test_db, seed_file_with_labels):
+    """✅ Test that a label differing only in case from a household label reuses it instead of adding another."""
+    file_id, user_id, household_id, _, _ = seed_file_with_labels
+    first_file = test_db.query(File).filter(File.id == file_id).first()
+    second_file = File(id=uuid.uuid4(), uploaded_by=user_id, household_id=household_id,
+                       claim_id=first_file.claim_id, file_name="test2.jpg", s3_key="test-key-2")
+    test_db.add(second_file)
+    test_db.commit()
+
+    event = api_gateway_event("POST", path_params={"file_id": str(second_file.id)},
+                              body=json.dumps({"label_text": "user label"}),
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 201
+    assert [label["label_text"] for label in body["data"]["labels_created"]] == ["User Label"]
+    user_labels = test_db.query(Label).filter(Label.household_id == household_id, Label.is_ai_generated.is_(False))
+    assert [label.label_text for label in user_labels] == ["User Label"]
+    assert test_db.query(FileLabel).filter(FileLabel.file_id == second_file.id).count() == 1
+
+
+def test_create_label_attaching_existing_label_bumps_label_version(api_gateway_event, test_db, seed_file_with_labels):
+    """✅ Test that attaching an existing household label to another file bumps the label version."""
+    file_id, user_id, household_id, _, _ = seed_file_with_labels
+    first_file = test_db.query(File).filter(File.id == file_id).first()
+    second_file = File(id=uuid.uuid4(), uploaded_by=user_id, household_id=household_id,
+                       claim_id=first_file.claim_id, file_name="test2.jpg", s3_key="test-key-2")
+    test_db.add(second_file)
+    test_db.commit()
+    before = test_db.query(LabelVersion.version).filter(LabelVersion.household_id == household_id).scalar() or 0
+
+    event = api_gateway_event("POST", path_params={"file_id": str(second_file.id)},
+                              body=json.dumps({"label_text": "User Label"}),
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 201
+    after = test_db.query(LabelVersion.version).filter(LabelVersion.household_id == household_id).scalar()
+    assert after == before + 1
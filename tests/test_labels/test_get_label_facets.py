@@ -0,0 +1,121 @@
+import json
+import uuid
+import pytest
+from labels import get_label_facets
+from labels.get_label_facets import lambda_handler
+from items.delete_item import lambda_handler as delete_item
+from models import Claim, File, Label
+from models.file_labels import FileLabel
+from models.item_labels import ItemLabel
+from utils.label_version import bump_label_version
+
+
+@pytest.fixture(autouse=True)
+def clear_facet_cache():
+    get_label_facets._facet_cache.clear()
+    yield
+    get_label_facets._facet_cache.clear()
+
+
+def _facets_event(api_gateway_event, claim_id, user_id, household_id):
+    return api_gateway_event(http_method="GET", path_params={"claim_id": str(claim_id)},
+                             auth_user=str(user_id), household_id=str(household_id))
+
+
+def test_get_label_facets_counts_files_and_items(test_db, api_gateway_event, seed_item_with_file_labels):
+    """ Test that each active label is returned with its file and item counts"""
+    item_id, user_id, file_id = seed_item_with_file_labels
+    claim = test_db.query(Claim).join(File, File.claim_id == Claim.id).filter(File.id == file_id).first()
+    tv = test_db.query(Label).filter(Label.label_text == "TV", Label.household_id == claim.household_id).first()
+    couch = test_db.query(Label).filter(Label.label_text == "Couch", Label.household_id == claim.household_id).first()
+    test_db.add_all([FileLabel(file_id=file_id, label_id=tv.id), FileLabel(file_id=file_id, label_id=couch.id)])
+    test_db.commit()
+
+    event = _facets_event(api_gateway_event, claim.id, user_id, claim.household_id)
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    facets = {facet["label_text"]: facet for facet in body["data"]["facets"]}
+    assert facets["TV"]["file_count"] == 1
+    assert facets["TV"]["item_count"] == 1
+    assert facets["Couch"]["file_count"] == 1
+    assert facets["Couch"]["item_count"] == 0
+    # Most used labels come first
+    assert body["data"]["facets"][0]["label_text"] == "TV"
+
+
+def test_get_label_facets_excludes_deleted(test_db, api_gateway_event, seed_item_with_file_labels):
+    """ Test that removed associations and deleted labels are not counted"""
+    item_id, user_id, file_id = seed_item_with_file_labels
+    claim = test_db.query(Claim).join(File, File.claim_id == Claim.id).filter(File.id == file_id).first()
+    couch = test_db.query(Label).filter(Label.label_text == "Couch", Label.household_id == claim.household_id).first()
+    test_db.add(FileLabel(file_id=file_id, label_id=couch.id, deleted=True))
+    test_db.query(ItemLabel).filter(ItemLabel.item_id == item_id).update({"deleted": True})
+    test_db.commit()
+
+    event = _facets_event(api_gateway_event, claim.id, user_id, claim.household_id)
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["data"]["facets"] == []
+
+
+def test_get_label_facets_cache_invalidated_by_label_version(test_db, api_gateway_event, seed_item_with_file_labels):
+    """ Test that cached facets are refreshed after a label change bumps the version"""
+    _, user_id, file_id = seed_item_with_file_labels
+    claim = test_db.query(Claim).join(File, File.claim_id == Claim.id).filter(File.id == file_id).first()
+    couch = test_db.query(Label).filter(Label.label_text == "Couch", Label.household_id == claim.household_id).first()
+    event = _facets_event(api_gateway_event, claim.id, user_id, claim.household_id)
+
+    first = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])["data"]["facets"]
+    assert [facet["label_text"] for facet in first] == ["TV"]
+
+    test_db.add(FileLabel(file_id=file_id, label_id=couch.id))
+    test_db.commit()
+
+    # Without a version bump the cached facets are served
+    cached = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])["data"]["facets"]
+    assert cached == first
+
+    bump_label_version(test_db, claim.household_id)
+    test_db.commit()
+
+    refreshed = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])["data"]["facets"]
+    assert {facet["label_text"] for facet in refreshed} == {"TV", "Couch"}
+
+
+def test_get_label_facets_other_household(test_db, api_gateway_event, seed_claim):
+    """ Test that a claim from another household is not found"""
+    claim_id, user_id, _ = seed_claim
+
+    event = _facets_event(api_gateway_event, claim_id, user_id, uuid.uuid4())
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 404
+
+
+def test_get_label_facets_invalid_id(test_db, api_gateway_event):
+    """ Test that an invalid claim ID is rejected"""
+    event = api_gateway_event(http_method="GET", path_params={"claim_id": "not-a-uuid"})
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
+
+
+def test_get_label_facets_cache_invalidated_by_item_delete(test_db, api_gateway_event, seed_item_with_file_labels):
+    """ Test that deleting a labelled item bumps the label version so its labels stop being counted"""
+    item_id, user_id, file_id = seed_item_with_file_labels
+    claim = test_db.query(Claim).join(File, File.claim_id == Claim.id).filter(File.id == file_id).first()
+    claim_id, household_id = claim.id, claim.household_id
+    event = _facets_event(api_gateway_event, claim_id, user_id, household_id)
+
+    first = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])["data"]["facets"]
+    assert [facet["label_text"] for facet in first] == ["TV"]
+
+    delete_event = api_gateway_event(http_method="DELETE", path_params={"item_id": str(item_id)},
+                                     auth_user=str(user_id), household_id=str(household_id))
+    assert delete_item(delete_event, {}, db_session=test_db)["statusCode"] == 204
+
+    refreshed = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])["data"]["facets"]
+    assert refreshed == []
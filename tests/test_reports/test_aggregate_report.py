@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from models import OutboxMessage
+from models.claim import Claim
+from models.report import Report, ReportStatus
+from reports import aggregate_report
+
+FILE_ORGANIZATION_QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/file-organization-queue"
+
+
+@pytest.fixture
+def aggregate_env(mocker, test_db):
+    """Route the handler to the test database, with S3 mocked and inline outbox flushing off."""
+    mocker.patch("reports.aggregate_report.get_db_session", return_value=test_db)
+    mocker.patch("utils.outbox.INLINE_FLUSH", False)
+    mocker.patch.multiple(aggregate_report, REPORTS_BUCKET_NAME="reports-bucket",
+                          FILE_ORGANIZATION_QUEUE_URL=FILE_ORGANIZATION_QUEUE_URL)
+    mocker.patch("reports.aggregate_report.s3_client")
+    return mocker.patch("reports.report_artifact.write_report_data", return_value={"key": "report-data/x.jsonl.gz"})
+
+
+def test_fingerprint_matches_the_aggregated_content(test_db, seed_claim, aggregate_env, mocker):
+    """Test that a claim change landing during aggregation changes neither the fingerprint nor the data"""
+    claim_id, user_id, _ = seed_claim
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    title, fingerprint = claim.title, claim.report_fingerprint(test_db)
+    report = Report(user_id=user_id, household_id=claim.household_id, claim_id=claim_id, report_type="FULL",
+                    email_address="owner@example.com", status=ReportStatus.REQUESTED.value)
+    test_db.add(report)
+    test_db.commit()
+    report_id = str(report.id)
+
+    build_report_data = Claim.build_report_data
+
+    def rename_then_build(self, session, *args, **kwargs):
+        with test_db.get_bind().begin() as other:
+            other.execute(text("UPDATE claims SET title = 'Renamed Claim' WHERE id = :id"), {"id": claim_id})
+        return build_report_data(self, session, *args, **kwargs)
+
+    mocker.patch.object(Claim, "build_report_data", autospec=True, side_effect=rename_then_build)
+
+    aggregate_report.lambda_handler({"Records": [{"body": json.dumps({
+        "report_id": report_id, "email_address": "owner@example.com"
+    })}]}, None)
+
+    report_data = aggregate_env.call_args[0][3]
+    assert report_data.claim["title"] == title
+    report = test_db.query(Report).filter(Report.id == report.id).one()
+    assert report.fingerprint == fingerprint
+    assert [message.queue_url for message in test_db.query(OutboxMessage).all()] == [FILE_ORGANIZATION_QUEUE_URL]
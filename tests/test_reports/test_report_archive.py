@@ -0,0 +1,300 @@
+import csv
+import io
+import zipfile
+from functools import partial
+from unittest.mock import MagicMock
+
+import pytest
+
+from reports import report_archive
+from reports.report_archive import ArchiveEntry, S3MultipartWriter
+
+
+class Unseekable(io.RawIOBase):
+    """A write-only stream like the multipart upload, to check zipfile never seeks."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def _report_data():
+    return {
+        "items": [
+            {"id": "item-1", "number": 1, "name": "Fridge / Freezer", "room": "Kitchen", "quantity": 2,
+             "unit_cost": 500.0, "total_cost": 1000.0, "description": "Fridge"},
+            {"id": "item-2", "number": 2, "name": "Lamp", "room": "N/A", "unit_cost": None, "total_cost": None},
+        ],
+        "files": [
+            {"id": "f1", "filename": "a.jpg", "s3_key": "k/a.jpg", "content_type": "image/jpeg", "item_ids": ["item-1"]},
+            {"id": "f2", "filename": "b.png", "s3_key": "k/b.png", "content_type": "image/png", "item_ids": ["item-1"]},
+            {"id": "f3", "filename": "c.jpg", "s3_key": "k/c.jpg", "content_type": "image/jpeg", "item_ids": ["item-2"]},
+            {"id": "f4", "filename": "c.jpg", "s3_key": "k/d.jpg", "content_type": "image/jpeg", "item_ids": []},
+        ],
+    }
+
+
+def test_plan_entries_names_files_by_item():
+    """Test that item files are named by room and item, and everything else goes to misc with unique names"""
+    entries = report_archive.plan_entries(_report_data())
+
+    assert [(entry.arcname, entry.source) for entry in entries] == [
+        ("submission/Kitchen/1 - Fridge _ Freezer (1).jpg", "k/a.jpg"),
+        ("submission/Kitchen/1 - Fridge _ Freezer (2).png", "k/b.png"),
+        ("submission/misc/c.jpg", "k/c.jpg"),
+        ("submission/misc/c (2).jpg", "k/d.jpg"),
+    ]
+
+
+def test_write_archive_streams_entries_and_items_csv():
+    """Test that the archive is written without seeking, with the CSV first and unreadable files skipped"""
+    contents = {"k/a.jpg": b"a" * 3000, "k/b.png": b"b" * 10, "k/c.jpg": b"c", "k/d.jpg": b"d"}
+
+    def open_entry(entry):
+        if entry.source == "k/b.png":
+            raise IOError("NoSuchKey")
+        return io.BytesIO(contents[entry.source]), len(contents[entry.source])
+
+    data = _report_data()
+    output = Unseekable()
+    skipped = report_archive.write_archive(output, report_archive.plan_entries(data), data["items"], open_entry)
+
+    assert skipped == ["submission/Kitchen/1 - Fridge _ Freezer (2).png"]
+    with zipfile.ZipFile(io.BytesIO(output.buffer.getvalue())) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [
+            "submission/items_summary.csv",
+            "submission/Kitchen/1 - Fridge _ Freezer (1).jpg",
+            "submission/misc/c.jpg",
+            "submission/misc/c (2).jpg",
+        ]
+        assert archive.read("submission/Kitchen/1 - Fridge _ Freezer (1).jpg") == contents["k/a.jpg"]
+        rows = list(csv.reader(io.StringIO(archive.read("submission/items_summary.csv").decode("utf-8"))))
+    assert rows[0] == report_archive.ITEMS_CSV_HEADER
+    assert rows[1][0:2] == ["1", "Kitchen"] and rows[1][-2:] == ["$500.00", "$1000.00"]
+    assert rows[2][-2:] == ["N/A", "N/A"]
+
+
+def test_multipart_writer_uploads_parts_and_completes():
+    """Test that data is uploaded in full parts with the remainder as the last part"""
+    s3 = MagicMock()
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+    s3.upload_part.side_effect = lambda **kwargs: {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    with S3MultipartWriter(s3, "bucket", "key", part_size=4) as upload:
+        upload.write(b"0123456")
+        upload.write(b"789")
+        assert upload.tell() == 10
+
+    assert [call.kwargs["Body"] for call in s3.upload_part.call_args_list] == [b"0123", b"4567", b"89"]
+    s3.complete_multipart_upload.assert_called_once_with(
+        Bucket="bucket", Key="key", UploadId="upload-1",
+        MultipartUpload={"Parts": [{"PartNumber": n, "ETag": f"etag-{n}"} for n in (1, 2, 3)]}
+    )
+
+
+def test_multipart_writer_aborts_on_error():
+    """Test that a failure while writing aborts the upload instead of completing it"""
+    s3 = MagicMock()
+    s3.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+
+    with pytest.raises(RuntimeError):
+        with S3MultipartWriter(s3, "bucket", "key", part_size=4) as upload:
+            upload.write(b"01")
+            raise RuntimeError("source failed")
+
+    s3.abort_multipart_upload.assert_called_once_with(Bucket="bucket", Key="key", UploadId="upload-1")
+    s3.complete_multipart_upload.assert_not_called()
+
+
+def test_compress_type_for_media_and_text():
+    """Test that already compressed media is stored, by content type or magic bytes, and text is deflated"""
+    assert report_archive.compress_type_for("image/jpeg") == zipfile.ZIP_STORED
+    assert report_archive.compress_type_for("video/quicktime") == zipfile.ZIP_STORED
+    assert report_archive.compress_type_for("application/octet-stream", b"%PDF-1.7\n") == zipfile.ZIP_STORED
+    assert report_archive.compress_type_for(None, b"\x00\x00\x00\x18ftypheic") == zipfile.ZIP_STORED
+    assert report_archive.compress_type_for("text/csv", b"a,b,c\n") == zipfile.ZIP_DEFLATED
+    assert report_archive.compress_type_for(None, b"plain text") == zipfile.ZIP_DEFLATED
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_write_archive_stores_media_and_deflates_text(workers):
+    """Test that photos are stored and text entries deflated, inline or on the thread pool, in plan order"""
+    contents = {"photo": b"\xff\xd8\xff\xe0" + bytes(5000), "notes": b"notes " * 1000, "blob": b"\x89PNG\r\n\x1a\n" + bytes(100)}
+    entries = [
+        ArchiveEntry("submission/misc/notes.txt", "notes", "text/plain"),
+        ArchiveEntry("submission/misc/photo.jpg", "photo", "image/jpeg"),
+        ArchiveEntry("submission/misc/blob", "blob", "application/octet-stream"),
+        ArchiveEntry("submission/misc/more.txt", "notes", "text/plain"),
+    ]
+    output = Unseekable()
+
+    report_archive.write_archive(output, entries, [], lambda entry: (io.BytesIO(contents[entry.source]),
+                                                                     len(contents[entry.source])), workers=workers)
+
+    with zipfile.ZipFile(io.BytesIO(output.buffer.getvalue())) as archive:
+        assert archive.testzip() is None
+        assert [(info.filename, info.compress_type) for info in archive.infolist()] == [
+            ("submission/items_summary.csv", zipfile.ZIP_DEFLATED),
+            ("submission/misc/notes.txt", zipfile.ZIP_DEFLATED),
+            ("submission/misc/photo.jpg", zipfile.ZIP_STORED),
+            ("submission/misc/blob", zipfile.ZIP_STORED),
+            ("submission/misc/more.txt", zipfile.ZIP_DEFLATED),
+        ]
+        assert archive.read("submission/misc/more.txt") == contents["notes"]
+        assert archive.read("submission/misc/photo.jpg") == contents["photo"]
+
+
+def _download_s3(missing=("k/b.png",), changed=()):
+    """S3 mock whose objects hold their own key (reversed if `changed`), except for the `missing` keys."""
+    s3 = MagicMock()
+
+    def body(Key):
+        if Key in missing:
+            raise IOError("Not Found")
+        return Key.encode()[::-1] if Key in changed else Key.encode()
+
+    def head_object(Bucket, Key):
+        data = body(Key)
+        return {"ContentLength": len(data), "ETag": f'"{data.decode()}"'}
+
+    def get_object(Bucket, Key):
+        data = body(Key)
+        return {"Body": io.BytesIO(data), "ContentLength": len(data), "ETag": f'"{data.decode()}"'}
+
+    s3.head_object.side_effect = head_object
+    s3.get_object.side_effect = get_object
+    return s3
+
+
+def test_download_entries_collects_failures(tmp_path):
+    """Test that entries are downloaded to their archive paths and failed downloads are returned"""
+    s3 = _download_s3()
+    entries = report_archive.plan_entries(_report_data())
+
+    failures = report_archive.download_entries(s3, "bucket", entries, str(tmp_path), workers=3)
+
+    assert failures == [{"file": "submission/Kitchen/1 - Fridge _ Freezer (2).png", "s3_key": "k/b.png",
+                         "error": "Not Found"}]
+    assert (tmp_path / "submission" / "Kitchen" / "1 - Fridge _ Freezer (1).jpg").read_bytes() == b"k/a.jpg"
+    assert (tmp_path / "submission" / "misc" / "c (2).jpg").read_bytes() == b"k/d.jpg"
+    assert not s3.head_object.called  # Nothing to resume
+    assert [entry.arcname for entry in report_archive.local_entries(str(tmp_path))] == [
+        "submission/Kitchen/1 - Fridge _ Freezer (1).jpg", "submission/misc/c (2).jpg", "submission/misc/c.jpg"
+    ]
+
+
+def test_download_entries_resumes_from_checkpoints(tmp_path):
+    """Test that a retried download skips checkpointed files that still match and fetches the rest"""
+    entries = report_archive.plan_entries(_report_data())
+    report_archive.download_entries(_download_s3(), "bucket", entries, str(tmp_path))
+    (tmp_path / "submission" / "misc" / "c.jpg").write_bytes(b"cut")  # Truncated by the timed out attempt
+    with open(tmp_path / report_archive.MANIFEST_NAME, "a") as manifest:
+        manifest.write('{"file": "submission/misc/c (2')  # Checkpoint cut short
+
+    s3 = _download_s3(missing=(), changed=("k/d.jpg",))  # Replaced in S3 since its checkpoint
+    progress = []
+    failures = report_archive.download_entries(s3, "bucket", entries, str(tmp_path),
+                                               on_progress=lambda done, total: progress.append((done, total)))
+
+    assert failures == []
+    assert sorted(call.kwargs["Key"] for call in s3.get_object.call_args_list) == ["k/b.png", "k/c.jpg", "k/d.jpg"]
+    assert (tmp_path / "submission" / "misc" / "c.jpg").read_bytes() == b"k/c.jpg"
+    assert (tmp_path / "submission" / "misc" / "c (2).jpg").read_bytes() == b"gpj.d/k"
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+    assert report_archive.read_manifest(str(tmp_path))["submission/misc/c (2).jpg"]["etag"] == '"gpj.d/k"'
+
+
+def test_fetch_entries_reads_files_into_memory():
+    """Test that entries are read in parallel into memory and unreadable ones are left out"""
+    s3 = MagicMock()
+
+    def get_object(Bucket, Key):
+        if Key == "k/b.png":
+            raise IOError("Not Found")
+        return {"Body": io.BytesIO(Key.encode())}
+
+    s3.get_object.side_effect = get_object
+    entries = report_archive.plan_entries(_report_data())
+
+    contents = report_archive.fetch_entries(s3, "bucket", entries, workers=3)
+    skipped = report_archive.write_archive(io.BytesIO(), entries, [],
+                                           partial(report_archive.open_memory_entry, contents))
+
+    assert contents == {"k/a.jpg": b"k/a.jpg", "k/c.jpg": b"k/c.jpg", "k/d.jpg": b"k/d.jpg"}
+    assert skipped == ["submission/Kitchen/1 - Fridge _ Freezer (2).png"]
+
+
+class FakeS3:
+    """Keeps objects and multipart uploads in memory, including server side part copies."""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.copied = 0
+
+    def create_multipart_upload(self, Bucket, Key, ContentType=None):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber, CopySource, CopySourceRange):
+        start, end = (int(n) for n in CopySourceRange[len("bytes="):].split("-"))
+        self.uploads[UploadId][PartNumber] = self.objects[(CopySource["Bucket"], CopySource["Key"])][start:end + 1]
+        self.copied += end + 1 - start
+        return {"CopyPartResult": {"ETag": f"etag-{PartNumber}"}}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(parts)
+        assert all(len(parts[n]) >= report_archive.MIN_PART_SIZE for n in numbers[:-1])
+        self.objects[(Bucket, Key)] = b"".join(parts[n] for n in numbers)
+
+    def get_object(self, Bucket, Key, Range=None):
+        data = self.objects[(Bucket, Key)]
+        if Range:
+            start, end = (int(n) for n in Range[len("bytes="):].split("-"))
+            data = data[start:end + 1]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+
+def test_segments_concatenate_into_one_archive(monkeypatch):
+    """Test that shard segments copied into one upload and finished with the CSV form a valid archive"""
+    monkeypatch.setattr(report_archive, "MIN_PART_SIZE", 64)
+    monkeypatch.setattr(report_archive, "COPY_PART_SIZE", 128)
+    s3 = FakeS3()
+    photos = {f"k/{n}": b"\xff\xd8\xff" + bytes([n]) * (40 + 100 * n) for n in range(6)}
+    s3.objects.update({("files", key): data for key, data in photos.items()})
+    entries = [ArchiveEntry(f"submission/Room {n % 2}/{n}.jpg", f"k/{n}", "image/jpeg") for n in range(6)]
+
+    segments = []
+    for shard in (entries[:1], entries[1:4], entries[4:]):
+        key = f"shards/{len(segments)}"
+        with S3MultipartWriter(s3, "reports", key, part_size=64) as upload:
+            records, skipped, size = report_archive.write_segment(
+                upload, shard, lambda entry: report_archive.open_s3_entry(s3, "files", entry))
+        assert skipped == [] and size == len(s3.objects[("reports", key)])
+        segments.append((key, size, records))
+
+    with S3MultipartWriter(s3, "reports", "report.zip", part_size=64) as upload:
+        offsets = []
+        for key, size, records in segments:
+            offsets.append((upload.tell(), records))
+            upload.copy_from("reports", key, size)
+        report_archive.finish_archive(upload, offsets, [{"number": 1, "room": "Room 0"}])
+
+    assert s3.copied > 0
+    with zipfile.ZipFile(io.BytesIO(s3.objects[("reports", "report.zip")])) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [entry.arcname for entry in entries] + ["submission/items_summary.csv"]
+        assert archive.read("submission/Room 1/5.jpg") == photos["k/5"]
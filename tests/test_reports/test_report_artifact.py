@@ -0,0 +1,71 @@
+import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from models.report_data import ReportData, ReportFile, ReportItem
+from reports import report_archive, report_artifact
+
+
+def _s3():
+    """S3 mock keeping uploaded objects in memory."""
+    objects = {}
+    s3 = MagicMock()
+    s3.upload_fileobj.side_effect = lambda fileobj, bucket, key, ExtraArgs=None: objects.__setitem__(
+        (bucket, key), fileobj.read())
+    s3.get_object.side_effect = lambda Bucket, Key: {"Body": io.BytesIO(objects[(Bucket, Key)])}
+    return s3, objects
+
+
+def _report_data(items=3):
+    report_data = ReportData({"id": "claim-1", "title": "Fire"})
+    for n in range(1, items + 1):
+        report_data.add_item(ReportItem(n, SimpleNamespace(
+            id=f"item-{n}", name=f"Item {n}", room_name="Kitchen" if n % 2 else None, brand_manufacturer=None,
+            model_number=None, description=None, original_vendor=None, quantity=1, age_years=None,
+            age_months=None, condition=None, unit_cost=10.0)))
+    file = ReportFile(SimpleNamespace(id="file-1", file_name="a.jpg", s3_key="k/a.jpg", content_type="image/jpeg",
+                                      file_size=1024))
+    file.item_ids.append("item-1")
+    report_data.files.append(file)
+    return report_data
+
+
+def test_report_data_round_trip():
+    """Test that the artifact is written once and streamed back section by section"""
+    s3, objects = _s3()
+
+    pointer = report_artifact.write_report_data(s3, "reports", "report-1", _report_data())
+
+    assert list(objects) == [("reports", "report-data/report-1.jsonl.gz")]
+    assert (pointer["key"], pointer["items"], pointer["files"]) == ("report-data/report-1.jsonl.gz", 3, 1)
+    stream = report_artifact.ReportDataStream(s3, pointer)
+    assert stream.claim == {"id": "claim-1", "title": "Fire"}
+    index = {}
+    items = list(report_archive.index_items(stream.items(), index))
+    assert [(item["number"], item["room"], item["total_cost"]) for item in items] == [
+        (1, "Kitchen", 10.0), (2, "N/A", 10.0), (3, "Kitchen", 10.0)
+    ]
+    entries = list(report_archive.plan_files(stream.files(), index))
+    assert [entry.arcname for entry in entries] == ["submission/Kitchen/1 - Item 1 (1).jpg"]
+
+
+def test_report_data_files_can_skip_items():
+    """Test that a stage needing only the files can skip the item records"""
+    s3, _ = _s3()
+    pointer = report_artifact.write_report_data(s3, "reports", "report-1", _report_data(items=50))
+
+    files = list(report_artifact.ReportDataStream(s3, pointer).files())
+
+    assert [file["s3_key"] for file in files] == ["k/a.jpg"]
+
+
+def test_report_data_checksum_mismatch():
+    """Test that reading an artifact that does not match its pointer's checksum fails"""
+    s3, _ = _s3()
+    pointer = dict(report_artifact.write_report_data(s3, "reports", "report-1", _report_data()), sha256="0" * 64)
+
+    stream = report_artifact.ReportDataStream(s3, pointer)
+    with pytest.raises(ValueError, match="checksum"):
+        list(stream.items()) and list(stream.files())
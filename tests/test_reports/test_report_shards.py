@@ -0,0 +1,83 @@
+from sqlalchemy.orm import Session
+from models.claim import Claim
+from models.report import Report, ReportStatus
+from reports import report_shards
+from reports.report_archive import ArchiveEntry
+
+MB = 1024 * 1024
+
+
+def _entries(*files):
+    return [ArchiveEntry(f"submission/{room}/{n} - Item {n} (1).jpg", f"k/{n}.jpg", "image/jpeg", size * MB)
+            for n, (room, size) in enumerate(files, 1)]
+
+
+def test_plan_shards_keeps_rooms_together():
+    """Test that a room's files share a shard when the room fits the budget"""
+    entries = _entries(("Kitchen", 4), ("Kitchen", 4), ("Garage", 6), ("Kitchen", 1))
+
+    assert report_shards.plan_shards(entries, 10 * MB, "room") == [[0, 1, 3], [2]]
+
+
+def test_plan_shards_by_bytes_fills_shards_in_order():
+    """Test that byte sharding fills each shard in file order"""
+    entries = _entries(("Kitchen", 4), ("Kitchen", 4), ("Garage", 6), ("Kitchen", 1))
+
+    assert report_shards.plan_shards(entries, 10 * MB, "bytes") == [[0, 1], [2, 3]]
+
+
+def test_plan_shards_splits_oversized_rooms_and_files():
+    """Test that a room over the budget is split and a file over the budget gets its own shard"""
+    entries = _entries(("Kitchen", 6), ("Kitchen", 6), ("Kitchen", 25), ("Garage", 1))
+
+    assert report_shards.plan_shards(entries, 10 * MB, "room") == [[0], [1], [2], [3]]
+
+
+def test_plan_shards_small_claim_is_one_shard():
+    """Test that a claim within the budget, or without files, is a single shard"""
+    assert report_shards.plan_shards(_entries(("Kitchen", 1), ("Garage", 1)), 10 * MB) == [[0, 1]]
+    assert report_shards.plan_shards([], 10 * MB) == [[]]
+
+
+def test_complete_shard_reports_the_last_shard_once(test_db, seed_claim):
+    """Test that only the call completing the last shard gets the report, and redeliveries are not counted"""
+    claim_id, user_id, _ = seed_claim
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    report = Report(user_id=user_id, household_id=claim.household_id, claim_id=claim_id, report_type="FULL",
+                    email_address="owner@example.com", status=ReportStatus.DELIVERING.value)
+    report_shards.start_shards(report, 2)
+    test_db.add(report)
+    test_db.commit()
+
+    assert report_shards.complete_shard(test_db, str(report.id), 1, 100, []) is None
+    assert report_shards.complete_shard(test_db, str(report.id), 1, 100, []) is None
+    completed = report_shards.complete_shard(test_db, str(report.id), 0, 200, ["submission/a.jpg"])
+
+    assert completed is not None and completed.shards_completed == 2
+    assert completed.shard_state == {"1": {"size": 100, "skipped": []},
+                                     "0": {"size": 200, "skipped": ["submission/a.jpg"]}}
+
+
+def test_complete_shard_sees_shards_completed_by_other_sessions(test_db, seed_claim):
+    """Test that a worker holding a stale copy of the report still counts another worker's shard"""
+    claim_id, user_id, _ = seed_claim
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    report = Report(user_id=user_id, household_id=claim.household_id, claim_id=claim_id, report_type="FULL",
+                    email_address="owner@example.com", status=ReportStatus.DELIVERING.value)
+    report_shards.start_shards(report, 2)
+    test_db.add(report)
+    test_db.commit()
+    report_id = str(report.id)
+
+    with Session(bind=test_db.get_bind()) as other:
+        # Both workers load the report before either completes its shard
+        assert other.get(Report, report.id).shard_state == {}
+        assert test_db.get(Report, report.id).shard_state == {}
+
+        assert report_shards.complete_shard(other, report_id, 0, 200, []) is None
+        other.commit()
+
+        completed = report_shards.complete_shard(test_db, report_id, 1, 100, [])
+        assert completed is not None and completed.shards_completed == 2
+        assert set(completed.shard_state) == {"0", "1"}
+        test_db.commit()
@@ -0,0 +1,53 @@
+import csv
+import io
+import zipfile
+from types import SimpleNamespace
+
+from models.report import ReportType
+from models.report_data import ReportData, ReportItem
+from reports import report_summary
+
+
+def _report_data():
+    report_data = ReportData({"id": "claim-1", "title": "Fire <Kitchen>", "date_of_loss": "2024-01-02"})
+    for n, (name, room, unit_cost) in enumerate([("Fridge", "Kitchen", 500.0), ("Lamp", None, None)], 1):
+        report_data.add_item(ReportItem(n, SimpleNamespace(
+            id=f"item-{n}", name=name, room_name=room, brand_manufacturer=None, model_number=None,
+            description=None, original_vendor=None, quantity=2, age_years=None, age_months=None, condition=None,
+            unit_cost=unit_cost)))
+    return report_data
+
+
+def test_csv_only_summary_is_the_items_csv():
+    """Test that a CSV_ONLY report is the items summary CSV alone"""
+    body, extension, content_type = report_summary.build_summary(ReportType.CSV_ONLY.value, _report_data())
+
+    rows = list(csv.reader(io.StringIO(body.decode("utf-8"))))
+    assert (extension, content_type) == ("csv", "text/csv")
+    assert [row[:2] + row[-2:] for row in rows[1:]] == [["1", "Kitchen", "$500.00", "$1000.00"],
+                                                       ["2", "N/A", "N/A", "N/A"]]
+
+
+def test_summary_zips_the_csv_and_schedule():
+    """Test that a SUMMARY report zips the items CSV with an escaped HTML schedule"""
+    body, extension, content_type = report_summary.build_summary(ReportType.SUMMARY.value, _report_data())
+
+    assert (extension, content_type) == ("zip", "application/zip")
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        assert archive.namelist() == ["submission/items_summary.csv", "submission/items_schedule.html"]
+        schedule = archive.read("submission/items_schedule.html").decode("utf-8")
+    assert "<h1>Fire &lt;Kitchen&gt;</h1>" in schedule
+    assert "2 items, total $1000.00" in schedule
+
+
+def test_write_summary_uploads_next_to_full_reports():
+    """Test that the summary is uploaded under the claim's report prefix"""
+    s3 = SimpleNamespace(calls=[])
+    s3.put_object = lambda **kwargs: s3.calls.append(kwargs)
+    report = SimpleNamespace(report_type=ReportType.CSV_ONLY.value, household_id="household-1", claim_id="claim-1")
+
+    s3_key = report_summary.write_summary(s3, "reports", report, _report_data())
+
+    assert s3_key.startswith("reports/household-1/claim-1/claim_summary_Fire_<Kitchen>_")
+    assert s3_key.endswith(".csv")
+    assert [(call["Bucket"], call["Key"], call["ContentType"]) for call in s3.calls] == [("reports", s3_key, "text/csv")]
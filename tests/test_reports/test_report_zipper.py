@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from models import OutboxMessage
+from models.claim import Claim
+from models.report import Report, ReportStatus
+from reports import report_shards, report_zipper
+
+DELIVER_REPORT_QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/deliver-report-queue"
+
+
+@pytest.fixture
+def zipper_env(mocker, test_db):
+    """Route the handler to the test database, with S3 and the shard writer mocked and inline outbox flushing off."""
+    mocker.patch("reports.report_zipper.get_db_session", return_value=test_db)
+    mocker.patch("utils.outbox.INLINE_FLUSH", False)
+    mocker.patch.multiple(report_zipper, REPORTS_BUCKET_NAME="reports-bucket",
+                          DELIVER_REPORT_QUEUE_URL=DELIVER_REPORT_QUEUE_URL)
+    mocker.patch("reports.report_zipper.s3_client")
+    return mocker.patch("reports.report_zipper.write_shard", return_value=(100, []))
+
+
+def _sharded_report(test_db, claim_id, user_id, status, shards=1):
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    report = Report(user_id=user_id, household_id=claim.household_id, claim_id=claim_id, report_type="FULL",
+                    email_address="owner@example.com", status=status.value)
+    report_shards.start_shards(report, shards)
+    test_db.add(report)
+    test_db.commit()  # Expires the report, so the handler loads its status from the database
+    return str(report.id)
+
+
+def _shard_event(report_id, shard=0):
+    return {"Records": [{"body": json.dumps({
+        "report_id": report_id, "report_data_ref": {"key": "report-data/x.jsonl.gz"},
+        "email_address": "owner@example.com", "shard": shard, "shard_plan": {}
+    })}]}
+
+
+def test_last_shard_queues_the_finalize_message(test_db, seed_claim, zipper_env):
+    """Test that completing the last shard queues the finalize message"""
+    claim_id, user_id, _ = seed_claim
+    report_id = _sharded_report(test_db, claim_id, user_id, ReportStatus.DELIVERING)
+
+    report_zipper.lambda_handler(_shard_event(report_id), None)
+
+    messages = test_db.query(OutboxMessage).all()
+    assert [message.queue_url for message in messages] == [DELIVER_REPORT_QUEUE_URL]
+    assert json.loads(messages[0].body)["finalize"] is True
+
+
+@pytest.mark.parametrize("status", [ReportStatus.FAILED, ReportStatus.COMPLETED])
+def test_redelivered_shard_of_finished_report_is_skipped(test_db, seed_claim, zipper_env, status):
+    """Test that a shard message for a failed or completed report neither writes the shard nor changes the report"""
+    claim_id, user_id, _ = seed_claim
+    report_id = _sharded_report(test_db, claim_id, user_id, status)
+
+    report_zipper.lambda_handler(_shard_event(report_id), None)
+
+    zipper_env.assert_not_called()
+    assert test_db.query(Report).one().status == status
+    assert test_db.query(OutboxMessage).count() == 0
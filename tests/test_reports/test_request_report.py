@@ -0,0 +1,224 @@
+import io
+import json
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from models import OutboxMessage
+from models.report import Report, ReportStatus
+from models.claim import Claim
+from models.file import File
+from reports import request_report
+
+EMAIL_QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/email-queue"
+REQUEST_QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/report-request-queue"
+
+
+@pytest.fixture
+def report_env(mocker, test_db):
+    """Route the handler to the test database and mock S3, with inline outbox flushing off."""
+    mocker.patch("reports.request_report.get_db_session", return_value=test_db)
+    mocker.patch("utils.outbox.INLINE_FLUSH", False)
+    mocker.patch.multiple(request_report, EMAIL_QUEUE_URL=EMAIL_QUEUE_URL, REPORT_REQUEST_QUEUE_URL=REQUEST_QUEUE_URL,
+                          REPORTS_BUCKET_NAME="reports-bucket")
+    s3 = mocker.patch("reports.request_report.s3_client")
+    s3.generate_presigned_url.return_value = "https://signed-url.com/report.zip"
+    return s3
+
+
+def _event(claim_id, user_id, email="owner@example.com", report_type="FULL"):
+    return {
+        "pathParameters": {"claim_id": str(claim_id)},
+        "requestContext": {"authorizer": {"user_id": str(user_id)}},
+        "body": json.dumps({"email_address": email, "report_type": report_type}),
+    }
+
+
+def _report(test_db, claim_id, user_id, status, **fields):
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    report = Report(user_id=user_id, household_id=claim.household_id, claim_id=claim_id, report_type="FULL",
+                    email_address="owner@example.com", status=status.value,
+                    fingerprint=claim.report_fingerprint(test_db), **fields)
+    test_db.add(report)
+    test_db.commit()
+    return report.id
+
+
+def test_unchanged_claim_reuses_completed_report(test_db, seed_claim, report_env):
+    """Test that a request matching a completed report's fingerprint re-signs its archive and queues the email"""
+    claim_id, user_id, _ = seed_claim
+    previous = _report(test_db, claim_id, user_id, ReportStatus.COMPLETED, s3_key="reports/previous.zip",
+                       completed_at=datetime.now(timezone.utc))
+
+    response = request_report.lambda_handler(_event(claim_id, user_id), None)
+
+    assert response["statusCode"] == 200
+    report_id = uuid.UUID(json.loads(response["body"])["data"]["report_id"])
+    assert report_id != previous
+    report = test_db.query(Report).filter(Report.id == report_id).one()
+    assert (report.status, report.s3_key) == (ReportStatus.COMPLETED, "reports/previous.zip")
+    report_env.head_object.assert_called_once_with(Bucket="reports-bucket", Key="reports/previous.zip")
+    messages = test_db.query(OutboxMessage).all()
+    assert [message.queue_url for message in messages] == [EMAIL_QUEUE_URL]
+    assert json.loads(messages[0].body)["presigned_url"] == "https://signed-url.com/report.zip"
+
+
+def test_changed_claim_runs_the_pipeline(test_db, seed_claim, report_env):
+    """Test that a completed report for different content is not reused"""
+    claim_id, user_id, _ = seed_claim
+    _report(test_db, claim_id, user_id, ReportStatus.COMPLETED, s3_key="reports/previous.zip")
+    claim = test_db.query(Claim).filter(Claim.id == claim_id).first()
+    claim.title = "Renamed Claim"
+    test_db.commit()
+
+    response = request_report.lambda_handler(_event(claim_id, user_id), None)
+
+    assert json.loads(response["body"])["data"]["status"] == ReportStatus.REQUESTED.value
+    assert [message.queue_url for message in test_db.query(OutboxMessage).all()] == [REQUEST_QUEUE_URL]
+
+
+def test_duplicate_request_is_coalesced(test_db, seed_claim, report_env):
+    """Test that a duplicate of a report still being built returns that report"""
+    claim_id, user_id, _ = seed_claim
+    in_flight = _report(test_db, claim_id, user_id, ReportStatus.ORGANIZING)
+
+    response = request_report.lambda_handler(_event(claim_id, user_id), None)
+
+    assert json.loads(response["body"])["data"]["report_id"] == str(in_flight)
+    assert test_db.query(Report).count() == 1
+    assert test_db.query(OutboxMessage).count() == 0
+
+
+def test_summary_is_built_and_emailed_in_the_request(test_db, seed_item, report_env):
+    """Test that a SUMMARY report is uploaded and its email queued without running the pipeline"""
+    _, user_id, _ = seed_item
+    claim_id = test_db.query(Claim).one().id
+
+    response = request_report.lambda_handler(_event(claim_id, user_id, report_type="SUMMARY"), None)
+
+    assert json.loads(response["body"])["data"]["status"] == ReportStatus.COMPLETED.value
+    upload = report_env.put_object.call_args.kwargs
+    assert (upload["Bucket"], upload["ContentType"]) == ("reports-bucket", "application/zip")
+    report = test_db.query(Report).one()
+    assert (report.report_type, report.s3_key) == ("SUMMARY", upload["Key"])
+    assert [message.queue_url for message in test_db.query(OutboxMessage).all()] == [EMAIL_QUEUE_URL]
+
+
+def test_failed_summary_is_reported_as_an_error(test_db, seed_item, report_env):
+    """Test that a summary that cannot be uploaded fails the report and the request"""
+    _, user_id, _ = seed_item
+    claim_id = test_db.query(Claim).one().id
+    report_env.put_object.side_effect = IOError("Access Denied")
+
+    response = request_report.lambda_handler(_event(claim_id, user_id, report_type="CSV_ONLY"), None)
+
+    assert response["statusCode"] == 500
+    assert "Access Denied" in json.loads(response["body"])["error_details"]
+    assert test_db.query(Report).one().status == ReportStatus.FAILED
+    assert test_db.query(OutboxMessage).count() == 0
+
+
+def test_unknown_report_type_is_rejected(test_db, seed_claim, report_env):
+    """Test that a report type other than FULL, SUMMARY or CSV_ONLY is a bad request"""
+    claim_id, user_id, _ = seed_claim
+
+    response = request_report.lambda_handler(_event(claim_id, user_id, report_type="PHOTOS"), None)
+
+    assert response["statusCode"] == 400
+    assert test_db.query(Report).count() == 0
+
+
+def test_small_claim_is_built_and_emailed_in_the_request(test_db, seed_claim, report_env):
+    """Test that a FULL report of a small claim is zipped in memory and emailed without running the pipeline"""
+    claim_id, user_id, file_id = seed_claim
+    test_db.query(File).filter(File.id == file_id).one().file_size = 5
+    test_db.commit()
+    report_env.get_object.return_value = {"Body": io.BytesIO(b"photo")}
+
+    response = request_report.lambda_handler(_event(claim_id, user_id), None)
+
+    assert json.loads(response["body"])["data"]["status"] == ReportStatus.COMPLETED.value
+    upload = report_env.put_object.call_args.kwargs
+    with zipfile.ZipFile(io.BytesIO(upload["Body"])) as archive:
+        assert archive.read("submission/misc/test.jpg") == b"photo"
+    assert test_db.query(Report).one().s3_key == upload["Key"]
+    assert [message.queue_url for message in test_db.query(OutboxMessage).all()] == [EMAIL_QUEUE_URL]
+
+
+def test_claim_is_not_locked_while_building_in_the_request(test_db, seed_claim, report_env, mocker):
+    """Test that the report is committed and the claim lock released before a small report is built"""
+    claim_id, user_id, file_id = seed_claim
+    test_db.query(File).filter(File.id == file_id).one().file_size = 5
+    test_db.commit()
+
+    def write_report(s3_client, reports_bucket, files_bucket, report, report_data):
+        with test_db.get_bind().connect() as other:
+            # Fails at once if the request still holds the claim lock
+            other.execute(text("SELECT id FROM claims WHERE id = :id FOR UPDATE NOWAIT"), {"id": claim_id})
+            assert other.execute(text("SELECT count(*) FROM reports")).scalar() == 1
+            other.rollback()
+        return "reports/small.zip", []
+
+    mocker.patch("reports.report_inline.write_report", side_effect=write_report)
+
+    response = request_report.lambda_handler(_event(claim_id, user_id), None)
+
+    assert response["statusCode"] == 200
+    assert test_db.query(Report).one().s3_key == "reports/small.zip"
+
+
+def test_inline_report_is_failed_when_the_request_errors_after_committing_it(test_db, seed_item, report_env, mocker):
+    """Test that a report committed before an in-request build is failed if the request then errors"""
+    _, user_id, _ = seed_item
+    claim_id = test_db.query(Claim).one().id
+    mocker.patch("utils.outbox.enqueue", side_effect=RuntimeError("outbox unavailable"))
+
+    response = request_report.lambda_handler(_event(claim_id, user_id, report_type="SUMMARY"), None)
+
+    assert response["statusCode"] == 500
+    report = test_db.query(Report).one()
+    assert report.status == ReportStatus.FAILED
+    assert "outbox unavailable" in report.error_message
+
+
+def test_stale_inline_report_is_not_coalesced(test_db, seed_claim, report_env):
+    """Test that a small claim's report left unfinished by an earlier request is not joined"""
+    claim_id, user_id, file_id = seed_claim
+    test_db.query(File).filter(File.id == file_id).one().file_size = 5
+    test_db.commit()
+    report_env.get_object.return_value = {"Body": io.BytesIO(b"photo")}
+    stale = _report(test_db, claim_id, user_id, ReportStatus.REQUESTED,
+                    created_at=datetime.now(timezone.utc) - timedelta(
+                        seconds=request_report.INLINE_COALESCE_WINDOW_SECONDS + 60))
+
+    response = request_report.lambda_handler(_event(claim_id, user_id), None)
+
+    data = json.loads(response["body"])["data"]
+    assert data["report_id"] != str(stale)
+    assert data["status"] == ReportStatus.COMPLETED.value
+
+
+def test_inline_report_fingerprint_matches_the_built_content(test_db, seed_item, report_env, mocker):
+    """Test that a claim change landing while a summary is built changes neither its fingerprint nor its content"""
+    _, user_id, _ = seed_item
+    claim = test_db.query(Claim).one()
+    claim_id, title, fingerprint = claim.id, claim.title, claim.report_fingerprint(test_db)
+    build_report_data = Claim.build_report_data
+
+    def rename_then_build(self, session, *args, **kwargs):
+        with test_db.get_bind().begin() as other:
+            other.execute(text("UPDATE claims SET title = 'Renamed Claim' WHERE id = :id"), {"id": claim_id})
+        return build_report_data(self, session, *args, **kwargs)
+
+    mocker.patch.object(Claim, "build_report_data", autospec=True, side_effect=rename_then_build)
+
+    response = request_report.lambda_handler(_event(claim_id, user_id, report_type="SUMMARY"), None)
+
+    assert json.loads(response["body"])["data"]["status"] == ReportStatus.COMPLETED.value
+    with zipfile.ZipFile(io.BytesIO(report_env.put_object.call_args.kwargs["Body"])) as archive:
+        schedule = archive.read("submission/items_schedule.html").decode("utf-8")
+    assert f"<h1>{title}</h1>" in schedule
+    assert test_db.query(Report).one().fingerprint == fingerprint
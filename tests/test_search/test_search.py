@@ -0,0 +1,119 @@
+"""Test searching a household's items, files and labels"""
+import json
+import uuid
+from search.search import lambda_handler
+from models.claim import Claim
+from models.file_labels import FileLabel
+from models.item import Item
+from models.label import Label
+from utils.search_index import reindex_items, reindex_files, reindex_labels
+
+
+def _household_of(test_db, claim_id):
+    return test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+
+
+def _seed_searchable(test_db, claim_id, file_id):
+    household_id = _household_of(test_db, claim_id)
+    item = Item(id=uuid.uuid4(), claim_id=claim_id, name="Television", brand_manufacturer="Samsung",
+                model_number="QN65Q80C", description="65 inch living room TV")
+    label = Label(id=uuid.uuid4(), label_text="electronics", is_ai_generated=True, household_id=household_id)
+    test_db.add_all([item, label])
+    test_db.commit()
+    test_db.add(FileLabel(file_id=file_id, label_id=label.id))
+    test_db.commit()
+
+    reindex_items(test_db, [item.id])
+    reindex_files(test_db, [file_id])
+    reindex_labels(test_db, [label.id])
+    test_db.commit()
+    return household_id, item, label
+
+
+def test_search_matches_brand(api_gateway_event, test_db, seed_claim):
+    """Test that a brand name finds the item"""
+    claim_id, user_id, file_id = seed_claim
+    household_id, item, _ = _seed_searchable(test_db, claim_id, file_id)
+
+    event = api_gateway_event(http_method="GET", query_params={"q": "samsung"},
+                              auth_user=str(user_id), household_id=str(household_id))
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    results = body["data"]["results"]
+    assert results[0]["type"] == "item"
+    assert results[0]["id"] == str(item.id)
+
+
+def test_search_fuzzy_and_prefix(api_gateway_event, test_db, seed_claim):
+    """Test that typos and partially typed words still match"""
+    claim_id, user_id, file_id = seed_claim
+    household_id, item, _ = _seed_searchable(test_db, claim_id, file_id)
+
+    for text in ("televsion", "telev"):
+        event = api_gateway_event(http_method="GET", query_params={"q": text},
+                                  auth_user=str(user_id), household_id=str(household_id))
+        body = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])
+        assert str(item.id) in [result["id"] for result in body["data"]["results"]]
+
+
+def test_search_label_text_finds_files(api_gateway_event, test_db, seed_claim):
+    """Test that label text matches both the label and the labeled file"""
+    claim_id, user_id, file_id = seed_claim
+    household_id, _, label = _seed_searchable(test_db, claim_id, file_id)
+
+    event = api_gateway_event(http_method="GET", query_params={"q": "electronics", "types": "file,label"},
+                              auth_user=str(user_id), household_id=str(household_id))
+    body = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])
+
+    found = {(result["type"], result["id"]) for result in body["data"]["results"]}
+    assert ("file", str(file_id)) in found
+    assert ("label", str(label.id)) in found
+
+
+def test_search_removes_deleted_items(api_gateway_event, test_db, seed_claim):
+    """Test that soft-deleted items drop out of the index when reindexed"""
+    claim_id, user_id, file_id = seed_claim
+    household_id, item, _ = _seed_searchable(test_db, claim_id, file_id)
+
+    item.deleted = True
+    reindex_items(test_db, [item.id])
+    test_db.commit()
+
+    event = api_gateway_event(http_method="GET", query_params={"q": "samsung"},
+                              auth_user=str(user_id), household_id=str(household_id))
+    body = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])
+
+    assert body["data"]["results"] == []
+    assert body["data"]["pagination"]["total"] == 0
+
+
+def test_search_is_household_scoped(api_gateway_event, test_db, seed_claim):
+    """Test that another household sees no results"""
+    claim_id, user_id, file_id = seed_claim
+    _seed_searchable(test_db, claim_id, file_id)
+
+    event = api_gateway_event(http_method="GET", query_params={"q": "samsung"},
+                              auth_user=str(user_id), household_id=str(uuid.uuid4()))
+    body = json.loads(lambda_handler(event, {}, db_session=test_db)["body"])
+
+    assert body["data"]["results"] == []
+
+
+def test_search_requires_query(api_gateway_event, test_db):
+    """Test that a missing query is rejected"""
+    event = api_gateway_event(http_method="GET", query_params={"types": "item"})
+    response = lambda_handler(event, {}, db_session=test_db)
+
+    assert response["statusCode"] == 400
+
+
+def test_search_invalid_type(api_gateway_event, test_db):
+    """Test that unknown result types are rejected"""
+    event = api_gateway_event(http_method="GET", query_params={"q": "tv", "types": "room"})
+    response = lambda_handler(event, {}, db_session=test_db)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 400
+    assert body["error_details"] == "Invalid types: room"
@@ -0,0 +1,58 @@
+import uuid
+import pytest
+from models import Claim, Household, Item, Room
+from models.file import File
+from utils import auth_utils
+
+
+@pytest.fixture(autouse=True)
+def clear_claim_cache():
+    auth_utils._claim_households.clear()
+    yield
+    auth_utils._claim_households.clear()
+
+
+def _household_of(test_db, claim_id):
+    return test_db.query(Claim).filter(Claim.id == claim_id).first().household_id
+
+
+def test_claim_in_household_caches_owner(test_db, seed_claim):
+    """Test that the claim owner is resolved once and then served from the cache"""
+    claim_id, _, _ = seed_claim
+    household_id = _household_of(test_db, claim_id)
+
+    assert auth_utils.claim_in_household(test_db, claim_id, household_id) is True
+    assert auth_utils._claim_households.get(str(claim_id)) == str(household_id)
+    assert auth_utils.claim_in_household(test_db, claim_id, uuid.uuid4()) is False
+    assert auth_utils.claim_in_household(test_db, uuid.uuid4(), household_id) is False
+
+
+def test_get_claim_resource(test_db, seed_claim):
+    """Test that the claim check and resource lookup are answered by one query"""
+    claim_id, _, _ = seed_claim
+    household_id = _household_of(test_db, claim_id)
+    room = Room(id=uuid.uuid4(), name="Kitchen", household_id=household_id, claim_id=claim_id)
+    deleted_room = Room(id=uuid.uuid4(), name="Attic", household_id=household_id, claim_id=claim_id, deleted=True)
+    test_db.add_all([room, deleted_room])
+    test_db.commit()
+
+    assert auth_utils.get_claim_resource(test_db, household_id, claim_id, Room, room.id) == (True, room)
+    assert auth_utils.get_claim_resource(test_db, household_id, claim_id, Room, deleted_room.id) == (True, None)
+    assert auth_utils.get_claim_resource(test_db, household_id, claim_id, Room, uuid.uuid4()) == (True, None)
+    assert auth_utils.get_claim_resource(test_db, uuid.uuid4(), claim_id, Room, room.id) == (False, None)
+    assert auth_utils.get_claim_resource(test_db, household_id, uuid.uuid4(), Room, room.id) == (False, None)
+
+
+def test_get_household_resource(test_db, seed_item):
+    """Test that items and files of another household are not returned"""
+    item_id, _, file_id = seed_item
+    item = test_db.query(Item).filter(Item.id == item_id).first()
+    household_id = _household_of(test_db, item.claim_id)
+    other_household = Household(id=uuid.uuid4(), name="Other Household")
+    test_db.add(other_household)
+    test_db.commit()
+
+    assert auth_utils.get_household_resource(test_db, household_id, Item, item_id) is item
+    assert auth_utils.get_household_resource(test_db, household_id, File, file_id).id == file_id
+    assert auth_utils.get_household_resource(test_db, other_household.id, Item, item_id) is None
+    assert auth_utils.get_household_resource(test_db, other_household.id, File, file_id) is None
@@ -1,10 +1,11 @@
 import json
 import pytest
+import time
 import uuid
 from unittest.mock import patch, MagicMock
 from sqlalchemy.exc import SQLAlchemyError
 
-from utils.lambda_utils import standard_lambda_handler, extract_uuid_param
+from utils.lambda_utils import standard_lambda_handler, extract_uuid_param, resolve_session_intent, LAST_WRITE_HEADER
 from utils import response
 from models import User
 
@@ -273,3 +274,52 @@ class TestExtractUuidParam:
         assert result["statusCode"] == 400
         body = json.loads(result["body"])
         assert "Invalid" in body["error_details"]
+
+
+class TestSessionRouting:
+    """Test cases for read replica routing of handler sessions."""
+
+    @pytest.mark.parametrize("method, expected", [("GET", "read"), ("HEAD", "read"), ("POST", "write"), ("DELETE", "write")])
+    @patch("utils.lambda_utils.get_db_session")
+    def test_intent_follows_http_method(self, mock_get_db, method, expected, mock_event, mock_context):
+        """Test that read requests ask for a read session and mutations for the primary."""
+        mock_get_db.return_value = MagicMock()
+        mock_event["httpMethod"] = method
+
+        standard_lambda_handler(requires_auth=False)(handler_no_auth)(mock_event, mock_context)
+
+        mock_get_db.assert_called_once_with(expected)
+
+    @patch("utils.lambda_utils.get_db_session")
+    def test_declared_intent_overrides_method(self, mock_get_db, mock_event, mock_context):
+        """Test that GET handlers which write can pin the primary."""
+        mock_get_db.return_value = MagicMock()
+        mock_event["httpMethod"] = "GET"
+
+        standard_lambda_handler(requires_auth=False, db_intent="write")(handler_no_auth)(mock_event, mock_context)
+
+        mock_get_db.assert_called_once_with("write")
+
+    @patch("utils.lambda_utils.get_db_session")
+    def test_mutation_response_stamped_with_write_time(self, mock_get_db, mock_event, mock_context):
+        """Test that successful mutations return the read-your-writes header."""
+        mock_get_db.return_value = MagicMock()
+        mock_event["httpMethod"] = "POST"
+
+        result = standard_lambda_handler(requires_auth=False)(handler_no_auth)(mock_event, mock_context)
+
+        assert int(result["headers"][LAST_WRITE_HEADER]) > 0
+
+    def test_read_your_writes_window(self, mock_event):
+        """Test that reads shortly after a write echoed by the client go to the primary."""
+        mock_event["httpMethod"] = "GET"
+        now_ms = int(time.time() * 1000)
+
+        mock_event["headers"] = {LAST_WRITE_HEADER.lower(): str(now_ms)}
+        assert resolve_session_intent(mock_event) == "write"
+
+        mock_event["headers"] = {LAST_WRITE_HEADER: str(now_ms - 3_600_000)}
+        assert resolve_session_intent(mock_event) == "read"
+
+        mock_event["headers"] = {LAST_WRITE_HEADER: "yesterday"}
+        assert resolve_session_intent(mock_event) == "read"
@@ -0,0 +1,111 @@
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from models import OutboxMessage
+from utils import outbox
+
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/test-queue"
+OTHER_QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/other-queue"
+
+
+def _accepting_sqs(rejected=()):
+    """SQS mock that accepts every entry except those whose ID is in `rejected`."""
+    sqs = MagicMock()
+    sqs.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+        "Successful": [{"Id": entry["Id"]} for entry in Entries if entry["Id"] not in rejected],
+        "Failed": [{"Id": entry["Id"], "Code": "InternalError", "Message": "Rejected", "SenderFault": False}
+                   for entry in Entries if entry["Id"] in rejected],
+    }
+    return sqs
+
+
+def test_relay_publishes_in_batches_per_queue(test_db):
+    """Test that pending messages are sent in send_message_batch chunks of 10 per queue and marked published"""
+    ids = [outbox.enqueue(test_db, QUEUE_URL, {"n": n}) for n in range(23)]
+    ids.append(outbox.enqueue(test_db, OTHER_QUEUE_URL, {"n": 23}, {"ReportId": "report-1"}))
+    test_db.commit()
+    sqs = _accepting_sqs()
+
+    result = outbox.relay(test_db, sqs=sqs)
+
+    assert result == {"published": 24, "failed": 0}
+    batches = [(call.kwargs["QueueUrl"], len(call.kwargs["Entries"])) for call in sqs.send_message_batch.call_args_list]
+    assert sorted(batches) == sorted([(QUEUE_URL, 10), (QUEUE_URL, 10), (QUEUE_URL, 3), (OTHER_QUEUE_URL, 1)])
+    other_entry = sqs.send_message_batch.call_args_list[-1].kwargs["Entries"][0]
+    assert json.loads(other_entry["MessageBody"]) == {"n": 23}
+    assert other_entry["MessageAttributes"]["ReportId"]["StringValue"] == "report-1"
+    assert other_entry["MessageAttributes"]["OutboxId"]["StringValue"] == str(ids[-1])
+    assert test_db.query(OutboxMessage).filter(OutboxMessage.published_at.is_(None)).count() == 0
+    assert outbox.relay(test_db, sqs=sqs) == {"published": 0, "failed": 0}
+
+
+def test_relay_retries_rejected_messages_with_backoff(test_db):
+    """Test that rejected messages record the error and wait for their retry time"""
+    accepted = outbox.enqueue(test_db, QUEUE_URL, {"n": 1})
+    rejected = outbox.enqueue(test_db, QUEUE_URL, {"n": 2})
+    test_db.commit()
+
+    result = outbox.relay(test_db, sqs=_accepting_sqs(rejected={str(rejected)}))
+
+    assert result == {"published": 1, "failed": 1}
+    message = test_db.query(OutboxMessage).filter(OutboxMessage.id == rejected).one()
+    assert (message.published_at, message.attempts, message.last_error) == (None, 1, "InternalError: Rejected")
+    assert message.retry_at is not None
+    assert test_db.query(OutboxMessage).filter(OutboxMessage.id == accepted).one().published_at is not None
+    # Not due yet, so the next pass leaves it alone
+    assert outbox.relay(test_db, sqs=_accepting_sqs()) == {"published": 0, "failed": 0}
+
+
+def test_flush_only_when_inline_flush_enabled(test_db, monkeypatch):
+    """Test that flush publishes just the given messages, and nothing when inline flushing is off"""
+    mine = outbox.enqueue(test_db, QUEUE_URL, {"n": 1})
+    outbox.enqueue(test_db, QUEUE_URL, {"n": 2})
+    test_db.commit()
+    sqs = _accepting_sqs()
+
+    monkeypatch.setattr(outbox, "INLINE_FLUSH", False)
+    outbox.flush(test_db, [mine], sqs=sqs)
+    sqs.send_message_batch.assert_not_called()
+
+    monkeypatch.setattr(outbox, "INLINE_FLUSH", True)
+    outbox.flush(test_db, [mine], sqs=sqs)
+    entries = sqs.send_message_batch.call_args.kwargs["Entries"]
+    assert [entry["Id"] for entry in entries] == [str(mine)]
+
+
+def test_record_delivery_and_stats(test_db):
+    """Test that consumer deliveries are counted and duplicates and pending messages show up in the stats"""
+    delivered = outbox.enqueue(test_db, QUEUE_URL, {"n": 1})
+    outbox.enqueue(test_db, QUEUE_URL, {"n": 2})
+    test_db.commit()
+    outbox.relay(test_db, sqs=_accepting_sqs(), ids=[delivered])
+    record = {"body": "{}", "messageAttributes": {"OutboxId": {"stringValue": str(delivered), "dataType": "String"}}}
+
+    assert outbox.record_delivery(test_db, record) == 1
+    assert outbox.record_delivery(test_db, record) == 2
+    assert outbox.record_delivery(test_db, {"body": "{}"}) == 0
+    test_db.commit()
+
+    stats = outbox.outbox_stats(test_db)[QUEUE_URL]
+    assert (stats["pending"], stats["failed"], stats["duplicated"], stats["unconfirmed"]) == (1, 0, 1, 0)
+    assert stats["oldest_pending_seconds"] >= 0
+
+
+def test_purge_deletes_only_old_published_messages(test_db, monkeypatch):
+    """Test that published messages past the retention window are deleted in batches and the rest kept"""
+    old = [outbox.enqueue(test_db, QUEUE_URL, {"n": n}) for n in range(5)]
+    recent = outbox.enqueue(test_db, QUEUE_URL, {"n": 5})
+    pending = outbox.enqueue(test_db, QUEUE_URL, {"n": 6})
+    test_db.commit()
+    outbox.relay(test_db, sqs=_accepting_sqs(), ids=old + [recent])
+    long_ago = outbox._now() - timedelta(seconds=outbox.RETENTION_SECONDS + 60)
+    test_db.query(OutboxMessage).filter(OutboxMessage.id.in_(old)).update(
+        {OutboxMessage.published_at: long_ago}, synchronize_session=False)
+    test_db.commit()
+
+    assert outbox.purge_published(test_db, batch_size=2) == 5
+
+    assert {message.id for message in test_db.query(OutboxMessage)} == {recent, pending}
+    stats = outbox.outbox_stats(test_db)[QUEUE_URL]
+    assert (stats["pending"], stats["duplicated"], stats["unconfirmed"]) == (1, 0, 0)